@@ -17,7 +17,13 @@ For detailed documentation on each function and parameter,
 refer to the actual implementation in Rust with PyO3 bindings.
 """
 
-from typing import Dict, List, Union, Tuple, Set, Any
+import os
+from typing import Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Union, Tuple, Set, Any
+
+import numpy as np
+
+# Text accepted by the metric entry points: a str, or UTF-8 encoded bytes
+TextInput = Union[str, bytes, bytearray, memoryview]
 
 # BatchProcessor class for efficient batch processing of text metrics
 class BatchProcessor:
@@ -25,7 +31,9 @@ class BatchProcessor:
     A configurable processor for computing selected text metrics on batches of documents.
 
     This class allows for selective computation of metrics to optimize performance
-    when only specific metrics are needed.
+    when only specific metrics are needed. The selected metrics are compiled into a
+    plan when the processor is created, so each document is traversed once per pass
+    (characters, lines, words, sentences, tokens) however many metrics share it.
 
     Attributes:
         enabled_metrics: Set of metric names to compute
@@ -49,30 +57,112 @@ class BatchProcessor:
         """
         ...
 
-    def compute_metrics(self, text: str) -> Dict[str, Any]:
+    def compute_metrics(self, text: TextInput, lossy: bool = False) -> Dict[str, Any]:
         """
         Compute all enabled metrics for a single text.
 
         Args:
-            text: The input text to analyze
+            text: The input text to analyze, as str or UTF-8 bytes
+            lossy: Replace invalid UTF-8 in bytes input with U+FFFD instead of raising
 
         Returns:
             Dictionary mapping metric names to their values
+
+        Raises:
+            UnicodeDecodeError: If bytes input is not valid UTF-8 and lossy is False
         """
         ...
 
-    def compute_batch_metrics(self, texts: List[str]) -> List[Dict[str, Any]]:
+    def compute_batch_metrics(
+        self, texts: Sequence[TextInput], lossy: bool = False
+    ) -> List[Dict[str, Any]]:
         """
         Compute metrics for a batch of texts.
 
+        Texts are processed in parallel with the GIL released, so other Python
+        threads keep running while the batch is analyzed. Results are returned
+        in the same order as the input texts.
+
         Args:
-            texts: List of input texts to analyze
+            texts: Input texts to analyze, as str or UTF-8 bytes
+            lossy: Replace invalid UTF-8 in bytes input with U+FFFD instead of raising
 
         Returns:
             List of dictionaries, each mapping metric names to their values for one text
         """
         ...
 
+    def calculate_batch_columns(
+        self, texts: Sequence[TextInput], lossy: bool = False
+    ) -> Dict[str, Union[np.ndarray, List[Dict[str, int]]]]:
+        """
+        Compute metrics for a batch of texts in columnar form.
+
+        Instead of one dictionary per text, this returns one NumPy array per metric
+        (int64 for counts, float64 for ratios, bool for flags), which can be passed
+        straight to a DataFrame constructor. Frequency metrics are returned as a
+        list of dictionaries, one per text.
+
+        Args:
+            texts: Input texts to analyze, as str or UTF-8 bytes
+            lossy: Replace invalid UTF-8 in bytes input with U+FFFD instead of raising
+
+        Returns:
+            Dictionary mapping each enabled metric name to its column of values
+        """
+        ...
+
+    def calculate_batch_arrow(self, texts: Any) -> Any:
+        """
+        Compute metrics for an Arrow text column, returning an Arrow RecordBatch.
+
+        The input is read through the Arrow C Data Interface, so the UTF-8 buffers
+        of the array are analyzed in place without copying each document into a
+        Python string. Null input rows produce null rows in every output column.
+        Frequency metrics are returned as map<string, int64> columns.
+
+        Args:
+            texts: A pyarrow StringArray or LargeStringArray
+
+        Returns:
+            A pyarrow.RecordBatch with one row per input text and one column per metric
+
+        Raises:
+            TypeError: If the array does not hold string or large_string values
+        """
+        ...
+
+    def imap(
+        self,
+        iterable: Iterable[TextInput],
+        chunk_size: int = 128,
+        max_in_flight: Optional[int] = None,
+        lossy: bool = False,
+    ) -> MetricsStream:
+        """
+        Lazily compute metrics for a stream of texts.
+
+        Texts are read from the iterable in chunks and analyzed on background worker
+        threads while the next chunks are being read, so loading (e.g. decompressing
+        a JSONL shard) and metric computation overlap. Results are yielded in input
+        order, one dictionary per text.
+
+        Args:
+            iterable: Any iterable of str or UTF-8 bytes; it is consumed lazily
+            chunk_size: Number of texts handed to a worker at once
+            max_in_flight: Maximum number of chunks read ahead and pending at once
+                (default: one per worker thread)
+            lossy: Replace invalid UTF-8 in bytes input with U+FFFD instead of raising
+
+        Returns:
+            An iterator of metric dictionaries
+
+        Raises:
+            ValueError: If chunk_size or max_in_flight is 0
+            UnicodeDecodeError: If bytes input is not valid UTF-8 and lossy is False
+        """
+        ...
+
 # HyperAnalyzer class for high-performance single-pass metrics calculation
 class HyperAnalyzer:
     """
@@ -85,13 +175,19 @@ class HyperAnalyzer:
     Attributes:
         include_punctuation: Whether to include punctuation in unigram metrics
         case_sensitive: Whether to treat text as case-sensitive for unigram metrics
+        num_threads: Size of the analyzer's dedicated thread pool, or None to share
+            the global pool
     """
 
     include_punctuation: bool
     case_sensitive: bool
+    num_threads: Optional[int]
 
     def __init__(
-        self, include_punctuation: bool = True, case_sensitive: bool = False
+        self,
+        include_punctuation: bool = True,
+        case_sensitive: bool = False,
+        num_threads: Optional[int] = None,
     ) -> None:
         """
         Initialize a new HyperAnalyzer with specified options.
@@ -99,10 +195,17 @@ class HyperAnalyzer:
         Args:
             include_punctuation: Whether to include punctuation in unigram metrics
             case_sensitive: Whether to treat text as case-sensitive for unigram metrics
+            num_threads: Number of worker threads used for batch processing. When
+                given, the analyzer owns a thread pool of this size so several
+                analyzers in one process do not compete for the global pool.
+                Must be at least 1.
+
+        Raises:
+            ValueError: If num_threads is 0
         """
         ...
 
-    def calculate_char_metrics(self, text: str) -> Dict[str, Any]:
+    def calculate_char_metrics(self, text: TextInput, lossy: bool = False) -> Dict[str, Any]:
         """
         Calculate only character metrics for a text.
 
@@ -110,14 +213,18 @@ class HyperAnalyzer:
         character-related metrics in the result dictionary.
 
         Args:
-            text: The input text to analyze
+            text: The input text to analyze, as str or UTF-8 bytes
+            lossy: Replace invalid UTF-8 in bytes input with U+FFFD instead of raising
 
         Returns:
             Dictionary of character metrics
+
+        Raises:
+            UnicodeDecodeError: If bytes input is not valid UTF-8 and lossy is False
         """
         ...
 
-    def calculate_all_metrics(self, text: str) -> Dict[str, Any]:
+    def calculate_all_metrics(self, text: TextInput, lossy: bool = False) -> Dict[str, Any]:
         """
         Calculate all metrics for a text (character, segmentation, and unigram).
 
@@ -125,25 +232,432 @@ class HyperAnalyzer:
         at once, which is more efficient than calculating them separately.
 
         Args:
-            text: The input text to analyze
+            text: The input text to analyze, as str or UTF-8 bytes
+            lossy: Replace invalid UTF-8 in bytes input with U+FFFD instead of raising
 
         Returns:
             Dictionary containing all metrics
+
+        Raises:
+            UnicodeDecodeError: If bytes input is not valid UTF-8 and lossy is False
         """
         ...
 
-    def calculate_batch_metrics(self, texts: List[str]) -> List[Dict[str, Any]]:
+    def calculate_batch_metrics(
+        self, texts: Sequence[TextInput], lossy: bool = False
+    ) -> List[Dict[str, Any]]:
         """
         Calculate metrics for a batch of texts.
 
+        Texts are analyzed in parallel with the GIL released, using the analyzer's
+        own thread pool when num_threads was given. Results are returned in the
+        same order as the input texts.
+
         Args:
-            texts: List of input texts to analyze
+            texts: Input texts to analyze, as str or UTF-8 bytes
+            lossy: Replace invalid UTF-8 in bytes input with U+FFFD instead of raising
 
         Returns:
             List of dictionaries, each containing all metrics for one text
         """
         ...
 
+    def calculate_batch_columns(
+        self, texts: Sequence[TextInput], lossy: bool = False
+    ) -> Dict[str, Union[np.ndarray, List[Dict[str, int]]]]:
+        """
+        Calculate metrics for a batch of texts in columnar form.
+
+        Instead of one dictionary per text, this returns one NumPy array per metric
+        (int64 for counts, float64 for ratios, bool for flags), which can be passed
+        straight to a DataFrame constructor. Frequency metrics are returned as a
+        list of dictionaries, one per text.
+
+        Args:
+            texts: Input texts to analyze, as str or UTF-8 bytes
+            lossy: Replace invalid UTF-8 in bytes input with U+FFFD instead of raising
+
+        Returns:
+            Dictionary mapping each metric name to its column of values
+        """
+        ...
+
+    def calculate_batch_arrow(self, texts: Any) -> Any:
+        """
+        Calculate metrics for an Arrow text column, returning an Arrow RecordBatch.
+
+        The input is read through the Arrow C Data Interface, so the UTF-8 buffers
+        of the array are analyzed in place without copying each document into a
+        Python string. Null input rows produce null rows in every output column.
+        Frequency metrics are returned as map<string, int64> columns.
+
+        Args:
+            texts: A pyarrow StringArray or LargeStringArray
+
+        Returns:
+            A pyarrow.RecordBatch with one row per input text and one column per metric
+
+        Raises:
+            TypeError: If the array does not hold string or large_string values
+        """
+        ...
+
+    def imap(
+        self,
+        iterable: Iterable[TextInput],
+        chunk_size: int = 128,
+        max_in_flight: Optional[int] = None,
+        lossy: bool = False,
+    ) -> MetricsStream:
+        """
+        Lazily calculate metrics for a stream of texts.
+
+        Texts are read from the iterable in chunks and analyzed on background worker
+        threads while the next chunks are being read, so loading (e.g. decompressing
+        a JSONL shard) and metric computation overlap. Results are yielded in input
+        order, one dictionary per text.
+
+        Args:
+            iterable: Any iterable of str or UTF-8 bytes; it is consumed lazily
+            chunk_size: Number of texts handed to a worker at once
+            max_in_flight: Maximum number of chunks read ahead and pending at once
+                (default: one per worker thread)
+            lossy: Replace invalid UTF-8 in bytes input with U+FFFD instead of raising
+
+        Returns:
+            An iterator of metric dictionaries
+
+        Raises:
+            ValueError: If chunk_size or max_in_flight is 0
+            UnicodeDecodeError: If bytes input is not valid UTF-8 and lossy is False
+        """
+        ...
+
+class MetricsStream(Iterator[Dict[str, Any]]):
+    """
+    Iterator returned by HyperAnalyzer.imap and BatchProcessor.imap.
+
+    Each step reads and submits chunks until max_in_flight chunks are pending,
+    then returns the next result in input order.
+
+    Attributes:
+        chunk_size: Number of texts analyzed per chunk
+        max_in_flight: Maximum number of chunks pending at once
+    """
+
+    chunk_size: int
+    max_in_flight: int
+
+    def __iter__(self) -> MetricsStream: ...
+    def __next__(self) -> Dict[str, Any]: ...
+
+class CharMetricsAccumulator:
+    """
+    Character metrics over a text supplied in chunks.
+
+    Feed a document piece by piece with update() and read the metrics with
+    finalize(). Memory use does not grow with the length of the text, so files
+    too large to load at once can be measured. Byte chunks may be split at any
+    offset, including inside a multi-byte character.
+
+    Attributes:
+        lossy: Whether invalid UTF-8 is replaced with U+FFFD instead of raising
+        char_count: Number of characters added so far
+    """
+
+    lossy: bool
+    char_count: int
+
+    def __init__(self, lossy: bool = False) -> None:
+        """
+        Create an empty accumulator.
+
+        Args:
+            lossy: Replace invalid UTF-8 with U+FFFD instead of raising (default: False)
+        """
+        ...
+
+    def update(self, chunk: TextInput) -> None:
+        """
+        Add the next chunk of the text.
+
+        Args:
+            chunk: The next piece of text, as str or UTF-8 bytes
+
+        Raises:
+            UnicodeDecodeError: If the bytes are not valid UTF-8 and lossy is False
+        """
+        ...
+
+    def finalize(self) -> Dict[str, Any]:
+        """
+        Calculate the metrics of all chunks added so far.
+
+        The result equals get_all_char_metrics() on the concatenated chunks. The
+        accumulator is not reset, so more chunks can be added afterwards.
+
+        Returns:
+            Dictionary of character metrics, as returned by get_all_char_metrics
+
+        Raises:
+            UnicodeDecodeError: If the text ends inside a UTF-8 sequence and lossy is False
+        """
+        ...
+
+class CharMetricsResult(Mapping[str, Any]):
+    """
+    Character metrics of one text, as returned by get_char_metrics.
+
+    A read-only mapping with the keys and values of get_all_char_metrics (or the
+    selected fields). Values are also available as attributes, e.g.
+    result.letters. Each value is built when it is read, so reading a few
+    scalar metrics does not build the frequency and n-gram dictionaries.
+    """
+
+    def __getitem__(self, key: str) -> Any: ...
+    def __getattr__(self, name: str) -> Any: ...
+    def __contains__(self, key: object) -> bool: ...
+    def __len__(self) -> int: ...
+    def __iter__(self) -> Iterator[str]: ...
+    def keys(self) -> List[str]: ...  # type: ignore[override]
+    def get(self, key: str, default: Any = None) -> Any: ...
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert every available metric to a dictionary."""
+        ...
+
+class VocabularyAccumulator:
+    """
+    Corpus-level unigram token counts built from batches of texts.
+
+    Tokens follow the include_punctuation and case_sensitive semantics of
+    get_unigram_frequency. Batches are counted in parallel, and accumulators
+    from different processes or machines can be saved with to_bytes() or save()
+    and combined with merge().
+
+    Attributes:
+        include_punctuation: Whether punctuation and whitespace tokens are counted
+        case_sensitive: Whether tokens are counted without case folding
+        total_tokens: Total number of tokens counted
+        document_count: Number of texts and frequency maps added
+    """
+
+    include_punctuation: bool
+    case_sensitive: bool
+    total_tokens: int
+    document_count: int
+
+    def __init__(self, include_punctuation: bool = False, case_sensitive: bool = True) -> None: ...
+    def update(self, texts: Sequence[TextInput], lossy: bool = False) -> None:
+        """Count the tokens of a batch of texts in parallel."""
+        ...
+    def update_counts(self, counts: Mapping[str, int]) -> None:
+        """Add a per-document frequency map, e.g. from get_unigram_frequency."""
+        ...
+    def merge(self, other: "VocabularyAccumulator") -> None:
+        """
+        Add the counts of another accumulator.
+
+        Raises:
+            ValueError: If the accumulators were built with different options
+        """
+        ...
+    def counts(self) -> Dict[str, int]:
+        """Token counts as a dictionary."""
+        ...
+    def most_common(self, n: Optional[int] = None) -> List[Tuple[str, int]]:
+        """The n most frequent tokens with their counts (all tokens if n is None)."""
+        ...
+    def get(self, token: str) -> int:
+        """Count of a token, lowercased first if the vocabulary is case-insensitive."""
+        ...
+    def to_bytes(self) -> bytes:
+        """Encode the accumulator in a compact binary format."""
+        ...
+    @staticmethod
+    def from_bytes(data: bytes) -> "VocabularyAccumulator":
+        """
+        Decode an accumulator encoded with to_bytes.
+
+        Raises:
+            ValueError: If the data is not a valid encoded vocabulary
+        """
+        ...
+    def save(self, path: Union[str, "os.PathLike[str]"]) -> None:
+        """Write the accumulator to a file in the to_bytes format."""
+        ...
+    @staticmethod
+    def load(path: Union[str, "os.PathLike[str]"]) -> "VocabularyAccumulator":
+        """Read an accumulator written with save."""
+        ...
+    def __len__(self) -> int: ...
+    def __contains__(self, token: str) -> bool: ...
+
+class HeavyHittersSketch:
+    """
+    Most frequent unigram tokens of a corpus in bounded memory.
+
+    A mergeable Misra-Gries summary keeping at most capacity tokens. Every token
+    with a count above total_tokens / (capacity + 1) is kept, and kept counts are
+    low by at most error_bound.
+
+    Attributes:
+        capacity: Maximum number of tokens kept
+        include_punctuation: Whether punctuation and whitespace tokens are counted
+        case_sensitive: Whether tokens are counted without case folding
+        total_tokens: Total number of tokens counted
+        error_bound: Largest possible underestimate of any count
+    """
+
+    capacity: int
+    include_punctuation: bool
+    case_sensitive: bool
+    total_tokens: int
+    error_bound: int
+
+    def __init__(
+        self, capacity: int = 1000, include_punctuation: bool = False, case_sensitive: bool = True
+    ) -> None: ...
+    def update(self, texts: Sequence[TextInput], lossy: bool = False) -> None:
+        """Count the tokens of a batch of texts."""
+        ...
+    def merge(self, other: "HeavyHittersSketch") -> None:
+        """
+        Add the counts of another sketch; the capacity of this one is kept.
+
+        Raises:
+            ValueError: If the sketches were built with different options or sizes
+        """
+        ...
+    def to_bytes(self) -> bytes:
+        """Encode the sketch in a compact binary format."""
+        ...
+    @staticmethod
+    def from_bytes(data: bytes) -> "HeavyHittersSketch":
+        """
+        Decode a sketch encoded with to_bytes.
+
+        Raises:
+            ValueError: If the data is not a valid encoded sketch of this type
+        """
+        ...
+    def top(self, n: int = 10) -> List[Tuple[str, int]]:
+        """The n most frequent tokens with their (lower-bound) counts."""
+        ...
+    def top_coverage(self, n: int = 5) -> float:
+        """Share of all tokens covered by the n most frequent ones (a lower bound)."""
+        ...
+    def estimate(self, token: str) -> int:
+        """Lower bound of the count of a token."""
+        ...
+    def __len__(self) -> int: ...
+
+class CountMinSketch:
+    """
+    Approximate token frequencies of a corpus in a fixed-size Count-Min sketch.
+
+    Estimates never undercount; with probability 1 - exp(-depth) they overcount
+    by at most e * total_tokens / width.
+
+    Attributes:
+        width: Counters per row
+        depth: Number of rows
+        include_punctuation: Whether punctuation and whitespace tokens are counted
+        case_sensitive: Whether tokens are counted without case folding
+        total_tokens: Total number of tokens counted
+    """
+
+    width: int
+    depth: int
+    include_punctuation: bool
+    case_sensitive: bool
+    total_tokens: int
+
+    def __init__(
+        self,
+        width: int = 65536,
+        depth: int = 4,
+        include_punctuation: bool = False,
+        case_sensitive: bool = True,
+    ) -> None: ...
+    def update(self, texts: Sequence[TextInput], lossy: bool = False) -> None:
+        """Count the tokens of a batch of texts."""
+        ...
+    def merge(self, other: "CountMinSketch") -> None:
+        """
+        Add the counts of another sketch of the same width and depth.
+
+        Raises:
+            ValueError: If the sketches were built with different options or sizes
+        """
+        ...
+    def to_bytes(self) -> bytes:
+        """Encode the sketch in a compact binary format."""
+        ...
+    @staticmethod
+    def from_bytes(data: bytes) -> "CountMinSketch":
+        """
+        Decode a sketch encoded with to_bytes.
+
+        Raises:
+            ValueError: If the data is not a valid encoded sketch of this type
+        """
+        ...
+    def estimate(self, token: str) -> int:
+        """Upper bound of the count of a token."""
+        ...
+
+class HyperLogLogSketch:
+    """
+    Distinct token count of a corpus estimated with HyperLogLog.
+
+    Uses 2**precision bytes; the relative standard error is about
+    1.04 / sqrt(2**precision).
+
+    Attributes:
+        precision: Number of index bits, from 4 to 18
+        include_punctuation: Whether punctuation and whitespace tokens are counted
+        case_sensitive: Whether tokens are counted without case folding
+        total_tokens: Total number of tokens counted
+    """
+
+    precision: int
+    include_punctuation: bool
+    case_sensitive: bool
+    total_tokens: int
+
+    def __init__(
+        self, precision: int = 14, include_punctuation: bool = False, case_sensitive: bool = True
+    ) -> None: ...
+    def update(self, texts: Sequence[TextInput], lossy: bool = False) -> None:
+        """Count the tokens of a batch of texts."""
+        ...
+    def merge(self, other: "HyperLogLogSketch") -> None:
+        """
+        Add the tokens of another sketch of the same precision.
+
+        Raises:
+            ValueError: If the sketches were built with different options or sizes
+        """
+        ...
+    def to_bytes(self) -> bytes:
+        """Encode the sketch in a compact binary format."""
+        ...
+    @staticmethod
+    def from_bytes(data: bytes) -> "HyperLogLogSketch":
+        """
+        Decode a sketch encoded with to_bytes.
+
+        Raises:
+            ValueError: If the data is not a valid encoded sketch of this type
+        """
+        ...
+    def estimate(self) -> int:
+        """Estimated number of distinct tokens."""
+        ...
+    def type_token_ratio(self) -> float:
+        """Estimated distinct tokens per token."""
+        ...
+
 # Character count functions
 def count_chars(text: str) -> int:
     """
@@ -512,6 +1026,7 @@ def combined_char_metrics(text: str) -> Dict[str, int]:
 
 def get_all_char_metrics(
     text: str,
+    fields: Optional[Sequence[str]] = None,
 ) -> Dict[
     str,
     Union[
@@ -530,10 +1045,34 @@ def get_all_char_metrics(
 
     Args:
         text: The input text to analyze
+        fields: Names of the metrics to return (default: all). Category n-gram
+            tables are only counted when one of their ratio fields is requested.
 
     Returns:
         Dictionary containing all character metrics, with nested dictionaries for
         complex metrics like frequencies and ratios
+
+    Raises:
+        ValueError: If a field name is not a known character metric
+    """
+    ...
+
+def get_char_metrics(
+    text: str,
+    fields: Optional[Sequence[str]] = None,
+) -> CharMetricsResult:
+    """
+    Calculate character metrics, converting values to Python objects on access.
+
+    Args:
+        text: The input text to analyze
+        fields: Names of the metrics to make available (default: all)
+
+    Returns:
+        Read-only mapping with the keys of get_all_char_metrics, or the selected subset
+
+    Raises:
+        ValueError: If a field name is not a known character metric
     """
     ...
 
@@ -612,6 +1151,55 @@ def get_unicode_category_group_ratios(text: str) -> Dict[str, float]:
     """
     ...
 
+# Unicode script functions
+def get_script_ratios(text: str) -> Dict[str, float]:
+    """
+    Calculate the share of the characters in each Unicode script (writing system).
+
+    Characters shared between scripts (spaces, digits, most punctuation) count as
+    "Common", combining marks as "Inherited", and less common scripts as "Other".
+
+    Args:
+        text: The input text to analyze
+
+    Returns:
+        Dictionary mapping script names (e.g. "Latin", "Cyrillic", "Han") to their
+        ratios (0.0 to 1.0)
+    """
+    ...
+
+# Byte-level functions
+def byte_metrics(data: TextInput) -> Dict[str, Any]:
+    """
+    Calculate byte-level metrics of raw, possibly invalid, UTF-8 input.
+
+    The input is not decoded, so binary files, truncated downloads and mis-decoded
+    documents can be screened before any Unicode processing.
+
+    Args:
+        data: Raw bytes (bytes, bytearray, memoryview) or a str, measured as UTF-8
+
+    Returns:
+        Dictionary with byte_count, char_count (after lossy decoding),
+        is_valid_utf8, invalid_utf8_sequences, nul_bytes, control_bytes,
+        replacement_chars, overlong_sequences, mojibake_sequences, byte_entropy
+        (bits, 0.0 to 8.0), nul_ratio, control_ratio (per byte),
+        replacement_char_ratio and mojibake_score (per character)
+    """
+    ...
+
+def batch_byte_metrics(items: Sequence[TextInput]) -> List[Dict[str, Any]]:
+    """
+    Calculate byte-level metrics for a batch of inputs in parallel.
+
+    Args:
+        items: Sequence of raw byte strings or str
+
+    Returns:
+        One dictionary per item, as returned by byte_metrics
+    """
+    ...
+
 # Unicode category bigram functions
 def get_unicode_category_bigrams(text: str) -> Dict[Tuple[str, str], int]:
     """
@@ -714,6 +1302,58 @@ def get_unicode_category_group_trigram_ratios(
     """
     ...
 
+def get_unicode_category_ngram_matrix(
+    texts: Sequence[TextInput],
+    n: int = 2,
+    groups: bool = False,
+    ratios: bool = False,
+    lossy: bool = False,
+) -> np.ndarray:
+    """
+    Count Unicode category n-grams for a batch of texts as a dense matrix.
+
+    Args:
+        texts: The texts to analyze
+        n: 2 for bigrams, 3 for trigrams
+        groups: Count category groups instead of categories
+        ratios: Divide each row by its total instead of returning counts
+        lossy: Replace invalid UTF-8 in bytes inputs instead of raising
+
+    Returns:
+        Array of shape (len(texts), columns), int64 counts or float64 ratios, with
+        columns ordered as in get_unicode_category_ngram_columns(n, groups)
+
+    Raises:
+        ValueError: If n is not 2 or 3
+        UnicodeDecodeError: If a bytes input is not valid UTF-8 and lossy is False
+    """
+    ...
+
+def get_unicode_category_ngram_columns(
+    n: int = 2,
+    groups: bool = False,
+) -> List[Tuple[str, ...]]:
+    """
+    Get the column names of get_unicode_category_ngram_matrix.
+
+    Args:
+        n: 2 for bigrams, 3 for trigrams
+        groups: Name category groups instead of categories
+
+    Returns:
+        One tuple of category names per column, with "START" and "END" marking
+        the text boundaries
+
+    Raises:
+        ValueError: If n is not 2 or 3
+    """
+    ...
+
+UNICODE_CATEGORY_BIGRAM_COLUMNS: List[Tuple[str, str]]
+UNICODE_CATEGORY_GROUP_BIGRAM_COLUMNS: List[Tuple[str, str]]
+UNICODE_CATEGORY_TRIGRAM_COLUMNS: List[Tuple[str, str, str]]
+UNICODE_CATEGORY_GROUP_TRIGRAM_COLUMNS: List[Tuple[str, str, str]]
+
 # Frequency functions
 def get_char_frequency(text: str) -> Dict[str, int]:
     """
@@ -940,6 +1580,57 @@ def tokenize_unigrams_with_punctuation(text: str) -> List[str]:
     """
     ...
 
+TOKEN_CLASSES: Tuple[str, ...]
+
+def tokenize_unigrams_spans(
+    text: str,
+    include_punctuation: bool = False,
+    unit: str = "byte",
+    classes: bool = False,
+) -> Tuple[np.ndarray, ...]:
+    """
+    Get the start and end offsets of the unigram tokens without creating them.
+
+    Args:
+        text: The input text to analyze
+        include_punctuation: Use the tokens of tokenize_unigrams_with_punctuation
+            (words, punctuation runs and whitespace runs) instead of words only
+        unit: "byte" for offsets into the UTF-8 encoding, "char" for offsets that
+            index the Python string
+        classes: Also return the class code of each token
+
+    Returns:
+        (starts, ends) as int64 arrays, or (starts, ends, classes) where classes
+        is a uint8 array of indices into TOKEN_CLASSES
+        ("word", "punctuation", "whitespace")
+    """
+    ...
+
+def batch_tokenize_unigrams_spans(
+    texts: Sequence[TextInput],
+    include_punctuation: bool = False,
+    unit: str = "byte",
+    classes: bool = False,
+    lossy: bool = False,
+) -> Tuple[np.ndarray, ...]:
+    """
+    Get the unigram token offsets of a batch of texts in CSR layout.
+
+    Texts are tokenized in parallel. The spans of text i are
+    starts[offsets[i]:offsets[i + 1]].
+
+    Args:
+        texts: Sequence of texts (str, or UTF-8 bytes)
+        include_punctuation: As in tokenize_unigrams_spans
+        unit: "byte" or "char", as in tokenize_unigrams_spans
+        classes: Also return the class code of each token
+        lossy: Replace invalid UTF-8 in bytes input instead of raising
+
+    Returns:
+        (starts, ends, offsets) as int64 arrays, plus classes (uint8) if requested
+    """
+    ...
+
 def count_unigram_tokens(text: str, include_punctuation: bool) -> int:
     """
     Count the total number of unigram tokens in the text.
@@ -1178,11 +1869,12 @@ def get_all_pattern_metrics(
     ...
 
 def get_all_metrics(
-    text: str,
+    text: TextInput,
     include_punctuation: bool = True,
     case_sensitive: bool = False,
     use_paragraph_processing: bool = True,
     max_segment_size: int = 4096,
+    lossy: bool = False,
 ) -> Dict[str, Dict[str, Union[int, float, bool, Dict[str, float], Dict[str, int]]]]:
     """
     Calculate all metrics including character, unigram, segmentation, and pattern-based metrics.
@@ -1198,13 +1890,17 @@ def get_all_metrics(
     further broken down into line segments for better performance.
 
     Args:
-        text: The input text to analyze
+        text: The input text to analyze, as str or UTF-8 bytes
         include_punctuation: Whether to include punctuation for unigram metrics (default: True)
         case_sensitive: Whether to treat text as case-sensitive for unigram metrics (default: False)
         use_paragraph_processing: Whether to use paragraph-based processing for patterns (default: True)
         max_segment_size: Maximum segment size in bytes before breaking down paragraphs (default: 4096)
+        lossy: Replace invalid UTF-8 in bytes input with U+FFFD instead of raising (default: False)
 
     Returns:
         Nested dictionary containing all metrics organized by category
+
+    Raises:
+        UnicodeDecodeError: If bytes input is not valid UTF-8 and lossy is False
     """
     ...
@@ -929,7 +929,9 @@ def compute_metrics_for_dataset(dataset, args, metrics_to_calculate, output_stre
         )
     elif args.use_hyper:
         # Create a HyperAnalyzer for ultra-efficient metric computation
-        analyzer = cheesecloth.HyperAnalyzer(include_punctuation, case_sensitive)
+        analyzer = cheesecloth.HyperAnalyzer(
+            include_punctuation, case_sensitive, num_threads=args.num_threads
+        )
         print("Using hyper-optimized analyzer for maximum performance", file=sys.stderr)
     else:
         # Create a standard BatchProcessor
@@ -1571,6 +1573,11 @@ def main():
         action="store_true",
         help="Use the hyper-optimized analyzer for maximum performance",
     )
+    parser.add_argument(
+        "--num-threads",
+        type=int,
+        help="Number of worker threads for the hyper-optimized analyzer (default: all cores)",
+    )
     parser.add_argument(
         "--use-all-metrics",
         action="store_true",
@@ -509,37 +509,28 @@ class TextBatchProcessor:
         if source_type == "texts":
             # Already a collection of texts
             texts = cast(Iterable[str], source)
-            batch = []
-
-            for text in texts:
-                batch.append(text)
-
-                if len(batch) >= self.batch_size:
-                    results = self.process_texts(batch)
-                    yield from results
-                    batch = []
-
-            # Process any remaining texts
-            if batch:
-                results = self.process_texts(batch)
-                yield from results
         else:
             # Use TextDataLoader to get text from other sources
-            text_gen = self.data_loader.load_text_from_source(source, source_type)
-            batch = []
+            texts = self.data_loader.load_text_from_source(source, source_type)
 
-            for text in text_gen:
-                batch.append(text)
+        if hasattr(self.analyzer, "imap"):
+            # Stream through the analyzer so reading overlaps with computation
+            yield from self.analyzer.imap(texts, chunk_size=self.batch_size)
+            return
 
-                if len(batch) >= self.batch_size:
-                    results = self.process_texts(batch)
-                    yield from results
-                    batch = []
+        batch = []
+        for text in texts:
+            batch.append(text)
 
-            # Process any remaining texts
-            if batch:
+            if len(batch) >= self.batch_size:
                 results = self.process_texts(batch)
                 yield from results
+                batch = []
+
+        # Process any remaining texts
+        if batch:
+            results = self.process_texts(batch)
+            yield from results
 
 
 # Convenience functions for common use cases
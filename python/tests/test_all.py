@@ -1,3 +1,5 @@
+import pytest
+
 import cheesecloth
 
 
@@ -36,3 +38,32 @@ def test_integration_char_and_unigram():
 
     assert len(char_freq) > 0
     assert len(token_freq) > 0
+
+
+def test_get_all_metrics_matches_sections():
+    """Test that the fused get_all_metrics agrees with the per-section functions."""
+    text = "First line here.\nIs this a question?\n\n  Second paragraph... done!\n• item"
+
+    for use_paragraphs in (True, False):
+        result = cheesecloth.get_all_metrics(
+            text, True, False, use_paragraph_processing=use_paragraphs
+        )
+
+        assert result["character"].keys() == cheesecloth.get_all_char_metrics(text).keys()
+        assert result["unigram"] == cheesecloth.get_all_unigram_metrics(text, True, False)
+        assert result["patterns"] == cheesecloth.get_all_pattern_metrics(
+            text, use_paragraph_processing=use_paragraphs
+        )
+
+        segmentation = result["segmentation"]
+        assert segmentation["line_count"] == cheesecloth.count_lines(text)
+        assert segmentation["paragraph_count"] == cheesecloth.count_paragraphs(text)
+        assert segmentation["average_paragraph_length"] == pytest.approx(
+            cheesecloth.average_paragraph_length(text)
+        )
+
+    character = cheesecloth.get_all_char_metrics(text)
+    assert character["char_frequency"] == cheesecloth.get_char_frequency(text)
+    assert character["unicode_category_trigram_ratios"] == pytest.approx(
+        cheesecloth.get_unicode_category_trigram_ratios(text)
+    )
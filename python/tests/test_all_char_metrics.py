@@ -1,6 +1,8 @@
 import cheesecloth
 import math
 
+import pytest
+
 
 def test_get_all_char_metrics():
     """Test the optimized get_all_char_metrics function."""
@@ -158,3 +160,90 @@ def test_new_char_metrics():
     assert empty_metrics["punctuation_diversity"] == 0
     assert empty_metrics["category_entropy"] == 0.0
     assert empty_metrics["case_ratio"] == 0.0
+
+
+def _assert_metrics_close(actual, expected):
+    assert actual.keys() == expected.keys()
+    for key, value in expected.items():
+        if isinstance(value, dict):
+            _assert_metrics_close(actual[key], value)
+        elif isinstance(value, float):
+            assert math.isclose(actual[key], value, rel_tol=1e-9, abs_tol=1e-12), key
+        else:
+            assert actual[key] == value, key
+
+
+def test_char_metrics_accumulator_matches_whole_text():
+    """Test that chunked input gives the same metrics as the whole text."""
+    text = "Hello, World! naïve café — 日本語 🎉\n\tDone 123."
+    expected = cheesecloth.get_all_char_metrics(text)
+
+    encoded = text.encode("utf-8")
+    for chunk_size in (1, 2, 3, 7, len(encoded)):
+        acc = cheesecloth.CharMetricsAccumulator()
+        for start in range(0, len(encoded), chunk_size):
+            acc.update(encoded[start : start + chunk_size])
+        assert acc.char_count == len(text)
+        _assert_metrics_close(acc.finalize(), expected)
+
+    acc = cheesecloth.CharMetricsAccumulator()
+    for part in ("Hello, Wor", "ld! naïve café — 日本", "語 🎉\n\tDone 123."):
+        acc.update(part)
+    _assert_metrics_close(acc.finalize(), expected)
+
+
+def test_char_metrics_accumulator_invalid_utf8():
+    """Test strict and lossy handling of invalid and truncated UTF-8."""
+    acc = cheesecloth.CharMetricsAccumulator()
+    with pytest.raises(UnicodeDecodeError):
+        acc.update(b"ab\xffcd")
+
+    # A failed update leaves the accumulator as it was
+    acc = cheesecloth.CharMetricsAccumulator()
+    acc.update(b"ab\xe6")
+    with pytest.raises(UnicodeDecodeError):
+        acc.update(b"\x97\xa5cd\xff")
+    assert acc.char_count == 2
+    acc.update(b"\x97\xa5cd")
+    _assert_metrics_close(acc.finalize(), cheesecloth.get_all_char_metrics("ab日cd"))
+
+    acc = cheesecloth.CharMetricsAccumulator()
+    acc.update(b"ab\xe6")
+    with pytest.raises(UnicodeDecodeError):
+        acc.finalize()
+
+    acc = cheesecloth.CharMetricsAccumulator(lossy=True)
+    acc.update(b"ab\xffc")
+    acc.update(b"d\xe6")
+    expected = cheesecloth.get_all_char_metrics("ab�cd�")
+    _assert_metrics_close(acc.finalize(), expected)
+
+
+def test_char_metrics_result_fields():
+    """Test the lazy result mapping and field selection."""
+    text = "Hello, World! 123 naïve café"
+    expected = cheesecloth.get_all_char_metrics(text)
+
+    result = cheesecloth.get_char_metrics(text)
+    assert len(result) == len(expected)
+    assert set(result) == set(expected)
+    assert result["letters"] == expected["letters"]
+    assert math.isclose(result.char_entropy, expected["char_entropy"])
+    assert result.get("missing", 0) == 0
+    _assert_metrics_close(result.to_dict(), expected)
+
+    fields = ["ratio_digits", "letters", "unicode_category_ratios"]
+    selected = cheesecloth.get_char_metrics(text, fields=fields)
+    assert list(selected) == ["letters", "ratio_digits", "unicode_category_ratios"]
+    assert "char_entropy" not in selected
+    with pytest.raises(KeyError):
+        selected["char_entropy"]
+    with pytest.raises(AttributeError):
+        selected.char_entropy
+    _assert_metrics_close(
+        selected.to_dict(), {key: expected[key] for key in fields}
+    )
+    assert cheesecloth.get_all_char_metrics(text, fields=fields) == selected.to_dict()
+
+    with pytest.raises(ValueError):
+        cheesecloth.get_char_metrics(text, fields=["not_a_metric"])
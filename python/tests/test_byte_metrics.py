@@ -0,0 +1,65 @@
+import math
+
+import pytest
+
+import cheesecloth
+
+
+def test_byte_metrics_valid_text():
+    """Test byte metrics of valid UTF-8 text."""
+    text = "Hello, café 世界\n"
+    metrics = cheesecloth.byte_metrics(text.encode("utf-8"))
+
+    assert metrics["byte_count"] == len(text.encode("utf-8"))
+    assert metrics["char_count"] == len(text)
+    assert metrics["is_valid_utf8"]
+    assert metrics["invalid_utf8_sequences"] == 0
+    assert metrics["control_ratio"] == 0.0
+    assert 0.0 < metrics["byte_entropy"] <= 8.0
+
+    # str input is measured as its UTF-8 encoding
+    assert cheesecloth.byte_metrics(text) == metrics
+    assert cheesecloth.byte_metrics(bytearray(text, "utf-8")) == metrics
+    assert cheesecloth.byte_metrics(memoryview(text.encode("utf-8"))) == metrics
+
+    assert cheesecloth.byte_metrics(b"aaaa")["byte_entropy"] == 0.0
+    assert cheesecloth.byte_metrics(b"")["byte_count"] == 0
+
+
+def test_byte_metrics_invalid_input():
+    """Test byte metrics of invalid or suspicious input."""
+    data = b"ok\xff\xfe \xe6\x97 \x00\x01\xef\xbf\xbd"
+    metrics = cheesecloth.byte_metrics(data)
+    decoded = data.decode("utf-8", errors="replace")
+
+    assert not metrics["is_valid_utf8"]
+    assert metrics["char_count"] == len(decoded)
+    assert (
+        metrics["invalid_utf8_sequences"] + metrics["replacement_chars"]
+        == decoded.count("�")
+    )
+    assert metrics["replacement_chars"] == 1
+    assert metrics["nul_bytes"] == 1
+    assert math.isclose(metrics["nul_ratio"], 1 / len(data))
+    assert math.isclose(metrics["control_ratio"], 2 / len(data))
+
+    assert cheesecloth.byte_metrics(b"\xc0\xaf")["overlong_sequences"] == 1
+
+    # UTF-8 decoded as Latin-1 and encoded again
+    mojibake = "café résumé".encode("utf-8").decode("latin-1").encode("utf-8")
+    metrics = cheesecloth.byte_metrics(mojibake)
+    assert metrics["is_valid_utf8"]
+    assert metrics["mojibake_sequences"] == 3
+    assert metrics["mojibake_score"] > 0.0
+
+
+def test_batch_byte_metrics():
+    """Test that batch byte metrics match the single-item function."""
+    items = [b"plain ascii", b"\xff\xfe\x00\x00", "naïve", b""]
+    results = cheesecloth.batch_byte_metrics(items)
+    assert results == [cheesecloth.byte_metrics(item) for item in items]
+
+    with pytest.raises(TypeError):
+        cheesecloth.batch_byte_metrics(b"not a batch")
+    with pytest.raises(TypeError):
+        cheesecloth.byte_metrics(42)
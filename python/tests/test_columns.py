@@ -0,0 +1,90 @@
+"""
+Tests for columnar (NumPy) batch output.
+"""
+
+import numpy as np
+import pytest
+
+import cheesecloth
+
+TEXTS = [
+    "This is a test.",
+    "Another, longer test!\n\nWith two paragraphs and 123 digits.",
+    "",
+]
+
+
+def test_hyper_batch_columns_match_dicts():
+    """Test that HyperAnalyzer columns match the per-document dictionaries."""
+    analyzer = cheesecloth.HyperAnalyzer(include_punctuation=True, case_sensitive=False)
+    rows = analyzer.calculate_batch_metrics(TEXTS)
+    columns = analyzer.calculate_batch_columns(TEXTS)
+
+    assert set(columns) == set(rows[0])
+    assert columns["char_count"].dtype == np.int64
+    assert columns["ascii_ratio"].dtype == np.float64
+    assert columns["is_ascii"].dtype == np.bool_
+
+    for name, column in columns.items():
+        assert len(column) == len(TEXTS)
+        assert list(column) == [row[name] for row in rows]
+
+
+def test_batch_processor_columns_match_dicts():
+    """Test that BatchProcessor columns match the per-document dictionaries."""
+    metrics = ["char_count", "word_count", "is_ascii", "ascii_ratio", "char_frequency"]
+    processor = cheesecloth.BatchProcessor(
+        metrics, include_punctuation=False, case_sensitive=True
+    )
+    rows = processor.compute_batch_metrics(TEXTS)
+    columns = processor.calculate_batch_columns(TEXTS)
+
+    assert set(columns) == set(metrics)
+    assert columns["word_count"].dtype == np.int64
+    assert columns["is_ascii"].dtype == np.bool_
+    for name in metrics:
+        assert list(columns[name]) == [row[name] for row in rows]
+
+
+def test_batch_columns_empty_batch():
+    """Test that an empty batch produces empty, correctly typed columns."""
+    processor = cheesecloth.BatchProcessor(["char_count", "ascii_ratio"], True, False)
+    columns = processor.calculate_batch_columns([])
+
+    assert columns["char_count"].shape == (0,)
+    assert columns["char_count"].dtype == np.int64
+    assert columns["ascii_ratio"].dtype == np.float64
+
+
+def test_hyper_batch_arrow():
+    """Test Arrow input and RecordBatch output for HyperAnalyzer."""
+    pa = pytest.importorskip("pyarrow")
+    analyzer = cheesecloth.HyperAnalyzer(include_punctuation=True, case_sensitive=False)
+    texts = pa.array(["This is a test.", None, "Another test!"], type=pa.large_string())
+
+    batch = analyzer.calculate_batch_arrow(texts)
+    expected = analyzer.calculate_batch_columns(["This is a test.", "", "Another test!"])
+
+    assert isinstance(batch, pa.RecordBatch)
+    assert batch.num_rows == 3
+    assert batch.schema.field("char_count").type == pa.int64()
+    assert batch.schema.field("is_ascii").type == pa.bool_()
+    assert batch.column("char_count").to_pylist() == [
+        int(expected["char_count"][0]),
+        None,
+        int(expected["char_count"][2]),
+    ]
+    assert batch.column("unigram_frequency")[1].as_py() is None
+
+
+def test_batch_processor_arrow():
+    """Test Arrow input and RecordBatch output for BatchProcessor."""
+    pa = pytest.importorskip("pyarrow")
+    processor = cheesecloth.BatchProcessor(["char_count", "ascii_ratio"], True, False)
+
+    batch = processor.calculate_batch_arrow(pa.array(["abc", "déf"]))
+    assert batch.column("char_count").to_pylist() == [3, 3]
+    assert batch.column("ascii_ratio").type == pa.float64()
+
+    with pytest.raises(TypeError):
+        processor.calculate_batch_arrow(pa.array([1, 2, 3]))
@@ -7,6 +7,8 @@ import json
 import os
 import tempfile
 
+import pytest
+
 from cheesecloth.data import (
     TextDataLoader,
     TextBatchProcessor,
@@ -156,3 +158,107 @@ def test_process_huggingface_dataset():
     assert len(results) == 10
     assert "char_count" in results[0]
     assert "word_count" in results[0]
+
+
+def test_hyper_analyzer_parallel_batch():
+    """Test that parallel batch results match single-text results in order."""
+    texts = ["This is a test.", "Another, longer test!\n\nWith two paragraphs.", ""]
+    shared = cheesecloth.HyperAnalyzer(include_punctuation=True, case_sensitive=False)
+    pooled = cheesecloth.HyperAnalyzer(
+        include_punctuation=True, case_sensitive=False, num_threads=2
+    )
+    assert shared.num_threads is None
+    assert pooled.num_threads == 2
+
+    expected = [shared.calculate_all_metrics(text) for text in texts]
+    assert shared.calculate_batch_metrics(texts) == expected
+    assert pooled.calculate_batch_metrics(texts) == expected
+
+
+def test_hyper_analyzer_rejects_zero_threads():
+    """Test that a zero-sized thread pool is rejected."""
+    with pytest.raises(ValueError):
+        cheesecloth.HyperAnalyzer(True, False, num_threads=0)
+
+
+def test_hyper_analyzer_imap():
+    """Test that streamed results match batch results in input order."""
+    texts = [f"Text number {i}.\n\nSecond paragraph {i}!" for i in range(25)]
+    analyzer = cheesecloth.HyperAnalyzer(True, False, num_threads=2)
+
+    stream = analyzer.imap(iter(texts), chunk_size=4, max_in_flight=2)
+    assert stream.chunk_size == 4
+    assert stream.max_in_flight == 2
+    assert list(stream) == analyzer.calculate_batch_metrics(texts)
+    assert list(analyzer.imap([])) == []
+
+
+def test_batch_processor_imap():
+    """Test BatchProcessor.imap and its use by TextBatchProcessor."""
+    texts = (f"Sample text {i}." for i in range(10))
+    analyzer = cheesecloth.BatchProcessor(
+        ["char_count", "word_count"], include_punctuation=False, case_sensitive=True
+    )
+
+    results = list(analyzer.imap(texts, chunk_size=3))
+    assert len(results) == 10
+    assert results[0] == analyzer.compute_metrics("Sample text 0.")
+
+    processor = TextBatchProcessor(analyzer, batch_size=3)
+    streamed = list(processor.process_from_source(["a b", "c", "d e f"]))
+    assert [r["word_count"] for r in streamed] == [2, 1, 3]
+
+
+def test_imap_bad_item_keeps_earlier_results():
+    """Test that an unreadable item raises after the results of earlier items."""
+    texts = ["one", "two", "three", 42, "four"]
+    analyzer = cheesecloth.HyperAnalyzer()
+    expected = analyzer.calculate_batch_metrics(texts[:3])
+
+    stream = analyzer.imap(iter(texts), chunk_size=4)
+    assert [next(stream) for _ in range(3)] == expected
+    with pytest.raises(TypeError):
+        next(stream)
+    assert list(stream) == analyzer.calculate_batch_metrics(["four"])
+
+
+def test_imap_rejects_invalid_arguments():
+    """Test that empty chunks and zero in-flight limits are rejected."""
+    analyzer = cheesecloth.HyperAnalyzer()
+    with pytest.raises(ValueError):
+        analyzer.imap(["text"], chunk_size=0)
+    with pytest.raises(ValueError):
+        analyzer.imap(["text"], max_in_flight=0)
+
+
+def test_bytes_input_matches_str():
+    """Test that UTF-8 bytes and buffers give the same metrics as str."""
+    texts = ["Hello, world!", "Naïve café — déjà vu.", ""]
+    encoded = [text.encode("utf-8") for text in texts]
+
+    analyzer = cheesecloth.HyperAnalyzer()
+    expected = analyzer.calculate_batch_metrics(texts)
+    assert analyzer.calculate_batch_metrics(encoded) == expected
+    assert analyzer.calculate_batch_metrics([memoryview(b) for b in encoded]) == expected
+    assert analyzer.calculate_all_metrics(bytearray(encoded[1])) == expected[1]
+    assert list(analyzer.imap(iter(encoded), chunk_size=2)) == expected
+
+    processor = cheesecloth.BatchProcessor(["char_count", "letter_count"], True, False)
+    assert processor.compute_batch_metrics(encoded) == processor.compute_batch_metrics(texts)
+
+    assert cheesecloth.get_all_metrics(encoded[1]) == cheesecloth.get_all_metrics(texts[1])
+
+
+def test_invalid_utf8_input():
+    """Test strict and lossy handling of invalid UTF-8 bytes."""
+    analyzer = cheesecloth.HyperAnalyzer()
+    with pytest.raises(UnicodeDecodeError):
+        analyzer.calculate_all_metrics(b"ab\xffcd")
+
+    lossy = analyzer.calculate_all_metrics(b"ab\xffcd", lossy=True)
+    assert lossy == analyzer.calculate_all_metrics("ab�cd")
+
+    with pytest.raises(TypeError):
+        analyzer.calculate_batch_metrics("not a list of texts")
+    with pytest.raises(TypeError):
+        analyzer.calculate_batch_metrics([42])
@@ -0,0 +1,35 @@
+import math
+
+import cheesecloth
+
+
+def test_get_script_ratios():
+    """Test script ratios of mixed-script text."""
+    text = "Hello мир 世界"
+    ratios = cheesecloth.get_script_ratios(text)
+
+    assert math.isclose(ratios["Latin"], 5 / 12)
+    assert math.isclose(ratios["Cyrillic"], 3 / 12)
+    assert math.isclose(ratios["Han"], 2 / 12)
+    assert math.isclose(ratios["Common"], 2 / 12)
+    assert math.isclose(sum(ratios.values()), 1.0)
+
+    assert cheesecloth.get_script_ratios("") == {}
+    assert cheesecloth.get_script_ratios("नमस्ते") == {"Devanagari": 1.0}
+
+
+def test_script_metrics_in_char_metrics():
+    """Test the script fields of get_all_char_metrics."""
+    metrics = cheesecloth.get_all_char_metrics("Hello мир, hello 世界!")
+    assert metrics["dominant_script"] == "Latin"
+    assert metrics["script_switches"] == 3
+    assert metrics["script_ratios"] == cheesecloth.get_script_ratios(
+        "Hello мир, hello 世界!"
+    )
+
+    # Digits and punctuation do not count as a script or break a run
+    metrics = cheesecloth.get_all_char_metrics("abc 123, def!")
+    assert metrics["dominant_script"] == "Latin"
+    assert metrics["script_switches"] == 0
+
+    assert cheesecloth.get_all_char_metrics("123 !?")["dominant_script"] is None
@@ -0,0 +1,138 @@
+import pytest
+
+import cheesecloth
+
+
+TEXTS = [
+    "The cat and the dog.",
+    "THE CAT ran away!",
+    "",
+    "Ünïcode ünïcode text",
+] * 25
+
+
+def exact_vocabulary(texts, case_sensitive=True):
+    acc = cheesecloth.VocabularyAccumulator(case_sensitive=case_sensitive)
+    acc.update(texts)
+    return acc
+
+
+def test_heavy_hitters_sketch():
+    exact = exact_vocabulary(TEXTS, case_sensitive=False)
+
+    sketch = cheesecloth.HeavyHittersSketch(3, case_sensitive=False)
+    sketch.update(TEXTS[:40])
+    other = cheesecloth.HeavyHittersSketch(3, case_sensitive=False)
+    other.update(TEXTS[40:])
+    sketch.merge(other)
+
+    assert len(sketch) <= 3
+    assert sketch.total_tokens == exact.total_tokens
+    assert sketch.error_bound <= sketch.total_tokens // 4
+    assert sketch.top(1)[0][0] == "the"
+    for token, count in exact.counts().items():
+        estimate = sketch.estimate(token)
+        assert estimate <= count <= estimate + sketch.error_bound
+    assert sketch.estimate("The") == sketch.estimate("the")
+
+    covered = sum(count for _, count in exact.most_common(5))
+    assert 0.0 < sketch.top_coverage(5) <= covered / exact.total_tokens
+
+    # With enough capacity the summary is exact
+    exact_sketch = cheesecloth.HeavyHittersSketch(1000, case_sensitive=False)
+    exact_sketch.update(TEXTS)
+    assert exact_sketch.error_bound == 0
+    assert exact_sketch.top(5) == exact.most_common(5)
+    assert exact_sketch.top_coverage(5) == pytest.approx(covered / exact.total_tokens)
+
+
+def test_count_min_sketch():
+    exact = exact_vocabulary(TEXTS)
+
+    sketch = cheesecloth.CountMinSketch(width=256, depth=4)
+    sketch.update(TEXTS[:50])
+    other = cheesecloth.CountMinSketch(width=256, depth=4)
+    other.update(TEXTS[50:])
+    sketch.merge(other)
+
+    assert sketch.total_tokens == exact.total_tokens
+    for token, count in exact.counts().items():
+        assert sketch.estimate(token) >= count
+    assert sketch.estimate("The") == exact.get("The")
+
+    with pytest.raises(ValueError):
+        sketch.merge(cheesecloth.CountMinSketch(width=128, depth=4))
+    with pytest.raises(ValueError):
+        cheesecloth.CountMinSketch(width=0)
+
+
+def test_hyperloglog_sketch():
+    texts = [
+        " ".join(f"token{i}" for i in range(start, start + 100))
+        for start in range(0, 10000, 50)
+    ]
+    distinct = 10050
+
+    sketch = cheesecloth.HyperLogLogSketch(precision=12)
+    sketch.update(texts[:100])
+    other = cheesecloth.HyperLogLogSketch(precision=12)
+    other.update(texts[100:])
+    sketch.merge(other)
+
+    assert sketch.total_tokens == 100 * len(texts)
+    assert abs(sketch.estimate() - distinct) / distinct < 0.05
+    expected_ratio = distinct / sketch.total_tokens
+    assert sketch.type_token_ratio() == pytest.approx(expected_ratio, rel=0.05)
+
+    small = cheesecloth.HyperLogLogSketch(case_sensitive=False)
+    small.update(["the cat THE cat the end"])
+    assert small.estimate() == 3
+
+    with pytest.raises(ValueError):
+        sketch.merge(cheesecloth.HyperLogLogSketch(precision=10))
+    with pytest.raises(ValueError):
+        cheesecloth.HyperLogLogSketch(precision=30)
+
+
+@pytest.mark.parametrize(
+    "cls",
+    [
+        cheesecloth.HeavyHittersSketch,
+        cheesecloth.CountMinSketch,
+        cheesecloth.HyperLogLogSketch,
+    ],
+)
+def test_sketch_serialization(cls):
+    sketch = cls(include_punctuation=True, case_sensitive=False)
+    sketch.update(TEXTS)
+
+    restored = cls.from_bytes(sketch.to_bytes())
+    assert restored.to_bytes() == sketch.to_bytes()
+    assert restored.total_tokens == sketch.total_tokens
+    assert restored.include_punctuation and not restored.case_sensitive
+
+    with pytest.raises(ValueError):
+        sketch.merge(cls())
+    with pytest.raises(ValueError):
+        cls.from_bytes(b"not a sketch")
+
+
+@pytest.mark.parametrize(
+    "cls",
+    [
+        cheesecloth.HeavyHittersSketch,
+        cheesecloth.CountMinSketch,
+        cheesecloth.HyperLogLogSketch,
+    ],
+)
+def test_sketch_merge_into_itself(cls):
+    sketch = cls()
+    sketch.update(TEXTS)
+    estimate = sketch.estimate() if cls is cheesecloth.HyperLogLogSketch else None
+
+    sketch.merge(sketch)
+    assert sketch.total_tokens == 2 * exact_vocabulary(TEXTS).total_tokens
+    if cls is cheesecloth.HyperLogLogSketch:
+        assert sketch.estimate() == estimate
+    else:
+        assert sketch.estimate("The") == 2 * exact_vocabulary(TEXTS).get("The")
@@ -1,3 +1,4 @@
+import pytest
 import cheesecloth
 
 
@@ -188,3 +189,32 @@ def test_punctuation_transitions():
     assert group_bigrams.get(("L", "P")) >= 2  # Letter→Punctuation
     assert group_bigrams.get(("P", "Z")) >= 1  # Punctuation→Space
     assert group_bigrams.get(("Z", "L")) >= 1  # Space→Letter
+
+
+def test_unicode_category_ngram_matrix():
+    """Test that the n-gram matrix matches the per-text dictionaries."""
+    texts = ["Hi!", "", "Hello, World! 123", "naïve café"]
+    columns = cheesecloth.UNICODE_CATEGORY_BIGRAM_COLUMNS
+    assert len(columns) == 31 * 31
+    assert columns == cheesecloth.get_unicode_category_ngram_columns(2)
+
+    matrix = cheesecloth.get_unicode_category_ngram_matrix(texts)
+    assert matrix.shape == (len(texts), len(columns))
+    assert matrix.dtype.kind == "i"
+    for row, text in zip(matrix, texts):
+        expected = cheesecloth.get_unicode_category_bigrams(text)
+        actual = {column: count for column, count in zip(columns, row) if count}
+        assert actual == expected
+
+    ratios = cheesecloth.get_unicode_category_ngram_matrix(
+        texts, n=3, groups=True, ratios=True
+    )
+    columns = cheesecloth.UNICODE_CATEGORY_GROUP_TRIGRAM_COLUMNS
+    assert ratios.shape == (len(texts), 8 * 7 * 8)
+    assert ratios[1].sum() == 0.0
+    expected = cheesecloth.get_unicode_category_group_trigram_ratios(texts[2])
+    for column, ratio in zip(columns, ratios[2]):
+        assert abs(ratio - expected.get(column, 0.0)) < 1e-10
+
+    with pytest.raises(ValueError):
+        cheesecloth.get_unicode_category_ngram_matrix(texts, n=4)
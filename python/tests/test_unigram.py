@@ -1,3 +1,5 @@
+import pytest
+
 import cheesecloth
 
 
@@ -33,6 +35,57 @@ def test_tokenize_unigrams_with_punctuation():
     assert "world" in tokens
 
 
+def test_tokenize_unigrams_spans():
+    text = "Héllo, wörld!"
+    starts, ends = cheesecloth.tokenize_unigrams_spans(text, unit="char")
+    assert starts.dtype == "int64"
+    assert [text[s:e] for s, e in zip(starts, ends)] == cheesecloth.tokenize_unigrams(
+        text
+    )
+
+    # Byte offsets index the UTF-8 encoding
+    data = text.encode("utf-8")
+    starts, ends, classes = cheesecloth.tokenize_unigrams_spans(
+        text, include_punctuation=True, classes=True
+    )
+    tokens = [data[s:e].decode("utf-8") for s, e in zip(starts, ends)]
+    assert tokens == cheesecloth.tokenize_unigrams_with_punctuation(text)
+    assert [cheesecloth.TOKEN_CLASSES[c] for c in classes] == [
+        "word",
+        "punctuation",
+        "whitespace",
+        "word",
+        "punctuation",
+    ]
+
+    starts, ends = cheesecloth.tokenize_unigrams_spans("")
+    assert len(starts) == 0 and len(ends) == 0
+
+    with pytest.raises(ValueError):
+        cheesecloth.tokenize_unigrams_spans(text, unit="word")
+
+
+def test_batch_tokenize_unigrams_spans():
+    texts = ["one two", "", "naïve three"]
+    starts, ends, offsets = cheesecloth.batch_tokenize_unigrams_spans(
+        texts, unit="char"
+    )
+    assert offsets.tolist() == [0, 2, 2, 4]
+    for i, text in enumerate(texts):
+        row = slice(offsets[i], offsets[i + 1])
+        spans = zip(starts[row], ends[row])
+        assert [text[s:e] for s, e in spans] == cheesecloth.tokenize_unigrams(text)
+
+    result = cheesecloth.batch_tokenize_unigrams_spans(
+        texts, include_punctuation=True, classes=True
+    )
+    assert len(result) == 4
+    assert len(result[3]) == result[2][-1]
+
+    with pytest.raises(TypeError):
+        cheesecloth.batch_tokenize_unigrams_spans("not a batch")
+
+
 def test_count_unigram_tokens():
     assert (
         cheesecloth.count_unigram_tokens("hello world", include_punctuation=False) == 2
@@ -231,6 +284,12 @@ def test_get_unigram_frequency():
     assert "." in freq, "Period should be in frequency dictionary"
     assert freq["."] == 1, f"Expected period count 1, got {freq.get('.', 0)}"
 
+    # Case-insensitive keys are the lowercase tokens
+    freq = cheesecloth.get_unigram_frequency(
+        "ΟΔΟΣ οδος", include_punctuation=False, case_sensitive=False
+    )
+    assert freq == {"οδος": 2}
+
 
 def test_unigram_entropy():
     # Simple cases
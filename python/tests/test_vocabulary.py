@@ -0,0 +1,81 @@
+from collections import Counter
+
+import pytest
+
+import cheesecloth
+
+
+TEXTS = [
+    "The cat and the dog.",
+    "THE CAT ran away!",
+    "",
+    "Ünïcode ünïcode text",
+] * 25
+
+
+def expected_counts(texts, include_punctuation, case_sensitive):
+    total = Counter()
+    for text in texts:
+        total.update(
+            cheesecloth.get_unigram_frequency(text, include_punctuation, case_sensitive)
+        )
+    return dict(total)
+
+
+@pytest.mark.parametrize(
+    "include_punctuation,case_sensitive", [(False, True), (False, False), (True, False)]
+)
+def test_vocabulary_matches_unigram_frequency(include_punctuation, case_sensitive):
+    acc = cheesecloth.VocabularyAccumulator(include_punctuation, case_sensitive)
+    acc.update(TEXTS)
+
+    expected = expected_counts(TEXTS, include_punctuation, case_sensitive)
+    assert acc.counts() == expected
+    assert len(acc) == len(expected)
+    assert acc.total_tokens == sum(expected.values())
+    assert acc.document_count == len(TEXTS)
+
+
+def test_vocabulary_queries():
+    acc = cheesecloth.VocabularyAccumulator(case_sensitive=False)
+    acc.update(["the cat and the dog", "The end"])
+    acc.update_counts({"THE": 2, "cat": 1})
+
+    assert acc.get("The") == 5
+    assert "CAT" in acc
+    assert "bird" not in acc
+    assert acc.most_common(2) == [("the", 5), ("cat", 2)]
+    assert acc.document_count == 3
+
+
+def test_vocabulary_merge_and_serialize(tmp_path):
+    first = cheesecloth.VocabularyAccumulator()
+    first.update(TEXTS[:40])
+    second = cheesecloth.VocabularyAccumulator()
+    second.update(TEXTS[40:])
+
+    restored = cheesecloth.VocabularyAccumulator.from_bytes(second.to_bytes())
+    assert restored.counts() == second.counts()
+    assert restored.total_tokens == second.total_tokens
+
+    path = tmp_path / "vocab.bin"
+    first.save(path)
+    merged = cheesecloth.VocabularyAccumulator.load(path)
+    merged.merge(restored)
+
+    whole = cheesecloth.VocabularyAccumulator()
+    whole.update(TEXTS)
+    assert merged.counts() == whole.counts()
+    assert merged.document_count == whole.document_count
+
+    # Merging into itself doubles the counts
+    doubled = cheesecloth.VocabularyAccumulator.from_bytes(whole.to_bytes())
+    doubled.merge(doubled)
+    expected = {token: 2 * count for token, count in whole.counts().items()}
+    assert doubled.counts() == expected
+    assert doubled.total_tokens == 2 * whole.total_tokens
+
+    with pytest.raises(ValueError):
+        merged.merge(cheesecloth.VocabularyAccumulator(case_sensitive=False))
+    with pytest.raises(ValueError):
+        cheesecloth.VocabularyAccumulator.from_bytes(b"not a vocabulary")
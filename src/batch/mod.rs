@@ -6,7 +6,14 @@
 //! ## Key Features
 //!
 //! * Configurable metric selection to compute only what's needed
+//! * Metric plans that fuse the selected metrics into one traversal per pass
+//! * A typed metric schema resolved once, with interned Python keys
 //! * Batch processing for efficient handling of multiple documents
+//! * Parallel, GIL-free computation across documents using rayon
+//! * Columnar NumPy output for direct DataFrame construction
+//! * Zero-copy Apache Arrow input and RecordBatch output
+//! * Streaming `imap` iteration that overlaps input reading with computation
+//! * `str` or raw UTF-8 `bytes` input, validated in Rust
 //! * PyO3 integration for seamless Python interoperability
 //! * Concise API for selective metric computation
 //!
@@ -15,21 +22,32 @@
 //! It balances flexibility with performance to provide efficient text analysis
 //! at scale.
 
+pub mod plan;
+pub mod schema;
+
 use pyo3::prelude::*;
-use pyo3::types::{PyDict, PyList};
+use pyo3::sync::GILOnceCell;
+use pyo3::types::{PyDict, PyList, PyString};
+use rayon::prelude::*;
 use std::collections::{HashMap, HashSet};
+use std::sync::Arc;
 
-use crate::char;
-use crate::text;
-use crate::unigram;
+use crate::char::categories::{self, UnicodeCategory, UnicodeCategoryGroup};
+use crate::columns::arrow_io::TextArray;
+use crate::columns::{Column, ColumnSet};
+use crate::input::{text_from_py, TextBatch};
+use crate::stream::{ChunkWorker, MetricsStream, StreamEngine};
+use plan::MetricEngine;
+use schema::{CategoryTrigram, MetricKind, MetricValue};
 
 /// A struct that holds configuration for batch metric computation
 #[pyclass]
 pub struct BatchProcessor {
     #[pyo3(get)]
     enabled_metrics: HashSet<String>,
-    include_punctuation: bool,
-    case_sensitive: bool,
+    engine: Arc<MetricEngine>,
+    /// Interned Python metric names, in schema order, created on first use
+    keys: GILOnceCell<Vec<Py<PyString>>>,
 }
 
 #[pymethods]
@@ -37,419 +55,616 @@ impl BatchProcessor {
     /// Create a new BatchProcessor with specified metrics enabled
     #[new]
     fn new(metrics: Vec<String>, include_punctuation: bool, case_sensitive: bool) -> Self {
-        BatchProcessor {
-            enabled_metrics: metrics.into_iter().collect(),
+        let engine = MetricEngine::new(
+            metrics.iter().map(String::as_str),
             include_punctuation,
             case_sensitive,
+        );
+        BatchProcessor {
+            enabled_metrics: metrics.into_iter().collect(),
+            engine: Arc::new(engine),
+            keys: GILOnceCell::new(),
         }
     }
 
     /// Compute all enabled metrics for a single text
-    fn compute_metrics(&self, py: Python<'_>, text: &str) -> PyResult<PyObject> {
-        let metrics = self.compute_metrics_internal(text);
-
-        // Convert to Python dictionary
-        let dict = PyDict::new(py);
-        for (key, value) in metrics {
-            match value {
-                MetricValue::Int(v) => dict.set_item(key, v)?,
-                MetricValue::Float(v) => dict.set_item(key, v)?,
-                MetricValue::Bool(v) => dict.set_item(key, v)?,
-                MetricValue::StringMap(map) => {
-                    let inner_dict = PyDict::new(py);
-                    for (k, v) in map {
-                        inner_dict.set_item(k, v)?;
-                    }
-                    dict.set_item(key, inner_dict)?;
-                }
-                MetricValue::StringMap3(map) => {
-                    let inner_dict = PyDict::new(py);
-                    for ((prev, current, next), v) in map {
-                        // Convert the tuple key to a string representation for Python
-                        let start_str = "START".to_string();
-                        let end_str = "END".to_string();
-                        let prev_str = prev.as_ref().unwrap_or(&start_str);
-                        let next_str = next.as_ref().unwrap_or(&end_str);
-                        let key_str = format!("({},{},{})", prev_str, current, next_str);
-                        inner_dict.set_item(key_str, v)?;
-                    }
-                    dict.set_item(key, inner_dict)?;
-                }
-            }
-        }
-
-        Ok(dict.into())
+    ///
+    /// `text` may be a `str` or UTF-8 `bytes`, `bytearray` or `memoryview`; invalid
+    /// UTF-8 raises `UnicodeDecodeError` unless `lossy` is set.
+    #[pyo3(signature = (text, lossy=false))]
+    fn compute_metrics(
+        &self,
+        py: Python<'_>,
+        text: &Bound<'_, PyAny>,
+        lossy: bool,
+    ) -> PyResult<PyObject> {
+        let row = self.engine.compute(&text_from_py(text, lossy)?);
+        let mut converter = RowConverter::new(py, self.keys(py));
+        Ok(converter.convert_row(row)?.into_any().unbind())
     }
 
     /// Compute metrics for a batch of texts
-    fn compute_batch_metrics(&self, py: Python<'_>, texts: Vec<String>) -> PyResult<PyObject> {
-        let results: Vec<HashMap<String, MetricValue>> = texts
-            .iter()
-            .map(|text| self.compute_metrics_internal(text))
-            .collect();
-
-        // Convert results to a list of dictionaries
+    ///
+    /// Documents are analyzed in parallel on the rayon thread pool with the GIL
+    /// released; only the conversion of the results into Python dictionaries
+    /// happens while holding the GIL. Texts may be `str` or UTF-8 `bytes`-like
+    /// objects (see `compute_metrics`).
+    #[pyo3(signature = (texts, lossy=false))]
+    fn compute_batch_metrics(
+        &self,
+        py: Python<'_>,
+        texts: &Bound<'_, PyAny>,
+        lossy: bool,
+    ) -> PyResult<PyObject> {
+        let batch = TextBatch::from_py(texts)?;
+        let texts = batch.texts(lossy)?;
+        let rows: Vec<Vec<MetricValue>> = py.allow_threads(|| {
+            texts
+                .par_iter()
+                .map(|text| self.engine.compute(text))
+                .collect()
+        });
+
+        // Convert results to a list of dictionaries, reusing key objects across rows
+        let mut converter = RowConverter::new(py, self.keys(py));
         let result_list = PyList::empty(py);
-
-        for metrics in results {
-            let dict = PyDict::new(py);
-            for (key, value) in metrics {
-                match value {
-                    MetricValue::Int(v) => dict.set_item(&key, v)?,
-                    MetricValue::Float(v) => dict.set_item(&key, v)?,
-                    MetricValue::Bool(v) => dict.set_item(&key, v)?,
-                    MetricValue::StringMap(map) => {
-                        let inner_dict = PyDict::new(py);
-                        for (k, v) in map {
-                            inner_dict.set_item(k, v)?;
-                        }
-                        dict.set_item(&key, inner_dict)?;
-                    }
-                    MetricValue::StringMap3(map) => {
-                        let inner_dict = PyDict::new(py);
-                        for ((prev, current, next), v) in map {
-                            // Convert the tuple key to a string representation for Python
-                            let start_str = "START".to_string();
-                            let end_str = "END".to_string();
-                            let prev_str = prev.as_ref().unwrap_or(&start_str);
-                            let next_str = next.as_ref().unwrap_or(&end_str);
-                            let key_str = format!("({},{},{})", prev_str, current, next_str);
-                            inner_dict.set_item(key_str, v)?;
-                        }
-                        dict.set_item(&key, inner_dict)?;
-                    }
-                }
-            }
-            result_list.append(dict)?;
+        for row in rows {
+            result_list.append(converter.convert_row(row)?)?;
         }
 
         Ok(result_list.into())
     }
-}
-
-/// Internal enum to represent different metric value types
-enum MetricValue {
-    Int(usize),
-    Float(f64),
-    Bool(bool),
-    StringMap(HashMap<String, usize>),
-    StringMap3(HashMap<(Option<String>, String, Option<String>), usize>),
-}
-
-impl BatchProcessor {
-    /// Internal function to compute all metrics for a text
-    fn compute_metrics_internal(&self, text: &str) -> HashMap<String, MetricValue> {
-        let mut results = HashMap::new();
-
-        // Basic metrics
-        if self.enabled_metrics.contains("char_count") {
-            results.insert(
-                "char_count".to_string(),
-                MetricValue::Int(char::unicode::count_chars(text)),
-            );
-        }
-
-        if self.enabled_metrics.contains("word_count") {
-            results.insert(
-                "word_count".to_string(),
-                MetricValue::Int(text::segmentation::count_words(text)),
-            );
-        }
-
-        // Character type metrics
-        if self.enabled_metrics.contains("letter_count") {
-            results.insert(
-                "letter_count".to_string(),
-                MetricValue::Int(char::unicode::count_letters(text)),
-            );
-        }
 
-        if self.enabled_metrics.contains("digit_count") {
-            results.insert(
-                "digit_count".to_string(),
-                MetricValue::Int(char::unicode::count_digits(text)),
-            );
-        }
-
-        if self.enabled_metrics.contains("punctuation_count") {
-            results.insert(
-                "punctuation_count".to_string(),
-                MetricValue::Int(char::unicode::count_punctuation(text)),
-            );
-        }
-
-        if self.enabled_metrics.contains("symbol_count") {
-            results.insert(
-                "symbol_count".to_string(),
-                MetricValue::Int(char::unicode::count_symbols(text)),
-            );
-        }
-
-        if self.enabled_metrics.contains("whitespace_count") {
-            results.insert(
-                "whitespace_count".to_string(),
-                MetricValue::Int(char::unicode::count_whitespace(text)),
-            );
-        }
-
-        if self.enabled_metrics.contains("non_ascii_count") {
-            results.insert(
-                "non_ascii_count".to_string(),
-                MetricValue::Int(char::unicode::count_non_ascii(text)),
-            );
-        }
-
-        if self.enabled_metrics.contains("uppercase_count") {
-            results.insert(
-                "uppercase_count".to_string(),
-                MetricValue::Int(char::unicode::count_uppercase(text)),
-            );
-        }
-
-        if self.enabled_metrics.contains("lowercase_count") {
-            results.insert(
-                "lowercase_count".to_string(),
-                MetricValue::Int(char::unicode::count_lowercase(text)),
-            );
-        }
-
-        if self.enabled_metrics.contains("alphanumeric_count") {
-            results.insert(
-                "alphanumeric_count".to_string(),
-                MetricValue::Int(char::unicode::count_alphanumeric(text)),
-            );
-        }
-
-        // Ratio metrics
-        if self.enabled_metrics.contains("is_ascii") {
-            results.insert(
-                "is_ascii".to_string(),
-                MetricValue::Bool(char::unicode::is_ascii(text)),
-            );
-        }
-
-        if self.enabled_metrics.contains("ascii_ratio") {
-            results.insert(
-                "ascii_ratio".to_string(),
-                MetricValue::Float(char::unicode::ratio_ascii(text)),
-            );
-        }
+    /// Compute metrics for a batch of texts in columnar form
+    ///
+    /// Returns a dictionary mapping each enabled metric name to a NumPy array with
+    /// one entry per text. Frequency maps are returned as a list of dictionaries.
+    #[pyo3(signature = (texts, lossy=false))]
+    fn calculate_batch_columns(
+        &self,
+        py: Python<'_>,
+        texts: &Bound<'_, PyAny>,
+        lossy: bool,
+    ) -> PyResult<PyObject> {
+        let batch = TextBatch::from_py(texts)?;
+        let texts = batch.texts(lossy)?;
+        let columns = py.allow_threads(|| {
+            let rows: Vec<Vec<MetricValue>> = texts
+                .par_iter()
+                .map(|text| self.engine.compute(text))
+                .collect();
+            self.rows_to_columns(rows)
+        });
+        columns.into_py_dict(py)
+    }
 
-        if self.enabled_metrics.contains("uppercase_ratio") {
-            results.insert(
-                "uppercase_ratio".to_string(),
-                MetricValue::Float(char::unicode::ratio_uppercase(text)),
-            );
-        }
+    /// Compute metrics for an Arrow text column, returning an Arrow RecordBatch
+    ///
+    /// Accepts a pyarrow `StringArray` or `LargeStringArray` (anything exporting the
+    /// Arrow C Data Interface). The UTF-8 buffers are read in place, and null input
+    /// rows produce null output rows.
+    fn calculate_batch_arrow(
+        &self,
+        py: Python<'_>,
+        texts: &Bound<'_, PyAny>,
+    ) -> PyResult<PyObject> {
+        let texts = TextArray::from_pyarrow(texts)?;
+        let columns = py.allow_threads(|| {
+            let rows: Vec<Vec<MetricValue>> = (0..texts.len())
+                .into_par_iter()
+                .map(|i| self.engine.compute(texts.value(i)))
+                .collect();
+            self.rows_to_columns(rows)
+        });
+        columns.into_pyarrow(py, texts.len(), texts.nulls())
+    }
 
-        if self.enabled_metrics.contains("alphanumeric_ratio") {
-            results.insert(
-                "alphanumeric_ratio".to_string(),
-                MetricValue::Float(char::unicode::ratio_alphanumeric(text)),
-            );
-        }
+    /// Lazily compute metrics for an iterable of texts
+    ///
+    /// Texts are read from `iterable` in chunks of `chunk_size` and analyzed on
+    /// worker threads while the next chunks are being read; at most `max_in_flight`
+    /// chunks are pending at once (default: one per worker thread). Yields one
+    /// metrics dictionary per text, in input order. Items may be `str` or UTF-8
+    /// `bytes`-like objects.
+    #[pyo3(signature = (iterable, chunk_size=128, max_in_flight=None, lossy=false))]
+    fn imap(
+        slf: &Bound<'_, Self>,
+        iterable: &Bound<'_, PyAny>,
+        chunk_size: usize,
+        max_in_flight: Option<usize>,
+        lossy: bool,
+    ) -> PyResult<MetricsStream> {
+        let engine = BatchStream {
+            engine: Arc::clone(&slf.borrow().engine),
+            processor: slf.clone().unbind(),
+        };
+        MetricsStream::new(iterable, engine, chunk_size, max_in_flight, lossy)
+    }
+}
 
-        if self.enabled_metrics.contains("alpha_to_numeric_ratio") {
-            results.insert(
-                "alpha_to_numeric_ratio".to_string(),
-                MetricValue::Float(char::unicode::ratio_alpha_to_numeric(text)),
-            );
-        }
+impl ChunkWorker for MetricEngine {
+    type Output = Vec<Vec<MetricValue>>;
 
-        if self.enabled_metrics.contains("whitespace_ratio") {
-            results.insert(
-                "whitespace_ratio".to_string(),
-                MetricValue::Float(char::unicode::ratio_whitespace(text)),
-            );
-        }
+    fn compute_chunk(&self, texts: &[String]) -> Vec<Vec<MetricValue>> {
+        texts.par_iter().map(|text| self.compute(text)).collect()
+    }
+}
 
-        if self.enabled_metrics.contains("digit_ratio") {
-            results.insert(
-                "digit_ratio".to_string(),
-                MetricValue::Float(char::unicode::ratio_digits(text)),
-            );
-        }
+/// Streaming engine backing `BatchProcessor.imap`
+struct BatchStream {
+    engine: Arc<MetricEngine>,
+    processor: Py<BatchProcessor>,
+}
 
-        if self.enabled_metrics.contains("punctuation_ratio") {
-            results.insert(
-                "punctuation_ratio".to_string(),
-                MetricValue::Float(char::unicode::ratio_punctuation(text)),
-            );
-        }
+impl StreamEngine for BatchStream {
+    type Worker = MetricEngine;
 
-        // Entropy metrics
-        if self.enabled_metrics.contains("char_entropy") {
-            results.insert(
-                "char_entropy".to_string(),
-                MetricValue::Float(char::unicode::char_entropy(text)),
-            );
-        }
+    fn worker(&self) -> Arc<MetricEngine> {
+        Arc::clone(&self.engine)
+    }
 
-        // Frequency metrics
-        if self.enabled_metrics.contains("char_frequency") {
-            let freq = char::unicode::char_frequency(text);
-            // Convert char keys to string
-            let string_freq: HashMap<String, usize> =
-                freq.into_iter().map(|(k, v)| (k.to_string(), v)).collect();
-            results.insert(
-                "char_frequency".to_string(),
-                MetricValue::StringMap(string_freq),
-            );
-        }
+    fn convert(&self, py: Python<'_>, rows: Vec<Vec<MetricValue>>) -> PyResult<Vec<PyObject>> {
+        let processor = self.processor.borrow(py);
+        let mut converter = RowConverter::new(py, processor.keys(py));
+        rows.into_iter()
+            .map(|row| Ok(converter.convert_row(row)?.into_any().unbind()))
+            .collect()
+    }
+}
 
-        if self.enabled_metrics.contains("char_type_frequency") {
-            let freq = char::unicode::char_type_frequency(text);
-            let string_freq: HashMap<String, usize> =
-                freq.into_iter().map(|(k, v)| (k.to_string(), v)).collect();
-            results.insert(
-                "char_type_frequency".to_string(),
-                MetricValue::StringMap(string_freq),
-            );
-        }
+impl BatchProcessor {
+    /// Interned Python metric names in schema order
+    fn keys<'py>(&'py self, py: Python<'py>) -> &'py [Py<PyString>] {
+        self.keys.get_or_init(py, || {
+            self.engine
+                .schema
+                .ids()
+                .iter()
+                .map(|id| PyString::intern(py, id.name()).unbind())
+                .collect()
+        })
+    }
 
-        if self.enabled_metrics.contains("unicode_category_frequency") {
-            results.insert(
-                "unicode_category_frequency".to_string(),
-                MetricValue::StringMap(char::categories::category_string_frequency(text)),
-            );
-        }
+    /// Transpose schema-ordered rows into named columns.
+    ///
+    /// Column types come from the schema, so every enabled metric gets a correctly
+    /// typed column even for an empty batch.
+    fn rows_to_columns(&self, mut rows: Vec<Vec<MetricValue>>) -> ColumnSet {
+        let mut columns = ColumnSet::new();
+        for (slot, id) in self.engine.schema.ids().iter().enumerate() {
+            let values = rows
+                .iter_mut()
+                .map(|row| std::mem::replace(&mut row[slot], MetricValue::Int(0)));
+            let column = match id.kind() {
+                MetricKind::Int => Column::from_counts(values.map(|v| match v {
+                    MetricValue::Int(v) => v,
+                    _ => 0,
+                })),
+                MetricKind::Float => Column::from_floats(values.map(|v| match v {
+                    MetricValue::Float(v) => v,
+                    _ => 0.0,
+                })),
+                MetricKind::Bool => Column::from_bools(values.map(|v| match v {
+                    MetricValue::Bool(v) => v,
+                    _ => false,
+                })),
+                MetricKind::Map => Column::from_maps(values.map(MetricValue::into_string_map)),
+            };
+            columns.push(id.name(), column);
+        }
+
+        columns
+    }
+}
 
-        if self
-            .enabled_metrics
-            .contains("unicode_category_group_frequency")
-        {
-            results.insert(
-                "unicode_category_group_frequency".to_string(),
-                MetricValue::StringMap(char::categories::category_group_string_frequency(text)),
-            );
-        }
+/// Converts schema-ordered rows into Python dictionaries.
+///
+/// Metric names are the processor's interned key objects, and trigram key strings
+/// are created once per distinct trigram and reused across all rows of a batch.
+struct RowConverter<'py, 'k> {
+    py: Python<'py>,
+    keys: &'k [Py<PyString>],
+    category_trigrams: HashMap<CategoryTrigram<UnicodeCategory>, Bound<'py, PyString>>,
+    group_trigrams: HashMap<CategoryTrigram<UnicodeCategoryGroup>, Bound<'py, PyString>>,
+}
 
-        if self
-            .enabled_metrics
-            .contains("unicode_category_trigram_frequency")
-        {
-            results.insert(
-                "unicode_category_trigram_frequency".to_string(),
-                MetricValue::StringMap3(char::categories::count_category_trigrams(text)),
-            );
+impl<'py, 'k> RowConverter<'py, 'k> {
+    fn new(py: Python<'py>, keys: &'k [Py<PyString>]) -> Self {
+        RowConverter {
+            py,
+            keys,
+            category_trigrams: HashMap::new(),
+            group_trigrams: HashMap::new(),
         }
+    }
 
-        if self
-            .enabled_metrics
-            .contains("unicode_category_group_trigram_frequency")
-        {
-            results.insert(
-                "unicode_category_group_trigram_frequency".to_string(),
-                MetricValue::StringMap3(char::categories::count_category_group_trigrams(text)),
-            );
+    /// Convert one row into a dictionary
+    fn convert_row(&mut self, row: Vec<MetricValue>) -> PyResult<Bound<'py, PyDict>> {
+        let py = self.py;
+        let dict = PyDict::new(py);
+        for (key, value) in self.keys.iter().zip(row) {
+            let key = key.bind(py);
+            match value {
+                MetricValue::Int(v) => dict.set_item(key, v)?,
+                MetricValue::Float(v) => dict.set_item(key, v)?,
+                MetricValue::Bool(v) => dict.set_item(key, v)?,
+                MetricValue::CharMap(map) => {
+                    let inner_dict = PyDict::new(py);
+                    for (k, v) in map {
+                        inner_dict.set_item(k, v)?;
+                    }
+                    dict.set_item(key, inner_dict)?;
+                }
+                MetricValue::StaticMap(map) => {
+                    let inner_dict = PyDict::new(py);
+                    for (k, v) in map {
+                        inner_dict.set_item(PyString::intern(py, k), v)?;
+                    }
+                    dict.set_item(key, inner_dict)?;
+                }
+                MetricValue::StringMap(map) => {
+                    let inner_dict = PyDict::new(py);
+                    for (k, v) in map {
+                        inner_dict.set_item(k, v)?;
+                    }
+                    dict.set_item(key, inner_dict)?;
+                }
+                MetricValue::CategoryTrigrams(map) => {
+                    let inner_dict = PyDict::new(py);
+                    for (k, v) in map {
+                        let trigram = self.category_trigrams.entry(k).or_insert_with(|| {
+                            PyString::new(
+                                py,
+                                &schema::trigram_key(k, categories::category_to_string),
+                            )
+                        });
+                        inner_dict.set_item(&*trigram, v)?;
+                    }
+                    dict.set_item(key, inner_dict)?;
+                }
+                MetricValue::GroupTrigrams(map) => {
+                    let inner_dict = PyDict::new(py);
+                    for (k, v) in map {
+                        let trigram = self.group_trigrams.entry(k).or_insert_with(|| {
+                            PyString::new(
+                                py,
+                                &schema::trigram_key(k, categories::category_group_to_string),
+                            )
+                        });
+                        inner_dict.set_item(&*trigram, v)?;
+                    }
+                    dict.set_item(key, inner_dict)?;
+                }
+            }
         }
 
-        // Segmentation metrics
-        if self.enabled_metrics.contains("line_count") {
-            results.insert(
-                "line_count".to_string(),
-                MetricValue::Int(text::segmentation::count_lines(text)),
-            );
-        }
+        Ok(dict)
+    }
+}
 
-        if self.enabled_metrics.contains("avg_line_length") {
-            results.insert(
-                "avg_line_length".to_string(),
-                MetricValue::Float(text::segmentation::average_line_length(text)),
-            );
-        }
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::{char, text, unigram};
+
+    const ALL_METRICS: &[&str] = &[
+        "char_count",
+        "word_count",
+        "letter_count",
+        "digit_count",
+        "punctuation_count",
+        "symbol_count",
+        "whitespace_count",
+        "non_ascii_count",
+        "uppercase_count",
+        "lowercase_count",
+        "alphanumeric_count",
+        "is_ascii",
+        "ascii_ratio",
+        "uppercase_ratio",
+        "alphanumeric_ratio",
+        "alpha_to_numeric_ratio",
+        "whitespace_ratio",
+        "digit_ratio",
+        "punctuation_ratio",
+        "char_entropy",
+        "char_frequency",
+        "char_type_frequency",
+        "unicode_category_frequency",
+        "unicode_category_group_frequency",
+        "unicode_category_trigram_frequency",
+        "unicode_category_group_trigram_frequency",
+        "line_count",
+        "avg_line_length",
+        "paragraph_count",
+        "avg_paragraph_length",
+        "avg_word_length",
+        "avg_sentence_length",
+        "unigram_count",
+        "unique_unigram_count",
+        "unigram_type_token_ratio",
+        "unigram_repetition_rate",
+        "unigram_entropy",
+        "unigram_frequency",
+    ];
+
+    const TEXTS: &[&str] = &[
+        "",
+        "a",
+        "Hi",
+        "Hello, World! 123 + 45 = 168.\n\nSecond paragraph: café, naïve — «quoted».",
+        "  The the THE cat.\r\nSat on the mat?  \n\t\nΕλληνικά 漢字 ١٢٣ ©®™ $5 ~x^y",
+    ];
+
+    fn processor(metrics: &[&str]) -> BatchProcessor {
+        BatchProcessor::new(metrics.iter().map(|m| m.to_string()).collect(), true, false)
+    }
 
-        if self.enabled_metrics.contains("paragraph_count") {
-            results.insert(
-                "paragraph_count".to_string(),
-                MetricValue::Int(text::segmentation::count_paragraphs(text)),
-            );
-        }
+    /// Compute a row and key it by metric name
+    fn compute(processor: &BatchProcessor, text: &str) -> HashMap<String, MetricValue> {
+        let ids = processor.engine.schema.ids();
+        let row = processor.engine.compute(text);
+        assert_eq!(row.len(), ids.len());
+        ids.iter()
+            .map(|id| id.name().to_string())
+            .zip(row)
+            .collect()
+    }
 
-        if self.enabled_metrics.contains("avg_paragraph_length") {
-            results.insert(
-                "avg_paragraph_length".to_string(),
-                MetricValue::Float(text::segmentation::average_paragraph_length(text)),
-            );
+    fn int(metrics: &HashMap<String, MetricValue>, name: &str) -> usize {
+        match metrics.get(name) {
+            Some(MetricValue::Int(v)) => *v,
+            _ => panic!("{} is not an integer metric", name),
         }
+    }
 
-        if self.enabled_metrics.contains("avg_word_length") {
-            results.insert(
-                "avg_word_length".to_string(),
-                MetricValue::Float(text::segmentation::average_word_length(text)),
-            );
+    fn float(metrics: &HashMap<String, MetricValue>, name: &str) -> f64 {
+        match metrics.get(name) {
+            Some(MetricValue::Float(v)) => *v,
+            _ => panic!("{} is not a float metric", name),
         }
+    }
 
-        if self.enabled_metrics.contains("avg_sentence_length") {
-            results.insert(
-                "avg_sentence_length".to_string(),
-                MetricValue::Float(text::segmentation::average_sentence_length(text)),
-            );
-        }
+    fn map(metrics: &HashMap<String, MetricValue>, name: &str) -> HashMap<String, usize> {
+        metrics[name].clone().into_string_map()
+    }
 
-        // Unigram metrics
-        if self.enabled_metrics.contains("unigram_count") {
-            results.insert(
-                "unigram_count".to_string(),
-                MetricValue::Int(unigram::count_tokens(text, self.include_punctuation)),
-            );
-        }
+    /// Format string-keyed trigram counts the way the batch processor reports them
+    fn trigram_strings(
+        counts: HashMap<(Option<String>, String, Option<String>), usize>,
+    ) -> HashMap<String, usize> {
+        counts
+            .into_iter()
+            .map(|((prev, current, next), count)| {
+                let prev = prev.unwrap_or_else(|| "START".to_string());
+                let next = next.unwrap_or_else(|| "END".to_string());
+                (format!("({},{},{})", prev, current, next), count)
+            })
+            .collect()
+    }
 
-        if self.enabled_metrics.contains("unique_unigram_count") {
-            results.insert(
-                "unique_unigram_count".to_string(),
-                MetricValue::Int(unigram::count_unique_tokens(
-                    text,
-                    self.include_punctuation,
-                    self.case_sensitive,
-                )),
-            );
-        }
+    fn assert_close(actual: f64, expected: f64, name: &str) {
+        assert!(
+            (actual - expected).abs() < 1e-9,
+            "{}: {} != {}",
+            name,
+            actual,
+            expected
+        );
+    }
 
-        if self.enabled_metrics.contains("unigram_type_token_ratio") {
-            results.insert(
-                "unigram_type_token_ratio".to_string(),
-                MetricValue::Float(unigram::type_token_ratio(
-                    text,
-                    self.include_punctuation,
-                    self.case_sensitive,
-                )),
-            );
-        }
+    #[test]
+    fn test_plan_compilation() {
+        let plan = processor(&["char_count", "unigram_entropy"]).engine.plan;
+        assert!(plan.char_counts);
+        assert!(plan.tokens);
+        assert!(!plan.char_frequency);
+        assert!(!plan.categories);
+        assert!(!plan.lines);
+        assert!(!plan.words);
+        assert!(!plan.sentences);
+
+        assert_eq!(processor(&[]).engine.plan, plan::MetricPlan::default());
+        assert!(!processor(&["line_count"]).engine.plan.needs_char_pass());
+    }
 
-        if self.enabled_metrics.contains("unigram_repetition_rate") {
-            results.insert(
-                "unigram_repetition_rate".to_string(),
-                MetricValue::Float(unigram::repetition_rate(
-                    text,
-                    self.include_punctuation,
-                    self.case_sensitive,
-                )),
-            );
-        }
+    #[test]
+    fn test_columns_follow_schema() {
+        let processor = processor(&["is_ascii", "char_count", "char_frequency"]);
+        let rows = vec![
+            processor.engine.compute("ab"),
+            processor.engine.compute("é"),
+        ];
+        let columns = processor.rows_to_columns(rows);
+
+        assert_eq!(
+            columns.names(),
+            vec!["char_count", "is_ascii", "char_frequency"]
+        );
+        assert_eq!(columns.get("char_count"), Some(&Column::Int64(vec![2, 1])));
+        assert_eq!(
+            columns.get("is_ascii"),
+            Some(&Column::Bool(vec![true, false]))
+        );
+
+        let empty = processor.rows_to_columns(Vec::new());
+        assert_eq!(empty.get("char_count"), Some(&Column::Int64(Vec::new())));
+    }
 
-        if self.enabled_metrics.contains("unigram_entropy") {
-            results.insert(
-                "unigram_entropy".to_string(),
-                MetricValue::Float(unigram::token_entropy(
-                    text,
-                    self.include_punctuation,
-                    self.case_sensitive,
-                )),
-            );
-        }
+    #[test]
+    fn test_only_enabled_metrics_are_returned() {
+        let processor = processor(&["letter_count", "unknown", "avg_line_length"]);
+        let names: Vec<&str> = processor
+            .engine
+            .schema
+            .ids()
+            .iter()
+            .map(|id| id.name())
+            .collect();
+        assert_eq!(names, vec!["letter_count", "avg_line_length"]);
+        assert_eq!(compute(&processor, "Some text\nhere").len(), 2);
+    }
 
-        if self.enabled_metrics.contains("unigram_frequency") {
-            results.insert(
-                "unigram_frequency".to_string(),
-                MetricValue::StringMap(unigram::token_frequency(
-                    text,
-                    self.include_punctuation,
-                    self.case_sensitive,
-                )),
+    #[test]
+    fn test_fused_plan_matches_individual_functions() {
+        let processor = processor(ALL_METRICS);
+
+        for &text in TEXTS {
+            let m = compute(&processor, text);
+            assert_eq!(m.len(), ALL_METRICS.len());
+
+            assert_eq!(int(&m, "char_count"), char::unicode::count_chars(text));
+            assert_eq!(int(&m, "word_count"), text::segmentation::count_words(text));
+            assert_eq!(int(&m, "letter_count"), char::unicode::count_letters(text));
+            assert_eq!(int(&m, "digit_count"), char::unicode::count_digits(text));
+            assert_eq!(
+                int(&m, "punctuation_count"),
+                char::unicode::count_punctuation(text)
+            );
+            assert_eq!(int(&m, "symbol_count"), char::unicode::count_symbols(text));
+            assert_eq!(
+                int(&m, "whitespace_count"),
+                char::unicode::count_whitespace(text)
+            );
+            assert_eq!(
+                int(&m, "non_ascii_count"),
+                char::unicode::count_non_ascii(text)
+            );
+            assert_eq!(
+                int(&m, "uppercase_count"),
+                char::unicode::count_uppercase(text)
+            );
+            assert_eq!(
+                int(&m, "lowercase_count"),
+                char::unicode::count_lowercase(text)
+            );
+            assert_eq!(
+                int(&m, "alphanumeric_count"),
+                char::unicode::count_alphanumeric(text)
+            );
+            assert!(matches!(
+                m.get("is_ascii"),
+                Some(MetricValue::Bool(v)) if *v == char::unicode::is_ascii(text)
+            ));
+
+            assert_close(
+                float(&m, "ascii_ratio"),
+                char::unicode::ratio_ascii(text),
+                "ascii_ratio",
+            );
+            assert_close(
+                float(&m, "uppercase_ratio"),
+                char::unicode::ratio_uppercase(text),
+                "uppercase_ratio",
+            );
+            assert_close(
+                float(&m, "alphanumeric_ratio"),
+                char::unicode::ratio_alphanumeric(text),
+                "alphanumeric_ratio",
+            );
+            assert_close(
+                float(&m, "alpha_to_numeric_ratio"),
+                char::unicode::ratio_alpha_to_numeric(text),
+                "alpha_to_numeric_ratio",
+            );
+            assert_close(
+                float(&m, "whitespace_ratio"),
+                char::unicode::ratio_whitespace(text),
+                "whitespace_ratio",
+            );
+            assert_close(
+                float(&m, "digit_ratio"),
+                char::unicode::ratio_digits(text),
+                "digit_ratio",
+            );
+            assert_close(
+                float(&m, "punctuation_ratio"),
+                char::unicode::ratio_punctuation(text),
+                "punctuation_ratio",
+            );
+            assert_close(
+                float(&m, "char_entropy"),
+                char::unicode::char_entropy(text),
+                "char_entropy",
+            );
+
+            let char_frequency: HashMap<String, usize> = char::unicode::char_frequency(text)
+                .into_iter()
+                .map(|(k, v)| (k.to_string(), v))
+                .collect();
+            assert_eq!(map(&m, "char_frequency"), char_frequency);
+            let char_types: HashMap<String, usize> = char::unicode::char_type_frequency(text)
+                .into_iter()
+                .map(|(k, v)| (k.to_string(), v))
+                .collect();
+            assert_eq!(map(&m, "char_type_frequency"), char_types);
+            assert_eq!(
+                map(&m, "unicode_category_frequency"),
+                char::categories::category_string_frequency(text)
+            );
+            assert_eq!(
+                map(&m, "unicode_category_group_frequency"),
+                char::categories::category_group_string_frequency(text)
+            );
+            assert_eq!(
+                map(&m, "unicode_category_trigram_frequency"),
+                trigram_strings(char::categories::count_category_trigrams(text))
+            );
+            assert_eq!(
+                map(&m, "unicode_category_group_trigram_frequency"),
+                trigram_strings(char::categories::count_category_group_trigrams(text))
+            );
+
+            assert_eq!(int(&m, "line_count"), text::segmentation::count_lines(text));
+            assert_eq!(
+                int(&m, "paragraph_count"),
+                text::segmentation::count_paragraphs(text)
+            );
+            assert_close(
+                float(&m, "avg_line_length"),
+                text::segmentation::average_line_length(text),
+                "avg_line_length",
+            );
+            assert_close(
+                float(&m, "avg_paragraph_length"),
+                text::segmentation::average_paragraph_length(text),
+                "avg_paragraph_length",
+            );
+            assert_close(
+                float(&m, "avg_word_length"),
+                text::segmentation::average_word_length(text),
+                "avg_word_length",
+            );
+            assert_close(
+                float(&m, "avg_sentence_length"),
+                text::segmentation::average_sentence_length(text),
+                "avg_sentence_length",
+            );
+
+            assert_eq!(int(&m, "unigram_count"), unigram::count_tokens(text, true));
+            assert_eq!(
+                int(&m, "unique_unigram_count"),
+                unigram::count_unique_tokens(text, true, false)
+            );
+            assert_close(
+                float(&m, "unigram_type_token_ratio"),
+                unigram::type_token_ratio(text, true, false),
+                "unigram_type_token_ratio",
+            );
+            assert_close(
+                float(&m, "unigram_repetition_rate"),
+                unigram::repetition_rate(text, true, false),
+                "unigram_repetition_rate",
+            );
+            assert_close(
+                float(&m, "unigram_entropy"),
+                unigram::token_entropy(text, true, false),
+                "unigram_entropy",
+            );
+            assert_eq!(
+                map(&m, "unigram_frequency"),
+                unigram::token_frequency(text, true, false)
             );
         }
-
-        results
     }
 }
@@ -0,0 +1,492 @@
+//! # Batch Execution Plan
+//!
+//! This module turns a metric schema into the minimal set of passes over a text
+//! and runs them, writing results straight into a schema-ordered row.
+//!
+//! ## Key Features
+//!
+//! * `MetricPlan`: which passes (character, line, word, sentence, token) are needed
+//! * A single character traversal shared by counts, ratios, frequencies and
+//!   Unicode categories
+//! * `MetricEngine`: schema, plan and options bundled for sharing across threads
+//!
+//! However many metrics are enabled, each document is traversed at most once per
+//! pass, so selecting a subset of metrics is never slower than computing all of them.
+
+use std::collections::HashMap;
+use unicode_segmentation::UnicodeSegmentation;
+
+use super::schema::{CategoryTrigram, MetricId, MetricSchema, MetricValue, Pass};
+use crate::char;
+use crate::char::categories::{SequenceNgramCounter, UnicodeCategory, UnicodeCategoryGroup};
+use crate::char::unicode::CharCounter;
+use crate::text;
+use crate::unigram;
+
+/// Execution plan compiled from a metric schema.
+///
+/// Each flag enables one group of work. All character-level groups share a single
+/// traversal of the text, and every other pass runs at most once per document, no
+/// matter how many metrics depend on it.
+#[derive(Debug, Clone, Copy, Default, PartialEq, Eq)]
+pub struct MetricPlan {
+    pub char_counts: bool,
+    pub char_frequency: bool,
+    pub categories: bool,
+    pub category_trigrams: bool,
+    pub group_trigrams: bool,
+    pub lines: bool,
+    pub words: bool,
+    pub sentences: bool,
+    pub tokens: bool,
+}
+
+impl MetricPlan {
+    /// Determine which passes are needed for a schema
+    pub fn compile(schema: &MetricSchema) -> Self {
+        let mut plan = MetricPlan::default();
+        for id in schema.ids() {
+            match id.pass() {
+                Pass::CharCounts => plan.char_counts = true,
+                Pass::CharFrequency => plan.char_frequency = true,
+                Pass::Categories => plan.categories = true,
+                Pass::CategoryTrigrams => plan.category_trigrams = true,
+                Pass::GroupTrigrams => plan.group_trigrams = true,
+                Pass::Lines => plan.lines = true,
+                Pass::Words => plan.words = true,
+                Pass::Sentences => plan.sentences = true,
+                Pass::Tokens => plan.tokens = true,
+            }
+        }
+        plan
+    }
+
+    /// Whether any metric needs the character traversal
+    pub fn needs_char_pass(&self) -> bool {
+        self.char_counts
+            || self.char_frequency
+            || self.categories
+            || self.category_trigrams
+            || self.group_trigrams
+    }
+}
+
+/// Names of the exclusive character types, in `CharPass::char_types` order
+const CHAR_TYPE_NAMES: [&str; 6] = [
+    "letter",
+    "digit",
+    "punctuation",
+    "symbol",
+    "whitespace",
+    "other",
+];
+
+/// Results of the single character traversal
+struct CharPass {
+    total: usize,
+    letters: usize,
+    digits: usize,
+    punctuation: usize,
+    symbols: usize,
+    whitespace: usize,
+    non_ascii: usize,
+    uppercase: usize,
+    lowercase: usize,
+    alphanumeric: usize,
+    /// Exclusive character types, indexed as in `CHAR_TYPE_NAMES`
+    char_types: [usize; 6],
+    frequency: CharCounter,
+    categories: HashMap<UnicodeCategory, usize>,
+    category_trigrams: HashMap<CategoryTrigram<UnicodeCategory>, usize>,
+    group_trigrams: HashMap<CategoryTrigram<UnicodeCategoryGroup>, usize>,
+}
+
+impl CharPass {
+    /// Traverse the text once, collecting everything the plan asks for
+    fn run(text: &str, plan: &MetricPlan) -> Self {
+        let mut pass = CharPass {
+            total: 0,
+            letters: 0,
+            digits: 0,
+            punctuation: 0,
+            symbols: 0,
+            whitespace: 0,
+            non_ascii: 0,
+            uppercase: 0,
+            lowercase: 0,
+            alphanumeric: 0,
+            char_types: [0; 6],
+            frequency: CharCounter::default(),
+            categories: HashMap::new(),
+            category_trigrams: HashMap::new(),
+            group_trigrams: HashMap::new(),
+        };
+        let mut category_trigrams = SequenceNgramCounter::default();
+        let mut group_trigrams = SequenceNgramCounter::default();
+        let needs_category = plan.categories || plan.category_trigrams || plan.group_trigrams;
+
+        for c in text.chars() {
+            pass.total += 1;
+
+            if plan.char_counts {
+                let letter = char::unicode::is_letter(c);
+                let digit = char::unicode::is_digit(c);
+                let punctuation = char::unicode::is_punctuation(c);
+                let symbol = char::unicode::is_symbol(c);
+                let whitespace = char::unicode::is_whitespace(c);
+
+                pass.letters += letter as usize;
+                pass.digits += digit as usize;
+                pass.punctuation += punctuation as usize;
+                pass.symbols += symbol as usize;
+                pass.whitespace += whitespace as usize;
+                pass.non_ascii += !c.is_ascii() as usize;
+                pass.uppercase += char::unicode::is_uppercase(c) as usize;
+                pass.lowercase += char::unicode::is_lowercase(c) as usize;
+                pass.alphanumeric += char::unicode::is_alphanumeric(c) as usize;
+
+                let char_type = if letter {
+                    0
+                } else if digit {
+                    1
+                } else if punctuation {
+                    2
+                } else if symbol {
+                    3
+                } else if whitespace {
+                    4
+                } else {
+                    5
+                };
+                pass.char_types[char_type] += 1;
+            }
+
+            if plan.char_frequency {
+                pass.frequency.add(c);
+            }
+
+            if needs_category {
+                let category = char::categories::char_to_category(c);
+                if plan.categories {
+                    *pass.categories.entry(category).or_insert(0) += 1;
+                }
+                if plan.category_trigrams {
+                    category_trigrams.push(category);
+                }
+                if plan.group_trigrams {
+                    group_trigrams.push(char::categories::category_to_group(category));
+                }
+            }
+        }
+
+        pass.category_trigrams = category_trigrams.trigrams();
+        pass.group_trigrams = group_trigrams.trigrams();
+        pass
+    }
+
+    /// Ratio of a count to the total number of characters
+    fn ratio(&self, count: usize) -> f64 {
+        if self.total == 0 {
+            return 0.0;
+        }
+        count as f64 / self.total as f64
+    }
+
+    fn uppercase_ratio(&self) -> f64 {
+        if self.letters == 0 {
+            return 0.0;
+        }
+        self.uppercase as f64 / self.letters as f64
+    }
+
+    fn alpha_to_numeric_ratio(&self) -> f64 {
+        if self.digits == 0 {
+            // Large but finite number instead of infinity, as in ratio_alpha_to_numeric
+            return if self.letters == 0 {
+                0.0
+            } else {
+                1e6 * self.letters as f64
+            };
+        }
+        self.letters as f64 / self.digits as f64
+    }
+
+    fn char_entropy(&self) -> f64 {
+        self.frequency.entropy()
+    }
+
+    fn char_type_frequency(&self) -> HashMap<&'static str, usize> {
+        CHAR_TYPE_NAMES.into_iter().zip(self.char_types).collect()
+    }
+
+    fn category_frequency(&self) -> HashMap<&'static str, usize> {
+        self.categories
+            .iter()
+            .map(|(&category, &count)| (char::categories::category_to_string(category), count))
+            .collect()
+    }
+
+    fn category_group_frequency(&self) -> HashMap<&'static str, usize> {
+        let mut groups = HashMap::new();
+        for (&category, &count) in &self.categories {
+            let group = char::categories::category_to_group(category);
+            *groups
+                .entry(char::categories::category_group_to_string(group))
+                .or_insert(0) += count;
+        }
+        groups
+    }
+}
+
+/// Results of the unigram token pass
+struct TokenPass<'a> {
+    count: usize,
+    /// Counts keyed by slices of the text, converted to strings only on output
+    frequency: HashMap<unigram::TokenKey<'a>, usize>,
+}
+
+impl<'a> TokenPass<'a> {
+    /// Tokenize once and build the frequency table shared by all unigram metrics
+    fn run(text: &'a str, include_punctuation: bool, case_sensitive: bool) -> Self {
+        let frequency = unigram::count_token_slices(text, include_punctuation, case_sensitive);
+        let count = frequency.values().sum();
+
+        TokenPass { count, frequency }
+    }
+
+    fn type_token_ratio(&self) -> f64 {
+        if self.count == 0 {
+            return 0.0;
+        }
+        self.frequency.len() as f64 / self.count as f64
+    }
+
+    fn repetition_rate(&self) -> f64 {
+        if self.count == 0 {
+            return 0.0;
+        }
+        1.0 - self.type_token_ratio()
+    }
+
+    fn entropy(&self) -> f64 {
+        if self.frequency.is_empty() {
+            return 0.0;
+        }
+        let total = self.count as f64;
+        let mut entropy = 0.0;
+        for &count in self.frequency.values() {
+            let probability = count as f64 / total;
+            entropy -= probability * probability.log2();
+        }
+        entropy
+    }
+}
+
+/// A resolved metric schema, its execution plan and the unigram options
+///
+/// The engine is immutable once built and can be shared between threads.
+#[derive(Debug, Clone, PartialEq, Eq)]
+pub struct MetricEngine {
+    pub schema: MetricSchema,
+    pub plan: MetricPlan,
+    pub include_punctuation: bool,
+    pub case_sensitive: bool,
+}
+
+impl MetricEngine {
+    /// Resolve metric names and compile the plan for them
+    pub fn new<'a, I: IntoIterator<Item = &'a str>>(
+        metrics: I,
+        include_punctuation: bool,
+        case_sensitive: bool,
+    ) -> Self {
+        let schema = MetricSchema::resolve(metrics);
+        let plan = MetricPlan::compile(&schema);
+        MetricEngine {
+            schema,
+            plan,
+            include_punctuation,
+            case_sensitive,
+        }
+    }
+
+    /// Compute every metric in the schema for a text, in schema order
+    ///
+    /// Runs only the passes selected by the plan, then reads each metric from the
+    /// pass results.
+    pub fn compute(&self, text: &str) -> Vec<MetricValue> {
+        let plan = &self.plan;
+        let mut row = self.schema.row();
+
+        // Character pass: counts, ratios, frequencies and Unicode categories
+        if plan.needs_char_pass() {
+            let chars = CharPass::run(text, plan);
+
+            if plan.char_counts {
+                row.set(MetricId::CharCount, MetricValue::Int(chars.total));
+                row.set(MetricId::LetterCount, MetricValue::Int(chars.letters));
+                row.set(MetricId::DigitCount, MetricValue::Int(chars.digits));
+                row.set(
+                    MetricId::PunctuationCount,
+                    MetricValue::Int(chars.punctuation),
+                );
+                row.set(MetricId::SymbolCount, MetricValue::Int(chars.symbols));
+                row.set(
+                    MetricId::WhitespaceCount,
+                    MetricValue::Int(chars.whitespace),
+                );
+                row.set(MetricId::NonAsciiCount, MetricValue::Int(chars.non_ascii));
+                row.set(MetricId::UppercaseCount, MetricValue::Int(chars.uppercase));
+                row.set(MetricId::LowercaseCount, MetricValue::Int(chars.lowercase));
+                row.set(
+                    MetricId::AlphanumericCount,
+                    MetricValue::Int(chars.alphanumeric),
+                );
+
+                row.set(MetricId::IsAscii, MetricValue::Bool(chars.non_ascii == 0));
+                row.set(
+                    MetricId::AsciiRatio,
+                    MetricValue::Float(chars.ratio(chars.total - chars.non_ascii)),
+                );
+                row.set(
+                    MetricId::UppercaseRatio,
+                    MetricValue::Float(chars.uppercase_ratio()),
+                );
+                row.set(
+                    MetricId::AlphanumericRatio,
+                    MetricValue::Float(chars.ratio(chars.alphanumeric)),
+                );
+                row.set(
+                    MetricId::AlphaToNumericRatio,
+                    MetricValue::Float(chars.alpha_to_numeric_ratio()),
+                );
+                row.set(
+                    MetricId::WhitespaceRatio,
+                    MetricValue::Float(chars.ratio(chars.whitespace)),
+                );
+                row.set(
+                    MetricId::DigitRatio,
+                    MetricValue::Float(chars.ratio(chars.digits)),
+                );
+                row.set(
+                    MetricId::PunctuationRatio,
+                    MetricValue::Float(chars.ratio(chars.punctuation)),
+                );
+                if row.wants(MetricId::CharTypeFrequency) {
+                    row.set(
+                        MetricId::CharTypeFrequency,
+                        MetricValue::StaticMap(chars.char_type_frequency()),
+                    );
+                }
+            }
+
+            if plan.char_frequency {
+                row.set(
+                    MetricId::CharEntropy,
+                    MetricValue::Float(chars.char_entropy()),
+                );
+            }
+
+            if plan.categories {
+                if row.wants(MetricId::UnicodeCategoryFrequency) {
+                    row.set(
+                        MetricId::UnicodeCategoryFrequency,
+                        MetricValue::StaticMap(chars.category_frequency()),
+                    );
+                }
+                if row.wants(MetricId::UnicodeCategoryGroupFrequency) {
+                    row.set(
+                        MetricId::UnicodeCategoryGroupFrequency,
+                        MetricValue::StaticMap(chars.category_group_frequency()),
+                    );
+                }
+            }
+
+            if row.wants(MetricId::CharFrequency) {
+                row.set(
+                    MetricId::CharFrequency,
+                    MetricValue::CharMap(chars.frequency.into_map()),
+                );
+            }
+            row.set(
+                MetricId::UnicodeCategoryTrigramFrequency,
+                MetricValue::CategoryTrigrams(chars.category_trigrams),
+            );
+            row.set(
+                MetricId::UnicodeCategoryGroupTrigramFrequency,
+                MetricValue::GroupTrigrams(chars.group_trigrams),
+            );
+        }
+
+        // Line pass: lines and paragraphs
+        if plan.lines {
+            let lines = text::segmentation::line_statistics(text);
+            row.set(MetricId::LineCount, MetricValue::Int(lines.line_count));
+            row.set(
+                MetricId::AvgLineLength,
+                MetricValue::Float(lines.average_line_length()),
+            );
+            row.set(
+                MetricId::ParagraphCount,
+                MetricValue::Int(lines.paragraph_count),
+            );
+            row.set(
+                MetricId::AvgParagraphLength,
+                MetricValue::Float(lines.average_paragraph_length()),
+            );
+        }
+
+        // Word pass: Unicode word segmentation
+        if plan.words {
+            let (word_count, word_chars) =
+                text.unicode_words().fold((0, 0), |(count, chars), word| {
+                    (count + 1, chars + word.chars().count())
+                });
+            let avg_word_length = if word_count == 0 {
+                0.0
+            } else {
+                word_chars as f64 / word_count as f64
+            };
+            row.set(MetricId::WordCount, MetricValue::Int(word_count));
+            row.set(MetricId::AvgWordLength, MetricValue::Float(avg_word_length));
+        }
+
+        // Sentence pass
+        if plan.sentences {
+            row.set(
+                MetricId::AvgSentenceLength,
+                MetricValue::Float(text::segmentation::average_sentence_length(text)),
+            );
+        }
+
+        // Token pass: unigram counts, diversity and frequency
+        if plan.tokens {
+            let tokens = TokenPass::run(text, self.include_punctuation, self.case_sensitive);
+            row.set(MetricId::UnigramCount, MetricValue::Int(tokens.count));
+            row.set(
+                MetricId::UniqueUnigramCount,
+                MetricValue::Int(tokens.frequency.len()),
+            );
+            row.set(
+                MetricId::UnigramTypeTokenRatio,
+                MetricValue::Float(tokens.type_token_ratio()),
+            );
+            row.set(
+                MetricId::UnigramRepetitionRate,
+                MetricValue::Float(tokens.repetition_rate()),
+            );
+            row.set(
+                MetricId::UnigramEntropy,
+                MetricValue::Float(tokens.entropy()),
+            );
+            if row.wants(MetricId::UnigramFrequency) {
+                row.set(
+                    MetricId::UnigramFrequency,
+                    MetricValue::StringMap(unigram::key_counts_to_strings(tokens.frequency)),
+                );
+            }
+        }
+
+        row.finish()
+    }
+}
@@ -0,0 +1,426 @@
+//! # Batch Metric Schema
+//!
+//! This module defines the fixed set of metrics the batch processor can compute,
+//! their value types, and the pass over the text each one needs.
+//!
+//! ## Key Features
+//!
+//! * `MetricId`: an indexed identifier for every supported metric
+//! * `MetricSchema`: metric names resolved once, when a processor is built
+//! * `MetricValue`: typed values with allocation-free keys for fixed vocabularies
+//!
+//! Resolving metric names up front lets each document's results be written into a
+//! flat, preallocated row instead of a map keyed by freshly allocated strings.
+
+use std::collections::HashMap;
+
+use crate::char::categories::{self, UnicodeCategory, UnicodeCategoryGroup};
+
+/// A category trigram: (previous, current, next), with `None` at text boundaries
+pub type CategoryTrigram<T> = (Option<T>, T, Option<T>);
+
+/// Identifier of a metric supported by the batch processor
+#[derive(Debug, Clone, Copy, PartialEq, Eq, Hash)]
+pub enum MetricId {
+    CharCount,
+    WordCount,
+    LetterCount,
+    DigitCount,
+    PunctuationCount,
+    SymbolCount,
+    WhitespaceCount,
+    NonAsciiCount,
+    UppercaseCount,
+    LowercaseCount,
+    AlphanumericCount,
+    IsAscii,
+    AsciiRatio,
+    UppercaseRatio,
+    AlphanumericRatio,
+    AlphaToNumericRatio,
+    WhitespaceRatio,
+    DigitRatio,
+    PunctuationRatio,
+    CharEntropy,
+    CharFrequency,
+    CharTypeFrequency,
+    UnicodeCategoryFrequency,
+    UnicodeCategoryGroupFrequency,
+    UnicodeCategoryTrigramFrequency,
+    UnicodeCategoryGroupTrigramFrequency,
+    LineCount,
+    AvgLineLength,
+    ParagraphCount,
+    AvgParagraphLength,
+    AvgWordLength,
+    AvgSentenceLength,
+    UnigramCount,
+    UniqueUnigramCount,
+    UnigramTypeTokenRatio,
+    UnigramRepetitionRate,
+    UnigramEntropy,
+    UnigramFrequency,
+}
+
+/// The Python-visible type of a metric's value
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+pub enum MetricKind {
+    Int,
+    Float,
+    Bool,
+    Map,
+}
+
+/// The traversal of the text a metric is computed in
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+pub enum Pass {
+    CharCounts,
+    CharFrequency,
+    Categories,
+    CategoryTrigrams,
+    GroupTrigrams,
+    Lines,
+    Words,
+    Sentences,
+    Tokens,
+}
+
+impl MetricId {
+    /// Number of supported metrics
+    pub const COUNT: usize = 38;
+
+    /// All metrics, in canonical output order
+    pub const ALL: [MetricId; MetricId::COUNT] = [
+        MetricId::CharCount,
+        MetricId::WordCount,
+        MetricId::LetterCount,
+        MetricId::DigitCount,
+        MetricId::PunctuationCount,
+        MetricId::SymbolCount,
+        MetricId::WhitespaceCount,
+        MetricId::NonAsciiCount,
+        MetricId::UppercaseCount,
+        MetricId::LowercaseCount,
+        MetricId::AlphanumericCount,
+        MetricId::IsAscii,
+        MetricId::AsciiRatio,
+        MetricId::UppercaseRatio,
+        MetricId::AlphanumericRatio,
+        MetricId::AlphaToNumericRatio,
+        MetricId::WhitespaceRatio,
+        MetricId::DigitRatio,
+        MetricId::PunctuationRatio,
+        MetricId::CharEntropy,
+        MetricId::CharFrequency,
+        MetricId::CharTypeFrequency,
+        MetricId::UnicodeCategoryFrequency,
+        MetricId::UnicodeCategoryGroupFrequency,
+        MetricId::UnicodeCategoryTrigramFrequency,
+        MetricId::UnicodeCategoryGroupTrigramFrequency,
+        MetricId::LineCount,
+        MetricId::AvgLineLength,
+        MetricId::ParagraphCount,
+        MetricId::AvgParagraphLength,
+        MetricId::AvgWordLength,
+        MetricId::AvgSentenceLength,
+        MetricId::UnigramCount,
+        MetricId::UniqueUnigramCount,
+        MetricId::UnigramTypeTokenRatio,
+        MetricId::UnigramRepetitionRate,
+        MetricId::UnigramEntropy,
+        MetricId::UnigramFrequency,
+    ];
+
+    /// The metric's name, as used in Python results
+    pub fn name(self) -> &'static str {
+        match self {
+            MetricId::CharCount => "char_count",
+            MetricId::WordCount => "word_count",
+            MetricId::LetterCount => "letter_count",
+            MetricId::DigitCount => "digit_count",
+            MetricId::PunctuationCount => "punctuation_count",
+            MetricId::SymbolCount => "symbol_count",
+            MetricId::WhitespaceCount => "whitespace_count",
+            MetricId::NonAsciiCount => "non_ascii_count",
+            MetricId::UppercaseCount => "uppercase_count",
+            MetricId::LowercaseCount => "lowercase_count",
+            MetricId::AlphanumericCount => "alphanumeric_count",
+            MetricId::IsAscii => "is_ascii",
+            MetricId::AsciiRatio => "ascii_ratio",
+            MetricId::UppercaseRatio => "uppercase_ratio",
+            MetricId::AlphanumericRatio => "alphanumeric_ratio",
+            MetricId::AlphaToNumericRatio => "alpha_to_numeric_ratio",
+            MetricId::WhitespaceRatio => "whitespace_ratio",
+            MetricId::DigitRatio => "digit_ratio",
+            MetricId::PunctuationRatio => "punctuation_ratio",
+            MetricId::CharEntropy => "char_entropy",
+            MetricId::CharFrequency => "char_frequency",
+            MetricId::CharTypeFrequency => "char_type_frequency",
+            MetricId::UnicodeCategoryFrequency => "unicode_category_frequency",
+            MetricId::UnicodeCategoryGroupFrequency => "unicode_category_group_frequency",
+            MetricId::UnicodeCategoryTrigramFrequency => "unicode_category_trigram_frequency",
+            MetricId::UnicodeCategoryGroupTrigramFrequency => {
+                "unicode_category_group_trigram_frequency"
+            }
+            MetricId::LineCount => "line_count",
+            MetricId::AvgLineLength => "avg_line_length",
+            MetricId::ParagraphCount => "paragraph_count",
+            MetricId::AvgParagraphLength => "avg_paragraph_length",
+            MetricId::AvgWordLength => "avg_word_length",
+            MetricId::AvgSentenceLength => "avg_sentence_length",
+            MetricId::UnigramCount => "unigram_count",
+            MetricId::UniqueUnigramCount => "unique_unigram_count",
+            MetricId::UnigramTypeTokenRatio => "unigram_type_token_ratio",
+            MetricId::UnigramRepetitionRate => "unigram_repetition_rate",
+            MetricId::UnigramEntropy => "unigram_entropy",
+            MetricId::UnigramFrequency => "unigram_frequency",
+        }
+    }
+
+    /// Look up a metric by name
+    pub fn from_name(name: &str) -> Option<Self> {
+        MetricId::ALL.iter().copied().find(|id| id.name() == name)
+    }
+
+    /// The type of the metric's value
+    pub fn kind(self) -> MetricKind {
+        match self {
+            MetricId::IsAscii => MetricKind::Bool,
+            MetricId::CharCount
+            | MetricId::WordCount
+            | MetricId::LetterCount
+            | MetricId::DigitCount
+            | MetricId::PunctuationCount
+            | MetricId::SymbolCount
+            | MetricId::WhitespaceCount
+            | MetricId::NonAsciiCount
+            | MetricId::UppercaseCount
+            | MetricId::LowercaseCount
+            | MetricId::AlphanumericCount
+            | MetricId::LineCount
+            | MetricId::ParagraphCount
+            | MetricId::UnigramCount
+            | MetricId::UniqueUnigramCount => MetricKind::Int,
+            MetricId::CharFrequency
+            | MetricId::CharTypeFrequency
+            | MetricId::UnicodeCategoryFrequency
+            | MetricId::UnicodeCategoryGroupFrequency
+            | MetricId::UnicodeCategoryTrigramFrequency
+            | MetricId::UnicodeCategoryGroupTrigramFrequency
+            | MetricId::UnigramFrequency => MetricKind::Map,
+            _ => MetricKind::Float,
+        }
+    }
+
+    /// The pass over the text that produces this metric
+    pub fn pass(self) -> Pass {
+        match self {
+            MetricId::WordCount | MetricId::AvgWordLength => Pass::Words,
+            MetricId::CharEntropy | MetricId::CharFrequency => Pass::CharFrequency,
+            MetricId::UnicodeCategoryFrequency | MetricId::UnicodeCategoryGroupFrequency => {
+                Pass::Categories
+            }
+            MetricId::UnicodeCategoryTrigramFrequency => Pass::CategoryTrigrams,
+            MetricId::UnicodeCategoryGroupTrigramFrequency => Pass::GroupTrigrams,
+            MetricId::LineCount
+            | MetricId::AvgLineLength
+            | MetricId::ParagraphCount
+            | MetricId::AvgParagraphLength => Pass::Lines,
+            MetricId::AvgSentenceLength => Pass::Sentences,
+            MetricId::UnigramCount
+            | MetricId::UniqueUnigramCount
+            | MetricId::UnigramTypeTokenRatio
+            | MetricId::UnigramRepetitionRate
+            | MetricId::UnigramEntropy
+            | MetricId::UnigramFrequency => Pass::Tokens,
+            _ => Pass::CharCounts,
+        }
+    }
+}
+
+/// A typed metric value
+///
+/// Map values keep their natural key types (chars, static names, category enums)
+/// until they are converted for Python, so no per-document key strings are built.
+#[derive(Debug, Clone, PartialEq)]
+pub enum MetricValue {
+    Int(usize),
+    Float(f64),
+    Bool(bool),
+    CharMap(HashMap<char, usize>),
+    StaticMap(HashMap<&'static str, usize>),
+    StringMap(HashMap<String, usize>),
+    CategoryTrigrams(HashMap<CategoryTrigram<UnicodeCategory>, usize>),
+    GroupTrigrams(HashMap<CategoryTrigram<UnicodeCategoryGroup>, usize>),
+}
+
+impl MetricValue {
+    /// Convert a map value into string-keyed form
+    ///
+    /// Trigram keys are formatted as `"(prev,current,next)"` with `START`/`END` at
+    /// the text boundaries. Scalar values produce an empty map.
+    pub fn into_string_map(self) -> HashMap<String, usize> {
+        match self {
+            MetricValue::CharMap(map) => map.into_iter().map(|(k, v)| (k.to_string(), v)).collect(),
+            MetricValue::StaticMap(map) => {
+                map.into_iter().map(|(k, v)| (k.to_string(), v)).collect()
+            }
+            MetricValue::StringMap(map) => map,
+            MetricValue::CategoryTrigrams(map) => map
+                .into_iter()
+                .map(|(k, v)| (trigram_key(k, categories::category_to_string), v))
+                .collect(),
+            MetricValue::GroupTrigrams(map) => map
+                .into_iter()
+                .map(|(k, v)| (trigram_key(k, categories::category_group_to_string), v))
+                .collect(),
+            MetricValue::Int(_) | MetricValue::Float(_) | MetricValue::Bool(_) => HashMap::new(),
+        }
+    }
+}
+
+/// Format a category trigram key as a string for Python
+pub fn trigram_key<T>(key: CategoryTrigram<T>, to_string: fn(T) -> &'static str) -> String {
+    let (prev, current, next) = key;
+    let prev_str = prev.map_or("START", to_string);
+    let next_str = next.map_or("END", to_string);
+    format!("({},{},{})", prev_str, to_string(current), next_str)
+}
+
+/// The resolved, ordered set of metrics a processor computes
+#[derive(Debug, Clone, PartialEq, Eq)]
+pub struct MetricSchema {
+    ids: Vec<MetricId>,
+    slots: [Option<usize>; MetricId::COUNT],
+}
+
+impl MetricSchema {
+    /// Resolve metric names into a schema in canonical order.
+    ///
+    /// Unknown names are ignored.
+    pub fn resolve<'a, I: IntoIterator<Item = &'a str>>(names: I) -> Self {
+        let mut enabled = [false; MetricId::COUNT];
+        for name in names {
+            if let Some(id) = MetricId::from_name(name) {
+                enabled[id as usize] = true;
+            }
+        }
+
+        let mut ids = Vec::new();
+        let mut slots = [None; MetricId::COUNT];
+        for id in MetricId::ALL {
+            if enabled[id as usize] {
+                slots[id as usize] = Some(ids.len());
+                ids.push(id);
+            }
+        }
+
+        MetricSchema { ids, slots }
+    }
+
+    /// Metrics in output order
+    pub fn ids(&self) -> &[MetricId] {
+        &self.ids
+    }
+
+    /// Number of metrics in the schema
+    pub fn len(&self) -> usize {
+        self.ids.len()
+    }
+
+    /// Whether the schema contains no metrics
+    pub fn is_empty(&self) -> bool {
+        self.ids.is_empty()
+    }
+
+    /// Whether a metric is part of the schema
+    pub fn contains(&self, id: MetricId) -> bool {
+        self.slots[id as usize].is_some()
+    }
+
+    /// Start a new row of values for one document
+    pub fn row(&self) -> MetricRow<'_> {
+        MetricRow {
+            schema: self,
+            values: vec![MetricValue::Int(0); self.ids.len()],
+        }
+    }
+}
+
+/// Values for one document, laid out in schema order
+pub struct MetricRow<'a> {
+    schema: &'a MetricSchema,
+    values: Vec<MetricValue>,
+}
+
+impl MetricRow<'_> {
+    /// Whether the schema asks for a metric; use to skip building unused values
+    pub fn wants(&self, id: MetricId) -> bool {
+        self.schema.contains(id)
+    }
+
+    /// Store a metric value; values for metrics outside the schema are dropped
+    pub fn set(&mut self, id: MetricId, value: MetricValue) {
+        if let Some(slot) = self.schema.slots[id as usize] {
+            self.values[slot] = value;
+        }
+    }
+
+    /// Finish the row, returning values in schema order
+    pub fn finish(self) -> Vec<MetricValue> {
+        self.values
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_metric_names_round_trip() {
+        for (index, id) in MetricId::ALL.iter().enumerate() {
+            assert_eq!(*id as usize, index);
+            assert_eq!(MetricId::from_name(id.name()), Some(*id));
+        }
+        assert_eq!(MetricId::from_name("not_a_metric"), None);
+    }
+
+    #[test]
+    fn test_schema_resolution() {
+        let schema = MetricSchema::resolve(["unigram_entropy", "bogus", "char_count"]);
+        assert_eq!(
+            schema.ids(),
+            &[MetricId::CharCount, MetricId::UnigramEntropy]
+        );
+        assert!(schema.contains(MetricId::CharCount));
+        assert!(!schema.contains(MetricId::WordCount));
+
+        let mut row = schema.row();
+        assert!(row.wants(MetricId::UnigramEntropy));
+        row.set(MetricId::UnigramEntropy, MetricValue::Float(1.5));
+        row.set(MetricId::WordCount, MetricValue::Int(7));
+        row.set(MetricId::CharCount, MetricValue::Int(3));
+        assert_eq!(
+            row.finish(),
+            vec![MetricValue::Int(3), MetricValue::Float(1.5)]
+        );
+    }
+
+    #[test]
+    fn test_trigram_keys() {
+        let key = (None, UnicodeCategory::Lu, Some(UnicodeCategory::Ll));
+        assert_eq!(
+            trigram_key(key, categories::category_to_string),
+            "(START,Lu,Ll)"
+        );
+
+        let map = MetricValue::GroupTrigrams(HashMap::from([(
+            (Some(UnicodeCategoryGroup::L), UnicodeCategoryGroup::P, None),
+            2,
+        )]));
+        assert_eq!(
+            map.into_string_map(),
+            HashMap::from([("(L,P,END)".to_string(), 2)])
+        );
+    }
+}
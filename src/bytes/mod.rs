@@ -0,0 +1,249 @@
+//! # Byte-Level Analysis
+//!
+//! This module measures raw, possibly invalid, UTF-8 input before it is decoded,
+//! so that binary files, truncated downloads and mis-decoded (mojibake) documents
+//! can be rejected before any Unicode processing runs on them.
+//!
+//! ## Key Features
+//!
+//! * Byte entropy from a 256-entry histogram
+//! * Invalid UTF-8 sequence count, matching the replacements of lossy decoding
+//! * NUL and control byte ratios
+//! * U+FFFD replacement characters already present in the input
+//! * Overlong encodings and double-encoded UTF-8 (e.g. "Ã©" for "é")
+//!
+//! The metrics come from a histogram pass, in which all-ASCII 64-byte blocks are
+//! counted without any pattern checks, and the standard library's UTF-8
+//! validation, which skips ASCII a word at a time.
+
+use pyo3::prelude::*;
+use pyo3::types::PyDict;
+
+/// Size of the blocks checked for the ASCII fast path
+const ASCII_BLOCK: usize = 64;
+
+/// Byte-level metrics of a buffer
+#[derive(Debug, Clone, PartialEq)]
+pub struct ByteMetrics {
+    pub byte_count: usize,
+    /// Characters after lossy decoding, each invalid sequence counting as one
+    pub char_count: usize,
+    pub is_valid_utf8: bool,
+    /// Invalid sequences, each replaced by one U+FFFD in lossy decoding
+    pub invalid_utf8_sequences: usize,
+    pub nul_bytes: usize,
+    /// C0 control bytes other than tab, line feed, form feed and carriage return,
+    /// plus DEL; NUL bytes included
+    pub control_bytes: usize,
+    /// Encoded U+FFFD characters present in the input itself
+    pub replacement_chars: usize,
+    /// Overlong encodings: C0/C1 lead bytes and E0/F0 followed by too small a byte
+    pub overlong_sequences: usize,
+    /// Character pairs typical of UTF-8 decoded as Latin-1 or Windows-1252 and
+    /// encoded again ("Ã©", "Â " and "â€")
+    pub mojibake_sequences: usize,
+    /// Shannon entropy in bits of the byte distribution (0 to 8)
+    pub byte_entropy: f64,
+    pub nul_ratio: f64,
+    pub control_ratio: f64,
+    /// Replacement characters per character
+    pub replacement_char_ratio: f64,
+    /// Mojibake sequences per character
+    pub mojibake_score: f64,
+}
+
+/// Whether a byte continues a multi-byte UTF-8 sequence
+#[inline]
+fn is_continuation(byte: u8) -> bool {
+    byte & 0xC0 == 0x80
+}
+
+/// Whether a byte is a control byte counted by `ByteMetrics::control_bytes`
+#[inline]
+fn is_control(byte: u8) -> bool {
+    (byte < 0x20 && !matches!(byte, b'\t' | b'\n' | b'\x0C' | b'\r')) || byte == 0x7F
+}
+
+/// Calculate the byte-level metrics of a buffer
+pub fn byte_metrics(bytes: &[u8]) -> ByteMetrics {
+    let mut histogram = [0usize; 256];
+    let mut replacement_chars = 0;
+    let mut overlong_sequences = 0;
+    let mut mojibake_sequences = 0;
+
+    for (block_index, block) in bytes.chunks(ASCII_BLOCK).enumerate() {
+        if block.is_ascii() {
+            for &byte in block {
+                histogram[byte as usize] += 1;
+            }
+            continue;
+        }
+
+        // Multi-byte patterns end on a non-ASCII byte and may start in the
+        // previous block
+        let start = block_index * ASCII_BLOCK;
+        for (i, &byte) in (start..).zip(block) {
+            histogram[byte as usize] += 1;
+            if byte < 0x80 {
+                continue;
+            }
+            let prev = if i >= 1 { bytes[i - 1] } else { 0 };
+            let prev2 = if i >= 2 { bytes[i - 2] } else { 0 };
+
+            match (prev2, prev, byte) {
+                (0xEF, 0xBF, 0xBD) => replacement_chars += 1,
+                (0xC3, 0x82 | 0x83, 0xC2) | (0xC3, 0xA2, 0xE2) => mojibake_sequences += 1,
+                _ => {}
+            }
+            if matches!(byte, 0xC0 | 0xC1)
+                || matches!((prev, byte), (0xE0, 0x80..=0x9F) | (0xF0, 0x80..=0x8F))
+            {
+                overlong_sequences += 1;
+            }
+        }
+    }
+
+    // Characters are counted by their first byte; each invalid sequence then
+    // stands for one replacement character instead of its bytes
+    let mut char_count: usize = histogram
+        .iter()
+        .enumerate()
+        .filter(|&(byte, _)| !is_continuation(byte as u8))
+        .map(|(_, &count)| count)
+        .sum();
+    let mut invalid_utf8_sequences = 0;
+    let mut rest = bytes;
+    while let Err(e) = std::str::from_utf8(rest) {
+        let start = e.valid_up_to();
+        let len = e.error_len().unwrap_or(rest.len() - start);
+        let invalid = &rest[start..start + len];
+        invalid_utf8_sequences += 1;
+        char_count = char_count + 1 - invalid.iter().filter(|&&b| !is_continuation(b)).count();
+        rest = &rest[start + len..];
+    }
+
+    let byte_count = bytes.len();
+    let nul_bytes = histogram[0];
+    let control_bytes = (0..=255u8)
+        .filter(|&byte| is_control(byte))
+        .map(|byte| histogram[byte as usize])
+        .sum();
+
+    let mut byte_entropy = 0.0;
+    for &count in histogram.iter().filter(|&&count| count > 0) {
+        let probability = count as f64 / byte_count as f64;
+        byte_entropy -= probability * probability.log2();
+    }
+
+    let per = |count: usize, total: usize| {
+        if total > 0 {
+            count as f64 / total as f64
+        } else {
+            0.0
+        }
+    };
+
+    ByteMetrics {
+        byte_count,
+        char_count,
+        is_valid_utf8: invalid_utf8_sequences == 0,
+        invalid_utf8_sequences,
+        nul_bytes,
+        control_bytes,
+        replacement_chars,
+        overlong_sequences,
+        mojibake_sequences,
+        byte_entropy,
+        nul_ratio: per(nul_bytes, byte_count),
+        control_ratio: per(control_bytes, byte_count),
+        replacement_char_ratio: per(replacement_chars, char_count),
+        mojibake_score: per(mojibake_sequences, char_count),
+    }
+}
+
+/// Convert byte metrics to a Python dictionary
+pub fn byte_metrics_to_dict<'py>(
+    py: Python<'py>,
+    metrics: &ByteMetrics,
+) -> PyResult<Bound<'py, PyDict>> {
+    let dict = PyDict::new(py);
+    dict.set_item("byte_count", metrics.byte_count)?;
+    dict.set_item("char_count", metrics.char_count)?;
+    dict.set_item("is_valid_utf8", metrics.is_valid_utf8)?;
+    dict.set_item("invalid_utf8_sequences", metrics.invalid_utf8_sequences)?;
+    dict.set_item("nul_bytes", metrics.nul_bytes)?;
+    dict.set_item("control_bytes", metrics.control_bytes)?;
+    dict.set_item("replacement_chars", metrics.replacement_chars)?;
+    dict.set_item("overlong_sequences", metrics.overlong_sequences)?;
+    dict.set_item("mojibake_sequences", metrics.mojibake_sequences)?;
+    dict.set_item("byte_entropy", metrics.byte_entropy)?;
+    dict.set_item("nul_ratio", metrics.nul_ratio)?;
+    dict.set_item("control_ratio", metrics.control_ratio)?;
+    dict.set_item("replacement_char_ratio", metrics.replacement_char_ratio)?;
+    dict.set_item("mojibake_score", metrics.mojibake_score)?;
+    Ok(dict)
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_valid_text() {
+        let text = "Hello, naïve café — 日本語 🎉\n".repeat(5);
+        let metrics = byte_metrics(text.as_bytes());
+        assert_eq!(metrics.byte_count, text.len());
+        assert_eq!(metrics.char_count, text.chars().count());
+        assert!(metrics.is_valid_utf8);
+        assert_eq!(metrics.control_bytes, 0);
+        assert_eq!(metrics.mojibake_sequences, 0);
+        assert!(metrics.byte_entropy > 0.0 && metrics.byte_entropy <= 8.0);
+
+        let empty = byte_metrics(b"");
+        assert_eq!(empty.byte_count, 0);
+        assert_eq!(empty.byte_entropy, 0.0);
+        assert!(empty.is_valid_utf8);
+    }
+
+    #[test]
+    fn test_invalid_and_suspicious_bytes() {
+        let cases: [&[u8]; 5] = [
+            b"ab\xffcd\xe6\x97",
+            b"\xc0\x80 overlong \xe0\x80\xaf",
+            b"\x80\x80 lone continuations",
+            b"caf\xc3\xa9 \xef\xbf\xbd ok\x00\x01\t\n",
+            b"\xe6\x97\xa5",
+        ];
+        for bytes in cases {
+            let metrics = byte_metrics(bytes);
+            let lossy = String::from_utf8_lossy(bytes);
+            let replaced = lossy.matches('\u{FFFD}').count();
+            assert_eq!(metrics.char_count, lossy.chars().count(), "{:?}", bytes);
+            assert_eq!(
+                metrics.invalid_utf8_sequences + metrics.replacement_chars,
+                replaced
+            );
+            assert_eq!(metrics.is_valid_utf8, std::str::from_utf8(bytes).is_ok());
+        }
+
+        let metrics = byte_metrics(b"\xc0\x80 overlong \xe0\x80\xaf");
+        assert_eq!(metrics.overlong_sequences, 2);
+
+        let metrics = byte_metrics(b"caf\xc3\xa9 \xef\xbf\xbd ok\x00\x01\t\n");
+        assert_eq!(metrics.replacement_chars, 1);
+        assert_eq!(metrics.nul_bytes, 1);
+        assert_eq!(metrics.control_bytes, 2);
+
+        // "café" encoded twice, with the pattern across a block boundary
+        let double = "café"
+            .as_bytes()
+            .iter()
+            .map(|&b| b as char)
+            .collect::<String>();
+        let text = format!("{}{}", "x".repeat(ASCII_BLOCK - 2), double);
+        let metrics = byte_metrics(text.as_bytes());
+        assert!(metrics.is_valid_utf8);
+        assert_eq!(metrics.mojibake_sequences, 1);
+        assert!(metrics.mojibake_score > 0.0);
+    }
+}
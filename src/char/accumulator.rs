@@ -0,0 +1,288 @@
+//! # Incremental Character Metrics
+//!
+//! This module computes character metrics over a text supplied in pieces, so a
+//! document of any size can be measured without holding it in memory at once.
+//! Chunks may be `str` or raw UTF-8 bytes split at arbitrary byte offsets; the
+//! result is identical to `get_all_char_metrics` on the whole text.
+//!
+//! ## Key Features
+//!
+//! * Constant memory in the length of the input (tables grow only with the
+//!   number of distinct characters)
+//! * UTF-8 sequences split across chunk boundaries are reassembled
+//! * Character type transitions and runs carried across chunks
+//! * Frequencies, entropies and category n-grams kept as running counts
+
+use pyo3::buffer::PyBuffer;
+use pyo3::prelude::*;
+use pyo3::types::{PyBytes, PyString};
+use std::str::Utf8Error;
+
+use crate::char::unicode::CharTally;
+
+/// Number of bytes in the UTF-8 sequence started by `lead`
+fn utf8_width(lead: u8) -> usize {
+    match lead {
+        0xC0..=0xDF => 2,
+        0xE0..=0xEF => 3,
+        0xF0..=0xF7 => 4,
+        _ => 1,
+    }
+}
+
+/// Character metrics computed from a text fed in chunks
+///
+/// Call `update` with each chunk in order, then `finalize` for the metrics of
+/// everything seen so far. `finalize` does not reset the accumulator.
+#[pyclass]
+pub struct CharMetricsAccumulator {
+    tally: CharTally,
+    /// Leading bytes of a UTF-8 sequence cut off at the end of the last chunk
+    pending: Vec<u8>,
+    /// Replace invalid UTF-8 with U+FFFD instead of raising
+    #[pyo3(get)]
+    lossy: bool,
+}
+
+impl CharMetricsAccumulator {
+    /// Create an empty accumulator
+    pub fn with_lossy(lossy: bool) -> Self {
+        CharMetricsAccumulator {
+            tally: CharTally::new(true, true),
+            pending: Vec::with_capacity(4),
+            lossy,
+        }
+    }
+
+    /// Add a chunk of text
+    ///
+    /// Fails only if bytes added before it ended inside a UTF-8 sequence.
+    pub fn update_str(&mut self, text: &str) -> Result<(), Utf8Error> {
+        if self.pending.is_empty() {
+            self.tally.push_str(text);
+            Ok(())
+        } else {
+            self.update_bytes(text.as_bytes())
+        }
+    }
+
+    /// Add a chunk of UTF-8 bytes, which may start or end inside a character
+    ///
+    /// In strict mode the chunk is validated first, so a chunk that fails leaves
+    /// the accumulator unchanged.
+    pub fn update_bytes(&mut self, mut bytes: &[u8]) -> Result<(), Utf8Error> {
+        if !self.lossy {
+            self.validate(bytes)?;
+        }
+
+        // Complete the sequence left over from the previous chunk first
+        while !self.pending.is_empty() && !bytes.is_empty() {
+            let needed = utf8_width(self.pending[0]) - self.pending.len();
+            let (head, rest) = bytes.split_at(needed.min(bytes.len()));
+            let mut sequence = std::mem::take(&mut self.pending);
+            sequence.extend_from_slice(head);
+            bytes = rest;
+            self.decode(&sequence)?;
+        }
+        self.decode(bytes)
+    }
+
+    /// Check that a chunk continues the text with valid UTF-8, allowing it to end
+    /// inside a character
+    fn validate(&self, bytes: &[u8]) -> Result<(), Utf8Error> {
+        fn check(bytes: &[u8]) -> Result<(), Utf8Error> {
+            match std::str::from_utf8(bytes) {
+                Err(e) if e.error_len().is_some() => Err(e),
+                _ => Ok(()),
+            }
+        }
+
+        let (head, rest) = if self.pending.is_empty() {
+            (&bytes[..0], bytes)
+        } else {
+            let needed = utf8_width(self.pending[0]) - self.pending.len();
+            bytes.split_at(needed.min(bytes.len()))
+        };
+        let mut sequence = self.pending.clone();
+        sequence.extend_from_slice(head);
+        check(&sequence)?;
+        check(rest)
+    }
+
+    /// Decode complete UTF-8, keeping a trailing incomplete sequence as pending
+    fn decode(&mut self, mut bytes: &[u8]) -> Result<(), Utf8Error> {
+        loop {
+            match std::str::from_utf8(bytes) {
+                Ok(text) => {
+                    self.tally.push_str(text);
+                    return Ok(());
+                }
+                Err(e) => {
+                    let (valid, rest) = bytes.split_at(e.valid_up_to());
+                    self.tally.push_str(std::str::from_utf8(valid)?);
+                    match e.error_len() {
+                        None => {
+                            self.pending.extend_from_slice(rest);
+                            return Ok(());
+                        }
+                        Some(_) if !self.lossy => return Err(e),
+                        Some(len) => {
+                            self.tally.push('\u{FFFD}');
+                            bytes = &rest[len..];
+                        }
+                    }
+                }
+            }
+        }
+    }
+
+    /// Tally of everything added so far, with an unfinished trailing sequence
+    /// counted as one replacement character in lossy mode
+    pub fn snapshot(&self) -> Result<CharTally, Utf8Error> {
+        let mut tally = self.tally.clone();
+        if !self.pending.is_empty() {
+            match std::str::from_utf8(&self.pending) {
+                Err(_) if self.lossy => tally.push('\u{FFFD}'),
+                Err(e) => return Err(e),
+                Ok(text) => tally.push_str(text),
+            }
+        }
+        Ok(tally)
+    }
+}
+
+#[pymethods]
+impl CharMetricsAccumulator {
+    #[new]
+    #[pyo3(signature = (lossy=false))]
+    fn new(lossy: bool) -> Self {
+        Self::with_lossy(lossy)
+    }
+
+    /// Add the next chunk of the text, as `str` or UTF-8 bytes.
+    ///
+    /// Byte chunks may split a character; its remaining bytes are expected at the
+    /// start of the next chunk. Raises `UnicodeDecodeError` for invalid UTF-8
+    /// unless the accumulator is lossy.
+    fn update(&mut self, py: Python<'_>, chunk: &Bound<'_, PyAny>) -> PyResult<()> {
+        if let Ok(text) = chunk.downcast::<PyString>() {
+            let text = text.to_str()?;
+            py.allow_threads(|| self.update_str(text))?;
+        } else if let Ok(bytes) = chunk.downcast::<PyBytes>() {
+            let bytes = bytes.as_bytes();
+            py.allow_threads(|| self.update_bytes(bytes))?;
+        } else if let Ok(buffer) = PyBuffer::<u8>::get(chunk) {
+            let bytes = buffer.to_vec(py)?;
+            py.allow_threads(|| self.update_bytes(&bytes))?;
+        } else {
+            return Err(PyErr::new::<pyo3::exceptions::PyTypeError, _>(format!(
+                "expected str, bytes or a buffer of UTF-8 bytes, got {}",
+                chunk.get_type().name()?
+            )));
+        }
+        Ok(())
+    }
+
+    /// Metrics of all chunks added so far, as returned by `get_all_char_metrics`
+    /// for their concatenation.
+    ///
+    /// Raises `UnicodeDecodeError` if the text ends inside a UTF-8 sequence and the
+    /// accumulator is not lossy.
+    fn finalize(&self, py: Python<'_>) -> PyResult<PyObject> {
+        let profile = self.snapshot()?.into_profile();
+        Ok(crate::char_profile_to_dict(py, &profile)?.into())
+    }
+
+    /// Number of characters added so far
+    #[getter]
+    fn char_count(&self) -> usize {
+        self.tally.total_chars()
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::char::unicode::calculate_char_profile;
+
+    #[test]
+    fn test_split_utf8_sequences() {
+        let text = "naïve café — 日本語 🎉!";
+        let whole = calculate_char_profile(text);
+
+        // Every split point, including ones inside multi-byte characters
+        for split in 0..=text.len() {
+            let (head, tail) = text.as_bytes().split_at(split);
+            let mut accumulator = CharMetricsAccumulator::with_lossy(false);
+            accumulator.update_bytes(head).unwrap();
+            accumulator.update_bytes(tail).unwrap();
+
+            let profile = accumulator.snapshot().unwrap().into_profile();
+            assert_eq!(profile.metrics.total_chars, whole.metrics.total_chars);
+            assert_eq!(profile.frequency, whole.frequency);
+            assert_eq!(
+                profile.metrics.consecutive_runs,
+                whole.metrics.consecutive_runs
+            );
+        }
+
+        // One byte at a time
+        let mut accumulator = CharMetricsAccumulator::with_lossy(false);
+        for byte in text.as_bytes() {
+            accumulator
+                .update_bytes(std::slice::from_ref(byte))
+                .unwrap();
+        }
+        let profile = accumulator.snapshot().unwrap().into_profile();
+        assert_eq!(profile.frequency, whole.frequency);
+        assert_eq!(
+            profile.category_ngrams.trigrams(),
+            whole.category_ngrams.trigrams()
+        );
+    }
+
+    #[test]
+    fn test_invalid_utf8() {
+        let bytes = b"ab\xffc\xe6\x97";
+        let expected = String::from_utf8_lossy(bytes);
+
+        let mut strict = CharMetricsAccumulator::with_lossy(false);
+        assert!(strict.update_bytes(&bytes[..3]).is_err());
+
+        let mut lossy = CharMetricsAccumulator::with_lossy(true);
+        lossy.update_bytes(&bytes[..5]).unwrap();
+        lossy.update_bytes(&bytes[5..]).unwrap();
+        let profile = lossy.snapshot().unwrap().into_profile();
+        assert_eq!(
+            profile.frequency,
+            calculate_char_profile(&expected).frequency
+        );
+
+        let mut truncated = CharMetricsAccumulator::with_lossy(false);
+        truncated.update_bytes(&bytes[4..]).unwrap();
+        assert!(truncated.snapshot().is_err());
+    }
+
+    #[test]
+    fn test_failed_strict_update_keeps_state() {
+        let text = "héllo 日本";
+        let mut accumulator = CharMetricsAccumulator::with_lossy(false);
+        // Ends inside "本", whose last byte is still pending
+        let (head, tail) = text.as_bytes().split_at(text.len() - 1);
+        accumulator.update_bytes(head).unwrap();
+        let chars = accumulator.char_count();
+
+        // Invalid after valid characters, and invalid inside the pending sequence
+        assert!(accumulator.update_bytes(b"\x80 ok \xff").is_err());
+        assert!(accumulator.update_bytes(b"x").is_err());
+        assert_eq!(accumulator.char_count(), chars);
+        assert_eq!(accumulator.pending, &head[head.len() - 2..]);
+
+        accumulator.update_bytes(tail).unwrap();
+        accumulator.update_str("!").unwrap();
+        let profile = accumulator.snapshot().unwrap().into_profile();
+        let whole = calculate_char_profile("héllo 日本!");
+        assert_eq!(profile.frequency, whole.frequency);
+        assert_eq!(profile.metrics.total_chars, whole.metrics.total_chars);
+    }
+}
@@ -9,19 +9,20 @@
 //! * Full Unicode character categorization (Ll, Lu, Nd, etc.)
 //! * Unicode category grouping (L, N, P, S, Z, etc.)
 //! * Efficient category counting and frequency analysis
-//! * Parallelized processing for large texts
-//! * Optimized caching for common ASCII characters
+//! * Parallel scanning of large texts in byte ranges split at character boundaries
+//! * Two-stage lookup table covering every code point, with no per-thread caches
 //!
 //! The module implements the full Unicode General Category system with extensions
 //! for efficient text analysis, providing insights into script composition and
 //! character distribution patterns.
 
 use icu_properties::{maps, GeneralCategory};
-use lru::LruCache;
+use lazy_static::lazy_static;
 use rayon::prelude::*;
-use std::cell::RefCell;
 use std::collections::HashMap;
-use std::num::NonZeroUsize;
+use std::hash::Hash;
+
+use crate::char::table::BlockTable;
 
 /// Unicode character category enum
 #[derive(Hash, Eq, PartialEq, Clone, Copy, Debug)]
@@ -70,62 +71,45 @@ pub enum UnicodeCategoryGroup {
     C, // Other
 }
 
-// Initialize the thread-local LRU caches with capacity of 4096 entries
-// This size provides an optimal balance between memory usage and cache hit rate
-thread_local! {
-    // Cache for char to UnicodeCategory lookups
-    // Using a cache of 4096 entries to balance memory usage with hit rate
-    static CATEGORY_CACHE: RefCell<LruCache<char, UnicodeCategory>> =
-        RefCell::new(LruCache::new(NonZeroUsize::new(4096).unwrap()));
-
-    // Cache for char to UnicodeCategoryGroup lookups
-    // Using a cache of 4096 entries to balance memory usage with hit rate
-    static CATEGORY_GROUP_CACHE: RefCell<LruCache<char, UnicodeCategoryGroup>> =
-        RefCell::new(LruCache::new(NonZeroUsize::new(4096).unwrap()));
+lazy_static! {
+    // Built on first use; about 10ms of ICU lookups, shared by all threads
+    static ref CATEGORY_TABLE: BlockTable<UnicodeCategory> = {
+        let icu = maps::general_category();
+        BlockTable::build(|code_point| {
+            char::from_u32(code_point)
+                .and_then(ascii_category)
+                .unwrap_or_else(|| from_general_category(icu.get32(code_point)))
+        })
+    };
 }
 
-/// Convert a character to its Unicode category with efficient caching for common characters
-pub fn char_to_category(ch: char) -> UnicodeCategory {
-    // Fast path for ASCII range (most common in typical text)
-    // This avoids the expensive ICU lookup for common characters
-    if ch as u32 <= 127 {
-        match ch {
-            'a'..='z' => return UnicodeCategory::Ll,
-            'A'..='Z' => return UnicodeCategory::Lu,
-            '0'..='9' => return UnicodeCategory::Nd,
-            ' ' | '\t' | '\n' | '\r' | '\x0C' => return UnicodeCategory::Zs,
-            '.' | ',' | ';' | ':' | '!' | '?' => return UnicodeCategory::Po,
-            '(' | '[' | '{' => return UnicodeCategory::Ps,
-            ')' | ']' | '}' => return UnicodeCategory::Pe,
-            '+' | '-' | '*' | '/' | '%' | '=' | '<' | '>' => return UnicodeCategory::Sm,
-            '$' => return UnicodeCategory::Sc,
-            '_' => return UnicodeCategory::Pc,
-            '#' | '@' | '&' | '^' => return UnicodeCategory::Po,
-            '\"' | '\'' => return UnicodeCategory::Po,
-            // Fall through to cache/ICU lookup for other ASCII
-            _ => {}
-        }
-    }
-
-    // For non-ASCII characters, first check the thread-local cache
-    // This avoids the expensive ICU lookup for repeated characters
-    let mut category = None;
-
-    // Try to get from cache first
-    CATEGORY_CACHE.with(|cache| {
-        let mut cache_ref = cache.borrow_mut();
-        if let Some(&cached_category) = cache_ref.get(&ch) {
-            category = Some(cached_category);
-        }
-    });
-
-    // Return early if found in cache
-    if let Some(cat) = category {
-        return cat;
+/// Categories of ASCII characters that Cheesecloth classifies differently from ICU
+///
+/// Whitespace control characters count as space separators, and common operator
+/// and punctuation characters are grouped for text analysis rather than by their
+/// strict Unicode category. Returns `None` for characters using the ICU category.
+fn ascii_category(ch: char) -> Option<UnicodeCategory> {
+    match ch {
+        'a'..='z' => Some(UnicodeCategory::Ll),
+        'A'..='Z' => Some(UnicodeCategory::Lu),
+        '0'..='9' => Some(UnicodeCategory::Nd),
+        ' ' | '\t' | '\n' | '\r' | '\x0C' => Some(UnicodeCategory::Zs),
+        '.' | ',' | ';' | ':' | '!' | '?' => Some(UnicodeCategory::Po),
+        '(' | '[' | '{' => Some(UnicodeCategory::Ps),
+        ')' | ']' | '}' => Some(UnicodeCategory::Pe),
+        '+' | '-' | '*' | '/' | '%' | '=' | '<' | '>' => Some(UnicodeCategory::Sm),
+        '$' => Some(UnicodeCategory::Sc),
+        '_' => Some(UnicodeCategory::Pc),
+        '#' | '@' | '&' | '^' => Some(UnicodeCategory::Po),
+        '\"' | '\'' => Some(UnicodeCategory::Po),
+        // Other ASCII uses the ICU category
+        _ => None,
     }
+}
 
-    // For cache miss, use the ICU lookup
-    let result = match maps::general_category().get(ch) {
+/// Map an ICU general category onto `UnicodeCategory`
+fn from_general_category(category: GeneralCategory) -> UnicodeCategory {
+    match category {
         GeneralCategory::LowercaseLetter => UnicodeCategory::Ll,
         GeneralCategory::UppercaseLetter => UnicodeCategory::Lu,
         GeneralCategory::TitlecaseLetter => UnicodeCategory::Lt,
@@ -156,15 +140,12 @@ pub fn char_to_category(ch: char) -> UnicodeCategory {
         GeneralCategory::Surrogate => UnicodeCategory::Cs,
         GeneralCategory::PrivateUse => UnicodeCategory::Co,
         GeneralCategory::Unassigned => UnicodeCategory::Cn,
-    };
-
-    // Add to cache
-    CATEGORY_CACHE.with(|cache| {
-        let mut cache_ref = cache.borrow_mut();
-        cache_ref.put(ch, result);
-    });
+    }
+}
 
-    result
+/// Convert a character to its Unicode category with a two-stage table lookup
+pub fn char_to_category(ch: char) -> UnicodeCategory {
+    CATEGORY_TABLE.get(ch)
 }
 
 /// Convert a Unicode category to its group - optimized with a direct lookup table
@@ -214,49 +195,9 @@ pub fn category_to_group(category: UnicodeCategory) -> UnicodeCategoryGroup {
     GROUPS[category as usize]
 }
 
-/// Convert a character directly to its Unicode category group with optimized inline caching
+/// Convert a character directly to its Unicode category group
 pub fn char_to_category_group(ch: char) -> UnicodeCategoryGroup {
-    // Fast path for ASCII with inline category mapping to avoid double lookups
-    if ch as u32 <= 127 {
-        match ch {
-            'a'..='z' | 'A'..='Z' => return UnicodeCategoryGroup::L, // Letters
-            '0'..='9' => return UnicodeCategoryGroup::N,             // Numbers
-            ' ' | '\t' | '\n' | '\r' | '\x0C' => return UnicodeCategoryGroup::Z, // Whitespace
-            '.' | ',' | ';' | ':' | '!' | '?' | '(' | '[' | '{' | ')' | ']' | '}' | '#' | '@'
-            | '&' | '^' | '\"' | '\'' => return UnicodeCategoryGroup::P, // Punctuation
-            '+' | '-' | '*' | '/' | '%' | '=' | '<' | '>' | '$' => return UnicodeCategoryGroup::S, // Symbols
-            '_' => return UnicodeCategoryGroup::P, // Underscore is punctuation
-            _ => {}                                // Fall through for other ASCII
-        }
-    }
-
-    // For non-ASCII characters, first check the thread-local cache
-    // This avoids the expensive category lookup and group mapping for repeated characters
-    let mut group = None;
-
-    // Try to get from cache first
-    CATEGORY_GROUP_CACHE.with(|cache| {
-        let mut cache_ref = cache.borrow_mut();
-        if let Some(&cached_group) = cache_ref.get(&ch) {
-            group = Some(cached_group);
-        }
-    });
-
-    // Return early if found in cache
-    if let Some(g) = group {
-        return g;
-    }
-
-    // For cache miss, get category first then map to group
-    let result = category_to_group(char_to_category(ch));
-
-    // Add to cache
-    CATEGORY_GROUP_CACHE.with(|cache| {
-        let mut cache_ref = cache.borrow_mut();
-        cache_ref.put(ch, result);
-    });
-
-    result
+    category_to_group(char_to_category(ch))
 }
 
 /// Get the string representation of a Unicode category
@@ -308,133 +249,101 @@ pub fn category_group_to_string(group: UnicodeCategoryGroup) -> &'static str {
     }
 }
 
-/// Convert a string to a vector of Unicode categories
-pub fn to_category_vector(text: &str) -> Vec<UnicodeCategory> {
-    text.chars()
-        .collect::<Vec<char>>()
-        .par_iter()
-        .map(|&c| char_to_category(c))
-        .collect()
+/// Texts longer than this many bytes are scanned in parallel
+const PARALLEL_THRESHOLD: usize = 10_000;
+
+/// Smallest piece of text handed to one worker by `text_chunks`
+const MIN_CHUNK_LEN: usize = 4096;
+
+/// Split a text into pieces at character boundaries for parallel scanning
+///
+/// Returns each piece with its byte offset in `text`. Pieces are at least
+/// `min_len` bytes (except the last), and there are a few per rayon thread so
+/// uneven pieces still balance. The text is never copied or decoded up front.
+pub(crate) fn text_chunks(text: &str, min_len: usize) -> Vec<(usize, &str)> {
+    let pieces = (rayon::current_num_threads() * 4).min(text.len() / min_len.max(1));
+    let target = text.len() / pieces.max(1);
+    let mut chunks = Vec::with_capacity(pieces.max(1));
+    let mut start = 0;
+    while start < text.len() {
+        let mut end = (start + target.max(1)).min(text.len());
+        while !text.is_char_boundary(end) {
+            end += 1;
+        }
+        chunks.push((start, &text[start..end]));
+        start = end;
+    }
+    chunks
 }
 
-/// Convert a string to a vector of Unicode category groups
-pub fn to_category_group_vector(text: &str) -> Vec<UnicodeCategoryGroup> {
-    text.chars()
-        .collect::<Vec<char>>()
-        .par_iter()
-        .map(|&c| char_to_category_group(c))
+/// Map every character of a text, in order, scanning large texts in parallel
+fn map_chars<T: Send>(text: &str, classify: fn(char) -> T) -> Vec<T> {
+    if text.len() <= PARALLEL_THRESHOLD {
+        return text.chars().map(classify).collect();
+    }
+    text_chunks(text, MIN_CHUNK_LEN)
+        .into_par_iter()
+        .flat_map_iter(|(_, chunk)| chunk.chars().map(classify))
         .collect()
 }
 
-/// Count the occurrences of each Unicode category in a string - efficient implementation
-pub fn count_categories(text: &str) -> HashMap<UnicodeCategory, usize> {
-    let mut counts = HashMap::new();
-
-    // Process text in parallel for larger texts, sequential for smaller ones
-    if text.len() > 10000 {
-        // For larger texts, use parallel processing
-        let char_vec: Vec<char> = text.chars().collect();
-        let category_counts = char_vec
-            .par_iter()
-            .map(|&c| char_to_category(c))
-            .fold(
-                HashMap::new,
-                |mut acc, category| {
-                    *acc.entry(category).or_insert(0) += 1;
-                    acc
-                },
-            )
-            .reduce(
-                HashMap::new,
-                |mut acc, partial| {
-                    for (k, v) in partial {
-                        *acc.entry(k).or_insert(0) += v;
-                    }
-                    acc
-                },
-            );
-
-        counts = category_counts;
-    } else {
-        // For smaller texts, use direct sequential processing
-        for c in text.chars() {
-            *counts.entry(char_to_category(c)).or_insert(0) += 1;
+/// Count the characters of a text by category index, scanning large texts in
+/// parallel
+fn count_indexed<T: CategoryIndex>(text: &str, classify: fn(char) -> T) -> Vec<usize> {
+    let count_chunk = |chunk: &str| {
+        let mut counts = vec![0; T::COUNT];
+        for c in chunk.chars() {
+            counts[classify(c).index()] += 1;
         }
+        counts
+    };
+
+    if text.len() <= PARALLEL_THRESHOLD {
+        return count_chunk(text);
     }
+    text_chunks(text, MIN_CHUNK_LEN)
+        .into_par_iter()
+        .map(|(_, chunk)| count_chunk(chunk))
+        .reduce(
+            || vec![0; T::COUNT],
+            |mut acc, partial| {
+                acc.iter_mut().zip(partial).for_each(|(a, p)| *a += p);
+                acc
+            },
+        )
+}
 
+/// Nonzero entries of counts indexed by category
+fn indexed_counts_to_map<T: CategoryIndex>(counts: Vec<usize>) -> HashMap<T, usize> {
     counts
+        .into_iter()
+        .enumerate()
+        .filter(|&(_, count)| count > 0)
+        .map(|(index, count)| (T::from_index(index), count))
+        .collect()
 }
 
-/// Count the occurrences of each Unicode category group in a string - efficient implementation
-pub fn count_category_groups(text: &str) -> HashMap<UnicodeCategoryGroup, usize> {
-    let mut counts = HashMap::new();
+/// Convert a string to a vector of Unicode categories
+pub fn to_category_vector(text: &str) -> Vec<UnicodeCategory> {
+    map_chars(text, char_to_category)
+}
 
-    // Pre-initialize with all possible groups for more efficient insertions
-    counts.insert(UnicodeCategoryGroup::L, 0);
-    counts.insert(UnicodeCategoryGroup::M, 0);
-    counts.insert(UnicodeCategoryGroup::N, 0);
-    counts.insert(UnicodeCategoryGroup::P, 0);
-    counts.insert(UnicodeCategoryGroup::S, 0);
-    counts.insert(UnicodeCategoryGroup::Z, 0);
-    counts.insert(UnicodeCategoryGroup::C, 0);
-
-    // Process text in parallel for larger texts, sequential for smaller ones
-    if text.len() > 10000 {
-        // For larger texts, use parallel processing with Rayon
-        let char_vec: Vec<char> = text.chars().collect();
-        let group_counts = char_vec
-            .par_iter()
-            .fold(
-                || {
-                    let mut map = HashMap::new();
-                    map.insert(UnicodeCategoryGroup::L, 0);
-                    map.insert(UnicodeCategoryGroup::M, 0);
-                    map.insert(UnicodeCategoryGroup::N, 0);
-                    map.insert(UnicodeCategoryGroup::P, 0);
-                    map.insert(UnicodeCategoryGroup::S, 0);
-                    map.insert(UnicodeCategoryGroup::Z, 0);
-                    map.insert(UnicodeCategoryGroup::C, 0);
-                    map
-                },
-                |mut acc, &c| {
-                    let group = char_to_category_group(c);
-                    *acc.get_mut(&group).unwrap() += 1;
-                    acc
-                },
-            )
-            .reduce(
-                || {
-                    let mut map = HashMap::new();
-                    map.insert(UnicodeCategoryGroup::L, 0);
-                    map.insert(UnicodeCategoryGroup::M, 0);
-                    map.insert(UnicodeCategoryGroup::N, 0);
-                    map.insert(UnicodeCategoryGroup::P, 0);
-                    map.insert(UnicodeCategoryGroup::S, 0);
-                    map.insert(UnicodeCategoryGroup::Z, 0);
-                    map.insert(UnicodeCategoryGroup::C, 0);
-                    map
-                },
-                |mut acc, partial| {
-                    for (k, v) in partial {
-                        *acc.get_mut(&k).unwrap() += v;
-                    }
-                    acc
-                },
-            );
-
-        counts = group_counts;
-    } else {
-        // For smaller texts, use direct sequential processing with pre-initialized counts
-        for c in text.chars() {
-            let group = char_to_category_group(c);
-            *counts.get_mut(&group).unwrap() += 1;
-        }
-    }
+/// Convert a string to a vector of Unicode category groups
+pub fn to_category_group_vector(text: &str) -> Vec<UnicodeCategoryGroup> {
+    map_chars(text, char_to_category_group)
+}
 
-    // Remove any groups with zero counts
-    counts.retain(|_, &mut count| count > 0);
+/// Count the occurrences of each Unicode category in a string
+///
+/// Large texts are split into byte ranges at character boundaries and counted in
+/// parallel into dense per-range tables, which are then summed.
+pub fn count_categories(text: &str) -> HashMap<UnicodeCategory, usize> {
+    indexed_counts_to_map(count_indexed(text, char_to_category))
+}
 
-    counts
+/// Count the occurrences of each Unicode category group in a string
+pub fn count_category_groups(text: &str) -> HashMap<UnicodeCategoryGroup, usize> {
+    indexed_counts_to_map(count_indexed(text, char_to_category_group))
 }
 
 /// Get efficient string-based frequency counts of Unicode categories
@@ -464,7 +373,7 @@ pub fn category_group_string_frequency(text: &str) -> HashMap<String, usize> {
 /// Count the ratio of each Unicode category in a string
 pub fn category_ratios(text: &str) -> HashMap<UnicodeCategory, f64> {
     let counts = count_categories(text);
-    let total = text.chars().count() as f64;
+    let total = counts.values().sum::<usize>() as f64;
 
     if total == 0.0 {
         return HashMap::new();
@@ -479,7 +388,7 @@ pub fn category_ratios(text: &str) -> HashMap<UnicodeCategory, f64> {
 /// Count the ratio of each Unicode category group in a string
 pub fn category_group_ratios(text: &str) -> HashMap<UnicodeCategoryGroup, f64> {
     let counts = count_category_groups(text);
-    let total = text.chars().count() as f64;
+    let total = counts.values().sum::<usize>() as f64;
 
     if total == 0.0 {
         return HashMap::new();
@@ -531,36 +440,12 @@ pub fn calculate_category_bigrams(
 
 /// Count the frequencies of Unicode category bigrams in a text
 pub fn count_category_bigrams(text: &str) -> HashMap<(Option<String>, Option<String>), usize> {
-    let bigrams = calculate_category_bigrams(text);
-    let mut counts = HashMap::new();
-
-    for (prev_cat, next_cat) in bigrams {
-        // Convert categories to strings, using None where appropriate
-        let prev_cat_str = prev_cat.map(|c| category_to_string(c).to_string());
-        let next_cat_str = next_cat.map(|c| category_to_string(c).to_string());
-
-        // Increment the count for this bigram
-        *counts.entry((prev_cat_str, next_cat_str)).or_insert(0) += 1;
-    }
-
-    counts
+    named_bigrams(category_bigrams(text).bigram_counts())
 }
 
 /// Calculate the ratios of Unicode category bigrams in a text
 pub fn category_bigram_ratios(text: &str) -> HashMap<(Option<String>, Option<String>), f64> {
-    let counts = count_category_bigrams(text);
-
-    // For bigrams, the total count should be the sum of all bigram counts
-    let total: usize = counts.values().sum();
-
-    if total == 0 {
-        return HashMap::new();
-    }
-
-    counts
-        .into_iter()
-        .map(|(k, v)| (k, v as f64 / total as f64))
-        .collect()
+    count_ratios(count_category_bigrams(text))
 }
 
 /// Calculate bigrams of Unicode category groups in a text
@@ -603,36 +488,12 @@ pub fn calculate_category_group_bigrams(
 pub fn count_category_group_bigrams(
     text: &str,
 ) -> HashMap<(Option<String>, Option<String>), usize> {
-    let bigrams = calculate_category_group_bigrams(text);
-    let mut counts = HashMap::new();
-
-    for (prev_group, next_group) in bigrams {
-        // Convert category groups to strings, using None where appropriate
-        let prev_group_str = prev_group.map(|g| category_group_to_string(g).to_string());
-        let next_group_str = next_group.map(|g| category_group_to_string(g).to_string());
-
-        // Increment the count for this bigram
-        *counts.entry((prev_group_str, next_group_str)).or_insert(0) += 1;
-    }
-
-    counts
+    named_bigrams(category_group_bigrams(text).bigram_counts())
 }
 
 /// Calculate the ratios of Unicode category group bigrams in a text
 pub fn category_group_bigram_ratios(text: &str) -> HashMap<(Option<String>, Option<String>), f64> {
-    let counts = count_category_group_bigrams(text);
-
-    // For bigrams, the total count should be the sum of all bigram counts
-    let total: usize = counts.values().sum();
-
-    if total == 0 {
-        return HashMap::new();
-    }
-
-    counts
-        .into_iter()
-        .map(|(k, v)| (k, v as f64 / total as f64))
-        .collect()
+    count_ratios(count_category_group_bigrams(text))
 }
 
 /// Calculate trigrams of Unicode categories in a text
@@ -690,41 +551,14 @@ pub fn calculate_category_trigrams(
 pub fn count_category_trigrams(
     text: &str,
 ) -> HashMap<(Option<String>, String, Option<String>), usize> {
-    let trigrams = calculate_category_trigrams(text);
-    let mut counts = HashMap::new();
-
-    for (prev_cat, current_cat, next_cat) in trigrams {
-        // Convert categories to strings, using None where appropriate
-        let prev_cat_str = prev_cat.map(|c| category_to_string(c).to_string());
-        let current_cat_str = category_to_string(current_cat).to_string();
-        let next_cat_str = next_cat.map(|c| category_to_string(c).to_string());
-
-        // Increment the count for this trigram
-        *counts
-            .entry((prev_cat_str, current_cat_str, next_cat_str))
-            .or_insert(0) += 1;
-    }
-
-    counts
+    named_trigrams(category_ngrams(text).trigram_counts())
 }
 
 /// Calculate the ratios of Unicode category trigrams in a text
 pub fn category_trigram_ratios(
     text: &str,
 ) -> HashMap<(Option<String>, String, Option<String>), f64> {
-    let counts = count_category_trigrams(text);
-
-    // For trigrams, the total count should be the sum of all trigram counts
-    let total: usize = counts.values().sum();
-
-    if total == 0 {
-        return HashMap::new();
-    }
-
-    counts
-        .into_iter()
-        .map(|(k, v)| (k, v as f64 / total as f64))
-        .collect()
+    count_ratios(count_category_trigrams(text))
 }
 
 /// Calculate trigrams of Unicode category groups in a text
@@ -777,33 +611,450 @@ pub fn calculate_category_group_trigrams(
 pub fn count_category_group_trigrams(
     text: &str,
 ) -> HashMap<(Option<String>, String, Option<String>), usize> {
-    let trigrams = calculate_category_group_trigrams(text);
+    named_trigrams(category_group_ngrams(text).trigram_counts())
+}
+
+/// Calculate the ratios of Unicode category group trigrams in a text
+pub fn category_group_trigram_ratios(
+    text: &str,
+) -> HashMap<(Option<String>, String, Option<String>), f64> {
+    count_ratios(count_category_group_trigrams(text))
+}
+
+/// Count bigrams over a precomputed sequence of categories or category groups
+///
+/// Matches `calculate_category_bigrams`: `None` marks the start and end of the text,
+/// so a sequence of n items yields n + 1 bigrams.
+pub fn count_sequence_bigrams<T: Copy + Eq + Hash>(
+    sequence: &[T],
+) -> HashMap<(Option<T>, Option<T>), usize> {
     let mut counts = HashMap::new();
+    if sequence.is_empty() {
+        return counts;
+    }
 
-    for (prev_group, current_group, next_group) in trigrams {
-        // Convert category groups to strings, using None where appropriate
-        let prev_group_str = prev_group.map(|g| category_group_to_string(g).to_string());
-        let current_group_str = category_group_to_string(current_group).to_string();
-        let next_group_str = next_group.map(|g| category_group_to_string(g).to_string());
+    let mut prev = None;
+    for &item in sequence {
+        *counts.entry((prev, Some(item))).or_insert(0) += 1;
+        prev = Some(item);
+    }
+    *counts.entry((prev, None)).or_insert(0) += 1;
 
-        // Increment the count for this trigram
-        *counts
-            .entry((prev_group_str, current_group_str, next_group_str))
-            .or_insert(0) += 1;
+    counts
+}
+
+/// Count trigrams over a precomputed sequence of categories or category groups
+///
+/// Matches `calculate_category_trigrams`: one trigram per item, with `None` for the
+/// missing neighbour of the first and last item.
+pub fn count_sequence_trigrams<T: Copy + Eq + Hash>(
+    sequence: &[T],
+) -> HashMap<(Option<T>, T, Option<T>), usize> {
+    let mut counts = HashMap::new();
+    for (i, &current) in sequence.iter().enumerate() {
+        let prev = i.checked_sub(1).map(|j| sequence[j]);
+        let next = sequence.get(i + 1).copied();
+        *counts.entry((prev, current, next)).or_insert(0) += 1;
     }
 
     counts
 }
 
-/// Calculate the ratios of Unicode category group trigrams in a text
-pub fn category_group_trigram_ratios(
+/// Categories that can index dense count tables
+pub trait CategoryIndex: Copy + Eq + Hash {
+    /// Number of distinct values
+    const COUNT: usize;
+
+    /// Position of the value in `0..COUNT`
+    fn index(self) -> usize;
+
+    /// Value at a position in `0..COUNT`
+    fn from_index(index: usize) -> Self;
+
+    /// Name used in results, such as "Lu" or "P"
+    fn name(self) -> &'static str;
+}
+
+/// All Unicode categories, in discriminant order
+const ALL_CATEGORIES: [UnicodeCategory; 30] = [
+    UnicodeCategory::Ll,
+    UnicodeCategory::Lu,
+    UnicodeCategory::Lt,
+    UnicodeCategory::Lm,
+    UnicodeCategory::Lo,
+    UnicodeCategory::Mn,
+    UnicodeCategory::Mc,
+    UnicodeCategory::Me,
+    UnicodeCategory::Nd,
+    UnicodeCategory::Nl,
+    UnicodeCategory::No,
+    UnicodeCategory::Pc,
+    UnicodeCategory::Pd,
+    UnicodeCategory::Ps,
+    UnicodeCategory::Pe,
+    UnicodeCategory::Pi,
+    UnicodeCategory::Pf,
+    UnicodeCategory::Po,
+    UnicodeCategory::Sm,
+    UnicodeCategory::Sc,
+    UnicodeCategory::Sk,
+    UnicodeCategory::So,
+    UnicodeCategory::Zs,
+    UnicodeCategory::Zl,
+    UnicodeCategory::Zp,
+    UnicodeCategory::Cc,
+    UnicodeCategory::Cf,
+    UnicodeCategory::Cs,
+    UnicodeCategory::Co,
+    UnicodeCategory::Cn,
+];
+
+/// All Unicode category groups, in discriminant order
+const ALL_GROUPS: [UnicodeCategoryGroup; 7] = [
+    UnicodeCategoryGroup::L,
+    UnicodeCategoryGroup::M,
+    UnicodeCategoryGroup::N,
+    UnicodeCategoryGroup::P,
+    UnicodeCategoryGroup::S,
+    UnicodeCategoryGroup::Z,
+    UnicodeCategoryGroup::C,
+];
+
+impl CategoryIndex for UnicodeCategory {
+    const COUNT: usize = ALL_CATEGORIES.len();
+
+    fn index(self) -> usize {
+        self as usize
+    }
+
+    fn from_index(index: usize) -> Self {
+        ALL_CATEGORIES[index]
+    }
+
+    fn name(self) -> &'static str {
+        category_to_string(self)
+    }
+}
+
+impl CategoryIndex for UnicodeCategoryGroup {
+    const COUNT: usize = ALL_GROUPS.len();
+
+    fn index(self) -> usize {
+        self as usize
+    }
+
+    fn from_index(index: usize) -> Self {
+        ALL_GROUPS[index]
+    }
+
+    fn name(self) -> &'static str {
+        category_group_to_string(self)
+    }
+}
+
+/// Running bigram and trigram counts over a sequence fed one item at a time
+///
+/// Gives the same counts as `count_sequence_bigrams` and `count_sequence_trigrams`
+/// without keeping the sequence, so a long text can be processed in pieces.
+///
+/// Counts live in dense tables indexed by category, with slot 0 of each position
+/// standing for the start or end of the sequence: (N + 1)² bigrams and
+/// (N + 1)·N·(N + 1) trigrams, or 961 and 28,830 entries for the 30 categories.
+/// Each item costs two array increments; each table is allocated when its first
+/// n-gram is counted, the trigram table only if trigrams are tracked, and names
+/// are attached only when counts are read.
+#[derive(Debug, Clone)]
+pub struct SequenceNgramCounter<T> {
+    bigrams: Vec<usize>,
+    trigrams: Vec<usize>,
+    track_trigrams: bool,
+    // The last two items, most recent last
+    before_last: Option<T>,
+    last: Option<T>,
+}
+
+impl<T> Default for SequenceNgramCounter<T> {
+    fn default() -> Self {
+        SequenceNgramCounter::new(true)
+    }
+}
+
+impl<T> SequenceNgramCounter<T> {
+    /// Empty counter; without `track_trigrams` only bigrams are counted
+    pub fn new(track_trigrams: bool) -> Self {
+        SequenceNgramCounter {
+            bigrams: Vec::new(),
+            trigrams: Vec::new(),
+            track_trigrams,
+            before_last: None,
+            last: None,
+        }
+    }
+}
+
+/// Add a dense count table to another, either of which may not be allocated yet
+fn add_table(table: &mut Vec<usize>, other: Vec<usize>) {
+    if table.is_empty() {
+        *table = other;
+    } else {
+        table.iter_mut().zip(other).for_each(|(a, b)| *a += b);
+    }
+}
+
+impl<T: CategoryIndex> SequenceNgramCounter<T> {
+    /// Slots per n-gram position: every value plus the start/end marker
+    const WIDTH: usize = T::COUNT + 1;
+
+    #[inline]
+    fn slot(item: Option<T>) -> usize {
+        item.map_or(0, |item| item.index() + 1)
+    }
+
+    fn unslot(slot: usize) -> Option<T> {
+        slot.checked_sub(1).map(T::from_index)
+    }
+
+    /// Index of the trigram `(before, current, next)` in the trigram table
+    #[inline]
+    fn trigram_index(before: Option<T>, current: T, next: Option<T>) -> usize {
+        (Self::slot(before) * T::COUNT + current.index()) * Self::WIDTH + Self::slot(next)
+    }
+
+    /// Counter for a sequence that continues after `before_last` and `last`
+    ///
+    /// Used to count a piece of a longer sequence: the first items are paired
+    /// with the preceding context instead of the start marker.
+    pub fn resume(before_last: Option<T>, last: Option<T>, track_trigrams: bool) -> Self {
+        SequenceNgramCounter {
+            before_last,
+            last,
+            ..Self::new(track_trigrams)
+        }
+    }
+
+    /// Add the counts of the sequence that directly follows this one
+    ///
+    /// `next` must have been created with `resume` from the last two items of
+    /// this sequence; the result is the same as pushing its items here.
+    pub fn append(&mut self, next: Self) {
+        if next.bigrams.is_empty() {
+            return;
+        }
+        add_table(&mut self.bigrams, next.bigrams);
+        if !next.trigrams.is_empty() {
+            add_table(&mut self.trigrams, next.trigrams);
+        }
+        self.before_last = next.before_last;
+        self.last = next.last;
+    }
+
+    /// Add the next item of the sequence
+    #[inline]
+    pub fn push(&mut self, item: T) {
+        if self.bigrams.is_empty() {
+            self.bigrams = vec![0; Self::BIGRAM_LEN];
+        }
+        self.bigrams[Self::slot(self.last) * Self::WIDTH + item.index() + 1] += 1;
+
+        if let (Some(last), true) = (self.last, self.track_trigrams) {
+            if self.trigrams.is_empty() {
+                self.trigrams = vec![0; Self::TRIGRAM_LEN];
+            }
+            self.trigrams[Self::trigram_index(self.before_last, last, Some(item))] += 1;
+        }
+        self.before_last = self.last;
+        self.last = Some(item);
+    }
+
+    /// Number of entries in the bigram table
+    pub const BIGRAM_LEN: usize = Self::WIDTH * Self::WIDTH;
+
+    /// Number of entries in the trigram table
+    pub const TRIGRAM_LEN: usize = Self::WIDTH * T::COUNT * Self::WIDTH;
+
+    /// Bigram stored at an index of the bigram table
+    pub fn bigram_key(index: usize) -> (Option<T>, Option<T>) {
+        (
+            Self::unslot(index / Self::WIDTH),
+            Self::unslot(index % Self::WIDTH),
+        )
+    }
+
+    /// Trigram stored at an index of the trigram table
+    pub fn trigram_key(index: usize) -> (Option<T>, T, Option<T>) {
+        let rest = index / Self::WIDTH;
+        (
+            Self::unslot(rest / T::COUNT),
+            T::from_index(rest % T::COUNT),
+            Self::unslot(index % Self::WIDTH),
+        )
+    }
+
+    /// Dense bigram counts of the sequence so far, closed with an end marker
+    ///
+    /// Entry `i` counts the bigram `bigram_key(i)`; the table always has
+    /// `BIGRAM_LEN` entries.
+    pub fn bigram_table(&self) -> Vec<usize> {
+        let mut table = vec![0; Self::BIGRAM_LEN];
+        self.for_each_bigram(|index, count| table[index] = count);
+        table
+    }
+
+    /// Dense trigram counts of the sequence so far, closed with an end marker
+    ///
+    /// Entry `i` counts the trigram `trigram_key(i)`; the table always has
+    /// `TRIGRAM_LEN` entries, all zero unless trigrams are tracked.
+    pub fn trigram_table(&self) -> Vec<usize> {
+        let mut table = vec![0; Self::TRIGRAM_LEN];
+        self.for_each_trigram(|index, count| table[index] = count);
+        table
+    }
+
+    /// Index of the trigram closing the sequence with an end marker, if any
+    fn closing_trigram(&self) -> Option<usize> {
+        match (self.last, self.track_trigrams) {
+            (Some(last), true) => Some(Self::trigram_index(self.before_last, last, None)),
+            _ => None,
+        }
+    }
+
+    /// Call `f` with the table index and count of every nonzero bigram of the
+    /// sequence so far, closed with an end marker, in table order
+    pub fn for_each_bigram(&self, mut f: impl FnMut(usize, usize)) {
+        let closing = self.last.map(|_| Self::slot(self.last) * Self::WIDTH);
+        for (index, &count) in self.bigrams.iter().enumerate() {
+            let count = count + (closing == Some(index)) as usize;
+            if count > 0 {
+                f(index, count);
+            }
+        }
+    }
+
+    /// Call `f` with the table index and count of every nonzero trigram of the
+    /// sequence so far, closed with an end marker, in table order
+    pub fn for_each_trigram(&self, mut f: impl FnMut(usize, usize)) {
+        let closing = self.closing_trigram();
+        for (index, &count) in self.trigrams.iter().enumerate() {
+            let count = count + (closing == Some(index)) as usize;
+            if count > 0 {
+                f(index, count);
+            }
+        }
+        // A one-item sequence has no table, only the closing trigram
+        if let (Some(index), true) = (closing, self.trigrams.is_empty()) {
+            f(index, 1);
+        }
+    }
+
+    /// Nonzero bigram counts of the sequence so far, closed with an end marker
+    pub fn bigram_counts(&self) -> Vec<((Option<T>, Option<T>), usize)> {
+        let mut counts = Vec::new();
+        self.for_each_bigram(|index, count| counts.push((Self::bigram_key(index), count)));
+        counts
+    }
+
+    /// Nonzero trigram counts of the sequence so far, closed with an end marker
+    pub fn trigram_counts(&self) -> Vec<((Option<T>, T, Option<T>), usize)> {
+        let mut counts = Vec::new();
+        self.for_each_trigram(|index, count| counts.push((Self::trigram_key(index), count)));
+        counts
+    }
+
+    /// Bigram counts of the sequence so far, closed with an end marker
+    pub fn bigrams(&self) -> HashMap<(Option<T>, Option<T>), usize> {
+        self.bigram_counts().into_iter().collect()
+    }
+
+    /// Trigram counts of the sequence so far, closed with an end marker
+    pub fn trigrams(&self) -> HashMap<(Option<T>, T, Option<T>), usize> {
+        self.trigram_counts().into_iter().collect()
+    }
+}
+
+/// Smallest piece of text counted by one worker when scanning n-grams, large
+/// enough to amortize the per-piece tables
+const MIN_NGRAM_CHUNK_LEN: usize = 64 * 1024;
+
+/// Count the n-grams of a text, scanning large texts in parallel
+///
+/// Each piece resumes from the last two characters before it, so n-grams that
+/// straddle a seam are counted once, by the piece they end in.
+fn scan_ngrams<T: CategoryIndex + Send>(
     text: &str,
-) -> HashMap<(Option<String>, String, Option<String>), f64> {
-    let counts = count_category_group_trigrams(text);
+    classify: fn(char) -> T,
+    track_trigrams: bool,
+) -> SequenceNgramCounter<T> {
+    let count_chunk = |start: usize, chunk: &str| {
+        let mut context = text[..start].chars().rev().map(classify);
+        let last = context.next();
+        let mut counter = SequenceNgramCounter::resume(context.next(), last, track_trigrams);
+        for c in chunk.chars() {
+            counter.push(classify(c));
+        }
+        counter
+    };
 
-    // For trigrams, the total count should be the sum of all trigram counts
-    let total: usize = counts.values().sum();
+    if text.len() <= MIN_NGRAM_CHUNK_LEN * 2 {
+        return count_chunk(0, text);
+    }
+    let pieces: Vec<_> = text_chunks(text, MIN_NGRAM_CHUNK_LEN)
+        .into_par_iter()
+        .map(|(start, chunk)| count_chunk(start, chunk))
+        .collect();
+    let mut counter = SequenceNgramCounter::new(track_trigrams);
+    for piece in pieces {
+        counter.append(piece);
+    }
+    counter
+}
+
+/// Count the Unicode category bigrams and trigrams of a text
+pub fn category_ngrams(text: &str) -> SequenceNgramCounter<UnicodeCategory> {
+    scan_ngrams(text, char_to_category, true)
+}
+
+/// Count the Unicode category group bigrams and trigrams of a text
+pub fn category_group_ngrams(text: &str) -> SequenceNgramCounter<UnicodeCategoryGroup> {
+    scan_ngrams(text, char_to_category_group, true)
+}
+
+/// Count only the Unicode category bigrams of a text
+pub fn category_bigrams(text: &str) -> SequenceNgramCounter<UnicodeCategory> {
+    scan_ngrams(text, char_to_category, false)
+}
 
+/// Count only the Unicode category group bigrams of a text
+pub fn category_group_bigrams(text: &str) -> SequenceNgramCounter<UnicodeCategoryGroup> {
+    scan_ngrams(text, char_to_category_group, false)
+}
+
+/// Name the items of bigram counts, using `None` for the start and end markers
+fn named_bigrams<T: CategoryIndex>(
+    counts: Vec<((Option<T>, Option<T>), usize)>,
+) -> HashMap<(Option<String>, Option<String>), usize> {
+    let name = |item: Option<T>| item.map(|item| item.name().to_string());
+    counts
+        .into_iter()
+        .map(|((prev, next), count)| ((name(prev), name(next)), count))
+        .collect()
+}
+
+/// Name the items of trigram counts, using `None` for the start and end markers
+fn named_trigrams<T: CategoryIndex>(
+    counts: Vec<((Option<T>, T, Option<T>), usize)>,
+) -> HashMap<(Option<String>, String, Option<String>), usize> {
+    let name = |item: Option<T>| item.map(|item| item.name().to_string());
+    counts
+        .into_iter()
+        .map(|((prev, current, next), count)| {
+            ((name(prev), current.name().to_string(), name(next)), count)
+        })
+        .collect()
+}
+
+/// Convert counts to ratios of their sum
+fn count_ratios<K: Eq + Hash>(counts: HashMap<K, usize>) -> HashMap<K, f64> {
+    let total: usize = counts.values().sum();
     if total == 0 {
         return HashMap::new();
     }
@@ -818,6 +1069,7 @@ mod tests {
     // Importing everything since most of the module's functions are tested
     #[allow(unused_imports)]
     use super::*;
+    use crate::char::table::BLOCK_COUNT;
 
     #[test]
     fn test_char_to_category() {
@@ -828,6 +1080,23 @@ mod tests {
         assert_eq!(char_to_category(' '), UnicodeCategory::Zs);
     }
 
+    #[test]
+    fn test_category_table_matches_icu() {
+        let icu = maps::general_category();
+        for ch in (0..=0x10FFFF).filter_map(char::from_u32) {
+            let expected = ascii_category(ch).unwrap_or_else(|| from_general_category(icu.get(ch)));
+            assert_eq!(char_to_category(ch), expected, "U+{:04X}", ch as u32);
+            assert_eq!(char_to_category_group(ch), category_to_group(expected));
+        }
+
+        // Identical blocks are shared
+        assert!(CATEGORY_TABLE.row_count() < BLOCK_COUNT / 4);
+        assert_eq!(char_to_category('\t'), UnicodeCategory::Zs);
+        assert_eq!(char_to_category('-'), UnicodeCategory::Sm);
+        assert_eq!(char_to_category('中'), UnicodeCategory::Lo);
+        assert_eq!(char_to_category('\u{10FFFD}'), UnicodeCategory::Co);
+    }
+
     #[test]
     fn test_category_to_group() {
         assert_eq!(
@@ -1269,4 +1538,180 @@ mod tests {
         let second_group = char_to_category_group(non_ascii_char);
         assert_eq!(first_group, second_group);
     }
+
+    #[test]
+    fn test_sequence_ngrams_match_text_ngrams() {
+        for text in ["", "a", "ab", "Hello, World! 123", "naïve café — ok?"] {
+            let categories = to_category_vector(text);
+
+            let mut bigrams = HashMap::new();
+            for (prev, next) in calculate_category_bigrams(text) {
+                *bigrams.entry((prev, next)).or_insert(0) += 1;
+            }
+            assert_eq!(count_sequence_bigrams(&categories), bigrams);
+
+            let mut trigrams = HashMap::new();
+            for trigram in calculate_category_trigrams(text) {
+                *trigrams.entry(trigram).or_insert(0) += 1;
+            }
+            assert_eq!(count_sequence_trigrams(&categories), trigrams);
+
+            let groups: Vec<_> = categories.iter().map(|&c| category_to_group(c)).collect();
+            let mut group_trigrams = HashMap::new();
+            for trigram in calculate_category_group_trigrams(text) {
+                *group_trigrams.entry(trigram).or_insert(0) += 1;
+            }
+            assert_eq!(count_sequence_trigrams(&groups), group_trigrams);
+        }
+    }
+
+    #[test]
+    fn test_sequence_ngram_counter() {
+        let sequence = to_category_vector("Ab1 c!");
+        let mut counter = SequenceNgramCounter::default();
+        for &category in &sequence {
+            counter.push(category);
+        }
+        assert_eq!(counter.bigrams(), count_sequence_bigrams(&sequence));
+        assert_eq!(counter.trigrams(), count_sequence_trigrams(&sequence));
+
+        let groups = to_category_group_vector("Ab1 c!");
+        let counter = category_group_ngrams("Ab1 c!");
+        assert_eq!(counter.bigrams(), count_sequence_bigrams(&groups));
+        assert_eq!(counter.trigrams(), count_sequence_trigrams(&groups));
+
+        let empty: SequenceNgramCounter<UnicodeCategory> = SequenceNgramCounter::default();
+        assert!(empty.bigrams().is_empty());
+        assert!(empty.trigrams().is_empty());
+
+        let single = category_ngrams("a");
+        assert!(single.trigrams.is_empty());
+        assert_eq!(
+            single.trigrams(),
+            count_sequence_trigrams(&to_category_vector("a"))
+        );
+    }
+
+    #[test]
+    fn test_bigram_only_counter() {
+        let text = "Ab1 c!";
+        let bigrams = category_bigrams(text);
+        assert!(bigrams.trigrams.is_empty());
+        assert!(bigrams.trigram_counts().is_empty());
+        assert_eq!(bigrams.bigrams(), category_ngrams(text).bigrams());
+        assert_eq!(
+            category_group_bigrams(text).bigram_table(),
+            category_group_ngrams(text).bigram_table()
+        );
+    }
+
+    #[test]
+    fn test_ngram_counts_past_u32() {
+        use UnicodeCategoryGroup::L;
+        let big = u32::MAX as usize;
+
+        let mut counter = category_group_ngrams("ab");
+        let bigram = (0..SequenceNgramCounter::<UnicodeCategoryGroup>::BIGRAM_LEN)
+            .find(|&i| SequenceNgramCounter::bigram_key(i) == (Some(L), Some(L)))
+            .unwrap();
+        let trigram = (0..SequenceNgramCounter::<UnicodeCategoryGroup>::TRIGRAM_LEN)
+            .find(|&i| SequenceNgramCounter::trigram_key(i) == (Some(L), L, Some(L)))
+            .unwrap();
+        counter.bigrams[bigram] = big;
+        counter.trigrams[trigram] = big;
+
+        let mut next = SequenceNgramCounter::resume(counter.before_last, counter.last, true);
+        next.push(L);
+        counter.append(next);
+        counter.push(L);
+        assert_eq!(counter.bigrams()[&(Some(L), Some(L))], big + 2);
+        assert_eq!(counter.trigrams()[&(Some(L), L, Some(L))], big + 2);
+    }
+
+    #[test]
+    fn test_sequence_ngram_tables() {
+        type Counter = SequenceNgramCounter<UnicodeCategoryGroup>;
+        assert_eq!(Counter::BIGRAM_LEN, 64);
+        assert_eq!(Counter::TRIGRAM_LEN, 8 * 7 * 8);
+
+        let counter = category_group_ngrams("Hi, 42!");
+        let table = counter.bigram_table();
+        assert_eq!(table.len(), Counter::BIGRAM_LEN);
+        for (key, count) in counter.bigram_counts() {
+            let index = (0..Counter::BIGRAM_LEN)
+                .find(|&i| Counter::bigram_key(i) == key)
+                .unwrap();
+            assert_eq!(table[index], count);
+        }
+        assert_eq!(table.iter().sum::<usize>(), 8);
+
+        let trigrams = counter.trigram_table();
+        assert_eq!(trigrams.iter().sum::<usize>(), 7);
+        assert_eq!(
+            Counter::trigram_key(0),
+            (None, UnicodeCategoryGroup::L, None)
+        );
+
+        let empty = Counter::default();
+        assert_eq!(empty.bigram_table(), vec![0; Counter::BIGRAM_LEN]);
+    }
+
+    #[test]
+    fn test_named_ngrams_match_sequences() {
+        for text in ["", "a", "ab", "Hello, World! 123", "naïve café — ok?"] {
+            let mut bigrams = HashMap::new();
+            for (prev, next) in calculate_category_bigrams(text) {
+                let key = (
+                    prev.map(|c| category_to_string(c).to_string()),
+                    next.map(|c| category_to_string(c).to_string()),
+                );
+                *bigrams.entry(key).or_insert(0) += 1;
+            }
+            assert_eq!(count_category_bigrams(text), bigrams);
+
+            let mut trigrams = HashMap::new();
+            for (prev, current, next) in calculate_category_group_trigrams(text) {
+                let key = (
+                    prev.map(|g| category_group_to_string(g).to_string()),
+                    category_group_to_string(current).to_string(),
+                    next.map(|g| category_group_to_string(g).to_string()),
+                );
+                *trigrams.entry(key).or_insert(0) += 1;
+            }
+            assert_eq!(count_category_group_trigrams(text), trigrams);
+        }
+    }
+
+    #[test]
+    fn test_parallel_scan_matches_sequential() {
+        // Long enough to be split, with multi-byte characters on every seam
+        let text = "Ab1 ,é日本🎉\u{301}\t".repeat(20_000);
+        assert!(text.len() > MIN_NGRAM_CHUNK_LEN * 2);
+
+        let chunks = text_chunks(&text, MIN_CHUNK_LEN);
+        assert!(chunks.len() > 1);
+        let joined: String = chunks.iter().map(|&(_, chunk)| chunk).collect();
+        assert_eq!(joined, text);
+
+        let sequential: Vec<UnicodeCategory> = text.chars().map(char_to_category).collect();
+        assert_eq!(to_category_vector(&text), sequential);
+
+        let mut counts = HashMap::new();
+        for &category in &sequential {
+            *counts.entry(category).or_insert(0) += 1;
+        }
+        assert_eq!(count_categories(&text), counts);
+        assert_eq!(
+            count_category_groups(&text).values().sum::<usize>(),
+            sequential.len()
+        );
+
+        let mut expected = SequenceNgramCounter::default();
+        for &category in &sequential {
+            expected.push(category);
+        }
+        let scanned = category_ngrams(&text);
+        assert_eq!(scanned.bigram_table(), expected.bigram_table());
+        assert_eq!(scanned.trigram_table(), expected.trigram_table());
+    }
 }
@@ -7,10 +7,17 @@
 //!
 //! * `unicode`: Basic character metrics, counts, and ratios
 //! * `categories`: Unicode category classification and frequency analysis
+//! * `scripts`: Unicode script (writing system) classification and distribution
+//! * `accumulator`: Character metrics over texts fed in chunks
+//! * `result`: Character metrics exposed to Python as a lazily converted mapping
 //!
 //! The character module forms the foundation of text analysis in Cheesecloth,
 //! providing the building blocks for higher-level metrics while optimizing for
 //! performance with non-allocating algorithms and efficient data structures.
 
+pub mod accumulator;
 pub mod categories;
+pub mod result;
+pub mod scripts;
+pub mod table;
 pub mod unicode;
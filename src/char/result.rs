@@ -0,0 +1,404 @@
+//! # Character Metric Results
+//!
+//! This module exposes the character metrics of one text to Python as a
+//! read-only mapping backed by the Rust `CharProfile`. Values are converted to
+//! Python objects only when they are read, so a filter that looks at a handful
+//! of the ~45 metrics does not pay for building the rest, including the nested
+//! frequency and n-gram dictionaries.
+//!
+//! ## Key Features
+//!
+//! * The same keys and values as the dictionary of `get_all_char_metrics`
+//! * Access by key (`result["letters"]`) or attribute (`result.letters`)
+//! * Optional selection of fields; the category n-gram tables and character
+//!   frequencies are only counted when one of their fields is selected
+
+use pyo3::prelude::*;
+use pyo3::types::{PyDict, PyList};
+use pyo3::IntoPyObjectExt;
+
+use crate::char::categories::{category_group_to_string, category_to_string, CategoryIndex};
+use crate::char::scripts::script_to_string;
+use crate::char::unicode::{CharProfile, CharTally};
+
+/// Keys of the character metrics, in the order of `get_all_char_metrics`
+pub const CHAR_METRIC_KEYS: [&str; 47] = [
+    "char_count",
+    "total_chars",
+    "letter_count",
+    "letters",
+    "digit_count",
+    "digits",
+    "punctuation_count",
+    "punctuation",
+    "symbol_count",
+    "symbols",
+    "whitespace_count",
+    "whitespace",
+    "non_ascii_count",
+    "non_ascii",
+    "uppercase_count",
+    "uppercase",
+    "lowercase_count",
+    "lowercase",
+    "alphanumeric_count",
+    "alphanumeric",
+    "ratio_letters",
+    "ratio_digits",
+    "ratio_punctuation",
+    "ratio_symbols",
+    "ratio_whitespace",
+    "ratio_non_ascii",
+    "ratio_uppercase",
+    "ratio_lowercase",
+    "ratio_alphanumeric",
+    "ratio_alpha_to_numeric",
+    "char_entropy",
+    "ascii_ratio",
+    "char_type_transitions",
+    "consecutive_runs",
+    "punctuation_diversity",
+    "case_ratio",
+    "category_entropy",
+    "script_switches",
+    "dominant_script",
+    "unicode_category_ratios",
+    "unicode_category_group_ratios",
+    "script_ratios",
+    "char_frequency",
+    "unicode_category_bigram_ratios",
+    "unicode_category_group_bigram_ratios",
+    "unicode_category_trigram_ratios",
+    "unicode_category_group_trigram_ratios",
+];
+
+/// Keys whose values need the per-character counts
+const FREQUENCY_KEYS: [&str; 2] = ["char_entropy", "char_frequency"];
+
+/// Keys whose values need the category n-gram tables
+const NGRAM_KEYS: [&str; 4] = [
+    "unicode_category_bigram_ratios",
+    "unicode_category_group_bigram_ratios",
+    "unicode_category_trigram_ratios",
+    "unicode_category_group_trigram_ratios",
+];
+
+/// Python value of one character metric, or `None` for an unknown key
+pub fn char_metric_value(
+    py: Python<'_>,
+    profile: &CharProfile,
+    key: &str,
+) -> PyResult<Option<PyObject>> {
+    let metrics = &profile.metrics;
+    let total_chars = metrics.total_chars as f64;
+
+    let value = match key {
+        // Counts, under both their current and their original names
+        "char_count" | "total_chars" => metrics.total_chars.into_py_any(py)?,
+        "letter_count" | "letters" => metrics.letters.into_py_any(py)?,
+        "digit_count" | "digits" => metrics.digits.into_py_any(py)?,
+        "punctuation_count" | "punctuation" => metrics.punctuation.into_py_any(py)?,
+        "symbol_count" | "symbols" => metrics.symbols.into_py_any(py)?,
+        "whitespace_count" | "whitespace" => metrics.whitespace.into_py_any(py)?,
+        "non_ascii_count" | "non_ascii" => metrics.non_ascii.into_py_any(py)?,
+        "uppercase_count" | "uppercase" => metrics.uppercase.into_py_any(py)?,
+        "lowercase_count" | "lowercase" => metrics.lowercase.into_py_any(py)?,
+        "alphanumeric_count" | "alphanumeric" => metrics.alphanumeric.into_py_any(py)?,
+
+        // Ratios
+        "ratio_letters" => metrics.ratio_letters.into_py_any(py)?,
+        "ratio_digits" => metrics.ratio_digits.into_py_any(py)?,
+        "ratio_punctuation" => metrics.ratio_punctuation.into_py_any(py)?,
+        "ratio_symbols" => metrics.ratio_symbols.into_py_any(py)?,
+        "ratio_whitespace" => metrics.ratio_whitespace.into_py_any(py)?,
+        "ratio_non_ascii" => metrics.ratio_non_ascii.into_py_any(py)?,
+        "ratio_uppercase" => metrics.ratio_uppercase.into_py_any(py)?,
+        "ratio_lowercase" => metrics.ratio_lowercase.into_py_any(py)?,
+        "ratio_alphanumeric" => metrics.ratio_alphanumeric.into_py_any(py)?,
+        "ratio_alpha_to_numeric" => metrics.ratio_alpha_to_numeric.into_py_any(py)?,
+        "char_entropy" => metrics.char_entropy.into_py_any(py)?,
+        "ascii_ratio" => (1.0 - metrics.ratio_non_ascii).into_py_any(py)?,
+
+        // Sequence and diversity metrics
+        "char_type_transitions" => metrics.char_type_transitions.into_py_any(py)?,
+        "consecutive_runs" => metrics.consecutive_runs.into_py_any(py)?,
+        "punctuation_diversity" => metrics.punctuation_diversity.into_py_any(py)?,
+        "case_ratio" => metrics.case_ratio.into_py_any(py)?,
+        "category_entropy" => metrics.category_entropy.into_py_any(py)?,
+        "script_switches" => metrics.script_switches.into_py_any(py)?,
+        "dominant_script" => metrics
+            .dominant_script
+            .map(script_to_string)
+            .into_py_any(py)?,
+
+        // Tables
+        "unicode_category_ratios" => {
+            let dict = PyDict::new(py);
+            for (&category, &count) in &profile.category_counts {
+                dict.set_item(category_to_string(category), count as f64 / total_chars)?;
+            }
+            dict.into_any().unbind()
+        }
+        "unicode_category_group_ratios" => {
+            let dict = PyDict::new(py);
+            for (group, count) in profile.group_counts() {
+                dict.set_item(category_group_to_string(group), count as f64 / total_chars)?;
+            }
+            dict.into_any().unbind()
+        }
+        "script_ratios" => {
+            let dict = PyDict::new(py);
+            for (script, ratio) in profile.scripts.ratios() {
+                dict.set_item(script_to_string(script), ratio)?;
+            }
+            dict.into_any().unbind()
+        }
+        "char_frequency" => {
+            let dict = PyDict::new(py);
+            for (c, &freq) in &profile.frequency {
+                dict.set_item(c.to_string(), freq)?;
+            }
+            dict.into_any().unbind()
+        }
+        "unicode_category_bigram_ratios" => {
+            bigram_dict(py, profile.category_ngrams.bigram_counts(), true)?
+                .into_any()
+                .unbind()
+        }
+        "unicode_category_group_bigram_ratios" => {
+            bigram_dict(py, profile.group_ngrams.bigram_counts(), true)?
+                .into_any()
+                .unbind()
+        }
+        "unicode_category_trigram_ratios" => {
+            trigram_dict(py, profile.category_ngrams.trigram_counts(), true)?
+                .into_any()
+                .unbind()
+        }
+        "unicode_category_group_trigram_ratios" => {
+            trigram_dict(py, profile.group_ngrams.trigram_counts(), true)?
+                .into_any()
+                .unbind()
+        }
+        _ => return Ok(None),
+    };
+    Ok(Some(value))
+}
+
+/// Converts bigram counts into a dictionary keyed by `(prev, next)` name tuples,
+/// using START/END for the text boundaries.
+pub fn bigram_dict<'py, T: CategoryIndex>(
+    py: Python<'py>,
+    counts: Vec<((Option<T>, Option<T>), usize)>,
+    as_ratios: bool,
+) -> PyResult<Bound<'py, PyDict>> {
+    let total: usize = counts.iter().map(|&(_, count)| count).sum();
+    let dict = PyDict::new(py);
+    for ((prev, next), count) in counts {
+        let key = (prev.map_or("START", T::name), next.map_or("END", T::name));
+        if as_ratios {
+            dict.set_item(key, count as f64 / total as f64)?;
+        } else {
+            dict.set_item(key, count)?;
+        }
+    }
+    Ok(dict)
+}
+
+/// Converts trigram counts into a dictionary keyed by `(prev, current, next)` name
+/// tuples, using START/END for the text boundaries.
+pub fn trigram_dict<'py, T: CategoryIndex>(
+    py: Python<'py>,
+    counts: Vec<((Option<T>, T, Option<T>), usize)>,
+    as_ratios: bool,
+) -> PyResult<Bound<'py, PyDict>> {
+    let total: usize = counts.iter().map(|&(_, count)| count).sum();
+    let dict = PyDict::new(py);
+    for ((prev, current, next), count) in counts {
+        let key = (
+            prev.map_or("START", T::name),
+            current.name(),
+            next.map_or("END", T::name),
+        );
+        if as_ratios {
+            dict.set_item(key, count as f64 / total as f64)?;
+        } else {
+            dict.set_item(key, count)?;
+        }
+    }
+    Ok(dict)
+}
+
+/// Resolve requested field names to the known keys, in canonical order
+///
+/// Returns `None` (every field) when no selection is given.
+pub fn select_fields(fields: Option<Vec<String>>) -> PyResult<Option<Vec<&'static str>>> {
+    let Some(fields) = fields else {
+        return Ok(None);
+    };
+    if let Some(unknown) = fields
+        .iter()
+        .find(|f| !CHAR_METRIC_KEYS.iter().any(|&key| key == f.as_str()))
+    {
+        return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
+            "unknown character metric field '{}'; expected one of: {}",
+            unknown,
+            CHAR_METRIC_KEYS.join(", ")
+        )));
+    }
+    Ok(Some(
+        CHAR_METRIC_KEYS
+            .into_iter()
+            .filter(|key| fields.iter().any(|f| f == key))
+            .collect(),
+    ))
+}
+
+/// Character metrics of one text, converted to Python values on access
+///
+/// Behaves as a read-only mapping with the keys of `get_all_char_metrics` (or
+/// the selected subset), and exposes the same values as attributes.
+#[pyclass(mapping)]
+pub struct CharMetricsResult {
+    profile: CharProfile,
+    /// Selected keys in canonical order; `None` means every key
+    fields: Option<Vec<&'static str>>,
+}
+
+impl CharMetricsResult {
+    /// Compute the metrics of a text, counting category n-grams and character
+    /// frequencies only when one of the fields that need them is selected
+    pub fn compute(text: &str, fields: Option<Vec<&'static str>>) -> Self {
+        let needs = |keys: &[&str]| {
+            fields
+                .as_ref()
+                .map_or(true, |fields| fields.iter().any(|f| keys.contains(f)))
+        };
+        let (track_ngrams, track_frequency) = (needs(&NGRAM_KEYS), needs(&FREQUENCY_KEYS));
+        CharMetricsResult {
+            profile: CharTally::scan(text, track_ngrams, track_frequency).into_profile(),
+            fields,
+        }
+    }
+
+    /// Keys available in this result, in canonical order
+    pub fn keys(&self) -> Vec<&'static str> {
+        match &self.fields {
+            Some(fields) => fields.clone(),
+            None => CHAR_METRIC_KEYS.to_vec(),
+        }
+    }
+
+    fn contains(&self, key: &str) -> bool {
+        match &self.fields {
+            Some(fields) => fields.iter().any(|&field| field == key),
+            None => CHAR_METRIC_KEYS.iter().any(|&field| field == key),
+        }
+    }
+
+    fn value(&self, py: Python<'_>, key: &str) -> PyResult<Option<PyObject>> {
+        if self.contains(key) {
+            char_metric_value(py, &self.profile, key)
+        } else {
+            Ok(None)
+        }
+    }
+
+    /// All available values as a dictionary
+    pub fn to_dict<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyDict>> {
+        let dict = PyDict::new(py);
+        for key in self.keys() {
+            if let Some(value) = char_metric_value(py, &self.profile, key)? {
+                dict.set_item(key, value)?;
+            }
+        }
+        Ok(dict)
+    }
+}
+
+#[pymethods]
+impl CharMetricsResult {
+    fn __getitem__(&self, py: Python<'_>, key: &str) -> PyResult<PyObject> {
+        self.value(py, key)?
+            .ok_or_else(|| PyErr::new::<pyo3::exceptions::PyKeyError, _>(key.to_string()))
+    }
+
+    fn __getattr__(&self, py: Python<'_>, name: &str) -> PyResult<PyObject> {
+        self.value(py, name)?.ok_or_else(|| {
+            PyErr::new::<pyo3::exceptions::PyAttributeError, _>(format!(
+                "'CharMetricsResult' object has no attribute '{}'",
+                name
+            ))
+        })
+    }
+
+    fn __contains__(&self, key: &str) -> bool {
+        self.contains(key)
+    }
+
+    fn __len__(&self) -> usize {
+        self.fields
+            .as_ref()
+            .map_or(CHAR_METRIC_KEYS.len(), Vec::len)
+    }
+
+    fn __iter__<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyAny>> {
+        Ok(PyList::new(py, self.keys())?.try_iter()?.into_any())
+    }
+
+    fn __repr__(&self) -> String {
+        format!("<CharMetricsResult with {} fields>", self.__len__())
+    }
+
+    /// Names of the available metrics
+    #[pyo3(name = "keys")]
+    fn py_keys(&self) -> Vec<&'static str> {
+        self.keys()
+    }
+
+    /// Value of a metric, or `default` if it is not available
+    #[pyo3(signature = (key, default=None))]
+    fn get(&self, py: Python<'_>, key: &str, default: Option<PyObject>) -> PyResult<PyObject> {
+        Ok(self
+            .value(py, key)?
+            .unwrap_or_else(|| default.unwrap_or_else(|| py.None())))
+    }
+
+    /// Convert every available metric to a dictionary, as `get_all_char_metrics`
+    #[pyo3(name = "to_dict")]
+    fn py_to_dict<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyDict>> {
+        self.to_dict(py)
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_select_fields() {
+        assert_eq!(select_fields(None).unwrap(), None);
+
+        let fields = vec!["letters".to_string(), "char_count".to_string()];
+        let selected = select_fields(Some(fields)).unwrap().unwrap();
+        assert_eq!(selected, vec!["char_count", "letters"]);
+
+        let result = CharMetricsResult::compute("Hi, 42!", Some(selected));
+        assert_eq!(result.keys(), vec!["char_count", "letters"]);
+        assert!(result.contains("letters"));
+        assert!(!result.contains("digits"));
+        assert_eq!(result.profile.category_ngrams.bigram_counts(), vec![]);
+        assert!(result.profile.frequency.is_empty());
+
+        let entropy = select_fields(Some(vec!["char_entropy".to_string()]))
+            .unwrap()
+            .unwrap();
+        let result = CharMetricsResult::compute("Hi, 42!", Some(entropy));
+        assert_eq!(result.profile.frequency.len(), 7);
+        assert!(result.profile.metrics.char_entropy > 0.0);
+
+        let result = CharMetricsResult::compute("Hi, 42!", None);
+        assert_eq!(result.keys().len(), CHAR_METRIC_KEYS.len());
+        assert!(!result.profile.category_ngrams.bigram_counts().is_empty());
+    }
+}
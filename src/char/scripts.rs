@@ -0,0 +1,419 @@
+//! # Unicode Scripts
+//!
+//! This module classifies characters by writing system (Latin, Cyrillic, Han,
+//! Arabic, Devanagari, ...) using the Unicode Script property, for routing
+//! multilingual text and detecting mixed-script content.
+//!
+//! ## Key Features
+//!
+//! * The scripts of the major modern writing systems, with the rest grouped as
+//!   "Other"
+//! * Two-stage lookup table built once from the ICU data, as for categories
+//! * Script distribution, dominant script and script switches in one pass
+//!
+//! Characters shared between scripts (spaces, digits, most punctuation) have the
+//! script "Common", and combining marks that take the script of their base
+//! character have the script "Inherited". Neither counts as a script of its own
+//! for the dominant script or for script switches.
+
+use icu_properties::{maps, Script};
+use lazy_static::lazy_static;
+use std::collections::HashMap;
+
+use crate::char::categories::CategoryIndex;
+use crate::char::table::BlockTable;
+
+/// Unicode script of a character
+#[derive(Hash, Eq, PartialEq, Clone, Copy, Debug)]
+pub enum UnicodeScript {
+    Latin,
+    Greek,
+    Cyrillic,
+    Armenian,
+    Hebrew,
+    Arabic,
+    Syriac,
+    Thaana,
+    Devanagari,
+    Bengali,
+    Gurmukhi,
+    Gujarati,
+    Oriya,
+    Tamil,
+    Telugu,
+    Kannada,
+    Malayalam,
+    Sinhala,
+    Thai,
+    Lao,
+    Tibetan,
+    Myanmar,
+    Georgian,
+    Hangul,
+    Ethiopic,
+    Khmer,
+    Mongolian,
+    Hiragana,
+    Katakana,
+    Han,
+    Common,
+    Inherited,
+    Other,
+}
+
+/// Number of `UnicodeScript` values
+const SCRIPT_COUNT: usize = 33;
+
+/// Every script, in declaration order
+const ALL_SCRIPTS: [UnicodeScript; SCRIPT_COUNT] = [
+    UnicodeScript::Latin,
+    UnicodeScript::Greek,
+    UnicodeScript::Cyrillic,
+    UnicodeScript::Armenian,
+    UnicodeScript::Hebrew,
+    UnicodeScript::Arabic,
+    UnicodeScript::Syriac,
+    UnicodeScript::Thaana,
+    UnicodeScript::Devanagari,
+    UnicodeScript::Bengali,
+    UnicodeScript::Gurmukhi,
+    UnicodeScript::Gujarati,
+    UnicodeScript::Oriya,
+    UnicodeScript::Tamil,
+    UnicodeScript::Telugu,
+    UnicodeScript::Kannada,
+    UnicodeScript::Malayalam,
+    UnicodeScript::Sinhala,
+    UnicodeScript::Thai,
+    UnicodeScript::Lao,
+    UnicodeScript::Tibetan,
+    UnicodeScript::Myanmar,
+    UnicodeScript::Georgian,
+    UnicodeScript::Hangul,
+    UnicodeScript::Ethiopic,
+    UnicodeScript::Khmer,
+    UnicodeScript::Mongolian,
+    UnicodeScript::Hiragana,
+    UnicodeScript::Katakana,
+    UnicodeScript::Han,
+    UnicodeScript::Common,
+    UnicodeScript::Inherited,
+    UnicodeScript::Other,
+];
+
+/// ICU scripts with their own `UnicodeScript`; all others map to `Other`
+const ICU_SCRIPTS: [(Script, UnicodeScript); SCRIPT_COUNT - 1] = [
+    (Script::Latin, UnicodeScript::Latin),
+    (Script::Greek, UnicodeScript::Greek),
+    (Script::Cyrillic, UnicodeScript::Cyrillic),
+    (Script::Armenian, UnicodeScript::Armenian),
+    (Script::Hebrew, UnicodeScript::Hebrew),
+    (Script::Arabic, UnicodeScript::Arabic),
+    (Script::Syriac, UnicodeScript::Syriac),
+    (Script::Thaana, UnicodeScript::Thaana),
+    (Script::Devanagari, UnicodeScript::Devanagari),
+    (Script::Bengali, UnicodeScript::Bengali),
+    (Script::Gurmukhi, UnicodeScript::Gurmukhi),
+    (Script::Gujarati, UnicodeScript::Gujarati),
+    (Script::Oriya, UnicodeScript::Oriya),
+    (Script::Tamil, UnicodeScript::Tamil),
+    (Script::Telugu, UnicodeScript::Telugu),
+    (Script::Kannada, UnicodeScript::Kannada),
+    (Script::Malayalam, UnicodeScript::Malayalam),
+    (Script::Sinhala, UnicodeScript::Sinhala),
+    (Script::Thai, UnicodeScript::Thai),
+    (Script::Lao, UnicodeScript::Lao),
+    (Script::Tibetan, UnicodeScript::Tibetan),
+    (Script::Myanmar, UnicodeScript::Myanmar),
+    (Script::Georgian, UnicodeScript::Georgian),
+    (Script::Hangul, UnicodeScript::Hangul),
+    (Script::Ethiopic, UnicodeScript::Ethiopic),
+    (Script::Khmer, UnicodeScript::Khmer),
+    (Script::Mongolian, UnicodeScript::Mongolian),
+    (Script::Hiragana, UnicodeScript::Hiragana),
+    (Script::Katakana, UnicodeScript::Katakana),
+    (Script::Han, UnicodeScript::Han),
+    (Script::Common, UnicodeScript::Common),
+    (Script::Inherited, UnicodeScript::Inherited),
+];
+
+impl UnicodeScript {
+    /// Whether the script belongs to a writing system of its own, rather than
+    /// being shared (`Common`) or taken from the base character (`Inherited`)
+    pub fn is_specific(self) -> bool {
+        !matches!(self, UnicodeScript::Common | UnicodeScript::Inherited)
+    }
+}
+
+impl CategoryIndex for UnicodeScript {
+    const COUNT: usize = SCRIPT_COUNT;
+
+    #[inline]
+    fn index(self) -> usize {
+        self as usize
+    }
+
+    fn from_index(index: usize) -> Self {
+        ALL_SCRIPTS[index]
+    }
+
+    fn name(self) -> &'static str {
+        script_to_string(self)
+    }
+}
+
+/// Map an ICU script onto `UnicodeScript`
+fn from_icu_script(script: Script) -> UnicodeScript {
+    ICU_SCRIPTS
+        .iter()
+        .find(|&&(icu, _)| icu == script)
+        .map_or(UnicodeScript::Other, |&(_, script)| script)
+}
+
+lazy_static! {
+    // Built on first use from the ICU script data, shared by all threads
+    static ref SCRIPT_TABLE: BlockTable<UnicodeScript> = {
+        let icu = maps::script();
+        // Neighbouring code points nearly always share a script
+        let mut last = None;
+        BlockTable::build(|code_point| {
+            let script = icu.get32(code_point);
+            match last {
+                Some((icu_script, mapped)) if icu_script == script => mapped,
+                _ => {
+                    let mapped = from_icu_script(script);
+                    last = Some((script, mapped));
+                    mapped
+                }
+            }
+        })
+    };
+}
+
+/// Convert a character to its Unicode script with a two-stage table lookup
+pub fn char_to_script(ch: char) -> UnicodeScript {
+    SCRIPT_TABLE.get(ch)
+}
+
+/// Convert a Unicode script to its name
+pub fn script_to_string(script: UnicodeScript) -> &'static str {
+    match script {
+        UnicodeScript::Latin => "Latin",
+        UnicodeScript::Greek => "Greek",
+        UnicodeScript::Cyrillic => "Cyrillic",
+        UnicodeScript::Armenian => "Armenian",
+        UnicodeScript::Hebrew => "Hebrew",
+        UnicodeScript::Arabic => "Arabic",
+        UnicodeScript::Syriac => "Syriac",
+        UnicodeScript::Thaana => "Thaana",
+        UnicodeScript::Devanagari => "Devanagari",
+        UnicodeScript::Bengali => "Bengali",
+        UnicodeScript::Gurmukhi => "Gurmukhi",
+        UnicodeScript::Gujarati => "Gujarati",
+        UnicodeScript::Oriya => "Oriya",
+        UnicodeScript::Tamil => "Tamil",
+        UnicodeScript::Telugu => "Telugu",
+        UnicodeScript::Kannada => "Kannada",
+        UnicodeScript::Malayalam => "Malayalam",
+        UnicodeScript::Sinhala => "Sinhala",
+        UnicodeScript::Thai => "Thai",
+        UnicodeScript::Lao => "Lao",
+        UnicodeScript::Tibetan => "Tibetan",
+        UnicodeScript::Myanmar => "Myanmar",
+        UnicodeScript::Georgian => "Georgian",
+        UnicodeScript::Hangul => "Hangul",
+        UnicodeScript::Ethiopic => "Ethiopic",
+        UnicodeScript::Khmer => "Khmer",
+        UnicodeScript::Mongolian => "Mongolian",
+        UnicodeScript::Hiragana => "Hiragana",
+        UnicodeScript::Katakana => "Katakana",
+        UnicodeScript::Han => "Han",
+        UnicodeScript::Common => "Common",
+        UnicodeScript::Inherited => "Inherited",
+        UnicodeScript::Other => "Other",
+    }
+}
+
+/// Running script statistics of a character sequence
+///
+/// Keeps the count of every script and the first and last specific script seen,
+/// so tallies of consecutive pieces of a text can be combined exactly.
+#[derive(Debug, Clone)]
+pub struct ScriptTally {
+    counts: [usize; SCRIPT_COUNT],
+    switches: usize,
+    first: Option<UnicodeScript>,
+    last: Option<UnicodeScript>,
+}
+
+impl Default for ScriptTally {
+    fn default() -> Self {
+        ScriptTally {
+            counts: [0; SCRIPT_COUNT],
+            switches: 0,
+            first: None,
+            last: None,
+        }
+    }
+}
+
+impl ScriptTally {
+    /// Add the next character's script
+    #[inline]
+    pub fn push(&mut self, script: UnicodeScript) {
+        self.counts[script.index()] += 1;
+        self.visit(script);
+    }
+
+    /// Count `count` characters of a script without advancing the sequence
+    ///
+    /// Used with `visit` when the characters of a run are counted out of order.
+    #[inline]
+    pub fn add_count(&mut self, script: UnicodeScript, count: usize) {
+        self.counts[script.index()] += count;
+    }
+
+    /// Advance the sequence to a script without counting a character
+    #[inline]
+    pub fn visit(&mut self, script: UnicodeScript) {
+        if !script.is_specific() {
+            return;
+        }
+        match self.last {
+            Some(last) if last != script => self.switches += 1,
+            None => self.first = Some(script),
+            _ => {}
+        }
+        self.last = Some(script);
+    }
+
+    /// Add the tally of the sequence that directly follows this one
+    pub fn append(&mut self, next: ScriptTally) {
+        for (count, next) in self.counts.iter_mut().zip(next.counts) {
+            *count += next;
+        }
+        self.switches += next.switches;
+        if let (Some(last), Some(first)) = (self.last, next.first) {
+            if last != first {
+                self.switches += 1;
+            }
+        }
+        self.first = self.first.or(next.first);
+        self.last = next.last.or(self.last);
+    }
+
+    /// Number of characters counted
+    pub fn total(&self) -> usize {
+        self.counts.iter().sum()
+    }
+
+    /// Number of characters of a script
+    pub fn count(&self, script: UnicodeScript) -> usize {
+        self.counts[script.index()]
+    }
+
+    /// Changes of specific script between consecutive letters or marks,
+    /// ignoring `Common` and `Inherited` characters in between
+    pub fn switches(&self) -> usize {
+        self.switches
+    }
+
+    /// Most frequent specific script, the earliest declared on ties; `None` when
+    /// the text has only `Common` and `Inherited` characters
+    pub fn dominant(&self) -> Option<UnicodeScript> {
+        let mut dominant = None;
+        let mut best = 0;
+        for script in ALL_SCRIPTS.into_iter().filter(|s| s.is_specific()) {
+            let count = self.count(script);
+            if count > best {
+                best = count;
+                dominant = Some(script);
+            }
+        }
+        dominant
+    }
+
+    /// Nonzero script counts
+    pub fn counts(&self) -> HashMap<UnicodeScript, usize> {
+        ALL_SCRIPTS
+            .into_iter()
+            .map(|script| (script, self.count(script)))
+            .filter(|&(_, count)| count > 0)
+            .collect()
+    }
+
+    /// Share of the characters in each script present
+    pub fn ratios(&self) -> HashMap<UnicodeScript, f64> {
+        let total = self.total() as f64;
+        self.counts()
+            .into_iter()
+            .map(|(script, count)| (script, count as f64 / total))
+            .collect()
+    }
+}
+
+/// Script statistics of a text
+pub fn script_tally(text: &str) -> ScriptTally {
+    let mut tally = ScriptTally::default();
+    for c in text.chars() {
+        tally.push(char_to_script(c));
+    }
+    tally
+}
+
+/// Count the characters of each script in a text
+pub fn count_scripts(text: &str) -> HashMap<UnicodeScript, usize> {
+    script_tally(text).counts()
+}
+
+/// Calculate the share of the characters of a text in each script
+pub fn script_ratios(text: &str) -> HashMap<UnicodeScript, f64> {
+    script_tally(text).ratios()
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_char_to_script() {
+        assert_eq!(char_to_script('a'), UnicodeScript::Latin);
+        assert_eq!(char_to_script('é'), UnicodeScript::Latin);
+        assert_eq!(char_to_script('ж'), UnicodeScript::Cyrillic);
+        assert_eq!(char_to_script('中'), UnicodeScript::Han);
+        assert_eq!(char_to_script('ب'), UnicodeScript::Arabic);
+        assert_eq!(char_to_script('क'), UnicodeScript::Devanagari);
+        assert_eq!(char_to_script(' '), UnicodeScript::Common);
+        assert_eq!(char_to_script('7'), UnicodeScript::Common);
+        assert_eq!(char_to_script('\u{301}'), UnicodeScript::Inherited);
+        assert_eq!(char_to_script('ᚠ'), UnicodeScript::Other);
+
+        for (index, &script) in ALL_SCRIPTS.iter().enumerate() {
+            assert_eq!(script.index(), index);
+        }
+    }
+
+    #[test]
+    fn test_script_tally() {
+        let tally = script_tally("Hello мир, hello 世界!");
+        assert_eq!(tally.count(UnicodeScript::Latin), 10);
+        assert_eq!(tally.count(UnicodeScript::Cyrillic), 3);
+        assert_eq!(tally.count(UnicodeScript::Han), 2);
+        assert_eq!(tally.total(), "Hello мир, hello 世界!".chars().count());
+        assert_eq!(tally.switches(), 3);
+        assert_eq!(tally.dominant(), Some(UnicodeScript::Latin));
+        assert!((tally.ratios().values().sum::<f64>() - 1.0).abs() < 1e-10);
+
+        assert_eq!(script_tally("123 !?").dominant(), None);
+        assert_eq!(script_tally("").switches(), 0);
+
+        // Tallies of consecutive pieces combine exactly
+        let text = "abc 123 где 456 abc";
+        for split in (0..=text.len()).filter(|&i| text.is_char_boundary(i)) {
+            let mut tally = script_tally(&text[..split]);
+            tally.append(script_tally(&text[split..]));
+            assert_eq!(tally.switches(), 2, "split at {}", split);
+            assert_eq!(tally.counts(), count_scripts(text));
+        }
+    }
+}
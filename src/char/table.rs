@@ -0,0 +1,78 @@
+//! # Code Point Tables
+//!
+//! This module provides the two-stage lookup table behind the per-character
+//! property lookups of the `categories` and `scripts` modules. A property of any
+//! code point is found with two array loads, without hashing, caching or calls
+//! into the ICU data at lookup time.
+
+use std::collections::HashMap;
+use std::hash::Hash;
+
+/// Number of code points in one block of a table
+pub const BLOCK_SIZE: usize = 256;
+
+/// Number of blocks covering U+0000..U+10FFFF
+pub const BLOCK_COUNT: usize = 0x110000 / BLOCK_SIZE;
+
+/// Two-stage lookup table holding a property value for every code point
+///
+/// The code space is split into blocks of 256 code points. `blocks` maps each block
+/// to its row in `rows`, and identical rows (unassigned planes, CJK ideographs,
+/// Hangul syllables, private use areas) are stored only once, so a whole table
+/// takes a few hundred kilobytes.
+pub struct BlockTable<T> {
+    blocks: Vec<u16>,
+    rows: Vec<[T; BLOCK_SIZE]>,
+}
+
+impl<T: Copy + Eq + Hash> BlockTable<T> {
+    /// Build the table from the value of every code point
+    ///
+    /// `value` is called once per code point, surrogates included.
+    pub fn build(mut value: impl FnMut(u32) -> T) -> Self {
+        let mut blocks = Vec::with_capacity(BLOCK_COUNT);
+        let mut rows = Vec::new();
+        let mut row_ids = HashMap::new();
+
+        for block in 0..BLOCK_COUNT {
+            let start = (block * BLOCK_SIZE) as u32;
+            let row: [T; BLOCK_SIZE] = std::array::from_fn(|offset| value(start + offset as u32));
+
+            let id = *row_ids.entry(row).or_insert_with(|| {
+                rows.push(row);
+                (rows.len() - 1) as u16
+            });
+            blocks.push(id);
+        }
+
+        BlockTable { blocks, rows }
+    }
+
+    /// Value of a character
+    #[inline]
+    pub fn get(&self, ch: char) -> T {
+        let code_point = ch as usize;
+        self.rows[self.blocks[code_point / BLOCK_SIZE] as usize][code_point % BLOCK_SIZE]
+    }
+
+    /// Number of distinct rows stored
+    pub fn row_count(&self) -> usize {
+        self.rows.len()
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_block_table() {
+        let table = BlockTable::build(|code_point| code_point % 3 == 0 || code_point > 0xFFFF);
+        assert!(table.get('\u{0}'));
+        assert!(!table.get('a'));
+        assert!(table.get('\u{10000}'));
+        assert!(table.get('\u{10FFFF}'));
+        // Repeating blocks are stored once
+        assert!(table.row_count() <= 4);
+    }
+}
@@ -13,9 +13,18 @@
 //! These functions form the foundation for higher-level text analysis by providing
 //! accurate and efficient character-level metrics.
 
-use std::collections::HashSet;
+use lazy_static::lazy_static;
+use rayon::prelude::*;
+use std::cell::RefCell;
+use std::collections::{HashMap, HashSet};
 use unicode_categories::UnicodeCategories;
 
+use crate::char::categories::{
+    category_to_group, char_to_category, text_chunks, SequenceNgramCounter, UnicodeCategory,
+    UnicodeCategoryGroup,
+};
+use crate::char::scripts::{char_to_script, ScriptTally, UnicodeScript};
+
 /// Checks if a character is a letter (alphabetic)
 pub fn is_letter(ch: char) -> bool {
     ch.is_alphabetic()
@@ -286,13 +295,11 @@ pub fn punctuation_diversity(text: &str) -> usize {
 ///
 ///    Calculates the entropy of the distribution of character categories
 pub fn category_entropy(text: &str) -> f64 {
-    use crate::char::categories::char_to_category;
-
     if text.is_empty() {
         return 0.0;
     }
 
-    let mut category_counts = std::collections::HashMap::new();
+    let mut category_counts = HashMap::new();
     let total_chars = text.chars().count();
 
     // Count occurrences of each category
@@ -360,14 +367,9 @@ pub fn count_words(text: &str) -> usize {
 
 /// Counts the frequency of each character in a string
 pub fn char_frequency(text: &str) -> std::collections::HashMap<char, usize> {
-    let mut counts = std::collections::HashMap::new();
-
-    // Use a single pass through the text to count characters
-    for c in text.chars() {
-        *counts.entry(c).or_insert(0) += 1;
-    }
-
-    counts
+    let mut counter = CharCounter::default();
+    counter.add_str(text);
+    counter.into_map()
 }
 
 /// Calculates the Shannon entropy of a string at the character level
@@ -377,17 +379,138 @@ pub fn char_entropy(text: &str) -> f64 {
         return 0.0;
     }
 
-    let frequency = char_frequency(text);
-    let total_chars = text.chars().count() as f64;
+    // Reuse this thread's counter so the map for non-ASCII characters keeps its
+    // allocation across documents
+    CHAR_COUNTER.with(|counter| {
+        let mut counter = counter.borrow_mut();
+        counter.clear();
+        counter.add_str(text);
+        counter.entropy()
+    })
+}
 
-    // Calculate entropy using Shannon's formula: -sum(p_i * log2(p_i))
-    let mut entropy = 0.0;
-    for (_, count) in frequency {
-        let probability = count as f64 / total_chars;
-        entropy -= probability * probability.log2();
+thread_local! {
+    static CHAR_COUNTER: RefCell<CharCounter> = RefCell::new(CharCounter::default());
+}
+
+/// Character counts with dense storage for ASCII
+///
+/// ASCII characters are counted in a fixed array and all others in a hash map, so
+/// counting the ASCII bulk of typical text is an array increment per character
+/// rather than a hashed insert.
+#[derive(Debug, Clone)]
+pub struct CharCounter {
+    ascii: [usize; 128],
+    other: HashMap<char, usize>,
+    total: usize,
+}
+
+impl Default for CharCounter {
+    fn default() -> Self {
+        CharCounter {
+            ascii: [0; 128],
+            other: HashMap::new(),
+            total: 0,
+        }
+    }
+}
+
+impl CharCounter {
+    /// Count one character
+    #[inline]
+    pub fn add(&mut self, c: char) {
+        if c.is_ascii() {
+            self.ascii[c as usize] += 1;
+        } else {
+            *self.other.entry(c).or_insert(0) += 1;
+        }
+        self.total += 1;
     }
 
-    entropy
+    /// Count `count` occurrences of an ASCII byte
+    #[inline]
+    pub fn add_ascii(&mut self, byte: u8, count: usize) {
+        debug_assert!(byte.is_ascii());
+        self.ascii[byte as usize] += count;
+        self.total += count;
+    }
+
+    /// Count every character of a text
+    pub fn add_str(&mut self, text: &str) {
+        if text.is_ascii() {
+            for &byte in text.as_bytes() {
+                self.ascii[byte as usize] += 1;
+            }
+            self.total += text.len();
+        } else {
+            for c in text.chars() {
+                self.add(c);
+            }
+        }
+    }
+
+    /// Number of characters counted
+    pub fn total(&self) -> usize {
+        self.total
+    }
+
+    /// Occurrences of a character
+    pub fn get(&self, c: char) -> usize {
+        if c.is_ascii() {
+            self.ascii[c as usize]
+        } else {
+            self.other.get(&c).copied().unwrap_or(0)
+        }
+    }
+
+    /// Counts of the distinct characters seen, in no particular order
+    pub fn counts(&self) -> impl Iterator<Item = usize> + '_ {
+        let ascii = self.ascii.iter().copied().filter(|&count| count > 0);
+        ascii.chain(self.other.values().copied())
+    }
+
+    /// Characters seen with their counts, ASCII first
+    pub fn iter(&self) -> impl Iterator<Item = (char, usize)> + '_ {
+        let ascii = self.ascii.iter().enumerate();
+        ascii
+            .filter(|&(_, &count)| count > 0)
+            .map(|(byte, &count)| (byte as u8 as char, count))
+            .chain(self.other.iter().map(|(&c, &count)| (c, count)))
+    }
+
+    /// Shannon entropy in bits of the character distribution
+    pub fn entropy(&self) -> f64 {
+        shannon_entropy(self.counts(), self.total)
+    }
+
+    /// Add the counts of another counter
+    pub fn merge(&mut self, other: CharCounter) {
+        for (count, other) in self.ascii.iter_mut().zip(other.ascii) {
+            *count += other;
+        }
+        for (c, count) in other.other {
+            *self.other.entry(c).or_insert(0) += count;
+        }
+        self.total += other.total;
+    }
+
+    /// Forget all counts, keeping the allocated storage
+    pub fn clear(&mut self) {
+        self.ascii = [0; 128];
+        self.other.clear();
+        self.total = 0;
+    }
+
+    /// Counts as a map from character to occurrences
+    pub fn into_map(self) -> HashMap<char, usize> {
+        let mut map = self.other;
+        for (byte, &count) in self.ascii.iter().enumerate() {
+            if count > 0 {
+                map.insert(byte as u8 as char, count);
+            }
+        }
+        map
+    }
 }
 
 /// Counts the frequency of each character type (letter, digit, punctuation, etc.) in a string
@@ -457,192 +580,515 @@ pub struct CharMetrics {
     // New ratio metrics
     pub case_ratio: f64,
     pub category_entropy: f64,
+
+    // Script metrics
+    /// Changes of script between consecutive letters, ignoring shared characters
+    pub script_switches: usize,
+    /// Most frequent script other than Common and Inherited
+    pub dominant_script: Option<UnicodeScript>,
+}
+
+/// Character metrics together with the per-character tables gathered while computing them
+///
+/// Lets callers that also report frequencies, category ratios or category n-grams
+/// reuse the traversal done for `CharMetrics` instead of re-scanning the text.
+pub struct CharProfile {
+    pub metrics: CharMetrics,
+    /// Occurrences of each character, as returned by `char_frequency`; empty if
+    /// the tally did not track frequencies
+    pub frequency: HashMap<char, usize>,
+    /// Occurrences of each Unicode category, as returned by `count_categories`
+    pub category_counts: HashMap<UnicodeCategory, usize>,
+    /// Bigrams and trigrams of the Unicode categories of the text
+    pub category_ngrams: SequenceNgramCounter<UnicodeCategory>,
+    /// Bigrams and trigrams of the Unicode category groups of the text
+    pub group_ngrams: SequenceNgramCounter<UnicodeCategoryGroup>,
+    /// Occurrences of each Unicode script
+    pub scripts: ScriptTally,
+}
+
+impl CharProfile {
+    /// Occurrences of each Unicode category group, as returned by `count_category_groups`
+    pub fn group_counts(&self) -> HashMap<UnicodeCategoryGroup, usize> {
+        let mut counts = HashMap::new();
+        for (&category, &count) in &self.category_counts {
+            *counts.entry(category_to_group(category)).or_insert(0) += count;
+        }
+        counts
+    }
 }
 
 /// Calculates all character metrics in a single pass (optimized Rust implementation)
 /// Returns both count metrics and ratio metrics in a single struct
 pub fn calculate_char_metrics(text: &str) -> CharMetrics {
-    // Initial counts
-    let mut total_chars = 0;
-    let mut letters = 0;
-    let mut digits = 0;
-    let mut punctuation = 0;
-    let mut symbols = 0;
-    let mut whitespace = 0;
-    let mut non_ascii = 0;
-    let mut uppercase = 0;
-    let mut lowercase = 0;
-    let mut alphanumeric = 0;
-
-    // For entropy calculation
-    let mut char_counts = std::collections::HashMap::new();
+    CharTally::scan(text, false, true).metrics()
+}
+
+/// Calculates all character metrics and keeps the frequency and category tables
+pub fn calculate_char_profile(text: &str) -> CharProfile {
+    CharTally::scan(text, true, true).into_profile()
+}
+
+/// Texts longer than this many bytes are tallied in parallel pieces
+const PARALLEL_TALLY_THRESHOLD: usize = 256 * 1024;
+
+/// Smallest piece of a text tallied on its own by `CharTally::scan`
+const MIN_TALLY_CHUNK_LEN: usize = 64 * 1024;
+
+/// Size of the blocks checked for the ASCII fast path of `CharTally::push_str`
+const ASCII_BLOCK: usize = 64;
+
+/// Classification of an ASCII character, as computed by the per-character path
+#[derive(Clone, Copy)]
+struct AsciiClass {
+    /// Character type as returned by `get_char_type`
+    char_type: u8,
+    lowercase: bool,
+    category: UnicodeCategory,
+    script: UnicodeScript,
+}
+
+lazy_static! {
+    // Derived from the character predicates so both paths always agree
+    static ref ASCII_CLASSES: [AsciiClass; 128] = std::array::from_fn(|byte| {
+        let c = byte as u8 as char;
+        AsciiClass {
+            char_type: get_char_type(&c),
+            lowercase: is_lowercase(c),
+            category: char_to_category(c),
+            script: char_to_script(c),
+        }
+    });
+}
+
+/// Running state behind `CharMetrics`, fed one character at a time
+///
+/// Everything the metrics depend on is kept as counts (plus the type of the last
+/// character for transitions and runs), so a text can be fed in any number of
+/// pieces and give the same result as a single `calculate_char_metrics` call.
+#[derive(Debug, Clone, Default)]
+pub struct CharTally {
+    total_chars: usize,
+    letters: usize,
+    digits: usize,
+    punctuation: usize,
+    symbols: usize,
+    whitespace: usize,
+    non_ascii: usize,
+    uppercase: usize,
+    lowercase: usize,
+    alphanumeric: usize,
+    char_type_transitions: usize,
+
+    // Type of the last character, for transitions and runs
+    last_type: Option<u8>,
+
+    // For entropy and character frequencies, only counted when requested
+    track_frequency: bool,
+    char_counts: CharCounter,
 
     // For punctuation diversity
-    let mut unique_punctuation = std::collections::HashSet::new();
+    unique_punctuation: HashSet<char>,
 
     // For category entropy
-    use crate::char::categories::char_to_category;
-    let mut category_counts = std::collections::HashMap::new();
+    category_counts: HashMap<UnicodeCategory, usize>,
 
-    // Use a single pass through the text to count all metrics at once
-    for c in text.chars() {
-        total_chars += 1;
+    // For script ratios, the dominant script and script switches
+    scripts: ScriptTally,
+
+    // Category n-grams, only counted when requested
+    track_ngrams: bool,
+    category_ngrams: SequenceNgramCounter<UnicodeCategory>,
+    group_ngrams: SequenceNgramCounter<UnicodeCategoryGroup>,
+}
+
+impl CharTally {
+    /// Create an empty tally, optionally counting category bigrams and trigrams and
+    /// the occurrences of each character (needed for `char_entropy`)
+    pub fn new(track_ngrams: bool, track_frequency: bool) -> Self {
+        CharTally {
+            track_ngrams,
+            track_frequency,
+            ..Default::default()
+        }
+    }
+
+    /// Empty tally for the part of a text that follows `before`
+    ///
+    /// Only the last two characters of `before` are read. They set the state
+    /// carried from one character to the next (the last character type and the
+    /// category n-gram context), so the pieces of a text can be tallied
+    /// separately and combined with `append`.
+    pub fn resume(before: &str, track_ngrams: bool, track_frequency: bool) -> Self {
+        let mut context = before.chars().rev();
+        let last = context.next();
+        let before_last = context.next();
+        let categories = (
+            before_last.map(char_to_category),
+            last.map(char_to_category),
+        );
+
+        let mut tally = CharTally::new(track_ngrams, track_frequency);
+        tally.last_type = last.map(|c| get_char_type(&c));
+        if track_ngrams {
+            tally.category_ngrams = SequenceNgramCounter::resume(categories.0, categories.1, true);
+            tally.group_ngrams = SequenceNgramCounter::resume(
+                categories.0.map(category_to_group),
+                categories.1.map(category_to_group),
+                true,
+            );
+        }
+        tally
+    }
+
+    /// Tally of a whole text
+    ///
+    /// Texts above a size threshold are split at character boundaries, the pieces
+    /// are tallied in parallel and combined in order, giving exactly the result of
+    /// `push_str` on the whole text.
+    pub fn scan(text: &str, track_ngrams: bool, track_frequency: bool) -> Self {
+        if text.len() <= PARALLEL_TALLY_THRESHOLD {
+            let mut tally = CharTally::new(track_ngrams, track_frequency);
+            tally.push_str(text);
+            return tally;
+        }
+
+        let pieces: Vec<CharTally> = text_chunks(text, MIN_TALLY_CHUNK_LEN)
+            .into_par_iter()
+            .map(|(start, chunk)| {
+                let mut tally = CharTally::resume(&text[..start], track_ngrams, track_frequency);
+                tally.push_str(chunk);
+                tally
+            })
+            .collect();
+
+        let mut tally = CharTally::new(track_ngrams, track_frequency);
+        for piece in pieces {
+            tally.append(piece);
+        }
+        tally
+    }
+
+    /// Add the tally of the text that directly follows the text tallied here
+    ///
+    /// `next` must have been created with `resume` from the end of this text, so
+    /// that transitions and n-grams across the seam are counted exactly once.
+    pub fn append(&mut self, next: CharTally) {
+        self.total_chars += next.total_chars;
+        self.letters += next.letters;
+        self.digits += next.digits;
+        self.punctuation += next.punctuation;
+        self.symbols += next.symbols;
+        self.whitespace += next.whitespace;
+        self.non_ascii += next.non_ascii;
+        self.uppercase += next.uppercase;
+        self.lowercase += next.lowercase;
+        self.alphanumeric += next.alphanumeric;
+        self.char_type_transitions += next.char_type_transitions;
+        if next.last_type.is_some() {
+            self.last_type = next.last_type;
+        }
+
+        self.char_counts.merge(next.char_counts);
+        self.unique_punctuation.extend(next.unique_punctuation);
+        for (category, count) in next.category_counts {
+            *self.category_counts.entry(category).or_insert(0) += count;
+        }
+        self.scripts.append(next.scripts);
+        if self.track_ngrams {
+            self.category_ngrams.append(next.category_ngrams);
+            self.group_ngrams.append(next.group_ngrams);
+        }
+    }
+
+    /// Number of characters seen so far
+    pub fn total_chars(&self) -> usize {
+        self.total_chars
+    }
+
+    /// Add every character of a text
+    ///
+    /// Runs of all-ASCII 64-byte blocks are counted from the raw bytes; blocks
+    /// containing other characters are decoded and added one character at a time.
+    pub fn push_str(&mut self, text: &str) {
+        let bytes = text.as_bytes();
+        let mut start = 0;
+        while start < bytes.len() {
+            let mut end = start;
+            while end < bytes.len() {
+                let block_end = (end + ASCII_BLOCK).min(bytes.len());
+                if !bytes[end..block_end].is_ascii() {
+                    break;
+                }
+                end = block_end;
+            }
+            if end > start {
+                self.push_ascii(&bytes[start..end]);
+                start = end;
+            }
+
+            if start < bytes.len() {
+                let mut block_end = (start + ASCII_BLOCK).min(bytes.len());
+                while !text.is_char_boundary(block_end) {
+                    block_end += 1;
+                }
+                for c in text[start..block_end].chars() {
+                    self.push(c);
+                }
+                start = block_end;
+            }
+        }
+    }
+
+    /// Add a run of ASCII bytes using the precomputed ASCII classes
+    fn push_ascii(&mut self, bytes: &[u8]) {
+        let classes = &*ASCII_CLASSES;
+
+        // Per-byte work is a histogram update and a transition check; every
+        // table and counter is then updated once per distinct byte
+        let mut histogram = [0usize; 128];
+        let mut last_type = self.last_type;
+        for &byte in bytes {
+            histogram[byte as usize] += 1;
+            let char_type = classes[byte as usize].char_type;
+            if matches!(last_type, Some(last) if last != char_type) {
+                self.char_type_transitions += 1;
+            }
+            last_type = Some(char_type);
+        }
+        self.last_type = last_type;
+
+        // ASCII letters are all Latin and other ASCII is Common, so the run
+        // switches script at most once, at its first letter
+        if let Some(script) = bytes
+            .iter()
+            .map(|&byte| classes[byte as usize].script)
+            .find(|script| script.is_specific())
+        {
+            self.scripts.visit(script);
+        }
+
+        if self.track_ngrams {
+            for &byte in bytes {
+                let category = classes[byte as usize].category;
+                self.category_ngrams.push(category);
+                self.group_ngrams.push(category_to_group(category));
+            }
+        }
+
+        self.total_chars += bytes.len();
+        for (byte, &count) in histogram.iter().enumerate() {
+            if count == 0 {
+                continue;
+            }
+            let c = byte as u8 as char;
+            let class = classes[byte];
+            if self.track_frequency {
+                self.char_counts.add_ascii(byte as u8, count);
+            }
+            *self.category_counts.entry(class.category).or_insert(0) += count;
+            self.scripts.add_count(class.script, count);
+
+            // The branches of `push`, by character type
+            match class.char_type {
+                1 => {
+                    self.letters += count;
+                    self.alphanumeric += count;
+                    self.uppercase += count;
+                }
+                2 => {
+                    self.letters += count;
+                    self.alphanumeric += count;
+                    if class.lowercase {
+                        self.lowercase += count;
+                    }
+                }
+                3 => {
+                    self.digits += count;
+                    self.alphanumeric += count;
+                }
+                4 => {
+                    self.punctuation += count;
+                    self.unique_punctuation.insert(c);
+                }
+                5 => self.symbols += count,
+                6 => self.whitespace += count,
+                _ => {}
+            }
+        }
+    }
+
+    /// Add one character
+    pub fn push(&mut self, c: char) {
+        self.total_chars += 1;
 
         // Update character frequency for entropy calculation
-        *char_counts.entry(c).or_insert(0) += 1;
+        if self.track_frequency {
+            self.char_counts.add(c);
+        }
 
         // Update category for category entropy
         let category = char_to_category(c);
-        *category_counts.entry(category).or_insert(0) += 1;
+        *self.category_counts.entry(category).or_insert(0) += 1;
+        self.scripts.push(char_to_script(c));
+        if self.track_ngrams {
+            self.category_ngrams.push(category);
+            self.group_ngrams.push(category_to_group(category));
+        }
 
         if is_letter(c) {
-            letters += 1;
-            alphanumeric += 1;
+            self.letters += 1;
+            self.alphanumeric += 1;
 
             if is_uppercase(c) {
-                uppercase += 1;
+                self.uppercase += 1;
             } else if is_lowercase(c) {
-                lowercase += 1;
+                self.lowercase += 1;
             }
         } else if is_digit(c) {
-            digits += 1;
-            alphanumeric += 1;
+            self.digits += 1;
+            self.alphanumeric += 1;
         } else if is_punctuation(c) {
-            punctuation += 1;
-            unique_punctuation.insert(c);
+            self.punctuation += 1;
+            self.unique_punctuation.insert(c);
         } else if is_symbol(c) {
-            symbols += 1;
+            self.symbols += 1;
         } else if is_whitespace(c) {
-            whitespace += 1;
+            self.whitespace += 1;
         }
 
         if !c.is_ascii() {
-            non_ascii += 1;
+            self.non_ascii += 1;
+        }
+
+        // Same transitions as `count_char_type_transitions`
+        let char_type = get_char_type(&c);
+        if matches!(self.last_type, Some(last) if last != char_type) {
+            self.char_type_transitions += 1;
         }
+        self.last_type = Some(char_type);
     }
 
-    // Calculate metrics that need a separate pass
-    let char_type_transitions = count_char_type_transitions(text);
-    let consecutive_runs = count_consecutive_runs(text);
-    let punctuation_diversity = unique_punctuation.len();
+    /// Metrics of all characters added so far
+    pub fn metrics(&self) -> CharMetrics {
+        let total_chars = self.total_chars;
+        let letters = self.letters;
+        let digits = self.digits;
+        let uppercase = self.uppercase;
+        let lowercase = self.lowercase;
+
+        // Every transition starts a new run, as in `count_consecutive_runs`
+        let char_type_transitions = self.char_type_transitions;
+        let consecutive_runs = if total_chars > 0 {
+            char_type_transitions + 1
+        } else {
+            0
+        };
+        let punctuation_diversity = self.unique_punctuation.len();
+
+        // Calculate ratios, handling empty text cases
+        let ratio = |count: usize| {
+            if total_chars > 0 {
+                count as f64 / total_chars as f64
+            } else {
+                0.0
+            }
+        };
+        let ratio_uppercase = if letters > 0 {
+            uppercase as f64 / letters as f64
+        } else {
+            0.0
+        };
+        let ratio_lowercase = if letters > 0 {
+            lowercase as f64 / letters as f64
+        } else {
+            0.0
+        };
+        let ratio_alpha_to_numeric = if digits > 0 {
+            letters as f64 / digits as f64
+        } else if letters > 0 {
+            // Use large but finite number instead of infinity for consistency
+            1e6 * letters as f64
+        } else {
+            0.0
+        };
 
-    // Calculate ratios, handling empty text cases
-    let ratio_letters = if total_chars > 0 {
-        letters as f64 / total_chars as f64
-    } else {
-        0.0
-    };
-    let ratio_digits = if total_chars > 0 {
-        digits as f64 / total_chars as f64
-    } else {
-        0.0
-    };
-    let ratio_punctuation = if total_chars > 0 {
-        punctuation as f64 / total_chars as f64
-    } else {
-        0.0
-    };
-    let ratio_symbols = if total_chars > 0 {
-        symbols as f64 / total_chars as f64
-    } else {
-        0.0
-    };
-    let ratio_whitespace = if total_chars > 0 {
-        whitespace as f64 / total_chars as f64
-    } else {
-        0.0
-    };
-    let ratio_non_ascii = if total_chars > 0 {
-        non_ascii as f64 / total_chars as f64
-    } else {
-        0.0
-    };
-    let ratio_uppercase = if letters > 0 {
-        uppercase as f64 / letters as f64
-    } else {
-        0.0
-    };
-    let ratio_lowercase = if letters > 0 {
-        lowercase as f64 / letters as f64
-    } else {
-        0.0
-    };
-    let ratio_alphanumeric = if total_chars > 0 {
-        alphanumeric as f64 / total_chars as f64
-    } else {
-        0.0
-    };
-    let ratio_alpha_to_numeric = if digits > 0 {
-        letters as f64 / digits as f64
-    } else if letters > 0 {
-        // Use large but finite number instead of infinity for consistency
-        1e6 * letters as f64
-    } else {
-        0.0
-    };
+        // New ratio metrics
+        let case_ratio = if lowercase > 0 {
+            uppercase as f64 / lowercase as f64
+        } else if uppercase > 0 {
+            1e6 * uppercase as f64
+        } else {
+            0.0
+        };
 
-    // New ratio metrics
-    let case_ratio = if lowercase > 0 {
-        uppercase as f64 / lowercase as f64
-    } else if uppercase > 0 {
-        1e6 * uppercase as f64
-    } else {
-        0.0
-    };
-
-    // Calculate character entropy
-    let mut char_entropy = 0.0;
-    if total_chars > 0 {
-        let total_chars_f64 = total_chars as f64;
-        for (_, count) in char_counts {
-            let probability = count as f64 / total_chars_f64;
-            char_entropy -= probability * probability.log2();
-        }
-    }
-
-    // Calculate category entropy
-    let mut category_entropy = 0.0;
-    if total_chars > 0 {
-        let total_chars_f64 = total_chars as f64;
-        for (_, count) in category_counts {
-            let probability = count as f64 / total_chars_f64;
-            category_entropy -= probability * probability.log2();
-        }
-    }
-
-    CharMetrics {
-        total_chars,
-        letters,
-        digits,
-        punctuation,
-        symbols,
-        whitespace,
-        non_ascii,
-        uppercase,
-        lowercase,
-        alphanumeric,
-
-        // New count metrics
-        char_type_transitions,
-        consecutive_runs,
-        punctuation_diversity,
-
-        ratio_letters,
-        ratio_digits,
-        ratio_punctuation,
-        ratio_symbols,
-        ratio_whitespace,
-        ratio_non_ascii,
-        ratio_uppercase,
-        ratio_lowercase,
-        ratio_alphanumeric,
-        ratio_alpha_to_numeric,
-        char_entropy,
+        CharMetrics {
+            total_chars,
+            letters,
+            digits,
+            punctuation: self.punctuation,
+            symbols: self.symbols,
+            whitespace: self.whitespace,
+            non_ascii: self.non_ascii,
+            uppercase,
+            lowercase,
+            alphanumeric: self.alphanumeric,
+
+            // New count metrics
+            char_type_transitions,
+            consecutive_runs,
+            punctuation_diversity,
+
+            ratio_letters: ratio(letters),
+            ratio_digits: ratio(digits),
+            ratio_punctuation: ratio(self.punctuation),
+            ratio_symbols: ratio(self.symbols),
+            ratio_whitespace: ratio(self.whitespace),
+            ratio_non_ascii: ratio(self.non_ascii),
+            ratio_uppercase,
+            ratio_lowercase,
+            ratio_alphanumeric: ratio(self.alphanumeric),
+            ratio_alpha_to_numeric,
+            char_entropy: self.char_counts.entropy(),
+
+            // New ratio metrics
+            case_ratio,
+            category_entropy: shannon_entropy(self.category_counts.values().copied(), total_chars),
+
+            script_switches: self.scripts.switches(),
+            dominant_script: self.scripts.dominant(),
+        }
+    }
 
-        // New ratio metrics
-        case_ratio,
-        category_entropy,
+    /// Metrics and tables of all characters added so far
+    pub fn profile(&self) -> CharProfile {
+        self.clone().into_profile()
+    }
+
+    /// Metrics and tables of all characters added, without copying the tables
+    pub fn into_profile(self) -> CharProfile {
+        CharProfile {
+            metrics: self.metrics(),
+            frequency: self.char_counts.into_map(),
+            category_counts: self.category_counts,
+            category_ngrams: self.category_ngrams,
+            group_ngrams: self.group_ngrams,
+            scripts: self.scripts,
+        }
+    }
+}
+
+/// Shannon entropy in bits of a distribution given as counts summing to `total`
+fn shannon_entropy(counts: impl Iterator<Item = usize>, total: usize) -> f64 {
+    let mut entropy = 0.0;
+    if total > 0 {
+        let total_f64 = total as f64;
+        for count in counts {
+            let probability = count as f64 / total_f64;
+            entropy -= probability * probability.log2();
+        }
     }
+    entropy
 }
 
 /// Performs combined character metrics in a single pass (optimized Rust implementation)
@@ -1016,4 +1462,152 @@ mod tests {
         assert!(letters_metrics.category_entropy > 0.0);
         assert_eq!(letters_metrics.punctuation_diversity, 0);
     }
+
+    #[test]
+    fn test_char_profile_matches_separate_functions() {
+        use crate::char::categories::{count_categories, count_category_groups};
+
+        let text = "Hello, World! Ça va? 123\n\tdone…";
+        let profile = calculate_char_profile(text);
+
+        assert_eq!(profile.metrics.total_chars, text.chars().count());
+        assert_eq!(profile.frequency, char_frequency(text));
+        assert_eq!(profile.category_counts, count_categories(text));
+        assert_eq!(profile.group_counts(), count_category_groups(text));
+        assert_eq!(
+            profile.category_ngrams.trigrams().values().sum::<usize>(),
+            text.chars().count()
+        );
+    }
+
+    #[test]
+    fn test_char_counter() {
+        let text = "Hello, naïve world! 日本";
+        let mut counter = CharCounter::default();
+        counter.add_str(text);
+
+        assert_eq!(counter.total(), text.chars().count());
+        assert_eq!(counter.get('l'), 3);
+        assert_eq!(counter.get('ï'), 1);
+        assert_eq!(counter.get('z'), 0);
+        assert_eq!(counter.counts().sum::<usize>(), counter.total());
+        assert_eq!(counter.iter().count(), counter.clone().into_map().len());
+
+        let mut expected = HashMap::new();
+        for c in text.chars() {
+            *expected.entry(c).or_insert(0) += 1;
+        }
+        assert_eq!(counter.clone().into_map(), expected);
+        assert!((char_entropy(text) - counter.entropy()).abs() < 1e-12);
+
+        counter.clear();
+        assert_eq!(counter.total(), 0);
+        assert_eq!(counter.entropy(), 0.0);
+    }
+
+    #[test]
+    fn test_ascii_fast_path_matches_per_char() {
+        let ascii: String = (0u8..128).map(char::from).cycle().take(1000).collect();
+        let mixed = format!("{}é{}日本{}", &ascii[..100], &ascii[..70], &ascii[200..]);
+
+        for text in [ascii.as_str(), mixed.as_str(), "a", "Hello, World!"] {
+            let mut fast = CharTally::new(true, true);
+            fast.push_str(text);
+            let mut slow = CharTally::new(true, true);
+            for c in text.chars() {
+                slow.push(c);
+            }
+
+            let (fast, slow) = (fast.into_profile(), slow.into_profile());
+            assert_eq!(fast.metrics.letters, slow.metrics.letters);
+            assert_eq!(fast.metrics.lowercase, slow.metrics.lowercase);
+            assert_eq!(fast.metrics.punctuation, slow.metrics.punctuation);
+            assert_eq!(fast.metrics.symbols, slow.metrics.symbols);
+            assert_eq!(fast.metrics.whitespace, slow.metrics.whitespace);
+            assert_eq!(fast.metrics.non_ascii, slow.metrics.non_ascii);
+            assert_eq!(
+                fast.metrics.char_type_transitions,
+                slow.metrics.char_type_transitions
+            );
+            assert_eq!(
+                fast.metrics.punctuation_diversity,
+                slow.metrics.punctuation_diversity
+            );
+            assert_eq!(fast.frequency, slow.frequency);
+            assert_eq!(fast.category_counts, slow.category_counts);
+            assert_eq!(
+                fast.category_ngrams.trigrams(),
+                slow.category_ngrams.trigrams()
+            );
+        }
+    }
+
+    #[test]
+    fn test_parallel_scan_matches_sequential() {
+        // Runs that straddle piece boundaries, punctuation first seen in later
+        // pieces and multi-byte characters near the seams
+        let base = "Hello, World!  Ça va?\n\t12345 日本語テキスト — done… ";
+        let text: String = (0..12_000)
+            .map(|i| format!("{}{}", base, ['!', '¿', '#', '«'][i % 4]))
+            .collect();
+        assert!(text.len() > PARALLEL_TALLY_THRESHOLD);
+
+        let parallel = CharTally::scan(&text, true, true).into_profile();
+        let mut tally = CharTally::new(true, true);
+        tally.push_str(&text);
+        let sequential = tally.into_profile();
+
+        let (p, s) = (&parallel.metrics, &sequential.metrics);
+        assert_eq!(p.total_chars, s.total_chars);
+        assert_eq!(p.letters, s.letters);
+        assert_eq!(p.uppercase, s.uppercase);
+        assert_eq!(p.non_ascii, s.non_ascii);
+        assert_eq!(p.char_type_transitions, s.char_type_transitions);
+        assert_eq!(p.consecutive_runs, s.consecutive_runs);
+        assert_eq!(p.punctuation_diversity, s.punctuation_diversity);
+        assert!((p.char_entropy - s.char_entropy).abs() < 1e-9);
+        assert!((p.category_entropy - s.category_entropy).abs() < 1e-9);
+        assert_eq!(parallel.frequency, sequential.frequency);
+        assert_eq!(parallel.category_counts, sequential.category_counts);
+        assert_eq!(
+            parallel.category_ngrams.trigram_table(),
+            sequential.category_ngrams.trigram_table()
+        );
+        assert_eq!(
+            parallel.group_ngrams.bigram_table(),
+            sequential.group_ngrams.bigram_table()
+        );
+    }
+
+    #[test]
+    fn test_char_tally_in_pieces() {
+        let text = "Hello, World! Ça va? 123\n\tdone…";
+        let whole = calculate_char_profile(text);
+
+        let mut tally = CharTally::new(true, true);
+        for piece in ["Hello, Wo", "", "rld! Ça", " va? 1", "23\n\tdone…"] {
+            tally.push_str(piece);
+        }
+        let pieces = tally.profile();
+
+        assert_eq!(pieces.metrics.total_chars, whole.metrics.total_chars);
+        assert_eq!(
+            pieces.metrics.char_type_transitions,
+            count_char_type_transitions(text)
+        );
+        assert_eq!(
+            pieces.metrics.consecutive_runs,
+            count_consecutive_runs(text)
+        );
+        assert!((pieces.metrics.char_entropy - whole.metrics.char_entropy).abs() < 1e-12);
+        assert_eq!(pieces.frequency, whole.frequency);
+        assert_eq!(
+            pieces.category_ngrams.bigrams(),
+            whole.category_ngrams.bigrams()
+        );
+        assert_eq!(
+            pieces.group_ngrams.trigrams(),
+            whole.group_ngrams.trigrams()
+        );
+    }
 }
@@ -0,0 +1,195 @@
+//! # Apache Arrow Interchange
+//!
+//! This module reads text columns from pyarrow through the Arrow C Data Interface
+//! and writes batch metrics back as an Arrow `RecordBatch`, so corpus shards stored
+//! as Parquet/Arrow can be analyzed without copying every document into a Python
+//! string and then into a Rust `String`.
+//!
+//! ## Key Features
+//!
+//! * Zero-copy access to `StringArray` and `LargeStringArray` UTF-8 buffers
+//! * Null input rows propagate to null output rows in every metric column
+//! * Typed output columns (Int64, Float64, Boolean, Map<Utf8, Int64>)
+
+use arrow::array::{
+    Array, ArrayRef, BooleanArray, Float64Array, Int64Array, Int64Builder, LargeStringArray,
+    MapBuilder, StringArray, StringBuilder,
+};
+use arrow::buffer::NullBuffer;
+use arrow::datatypes::{DataType, Field, Schema};
+use arrow::error::ArrowError;
+use arrow::pyarrow::{FromPyArrow, ToPyArrow};
+use arrow::record_batch::{RecordBatch, RecordBatchOptions};
+use pyo3::prelude::*;
+use std::sync::Arc;
+
+use super::{Column, ColumnSet};
+
+/// A borrowed view of an Arrow text column
+pub enum TextArray {
+    Utf8(StringArray),
+    LargeUtf8(LargeStringArray),
+}
+
+impl TextArray {
+    /// Import a pyarrow `StringArray` or `LargeStringArray` without copying its buffers
+    pub fn from_pyarrow(obj: &Bound<'_, PyAny>) -> PyResult<Self> {
+        let data = arrow::array::ArrayData::from_pyarrow_bound(obj)?;
+        match data.data_type() {
+            DataType::Utf8 => Ok(TextArray::Utf8(StringArray::from(data))),
+            DataType::LargeUtf8 => Ok(TextArray::LargeUtf8(LargeStringArray::from(data))),
+            other => Err(PyErr::new::<pyo3::exceptions::PyTypeError, _>(format!(
+                "expected an Arrow string or large_string array, got {}",
+                other
+            ))),
+        }
+    }
+
+    /// Number of rows, including nulls
+    pub fn len(&self) -> usize {
+        match self {
+            TextArray::Utf8(array) => array.len(),
+            TextArray::LargeUtf8(array) => array.len(),
+        }
+    }
+
+    /// Whether the array has no rows
+    pub fn is_empty(&self) -> bool {
+        self.len() == 0
+    }
+
+    /// Text of a row, read in place; null rows read as the empty string
+    pub fn value(&self, index: usize) -> &str {
+        match self {
+            TextArray::Utf8(array) if array.is_valid(index) => array.value(index),
+            TextArray::LargeUtf8(array) if array.is_valid(index) => array.value(index),
+            _ => "",
+        }
+    }
+
+    /// Validity bitmap of the input, if it contains nulls
+    pub fn nulls(&self) -> Option<&NullBuffer> {
+        match self {
+            TextArray::Utf8(array) => array.nulls(),
+            TextArray::LargeUtf8(array) => array.nulls(),
+        }
+    }
+}
+
+/// Convert a column into an Arrow array, applying the given validity bitmap
+fn column_to_arrow(column: Column, nulls: Option<&NullBuffer>) -> Result<ArrayRef, ArrowError> {
+    Ok(match column {
+        Column::Int64(values) => Arc::new(Int64Array::new(values.into(), nulls.cloned())),
+        Column::Float64(values) => Arc::new(Float64Array::new(values.into(), nulls.cloned())),
+        Column::Bool(values) => Arc::new(BooleanArray::new(
+            values.into_iter().collect(),
+            nulls.cloned(),
+        )),
+        Column::Counts(maps) => {
+            let mut builder = MapBuilder::new(None, StringBuilder::new(), Int64Builder::new());
+            for (index, map) in maps.into_iter().enumerate() {
+                let is_valid = nulls.map_or(true, |n| n.is_valid(index));
+                if is_valid {
+                    for (key, count) in map {
+                        builder.keys().append_value(key);
+                        builder.values().append_value(count as i64);
+                    }
+                }
+                builder.append(is_valid)?;
+            }
+            Arc::new(builder.finish())
+        }
+    })
+}
+
+impl ColumnSet {
+    /// Convert into an Arrow `RecordBatch` with `num_rows` rows.
+    ///
+    /// Rows marked null in `nulls` are null in every output column.
+    pub fn into_record_batch(
+        self,
+        num_rows: usize,
+        nulls: Option<&NullBuffer>,
+    ) -> Result<RecordBatch, ArrowError> {
+        let mut fields = Vec::with_capacity(self.columns.len());
+        let mut arrays = Vec::with_capacity(self.columns.len());
+        for (name, column) in self.columns {
+            let array = column_to_arrow(column, nulls)?;
+            fields.push(Field::new(name, array.data_type().clone(), true));
+            arrays.push(array);
+        }
+
+        RecordBatch::try_new_with_options(
+            Arc::new(Schema::new(fields)),
+            arrays,
+            &RecordBatchOptions::new().with_row_count(Some(num_rows)),
+        )
+    }
+
+    /// Convert into a pyarrow `RecordBatch`
+    pub fn into_pyarrow(
+        self,
+        py: Python<'_>,
+        num_rows: usize,
+        nulls: Option<&NullBuffer>,
+    ) -> PyResult<PyObject> {
+        let batch = self
+            .into_record_batch(num_rows, nulls)
+            .map_err(|e| PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(e.to_string()))?;
+        batch.to_pyarrow(py)
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use std::collections::HashMap;
+
+    #[test]
+    fn test_text_array_values() {
+        let array = TextArray::Utf8(StringArray::from(vec![Some("abc"), None, Some("")]));
+        assert_eq!(array.len(), 3);
+        assert_eq!(array.value(0), "abc");
+        assert_eq!(array.value(1), "");
+        assert_eq!(array.nulls().map(|n| n.null_count()), Some(1));
+
+        let large = TextArray::LargeUtf8(LargeStringArray::from(vec!["x"]));
+        assert_eq!(large.value(0), "x");
+        assert!(large.nulls().is_none());
+    }
+
+    #[test]
+    fn test_record_batch_nulls() {
+        let mut columns = ColumnSet::new();
+        columns.push("char_count", Column::from_counts(vec![3, 0]));
+        columns.push("is_ascii", Column::from_bools(vec![true, true]));
+        columns.push(
+            "char_frequency",
+            Column::from_maps(vec![HashMap::from([("a".to_string(), 3)]), HashMap::new()]),
+        );
+
+        let nulls = NullBuffer::from(vec![true, false]);
+        let batch = columns.into_record_batch(2, Some(&nulls)).unwrap();
+
+        assert_eq!(batch.num_rows(), 2);
+        assert_eq!(batch.num_columns(), 3);
+        for column in batch.columns() {
+            assert!(column.is_valid(0));
+            assert!(column.is_null(1));
+        }
+
+        let counts = batch
+            .column(0)
+            .as_any()
+            .downcast_ref::<Int64Array>()
+            .unwrap();
+        assert_eq!(counts.value(0), 3);
+    }
+
+    #[test]
+    fn test_record_batch_without_columns() {
+        let batch = ColumnSet::new().into_record_batch(4, None).unwrap();
+        assert_eq!(batch.num_rows(), 4);
+        assert_eq!(batch.num_columns(), 0);
+    }
+}
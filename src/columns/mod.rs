@@ -0,0 +1,180 @@
+//! # Columnar Batch Output
+//!
+//! This module provides a column-oriented representation of batch metric results,
+//! allowing metrics for many documents to be handed to Python as contiguous NumPy
+//! arrays instead of one dictionary per document.
+//!
+//! ## Key Features
+//!
+//! * Typed columns (int64, float64, bool) filled directly from Rust metric structs
+//! * Zero per-document Python object creation for scalar metrics
+//! * Map-valued metrics (frequency tables) kept as a list of dictionaries
+//! * PyO3 and rust-numpy integration for direct DataFrame construction
+//! * Apache Arrow input and `RecordBatch` output (see `arrow_io`)
+//! * Dense category n-gram matrices for feature extraction (see `ngrams`)
+//! * Token offset arrays for span-level filtering (see `spans`)
+//!
+//! Columnar output is most useful on corpora of short documents, where creating a
+//! dictionary and dozens of boxed Python numbers per document, and transposing them
+//! back into columns, can dominate the cost of the metrics themselves.
+
+pub mod arrow_io;
+pub mod ngrams;
+pub mod spans;
+
+use numpy::PyArray1;
+use pyo3::prelude::*;
+use pyo3::types::{PyDict, PyList};
+use std::collections::HashMap;
+
+/// A single column of metric values, one entry per document
+#[derive(Debug, Clone, PartialEq)]
+pub enum Column {
+    Int64(Vec<i64>),
+    Float64(Vec<f64>),
+    Bool(Vec<bool>),
+    Counts(Vec<HashMap<String, usize>>),
+}
+
+impl Column {
+    /// Build an int64 column from count values
+    pub fn from_counts<I: IntoIterator<Item = usize>>(values: I) -> Self {
+        Column::Int64(values.into_iter().map(|v| v as i64).collect())
+    }
+
+    /// Build a float64 column
+    pub fn from_floats<I: IntoIterator<Item = f64>>(values: I) -> Self {
+        Column::Float64(values.into_iter().collect())
+    }
+
+    /// Build a boolean column
+    pub fn from_bools<I: IntoIterator<Item = bool>>(values: I) -> Self {
+        Column::Bool(values.into_iter().collect())
+    }
+
+    /// Build a column of frequency maps
+    pub fn from_maps<I: IntoIterator<Item = HashMap<String, usize>>>(values: I) -> Self {
+        Column::Counts(values.into_iter().collect())
+    }
+
+    /// Number of documents in the column
+    pub fn len(&self) -> usize {
+        match self {
+            Column::Int64(v) => v.len(),
+            Column::Float64(v) => v.len(),
+            Column::Bool(v) => v.len(),
+            Column::Counts(v) => v.len(),
+        }
+    }
+
+    /// Whether the column holds no documents
+    pub fn is_empty(&self) -> bool {
+        self.len() == 0
+    }
+
+    /// Convert the column into a NumPy array, or a list of dictionaries for maps
+    pub fn into_py(self, py: Python<'_>) -> PyResult<PyObject> {
+        Ok(match self {
+            Column::Int64(v) => PyArray1::from_vec(py, v).into_any().unbind(),
+            Column::Float64(v) => PyArray1::from_vec(py, v).into_any().unbind(),
+            Column::Bool(v) => PyArray1::from_vec(py, v).into_any().unbind(),
+            Column::Counts(maps) => {
+                let list = PyList::empty(py);
+                for map in maps {
+                    let dict = PyDict::new(py);
+                    for (k, v) in map {
+                        dict.set_item(k, v)?;
+                    }
+                    list.append(dict)?;
+                }
+                list.into_any().unbind()
+            }
+        })
+    }
+}
+
+/// An ordered collection of named metric columns of equal length
+#[derive(Debug, Clone, Default, PartialEq)]
+pub struct ColumnSet {
+    columns: Vec<(String, Column)>,
+}
+
+impl ColumnSet {
+    /// Create an empty column set
+    pub fn new() -> Self {
+        ColumnSet {
+            columns: Vec::new(),
+        }
+    }
+
+    /// Append a named column
+    pub fn push(&mut self, name: impl Into<String>, column: Column) {
+        self.columns.push((name.into(), column));
+    }
+
+    /// Look up a column by name
+    pub fn get(&self, name: &str) -> Option<&Column> {
+        self.columns
+            .iter()
+            .find(|(column_name, _)| column_name == name)
+            .map(|(_, column)| column)
+    }
+
+    /// Names of all columns, in insertion order
+    pub fn names(&self) -> Vec<&str> {
+        self.columns.iter().map(|(name, _)| name.as_str()).collect()
+    }
+
+    /// Number of columns
+    pub fn len(&self) -> usize {
+        self.columns.len()
+    }
+
+    /// Whether the set holds no columns
+    pub fn is_empty(&self) -> bool {
+        self.columns.is_empty()
+    }
+
+    /// Convert into a Python dictionary mapping metric names to columns
+    pub fn into_py_dict(self, py: Python<'_>) -> PyResult<PyObject> {
+        let dict = PyDict::new(py);
+        for (name, column) in self.columns {
+            dict.set_item(name, column.into_py(py)?)?;
+        }
+        Ok(dict.into())
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_column_constructors() {
+        assert_eq!(
+            Column::from_counts(vec![1, 2, 3]),
+            Column::Int64(vec![1, 2, 3])
+        );
+        assert_eq!(Column::from_floats(vec![0.5]), Column::Float64(vec![0.5]));
+        assert_eq!(
+            Column::from_bools(vec![true, false]),
+            Column::Bool(vec![true, false])
+        );
+        assert_eq!(Column::from_maps(Vec::new()).len(), 0);
+        assert!(Column::Int64(Vec::new()).is_empty());
+    }
+
+    #[test]
+    fn test_column_set() {
+        let mut columns = ColumnSet::new();
+        assert!(columns.is_empty());
+
+        columns.push("char_count", Column::from_counts(vec![4, 0]));
+        columns.push("is_ascii", Column::from_bools(vec![true, true]));
+
+        assert_eq!(columns.len(), 2);
+        assert_eq!(columns.names(), vec!["char_count", "is_ascii"]);
+        assert_eq!(columns.get("char_count"), Some(&Column::Int64(vec![4, 0])));
+        assert_eq!(columns.get("missing"), None);
+    }
+}
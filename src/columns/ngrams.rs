@@ -0,0 +1,193 @@
+//! # Category N-gram Matrices
+//!
+//! This module turns Unicode category bigram and trigram counts for a batch of
+//! documents into a single dense matrix, one row per document and one column per
+//! n-gram, ready to feed a classifier without building a dictionary per document.
+//!
+//! ## Column Layout
+//!
+//! Columns follow the tables of `SequenceNgramCounter`. Every n-gram position has
+//! one slot per category (or category group) plus a boundary slot, named "START"
+//! in the first position and "END" in the last:
+//!
+//! * Category bigrams: 31 × 31 = 961 columns
+//! * Category group bigrams: 8 × 8 = 64 columns
+//! * Category trigrams: 31 × 30 × 31 = 28,830 columns
+//! * Category group trigrams: 8 × 7 × 8 = 448 columns
+//!
+//! The order never changes between calls, so column indices can be stored with a
+//! trained model; `columns` returns the names.
+
+use numpy::{PyArray1, PyArrayMethods};
+use pyo3::prelude::*;
+use rayon::prelude::*;
+
+use crate::char::categories::{
+    category_bigrams, category_group_bigrams, category_group_ngrams, category_ngrams,
+    CategoryIndex, SequenceNgramCounter, UnicodeCategory, UnicodeCategoryGroup,
+};
+
+/// Which category n-gram table to build
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+pub struct NgramSpec {
+    /// 2 for bigrams, 3 for trigrams
+    pub n: usize,
+    /// Count category groups instead of categories
+    pub groups: bool,
+}
+
+impl NgramSpec {
+    /// Validate an n-gram size
+    pub fn new(n: usize, groups: bool) -> PyResult<Self> {
+        if n != 2 && n != 3 {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
+                "n must be 2 (bigrams) or 3 (trigrams), got {}",
+                n
+            )));
+        }
+        Ok(NgramSpec { n, groups })
+    }
+
+    /// Number of columns of the matrix
+    pub fn width(&self) -> usize {
+        match (self.n, self.groups) {
+            (2, false) => SequenceNgramCounter::<UnicodeCategory>::BIGRAM_LEN,
+            (2, true) => SequenceNgramCounter::<UnicodeCategoryGroup>::BIGRAM_LEN,
+            (_, false) => SequenceNgramCounter::<UnicodeCategory>::TRIGRAM_LEN,
+            (_, true) => SequenceNgramCounter::<UnicodeCategoryGroup>::TRIGRAM_LEN,
+        }
+    }
+
+    /// Write the counts of one text into a zeroed row, in column order
+    pub fn fill_row<V>(&self, text: &str, row: &mut [V], convert: fn(usize) -> V) {
+        let mut write = |index: usize, count: usize| row[index] = convert(count);
+        match (self.n, self.groups) {
+            (2, false) => category_bigrams(text).for_each_bigram(&mut write),
+            (2, true) => category_group_bigrams(text).for_each_bigram(&mut write),
+            (_, false) => category_ngrams(text).for_each_trigram(&mut write),
+            (_, true) => category_group_ngrams(text).for_each_trigram(&mut write),
+        }
+    }
+
+    /// Column names, as tuples of category names with START/END boundaries
+    pub fn columns(&self, py: Python<'_>) -> PyResult<PyObject> {
+        let columns = match (self.n, self.groups) {
+            (2, false) => bigram_columns::<UnicodeCategory>().into_pyobject(py)?,
+            (2, true) => bigram_columns::<UnicodeCategoryGroup>().into_pyobject(py)?,
+            (_, false) => trigram_columns::<UnicodeCategory>().into_pyobject(py)?,
+            (_, true) => trigram_columns::<UnicodeCategoryGroup>().into_pyobject(py)?,
+        };
+        Ok(columns.into_any().unbind())
+    }
+}
+
+/// Names of the bigram columns, in table order
+pub fn bigram_columns<T: CategoryIndex>() -> Vec<(&'static str, &'static str)> {
+    (0..SequenceNgramCounter::<T>::BIGRAM_LEN)
+        .map(|index| {
+            let (prev, next) = SequenceNgramCounter::<T>::bigram_key(index);
+            (prev.map_or("START", T::name), next.map_or("END", T::name))
+        })
+        .collect()
+}
+
+/// Names of the trigram columns, in table order
+pub fn trigram_columns<T: CategoryIndex>() -> Vec<(&'static str, &'static str, &'static str)> {
+    (0..SequenceNgramCounter::<T>::TRIGRAM_LEN)
+        .map(|index| {
+            let (prev, current, next) = SequenceNgramCounter::<T>::trigram_key(index);
+            (
+                prev.map_or("START", T::name),
+                current.name(),
+                next.map_or("END", T::name),
+            )
+        })
+        .collect()
+}
+
+/// Row-major matrix of n-gram counts, one row of `spec.width()` per text
+///
+/// The matrix is allocated once and each text's counts are written straight
+/// into its row, converted with `convert`.
+pub fn count_matrix<S, V>(texts: &[S], spec: NgramSpec, convert: fn(usize) -> V) -> Vec<V>
+where
+    S: AsRef<str> + Sync,
+    V: Copy + Default + Send,
+{
+    let width = spec.width();
+    let mut matrix = vec![V::default(); texts.len() * width];
+    matrix
+        .par_chunks_mut(width)
+        .zip(texts.par_iter())
+        .for_each(|(row, text)| spec.fill_row(text.as_ref(), row, convert));
+    matrix
+}
+
+/// Row-major matrix of n-gram ratios, each row divided by its total in place
+pub fn ratio_matrix<S: AsRef<str> + Sync>(texts: &[S], spec: NgramSpec) -> Vec<f64> {
+    let mut matrix = count_matrix(texts, spec, |count| count as f64);
+    matrix.par_chunks_mut(spec.width()).for_each(|row| {
+        let total: f64 = row.iter().sum();
+        if total > 0.0 {
+            row.iter_mut().for_each(|value| *value /= total);
+        }
+    });
+    matrix
+}
+
+/// N-gram matrix of a batch of texts as a 2-D NumPy array of int64 counts, or
+/// of float64 ratios of each row's total, built without the GIL
+pub fn matrix_to_numpy<S: AsRef<str> + Sync>(
+    py: Python<'_>,
+    texts: &[S],
+    spec: NgramSpec,
+    ratios: bool,
+) -> PyResult<PyObject> {
+    let shape = [texts.len(), spec.width()];
+    if ratios {
+        let values = py.allow_threads(|| ratio_matrix(texts, spec));
+        let array = PyArray1::from_vec(py, values).reshape(shape)?;
+        Ok(array.into_any().unbind())
+    } else {
+        let values = py.allow_threads(|| count_matrix(texts, spec, |count| count as i64));
+        let array = PyArray1::from_vec(py, values).reshape(shape)?;
+        Ok(array.into_any().unbind())
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_count_matrix_rows() {
+        let spec = NgramSpec { n: 2, groups: true };
+        let texts = ["Hi, 42!", "", "ok"];
+        let matrix = count_matrix(&texts, spec, |count| count);
+
+        assert_eq!(matrix.len(), texts.len() * spec.width());
+        let rows: Vec<&[usize]> = matrix.chunks(spec.width()).collect();
+        assert_eq!(rows[0], category_group_bigrams("Hi, 42!").bigram_table());
+        assert!(rows[1].iter().all(|&count| count == 0));
+        assert_eq!(rows[2].iter().sum::<usize>(), 3);
+
+        let ratios = ratio_matrix(&texts, spec);
+        let first: Vec<f64> = rows[0].iter().map(|&count| count as f64 / 8.0).collect();
+        assert_eq!(&ratios[..spec.width()], first.as_slice());
+        assert!(ratios[spec.width()..2 * spec.width()]
+            .iter()
+            .all(|&ratio| ratio == 0.0));
+
+        let trigram_spec = NgramSpec {
+            n: 3,
+            groups: false,
+        };
+        let trigrams = count_matrix(&["a"], trigram_spec, |count| count as i64);
+        assert_eq!(trigrams.iter().sum::<i64>(), 1);
+
+        let columns = bigram_columns::<UnicodeCategoryGroup>();
+        assert_eq!(columns.len(), spec.width());
+        assert_eq!(columns[0], ("START", "END"));
+        assert_eq!(columns[1], ("START", "L"));
+    }
+}
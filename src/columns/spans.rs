@@ -0,0 +1,194 @@
+//! # Token Span Arrays
+//!
+//! This module turns the spans of the unigram tokenizer into flat NumPy arrays of
+//! start and end offsets, so span-level filters can locate tokens without a
+//! Python string per token.
+//!
+//! A batch is returned in compressed sparse row (CSR) layout: the spans of all
+//! texts are concatenated, and an offsets array of length `len(texts) + 1` marks
+//! where the spans of each text begin, so the spans of text `i` are
+//! `starts[offsets[i]:offsets[i + 1]]`.
+
+use numpy::PyArray1;
+use pyo3::prelude::*;
+use pyo3::types::PyTuple;
+use rayon::prelude::*;
+
+use crate::unigram::{self, TokenClass, TokenSpans};
+
+/// Unit of the offsets in a span array
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+pub enum OffsetUnit {
+    /// Byte offsets into the UTF-8 encoding
+    Byte,
+    /// Character (code point) offsets, as used to index a Python `str`
+    Char,
+}
+
+impl OffsetUnit {
+    /// Parse the `unit` argument of the Python functions
+    pub fn parse(unit: &str) -> PyResult<Self> {
+        match unit {
+            "byte" => Ok(OffsetUnit::Byte),
+            "char" => Ok(OffsetUnit::Char),
+            _ => Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
+                "unit must be \"byte\" or \"char\", got {:?}",
+                unit
+            ))),
+        }
+    }
+}
+
+/// Token spans of one or more texts as flat arrays
+#[derive(Debug, Clone, PartialEq)]
+pub struct SpanArrays {
+    pub starts: Vec<i64>,
+    pub ends: Vec<i64>,
+    /// `TokenClass` codes, one per span
+    pub classes: Vec<u8>,
+    /// Index of the first span of each text, followed by the total span count
+    pub offsets: Vec<i64>,
+}
+
+impl Default for SpanArrays {
+    fn default() -> Self {
+        SpanArrays {
+            starts: Vec::new(),
+            ends: Vec::new(),
+            classes: Vec::new(),
+            offsets: vec![0],
+        }
+    }
+}
+
+impl SpanArrays {
+    /// Spans of a single text
+    pub fn from_text(text: &str, include_punctuation: bool, unit: OffsetUnit) -> Self {
+        let mut arrays = SpanArrays::default();
+        arrays.push_text(text, include_punctuation, unit);
+        arrays
+    }
+
+    /// Spans of many texts, tokenized in parallel
+    pub fn from_texts<S: AsRef<str> + Sync>(
+        texts: &[S],
+        include_punctuation: bool,
+        unit: OffsetUnit,
+    ) -> Self {
+        let parts: Vec<SpanArrays> = texts
+            .par_iter()
+            .map(|text| SpanArrays::from_text(text.as_ref(), include_punctuation, unit))
+            .collect();
+
+        let total = parts.iter().map(|part| part.starts.len()).sum();
+        let mut arrays = SpanArrays {
+            starts: Vec::with_capacity(total),
+            ends: Vec::with_capacity(total),
+            classes: Vec::with_capacity(total),
+            offsets: Vec::with_capacity(texts.len() + 1),
+        };
+        arrays.offsets.push(0);
+        for part in parts {
+            arrays.starts.extend(part.starts);
+            arrays.ends.extend(part.ends);
+            arrays.classes.extend(part.classes);
+            arrays.offsets.push(arrays.starts.len() as i64);
+        }
+        arrays
+    }
+
+    /// Append the spans of a text as a new row
+    pub fn push_text(&mut self, text: &str, include_punctuation: bool, unit: OffsetUnit) {
+        // Spans are ordered and do not overlap, so character offsets are found by
+        // counting the characters between consecutive boundaries
+        let mut byte_pos = 0;
+        let mut char_pos = 0;
+        let mut offset = |byte: usize| -> i64 {
+            if unit == OffsetUnit::Char {
+                char_pos += text[byte_pos..byte].chars().count();
+                byte_pos = byte;
+                char_pos as i64
+            } else {
+                byte as i64
+            }
+        };
+
+        let mut push = |(start, end): unigram::Span, class: TokenClass| {
+            self.starts.push(offset(start));
+            self.ends.push(offset(end));
+            self.classes.push(class.code());
+        };
+        match unigram::token_spans(text, include_punctuation) {
+            TokenSpans::WithPunctuation(spans) => {
+                spans.for_each(|(span, class)| push(span, class));
+            }
+            words => words.for_each(|span| push(span, TokenClass::Word)),
+        }
+
+        self.offsets.push(self.starts.len() as i64);
+    }
+
+    /// Convert to a tuple of NumPy arrays
+    ///
+    /// The tuple holds `starts` and `ends` (int64), then `offsets` (int64) if
+    /// `with_offsets`, then `classes` (uint8) if `with_classes`.
+    pub fn into_numpy(
+        self,
+        py: Python<'_>,
+        with_offsets: bool,
+        with_classes: bool,
+    ) -> PyResult<PyObject> {
+        let mut arrays = vec![
+            PyArray1::from_vec(py, self.starts).into_any(),
+            PyArray1::from_vec(py, self.ends).into_any(),
+        ];
+        if with_offsets {
+            arrays.push(PyArray1::from_vec(py, self.offsets).into_any());
+        }
+        if with_classes {
+            arrays.push(PyArray1::from_vec(py, self.classes).into_any());
+        }
+        Ok(PyTuple::new(py, arrays)?.into_any().unbind())
+    }
+}
+
+/// Names of the token classes, indexed by their codes
+pub fn class_names() -> Vec<&'static str> {
+    TokenClass::ALL.iter().map(|class| class.name()).collect()
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_span_arrays() {
+        let text = "Héllo, wörld!";
+        let bytes = SpanArrays::from_text(text, true, OffsetUnit::Byte);
+        assert_eq!(bytes.starts, vec![0, 6, 7, 8, 14]);
+        assert_eq!(bytes.ends, vec![6, 7, 8, 14, 15]);
+        assert_eq!(bytes.classes, vec![0, 1, 2, 0, 1]);
+        assert_eq!(bytes.offsets, vec![0, 5]);
+
+        let chars = SpanArrays::from_text(text, true, OffsetUnit::Char);
+        assert_eq!(chars.starts, vec![0, 5, 6, 7, 12]);
+        assert_eq!(chars.ends, vec![5, 6, 7, 12, 13]);
+
+        let words = SpanArrays::from_text(text, false, OffsetUnit::Char);
+        assert_eq!(words.starts, vec![0, 7]);
+        assert_eq!(words.classes, vec![0, 0]);
+    }
+
+    #[test]
+    fn test_batch_offsets() {
+        let texts = ["one two", "", "three"];
+        let arrays = SpanArrays::from_texts(&texts, false, OffsetUnit::Byte);
+        assert_eq!(arrays.offsets, vec![0, 2, 2, 3]);
+        assert_eq!(arrays.starts, vec![0, 4, 0]);
+        assert_eq!(arrays.ends, vec![3, 7, 5]);
+        assert_eq!(
+            SpanArrays::from_texts::<&str>(&[], true, OffsetUnit::Byte).offsets,
+            vec![0]
+        );
+    }
+}
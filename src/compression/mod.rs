@@ -77,11 +77,7 @@ pub fn unigram_compression_ratio(text: &str, include_punctuation: bool) -> io::R
     }
 
     // Get the tokens
-    let tokens = if include_punctuation {
-        unigram::tokenize_with_punctuation(text)
-    } else {
-        unigram::tokenize(text)
-    };
+    let tokens: Vec<&str> = unigram::token_slices(text, include_punctuation).collect();
 
     // Join tokens with spaces to standardize presentation
     let token_text = tokens.join(" ");
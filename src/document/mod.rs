@@ -0,0 +1,115 @@
+//! # Per-Document Analysis
+//!
+//! This module computes the intermediate results shared by every section of
+//! `get_all_metrics` once per document: a single character traversal (metrics,
+//! frequencies and the category sequence), a single tokenization, one pass over
+//! lines and paragraphs, and at most one paragraph split for pattern matching.
+//!
+//! ## Key Features
+//!
+//! * Character, category and category n-gram metrics from one traversal
+//! * Line and paragraph statistics without building paragraph strings
+//! * Paragraphs split once and reused for paragraph-wise pattern matching
+//! * Results identical to the individual metric functions
+//!
+//! Without the shared context, a full analysis re-scanned the text for each
+//! category ratio and n-gram table, and split paragraphs up to three times.
+
+use crate::char::unicode::{calculate_char_profile, CharProfile};
+use crate::patterns::PatternMetrics;
+use crate::text::segmentation::{self, LineStats};
+use crate::unigram::{self, UnigramMetrics};
+
+/// Options controlling a full document analysis
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+pub struct AnalysisOptions {
+    pub include_punctuation: bool,
+    pub case_sensitive: bool,
+    /// Match patterns paragraph by paragraph instead of against the whole text
+    pub use_paragraph_processing: bool,
+    /// Paragraphs and lines longer than this many bytes are matched in pieces
+    pub max_segment_size: usize,
+}
+
+/// All metrics of one document, computed from shared intermediates
+pub struct DocumentAnalysis {
+    pub chars: CharProfile,
+    pub unigrams: UnigramMetrics,
+    pub lines: LineStats,
+    /// Average sentence length in words, matching `average_sentence_length`
+    pub average_sentence_length: f64,
+    pub patterns: PatternMetrics,
+}
+
+impl DocumentAnalysis {
+    /// Analyze a document
+    pub fn new(text: &str, options: AnalysisOptions) -> Self {
+        let lines = segmentation::line_statistics(text);
+
+        let patterns = if options.use_paragraph_processing {
+            let paragraphs = segmentation::split_paragraphs(text);
+            PatternMetrics::by_paragraph(
+                text,
+                &paragraphs,
+                lines.line_count,
+                options.max_segment_size,
+            )
+        } else {
+            PatternMetrics::whole_text(text, lines.line_count)
+        };
+
+        DocumentAnalysis {
+            chars: calculate_char_profile(text),
+            unigrams: unigram::calculate_all_unigram_metrics(
+                text,
+                options.include_punctuation,
+                options.case_sensitive,
+            ),
+            lines,
+            average_sentence_length: segmentation::average_sentence_length(text),
+            patterns,
+        }
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_document_analysis_matches_individual_functions() {
+        let text = "First line of text.\nSecond line?\n\n  Another paragraph... with more!\n";
+        let analysis = DocumentAnalysis::new(
+            text,
+            AnalysisOptions {
+                include_punctuation: false,
+                case_sensitive: false,
+                use_paragraph_processing: true,
+                max_segment_size: 4096,
+            },
+        );
+
+        assert_eq!(analysis.chars.metrics.total_chars, text.chars().count());
+        assert_eq!(
+            analysis.unigrams.token_count,
+            unigram::count_tokens(text, false)
+        );
+        assert_eq!(analysis.lines.line_count, segmentation::count_lines(text));
+        assert_eq!(
+            analysis.lines.paragraph_count,
+            segmentation::count_paragraphs(text)
+        );
+        assert_eq!(
+            analysis.lines.average_paragraph_length(),
+            segmentation::average_paragraph_length(text)
+        );
+        assert_eq!(
+            analysis.average_sentence_length,
+            segmentation::average_sentence_length(text)
+        );
+
+        let processing = analysis.patterns.paragraphs.unwrap();
+        assert_eq!(processing.paragraph_count, 2);
+        assert_eq!(processing.max_segment_size, 4096);
+    }
+}
@@ -9,7 +9,9 @@
 //! * Single-pass calculation of all metrics for maximum efficiency
 //! * Complete metrics coverage (character, unigram, segmentation)
 //! * Optimized algorithms that minimize redundant calculations
-//! * Batch processing capabilities for large datasets
+//! * Parallel, GIL-free batch processing with an optional dedicated thread pool
+//! * Streaming `imap` iteration that overlaps input reading with computation
+//! * `str` or raw UTF-8 `bytes` input, validated in Rust
 //! * PyO3 integration for seamless Python interoperability
 //!
 //! The HyperAnalyzer represents the most efficient approach for comprehensive
@@ -19,9 +21,15 @@
 
 use pyo3::prelude::*;
 use pyo3::types::{PyDict, PyList};
+use rayon::prelude::*;
 use std::collections::HashMap;
+use std::sync::Arc;
 
 use crate::char;
+use crate::columns::arrow_io::TextArray;
+use crate::columns::{Column, ColumnSet};
+use crate::input::{text_from_py, TextBatch};
+use crate::stream::{ChunkWorker, MetricsStream, StreamEngine};
 // Removing unused import: use crate::text;
 use crate::unigram;
 
@@ -210,6 +218,91 @@ impl HyperTextMetrics {
 
         Ok(dict.into())
     }
+
+    /// Transpose a batch of metrics into named columns, one entry per document.
+    ///
+    /// Column names and order match the keys produced by `to_py_dict`. Fields are
+    /// moved out of the metrics, so the frequency maps are not copied.
+    pub fn to_columns(mut metrics: Vec<HyperTextMetrics>) -> ColumnSet {
+        let mut columns = ColumnSet::new();
+
+        macro_rules! push {
+            ($ctor:path, $($field:ident),+) => {
+                $(columns.push(
+                    stringify!($field),
+                    $ctor(metrics.iter_mut().map(|m| std::mem::take(&mut m.$field))),
+                );)+
+            };
+        }
+
+        // Character metrics
+        push!(
+            Column::from_counts,
+            char_count,
+            letter_count,
+            digit_count,
+            punctuation_count,
+            symbol_count,
+            whitespace_count,
+            non_ascii_count,
+            uppercase_count,
+            lowercase_count,
+            alphanumeric_count
+        );
+
+        // Ratio metrics
+        push!(Column::from_bools, is_ascii);
+        push!(
+            Column::from_floats,
+            ascii_ratio,
+            uppercase_ratio,
+            alphanumeric_ratio,
+            alpha_to_numeric_ratio,
+            whitespace_ratio,
+            digit_ratio,
+            punctuation_ratio,
+            char_entropy
+        );
+
+        // Frequency metrics
+        columns.push(
+            "char_frequency",
+            Column::from_maps(metrics.iter_mut().map(|m| {
+                std::mem::take(&mut m.char_frequency)
+                    .into_iter()
+                    .map(|(k, v)| (k.to_string(), v))
+                    .collect()
+            })),
+        );
+        push!(
+            Column::from_maps,
+            char_type_frequency,
+            unicode_category_frequency,
+            unicode_category_group_frequency
+        );
+
+        // Segmentation metrics
+        push!(Column::from_counts, line_count, paragraph_count);
+        push!(
+            Column::from_floats,
+            avg_line_length,
+            avg_paragraph_length,
+            avg_word_length,
+            avg_sentence_length
+        );
+
+        // Unigram metrics
+        push!(Column::from_counts, unigram_count, unique_unigram_count);
+        push!(
+            Column::from_floats,
+            unigram_type_token_ratio,
+            unigram_repetition_rate,
+            unigram_entropy
+        );
+        push!(Column::from_maps, unigram_frequency);
+
+        columns
+    }
 }
 
 /// Calculate all character and text metrics in a true single pass algorithm.
@@ -227,79 +320,34 @@ pub fn calculate_all_metrics(
     }
 
     // ===== CHARACTER METRICS =====
-    // Character counting
-    result.char_count = text.chars().count();
-
-    // Character frequency counts for entropy and other metrics
-    let mut char_counts = std::collections::HashMap::new();
-
-    // Count various character properties in a single pass
-    for c in text.chars() {
-        // Update character frequency for entropy calculation
-        *char_counts.entry(c).or_insert(0) += 1;
-
-        // Track character categories
-        if char::unicode::is_letter(c) {
-            result.letter_count += 1;
-            result.alphanumeric_count += 1;
-
-            if char::unicode::is_uppercase(c) {
-                result.uppercase_count += 1;
-            } else if char::unicode::is_lowercase(c) {
-                result.lowercase_count += 1;
-            }
-        } else if char::unicode::is_digit(c) {
-            result.digit_count += 1;
-            result.alphanumeric_count += 1;
-        } else if char::unicode::is_punctuation(c) {
-            result.punctuation_count += 1;
-        } else if char::unicode::is_symbol(c) {
-            result.symbol_count += 1;
-        } else if char::unicode::is_whitespace(c) {
-            result.whitespace_count += 1;
-        }
-
-        if !c.is_ascii() {
-            result.non_ascii_count += 1;
-        }
-    }
-
-    // Store the char frequency
-    result.char_frequency = char_counts.clone();
+    // One pass over the text; pure ASCII runs are counted from the raw bytes and
+    // very long texts are split across threads
+    let profile = char::unicode::CharTally::scan(text, false, true).into_profile();
+    let metrics = &profile.metrics;
+
+    result.char_count = metrics.total_chars;
+    result.letter_count = metrics.letters;
+    result.digit_count = metrics.digits;
+    result.punctuation_count = metrics.punctuation;
+    result.symbol_count = metrics.symbols;
+    result.whitespace_count = metrics.whitespace;
+    result.non_ascii_count = metrics.non_ascii;
+    result.uppercase_count = metrics.uppercase;
+    result.lowercase_count = metrics.lowercase;
+    result.alphanumeric_count = metrics.alphanumeric;
 
     // Calculate ratio metrics
-    // Handle the denominator = 0 cases properly
-    let total_chars_f64 = result.char_count as f64;
-
-    if result.char_count > 0 {
-        result.ascii_ratio = 1.0 - (result.non_ascii_count as f64 / total_chars_f64);
-        result.alphanumeric_ratio = result.alphanumeric_count as f64 / total_chars_f64;
-        result.whitespace_ratio = result.whitespace_count as f64 / total_chars_f64;
-        result.digit_ratio = result.digit_count as f64 / total_chars_f64;
-        result.punctuation_ratio = result.punctuation_count as f64 / total_chars_f64;
-    }
-
-    if result.letter_count > 0 {
-        result.uppercase_ratio = result.uppercase_count as f64 / result.letter_count as f64;
-    }
-
-    if result.digit_count > 0 {
-        result.alpha_to_numeric_ratio = result.letter_count as f64 / result.digit_count as f64;
-    } else if result.letter_count > 0 {
-        // Use large but finite number instead of infinity for consistency
-        result.alpha_to_numeric_ratio = 1e6 * result.letter_count as f64;
-    }
-
-    // Calculate character entropy in a single pass
-    if result.char_count > 0 {
-        for count in char_counts.values() {
-            let probability = *count as f64 / total_chars_f64;
-            result.char_entropy -= probability * probability.log2();
-        }
-    }
+    result.ascii_ratio = 1.0 - metrics.ratio_non_ascii;
+    result.alphanumeric_ratio = metrics.ratio_alphanumeric;
+    result.whitespace_ratio = metrics.ratio_whitespace;
+    result.digit_ratio = metrics.ratio_digits;
+    result.punctuation_ratio = metrics.ratio_punctuation;
+    result.uppercase_ratio = metrics.ratio_uppercase;
+    result.alpha_to_numeric_ratio = metrics.ratio_alpha_to_numeric;
+    result.char_entropy = metrics.char_entropy;
 
     // Determine if text is all ASCII
-    result.is_ascii = text.is_ascii();
+    result.is_ascii = metrics.non_ascii == 0;
 
     // Build character type frequency
     let mut char_type_freq = std::collections::HashMap::new();
@@ -320,10 +368,24 @@ pub fn calculate_all_metrics(
     result.char_type_frequency = char_type_freq;
 
     // ===== UNICODE CATEGORY METRICS =====
-    // Get unicode category frequencies
-    result.unicode_category_frequency = char::categories::category_string_frequency(text);
-    result.unicode_category_group_frequency =
-        char::categories::category_group_string_frequency(text);
+    // Category frequencies come from the same pass
+    result.unicode_category_frequency = profile
+        .category_counts
+        .iter()
+        .map(|(&category, &count)| {
+            let name = char::categories::category_to_string(category);
+            (name.to_string(), count)
+        })
+        .collect();
+    result.unicode_category_group_frequency = profile
+        .group_counts()
+        .into_iter()
+        .map(|(group, count)| {
+            let name = char::categories::category_group_to_string(group);
+            (name.to_string(), count)
+        })
+        .collect();
+    result.char_frequency = profile.frequency;
 
     // ===== SEGMENTATION METRICS =====
     // To avoid multiple passes over the text, calculate segmentation info in one pass
@@ -393,31 +455,11 @@ pub fn calculate_all_metrics(
     }
 
     // ===== UNIGRAM METRICS =====
-    // Get tokens according to the include_punctuation parameter
-    let tokens = if include_punctuation {
-        unigram::tokenize_with_punctuation(text)
-    } else {
-        unigram::tokenize(text)
-    };
-
-    // Count unigrams and build frequency map in a single pass
-    let mut unigram_frequency = std::collections::HashMap::new();
-    let mut unique_unigrams = std::collections::HashSet::new();
-
-    for token in tokens {
-        let key = if case_sensitive {
-            token.clone()
-        } else {
-            token.to_lowercase()
-        };
-
-        *unigram_frequency.entry(key.clone()).or_insert(0) += 1;
-        unique_unigrams.insert(key);
-    }
+    // Count unigrams by slices of the text; only distinct tokens are copied
+    let unigram_frequency = unigram::count_token_slices(text, include_punctuation, case_sensitive);
 
     result.unigram_count = unigram_frequency.values().sum();
-    result.unique_unigram_count = unique_unigrams.len();
-    result.unigram_frequency = unigram_frequency.clone();
+    result.unique_unigram_count = unigram_frequency.len();
 
     // Calculate type-token ratio and repetition rate
     if result.unigram_count > 0 {
@@ -436,6 +478,8 @@ pub fn calculate_all_metrics(
         }
     }
 
+    result.unigram_frequency = unigram::key_counts_to_strings(unigram_frequency);
+
     result
 }
 
@@ -446,47 +490,257 @@ pub struct HyperAnalyzer {
     include_punctuation: bool,
     #[pyo3(get)]
     case_sensitive: bool,
+    #[pyo3(get)]
+    num_threads: Option<usize>,
+    /// Dedicated thread pool used for batch processing, if `num_threads` was given.
+    /// When `None`, batches run on rayon's global pool.
+    pool: Option<Arc<rayon::ThreadPool>>,
+}
+
+impl HyperAnalyzer {
+    /// Run `op` on the analyzer's own thread pool, or on the global pool if none
+    fn install<R: Send>(&self, op: impl FnOnce() -> R + Send) -> R {
+        match &self.pool {
+            Some(pool) => pool.install(op),
+            None => op(),
+        }
+    }
+
+    /// Calculate metrics for every text in parallel.
+    ///
+    /// This runs entirely in Rust and does not touch the GIL; the analyzer's own
+    /// thread pool is used when one was configured.
+    pub fn calculate_batch_metrics_internal<S: AsRef<str> + Sync>(
+        &self,
+        texts: &[S],
+    ) -> Vec<HyperTextMetrics> {
+        self.install(|| {
+            texts
+                .par_iter()
+                .map(|text| {
+                    calculate_all_metrics(
+                        text.as_ref(),
+                        self.include_punctuation,
+                        self.case_sensitive,
+                    )
+                })
+                .collect()
+        })
+    }
+
+    /// Calculate metrics for every row of an Arrow text column in parallel,
+    /// reading the strings in place
+    pub fn calculate_text_array_internal(&self, texts: &TextArray) -> Vec<HyperTextMetrics> {
+        self.install(|| {
+            (0..texts.len())
+                .into_par_iter()
+                .map(|i| {
+                    calculate_all_metrics(
+                        texts.value(i),
+                        self.include_punctuation,
+                        self.case_sensitive,
+                    )
+                })
+                .collect()
+        })
+    }
+}
+
+/// Analyzer settings shared with streaming worker threads
+struct HyperWorker {
+    include_punctuation: bool,
+    case_sensitive: bool,
+}
+
+impl ChunkWorker for HyperWorker {
+    type Output = Vec<HyperTextMetrics>;
+
+    fn compute_chunk(&self, texts: &[String]) -> Vec<HyperTextMetrics> {
+        texts
+            .par_iter()
+            .map(|text| calculate_all_metrics(text, self.include_punctuation, self.case_sensitive))
+            .collect()
+    }
+}
+
+/// Streaming engine backing `HyperAnalyzer.imap`
+struct HyperStream {
+    worker: Arc<HyperWorker>,
+    pool: Option<Arc<rayon::ThreadPool>>,
+}
+
+impl StreamEngine for HyperStream {
+    type Worker = HyperWorker;
+
+    fn worker(&self) -> Arc<HyperWorker> {
+        Arc::clone(&self.worker)
+    }
+
+    fn convert(&self, py: Python<'_>, output: Vec<HyperTextMetrics>) -> PyResult<Vec<PyObject>> {
+        output
+            .iter()
+            .map(|metrics| metrics.to_py_dict(py))
+            .collect()
+    }
+
+    fn pool(&self) -> Option<&rayon::ThreadPool> {
+        self.pool.as_deref()
+    }
 }
 
 #[pymethods]
 impl HyperAnalyzer {
     /// Create a new HyperAnalyzer with specified options
+    ///
+    /// `num_threads` sets the size of a thread pool owned by this analyzer for batch
+    /// processing. When omitted, the global rayon pool is shared.
     #[new]
-    pub fn new(include_punctuation: bool, case_sensitive: bool) -> Self {
-        HyperAnalyzer {
+    #[pyo3(signature = (include_punctuation=true, case_sensitive=false, num_threads=None))]
+    pub fn new(
+        include_punctuation: bool,
+        case_sensitive: bool,
+        num_threads: Option<usize>,
+    ) -> PyResult<Self> {
+        let pool = match num_threads {
+            Some(0) => {
+                return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                    "num_threads must be at least 1",
+                ))
+            }
+            Some(n) => Some(Arc::new(
+                rayon::ThreadPoolBuilder::new()
+                    .num_threads(n)
+                    .build()
+                    .map_err(|e| {
+                        PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(e.to_string())
+                    })?,
+            )),
+            None => None,
+        };
+
+        Ok(HyperAnalyzer {
             include_punctuation,
             case_sensitive,
-        }
+            num_threads,
+            pool,
+        })
     }
 
     /// Calculate only character metrics for a text
-    pub fn calculate_char_metrics(&self, py: Python<'_>, text: &str) -> PyResult<PyObject> {
+    ///
+    /// `text` may be a `str` or UTF-8 `bytes`, `bytearray` or `memoryview`; invalid
+    /// UTF-8 raises `UnicodeDecodeError` unless `lossy` is set.
+    #[pyo3(signature = (text, lossy=false))]
+    pub fn calculate_char_metrics(
+        &self,
+        py: Python<'_>,
+        text: &Bound<'_, PyAny>,
+        lossy: bool,
+    ) -> PyResult<PyObject> {
         // Use the full implementation but only return character-related metrics
-        let metrics = calculate_all_metrics(text, self.include_punctuation, self.case_sensitive);
-        metrics.to_py_dict(py)
+        self.calculate_all_metrics(py, text, lossy)
     }
 
     /// Calculate all metrics for a text (character, segmentation, and unigram)
-    pub fn calculate_all_metrics(&self, py: Python<'_>, text: &str) -> PyResult<PyObject> {
-        let metrics = calculate_all_metrics(text, self.include_punctuation, self.case_sensitive);
+    ///
+    /// `text` may be a `str` or UTF-8 `bytes`, `bytearray` or `memoryview`; invalid
+    /// UTF-8 raises `UnicodeDecodeError` unless `lossy` is set.
+    #[pyo3(signature = (text, lossy=false))]
+    pub fn calculate_all_metrics(
+        &self,
+        py: Python<'_>,
+        text: &Bound<'_, PyAny>,
+        lossy: bool,
+    ) -> PyResult<PyObject> {
+        let text = text_from_py(text, lossy)?;
+        let metrics = calculate_all_metrics(&text, self.include_punctuation, self.case_sensitive);
         metrics.to_py_dict(py)
     }
 
     /// Calculate metrics for a batch of texts
+    ///
+    /// Texts are analyzed in parallel with the GIL released; results are converted
+    /// to Python dictionaries afterwards, preserving input order. Texts may be `str`
+    /// or UTF-8 `bytes`-like objects (see `calculate_all_metrics`).
+    #[pyo3(signature = (texts, lossy=false))]
     pub fn calculate_batch_metrics(
         &self,
         py: Python<'_>,
-        texts: Vec<String>,
+        texts: &Bound<'_, PyAny>,
+        lossy: bool,
     ) -> PyResult<PyObject> {
-        let result_list = PyList::empty(py);
+        let batch = TextBatch::from_py(texts)?;
+        let texts = batch.texts(lossy)?;
+        let results = py.allow_threads(|| self.calculate_batch_metrics_internal(&texts));
 
-        for text in texts {
-            let metrics =
-                calculate_all_metrics(&text, self.include_punctuation, self.case_sensitive);
+        let result_list = PyList::empty(py);
+        for metrics in results {
             let dict = metrics.to_py_dict(py)?;
             result_list.append(dict)?;
         }
 
         Ok(result_list.into())
     }
+
+    /// Calculate metrics for a batch of texts in columnar form
+    ///
+    /// Returns a dictionary mapping each metric name to a NumPy array with one entry
+    /// per text (int64 for counts, float64 for ratios, bool for flags). Frequency
+    /// maps are returned as a list of dictionaries.
+    #[pyo3(signature = (texts, lossy=false))]
+    pub fn calculate_batch_columns(
+        &self,
+        py: Python<'_>,
+        texts: &Bound<'_, PyAny>,
+        lossy: bool,
+    ) -> PyResult<PyObject> {
+        let batch = TextBatch::from_py(texts)?;
+        let texts = batch.texts(lossy)?;
+        let columns = py.allow_threads(|| {
+            HyperTextMetrics::to_columns(self.calculate_batch_metrics_internal(&texts))
+        });
+        columns.into_py_dict(py)
+    }
+
+    /// Calculate metrics for an Arrow text column, returning an Arrow RecordBatch
+    ///
+    /// Accepts a pyarrow `StringArray` or `LargeStringArray` (anything exporting the
+    /// Arrow C Data Interface). The UTF-8 buffers are read in place, and null input
+    /// rows produce null output rows.
+    pub fn calculate_batch_arrow(
+        &self,
+        py: Python<'_>,
+        texts: &Bound<'_, PyAny>,
+    ) -> PyResult<PyObject> {
+        let texts = TextArray::from_pyarrow(texts)?;
+        let columns = py.allow_threads(|| {
+            HyperTextMetrics::to_columns(self.calculate_text_array_internal(&texts))
+        });
+        columns.into_pyarrow(py, texts.len(), texts.nulls())
+    }
+
+    /// Lazily calculate metrics for an iterable of texts
+    ///
+    /// Texts are read from `iterable` in chunks of `chunk_size` and analyzed on
+    /// worker threads while the next chunks are being read; at most `max_in_flight`
+    /// chunks are pending at once (default: one per worker thread). Yields one
+    /// metrics dictionary per text, in input order. Items may be `str` or UTF-8
+    /// `bytes`-like objects.
+    #[pyo3(signature = (iterable, chunk_size=128, max_in_flight=None, lossy=false))]
+    pub fn imap(
+        &self,
+        iterable: &Bound<'_, PyAny>,
+        chunk_size: usize,
+        max_in_flight: Option<usize>,
+        lossy: bool,
+    ) -> PyResult<MetricsStream> {
+        let engine = HyperStream {
+            worker: Arc::new(HyperWorker {
+                include_punctuation: self.include_punctuation,
+                case_sensitive: self.case_sensitive,
+            }),
+            pool: self.pool.clone(),
+        };
+        MetricsStream::new(iterable, engine, chunk_size, max_in_flight, lossy)
+    }
 }
@@ -0,0 +1,158 @@
+//! # Text Input from Python
+//!
+//! This module converts Python objects into Rust text for the metric entry points.
+//! Besides `str`, it accepts `bytes`, `bytearray`, `memoryview` and any other object
+//! exporting a byte buffer, validating the bytes as UTF-8 in Rust. Corpus readers
+//! that already hold raw UTF-8 can therefore skip decoding into a Python `str`
+//! (and its fixed-width internal representation) only to have it encoded again.
+//!
+//! ## Key Features
+//!
+//! * Zero-copy borrowing of `str` and `bytes` contents
+//! * Strict UTF-8 validation raising `UnicodeDecodeError`, or lossy replacement
+//! * Batch extraction that keeps the source objects alive while texts are borrowed
+
+use pyo3::buffer::PyBuffer;
+use pyo3::prelude::*;
+use pyo3::types::{PyByteArray, PyBytes, PyString};
+use std::borrow::Cow;
+
+/// Decode UTF-8 bytes, replacing invalid sequences with U+FFFD when `lossy` is set
+pub fn decode_utf8(bytes: &[u8], lossy: bool) -> PyResult<Cow<'_, str>> {
+    if lossy {
+        Ok(String::from_utf8_lossy(bytes))
+    } else {
+        Ok(Cow::Borrowed(std::str::from_utf8(bytes)?))
+    }
+}
+
+/// Decode an owned UTF-8 buffer without copying it again when it is valid
+fn decode_utf8_owned(bytes: Vec<u8>, lossy: bool) -> PyResult<String> {
+    match String::from_utf8(bytes) {
+        Ok(text) => Ok(text),
+        Err(e) if lossy => Ok(String::from_utf8_lossy(e.as_bytes()).into_owned()),
+        Err(e) => Err(e.utf8_error().into()),
+    }
+}
+
+/// Read the text of a `str`, `bytes`, `bytearray` or buffer-protocol object.
+///
+/// `str` and `bytes` are borrowed in place; other buffers are copied once.
+/// Raises `UnicodeDecodeError` for invalid UTF-8 unless `lossy` is set, and
+/// `TypeError` for objects that are neither text nor bytes.
+pub fn text_from_py<'a>(obj: &'a Bound<'_, PyAny>, lossy: bool) -> PyResult<Cow<'a, str>> {
+    if let Ok(text) = obj.downcast::<PyString>() {
+        return Ok(Cow::Borrowed(text.to_str()?));
+    }
+    if let Ok(bytes) = obj.downcast::<PyBytes>() {
+        return decode_utf8(bytes.as_bytes(), lossy);
+    }
+    if let Ok(buffer) = PyBuffer::<u8>::get(obj) {
+        return Ok(Cow::Owned(decode_utf8_owned(
+            buffer.to_vec(obj.py())?,
+            lossy,
+        )?));
+    }
+
+    Err(PyErr::new::<pyo3::exceptions::PyTypeError, _>(format!(
+        "expected str, bytes or a buffer of UTF-8 bytes, got {}",
+        obj.get_type().name()?
+    )))
+}
+
+/// Read the raw bytes of a `bytes`, `bytearray` or buffer-protocol object, or the
+/// UTF-8 encoding of a `str`, without validating them.
+///
+/// `str` and `bytes` are borrowed in place; other buffers are copied once.
+pub fn bytes_from_py<'a>(obj: &'a Bound<'_, PyAny>) -> PyResult<Cow<'a, [u8]>> {
+    if let Ok(text) = obj.downcast::<PyString>() {
+        return Ok(Cow::Borrowed(text.to_str()?.as_bytes()));
+    }
+    if let Ok(bytes) = obj.downcast::<PyBytes>() {
+        return Ok(Cow::Borrowed(bytes.as_bytes()));
+    }
+    if let Ok(buffer) = PyBuffer::<u8>::get(obj) {
+        return Ok(Cow::Owned(buffer.to_vec(obj.py())?));
+    }
+
+    Err(PyErr::new::<pyo3::exceptions::PyTypeError, _>(format!(
+        "expected bytes, a byte buffer or str, got {}",
+        obj.get_type().name()?
+    )))
+}
+
+/// A batch of Python text objects, held so their contents can be borrowed
+pub struct TextBatch<'py> {
+    items: Vec<Bound<'py, PyAny>>,
+}
+
+impl<'py> TextBatch<'py> {
+    /// Collect the items of an iterable of texts.
+    ///
+    /// A lone `str`, `bytes` or `bytearray` is rejected rather than iterated item
+    /// by item.
+    pub fn from_py(texts: &Bound<'py, PyAny>) -> PyResult<Self> {
+        if texts.is_instance_of::<PyString>()
+            || texts.is_instance_of::<PyBytes>()
+            || texts.is_instance_of::<PyByteArray>()
+        {
+            return Err(PyErr::new::<pyo3::exceptions::PyTypeError, _>(
+                "expected a sequence of texts, not a single text",
+            ));
+        }
+
+        let items = texts.try_iter()?.collect::<PyResult<Vec<_>>>()?;
+        Ok(TextBatch { items })
+    }
+
+    /// Number of texts in the batch
+    pub fn len(&self) -> usize {
+        self.items.len()
+    }
+
+    /// Whether the batch holds no texts
+    pub fn is_empty(&self) -> bool {
+        self.items.is_empty()
+    }
+
+    /// Texts of the batch, borrowed from the Python objects where possible
+    ///
+    /// The returned texts do not reference Python objects, so they can be
+    /// processed with the GIL released while the batch is alive.
+    pub fn texts(&self, lossy: bool) -> PyResult<Vec<Cow<'_, str>>> {
+        self.items
+            .iter()
+            .map(|item| text_from_py(item, lossy))
+            .collect()
+    }
+
+    /// Raw bytes of the batch items, borrowed from the Python objects where possible
+    pub fn bytes(&self) -> PyResult<Vec<Cow<'_, [u8]>>> {
+        self.items.iter().map(bytes_from_py).collect()
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    #[test]
+    fn test_decode_utf8() {
+        let valid = "naïve café".as_bytes();
+        assert!(matches!(
+            decode_utf8(valid, false),
+            Ok(Cow::Borrowed("naïve café"))
+        ));
+
+        let invalid = b"ab\xffcd";
+        assert_eq!(decode_utf8(invalid, true).unwrap(), "ab\u{FFFD}cd");
+        assert_eq!(
+            decode_utf8_owned(invalid.to_vec(), true).unwrap(),
+            "ab\u{FFFD}cd"
+        );
+        assert_eq!(
+            decode_utf8_owned(valid.to_vec(), false).unwrap(),
+            "naïve café"
+        );
+    }
+}
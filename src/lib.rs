@@ -26,14 +26,19 @@
 //! large text corpora while maintaining a clear API.
 
 use pyo3::prelude::*;
-use pyo3::types::PyDict;
+use pyo3::types::{PyDict, PyTuple};
 use std::collections::HashMap;
 
 pub mod batch;
+pub mod bytes;
 pub mod char;
+pub mod columns;
 pub mod compression;
+pub mod document;
 pub mod hyper;
+pub mod input;
 pub mod patterns;
+pub mod stream;
 pub mod text;
 pub mod token;
 pub mod unigram;
@@ -216,144 +221,40 @@ fn ratio_punctuation(text: &str) -> PyResult<f64> {
 /// Calculates all character metrics in a single pass and returns them as a dictionary.
 /// This is significantly more efficient than calling each metric function separately.
 /// The returned dictionary includes nested dictionaries for Unicode category ratios.
+/// With `fields`, only the named metrics are returned, and the category n-gram
+/// tables are only counted when one of them is requested.
 #[pyfunction]
-fn get_all_char_metrics(py: Python, text: &str) -> PyResult<PyObject> {
-    let metrics = char::unicode::calculate_char_metrics(text);
+#[pyo3(signature = (text, fields=None))]
+fn get_all_char_metrics(py: Python, text: &str, fields: Option<Vec<String>>) -> PyResult<PyObject> {
+    Ok(get_char_metrics(py, text, fields)?.to_dict(py)?.into())
+}
 
-    // Create a Python dictionary directly instead of using a HashMap
+/// Calculates character metrics in a single pass and returns them as a read-only
+/// mapping whose values are converted to Python objects only when read.
+#[pyfunction]
+#[pyo3(signature = (text, fields=None))]
+fn get_char_metrics(
+    py: Python,
+    text: &str,
+    fields: Option<Vec<String>>,
+) -> PyResult<char::result::CharMetricsResult> {
+    let fields = char::result::select_fields(fields)?;
+    Ok(py.allow_threads(|| char::result::CharMetricsResult::compute(text, fields)))
+}
+
+/// Builds the dictionary returned by `get_all_char_metrics` from character metrics and
+/// the frequency and category tables gathered in the same traversal.
+fn char_profile_to_dict<'py>(
+    py: Python<'py>,
+    profile: &char::unicode::CharProfile,
+) -> PyResult<Bound<'py, PyDict>> {
     let dict = PyDict::new(py);
-
-    // Count metrics
-    dict.set_item("char_count", metrics.total_chars)?;
-    dict.set_item("total_chars", metrics.total_chars)?; // Keep for backward compatibility
-    dict.set_item("letter_count", metrics.letters)?;
-    dict.set_item("letters", metrics.letters)?; // Keep for backward compatibility
-    dict.set_item("digit_count", metrics.digits)?;
-    dict.set_item("digits", metrics.digits)?; // Keep for backward compatibility
-    dict.set_item("punctuation_count", metrics.punctuation)?;
-    dict.set_item("punctuation", metrics.punctuation)?; // Keep for backward compatibility
-    dict.set_item("symbol_count", metrics.symbols)?;
-    dict.set_item("symbols", metrics.symbols)?; // Keep for backward compatibility
-    dict.set_item("whitespace_count", metrics.whitespace)?;
-    dict.set_item("whitespace", metrics.whitespace)?; // Keep for backward compatibility
-    dict.set_item("non_ascii_count", metrics.non_ascii)?;
-    dict.set_item("non_ascii", metrics.non_ascii)?; // Keep for backward compatibility
-    dict.set_item("uppercase_count", metrics.uppercase)?;
-    dict.set_item("uppercase", metrics.uppercase)?; // Keep for backward compatibility
-    dict.set_item("lowercase_count", metrics.lowercase)?;
-    dict.set_item("lowercase", metrics.lowercase)?; // Keep for backward compatibility
-    dict.set_item("alphanumeric_count", metrics.alphanumeric)?;
-    dict.set_item("alphanumeric", metrics.alphanumeric)?; // Keep for backward compatibility
-
-    // Ratio metrics
-    dict.set_item("ratio_letters", metrics.ratio_letters)?;
-    dict.set_item("ratio_digits", metrics.ratio_digits)?;
-    dict.set_item("ratio_punctuation", metrics.ratio_punctuation)?;
-    dict.set_item("ratio_symbols", metrics.ratio_symbols)?;
-    dict.set_item("ratio_whitespace", metrics.ratio_whitespace)?;
-    dict.set_item("ratio_non_ascii", metrics.ratio_non_ascii)?;
-    dict.set_item("ratio_uppercase", metrics.ratio_uppercase)?;
-    dict.set_item("ratio_lowercase", metrics.ratio_lowercase)?;
-    dict.set_item("ratio_alphanumeric", metrics.ratio_alphanumeric)?;
-    dict.set_item("ratio_alpha_to_numeric", metrics.ratio_alpha_to_numeric)?;
-    dict.set_item("char_entropy", metrics.char_entropy)?;
-    dict.set_item("ascii_ratio", 1.0 - metrics.ratio_non_ascii)?;
-
-    // Add new count metrics
-    dict.set_item("char_type_transitions", metrics.char_type_transitions)?;
-    dict.set_item("consecutive_runs", metrics.consecutive_runs)?;
-    dict.set_item("punctuation_diversity", metrics.punctuation_diversity)?;
-
-    // Add new ratio metrics
-    dict.set_item("case_ratio", metrics.case_ratio)?;
-    dict.set_item("category_entropy", metrics.category_entropy)?;
-
-    // Add Unicode category ratios
-    let category_ratios = char::categories::category_ratios(text);
-    let category_dict = PyDict::new(py);
-    for (category, ratio) in category_ratios {
-        let category_str = char::categories::category_to_string(category).to_string();
-        category_dict.set_item(category_str, ratio)?;
-    }
-    dict.set_item("unicode_category_ratios", category_dict)?;
-
-    // Add Unicode category group ratios
-    let group_ratios = char::categories::category_group_ratios(text);
-    let group_dict = PyDict::new(py);
-    for (group, ratio) in group_ratios {
-        let group_str = char::categories::category_group_to_string(group).to_string();
-        group_dict.set_item(group_str, ratio)?;
-    }
-    dict.set_item("unicode_category_group_ratios", group_dict)?;
-
-    // Add character frequencies
-    let char_freq = char::unicode::char_frequency(text);
-    let char_freq_dict = PyDict::new(py);
-    for (c, freq) in char_freq {
-        char_freq_dict.set_item(c.to_string(), freq)?;
-    }
-    dict.set_item("char_frequency", char_freq_dict)?;
-
-    // Add Unicode category bigram ratios
-    let category_bigram_ratios = char::categories::category_bigram_ratios(text);
-    let category_bigram_dict = PyDict::new(py);
-    for ((prev_cat, next_cat), ratio) in category_bigram_ratios {
-        // Get a tuple of (prev, next) with clean formatting using START/END for None
-        let prev_str = prev_cat.unwrap_or_else(|| "START".to_string());
-        let next_str = next_cat.unwrap_or_else(|| "END".to_string());
-
-        // Create a tuple key for Python
-        let key = (prev_str, next_str);
-        category_bigram_dict.set_item(key, ratio)?;
-    }
-    dict.set_item("unicode_category_bigram_ratios", category_bigram_dict)?;
-
-    // Add Unicode category group bigram ratios
-    let group_bigram_ratios = char::categories::category_group_bigram_ratios(text);
-    let group_bigram_dict = PyDict::new(py);
-    for ((prev_group, next_group), ratio) in group_bigram_ratios {
-        // Get a tuple of (prev, next) with clean formatting using START/END for None
-        let prev_str = prev_group.unwrap_or_else(|| "START".to_string());
-        let next_str = next_group.unwrap_or_else(|| "END".to_string());
-
-        // Create a tuple key for Python
-        let key = (prev_str, next_str);
-        group_bigram_dict.set_item(key, ratio)?;
-    }
-    dict.set_item("unicode_category_group_bigram_ratios", group_bigram_dict)?;
-
-    // Add Unicode category trigram ratios
-    let category_trigram_ratios = char::categories::category_trigram_ratios(text);
-    let category_trigram_dict = PyDict::new(py);
-    for ((prev_cat, current_cat, next_cat), ratio) in category_trigram_ratios {
-        // Get tuple elements with clean formatting using START/END for None
-        let prev_str = prev_cat.unwrap_or_else(|| "START".to_string());
-        let current_str = current_cat;
-        let next_str = next_cat.unwrap_or_else(|| "END".to_string());
-
-        // Create a tuple key for Python
-        let key = (prev_str, current_str, next_str);
-        category_trigram_dict.set_item(key, ratio)?;
-    }
-    dict.set_item("unicode_category_trigram_ratios", category_trigram_dict)?;
-
-    // Add Unicode category group trigram ratios
-    let group_trigram_ratios = char::categories::category_group_trigram_ratios(text);
-    let group_trigram_dict = PyDict::new(py);
-    for ((prev_group, current_group, next_group), ratio) in group_trigram_ratios {
-        // Get tuple elements with clean formatting using START/END for None
-        let prev_str = prev_group.unwrap_or_else(|| "START".to_string());
-        let current_str = current_group;
-        let next_str = next_group.unwrap_or_else(|| "END".to_string());
-
-        // Create a tuple key for Python
-        let key = (prev_str, current_str, next_str);
-        group_trigram_dict.set_item(key, ratio)?;
+    for key in char::result::CHAR_METRIC_KEYS {
+        if let Some(value) = char::result::char_metric_value(py, profile, key)? {
+            dict.set_item(key, value)?;
+        }
     }
-    dict.set_item("unicode_category_group_trigram_ratios", group_trigram_dict)?;
-
-    // Convert the Python dictionary to a PyObject and return it
-    Ok(dict.into())
+    Ok(dict)
 }
 
 /// Gets the Unicode category for each character in a string.
@@ -411,6 +312,19 @@ fn get_unicode_category_ratios(text: &str) -> PyResult<HashMap<String, f64>> {
     Ok(py_ratios)
 }
 
+/// Calculates the share of the characters in each Unicode script (writing system).
+/// Characters shared between scripts are reported as "Common", combining marks as
+/// "Inherited", and scripts without a name of their own as "Other".
+#[pyfunction]
+fn get_script_ratios(text: &str) -> PyResult<HashMap<String, f64>> {
+    let ratios = char::scripts::script_ratios(text);
+    let py_ratios = ratios
+        .into_iter()
+        .map(|(k, v)| (char::scripts::script_to_string(k).to_string(), v))
+        .collect();
+    Ok(py_ratios)
+}
+
 /// Calculates the ratio of each Unicode category group in a string.
 #[pyfunction]
 fn get_unicode_category_group_ratios(text: &str) -> PyResult<HashMap<String, f64>> {
@@ -428,39 +342,15 @@ fn get_unicode_category_group_ratios(text: &str) -> PyResult<HashMap<String, f64
 /// For the last character, the next category is "END".
 #[pyfunction]
 fn get_unicode_category_bigrams(py: Python, text: &str) -> PyResult<PyObject> {
-    let bigrams = char::categories::count_category_bigrams(text);
-    let dict = PyDict::new(py);
-
-    for ((prev_cat, next_cat), count) in bigrams {
-        // Get a tuple of (prev, next) with clean formatting using START/END for None
-        let prev_str = prev_cat.unwrap_or_else(|| "START".to_string());
-        let next_str = next_cat.unwrap_or_else(|| "END".to_string());
-
-        // Create a tuple key for Python
-        let key = (prev_str, next_str);
-        dict.set_item(key, count)?;
-    }
-
-    Ok(dict.into())
+    let counts = char::categories::category_bigrams(text).bigram_counts();
+    Ok(char::result::bigram_dict(py, counts, false)?.into())
 }
 
 /// Gets ratios of Unicode category bigrams in a string.
 #[pyfunction]
 fn get_unicode_category_bigram_ratios(py: Python, text: &str) -> PyResult<PyObject> {
-    let ratios = char::categories::category_bigram_ratios(text);
-    let dict = PyDict::new(py);
-
-    for ((prev_cat, next_cat), ratio) in ratios {
-        // Get a tuple of (prev, next) with clean formatting using START/END for None
-        let prev_str = prev_cat.unwrap_or_else(|| "START".to_string());
-        let next_str = next_cat.unwrap_or_else(|| "END".to_string());
-
-        // Create a tuple key for Python
-        let key = (prev_str, next_str);
-        dict.set_item(key, ratio)?;
-    }
-
-    Ok(dict.into())
+    let counts = char::categories::category_bigrams(text).bigram_counts();
+    Ok(char::result::bigram_dict(py, counts, true)?.into())
 }
 
 /// Gets frequencies of Unicode category group bigrams in a string.
@@ -469,107 +359,100 @@ fn get_unicode_category_bigram_ratios(py: Python, text: &str) -> PyResult<PyObje
 /// For the last character, the next group is "END".
 #[pyfunction]
 fn get_unicode_category_group_bigrams(py: Python, text: &str) -> PyResult<PyObject> {
-    let bigrams = char::categories::count_category_group_bigrams(text);
-    let dict = PyDict::new(py);
-
-    for ((prev_group, next_group), count) in bigrams {
-        // Get a tuple of (prev, next) with clean formatting using START/END for None
-        let prev_str = prev_group.unwrap_or_else(|| "START".to_string());
-        let next_str = next_group.unwrap_or_else(|| "END".to_string());
-
-        // Create a tuple key for Python
-        let key = (prev_str, next_str);
-        dict.set_item(key, count)?;
-    }
-
-    Ok(dict.into())
+    let counts = char::categories::category_group_bigrams(text).bigram_counts();
+    Ok(char::result::bigram_dict(py, counts, false)?.into())
 }
 
 /// Gets ratios of Unicode category group bigrams in a string.
 #[pyfunction]
 fn get_unicode_category_group_bigram_ratios(py: Python, text: &str) -> PyResult<PyObject> {
-    let ratios = char::categories::category_group_bigram_ratios(text);
-    let dict = PyDict::new(py);
-
-    for ((prev_group, next_group), ratio) in ratios {
-        // Get a tuple of (prev, next) with clean formatting using START/END for None
-        let prev_str = prev_group.unwrap_or_else(|| "START".to_string());
-        let next_str = next_group.unwrap_or_else(|| "END".to_string());
-
-        // Create a tuple key for Python
-        let key = (prev_str, next_str);
-        dict.set_item(key, ratio)?;
-    }
-
-    Ok(dict.into())
+    let counts = char::categories::category_group_bigrams(text).bigram_counts();
+    Ok(char::result::bigram_dict(py, counts, true)?.into())
 }
 
 /// Calculate Unicode category trigrams with "START" and "END" markers
 #[pyfunction]
 fn get_unicode_category_trigrams(py: Python, text: &str) -> PyResult<PyObject> {
-    let trigram_map = char::categories::count_category_trigrams(text);
-    let dict = PyDict::new(py);
-
-    // Convert special None values to "START" and "END" strings for Python interface
-    for ((prev, current, next), count) in trigram_map {
-        let prev_str = prev.unwrap_or_else(|| "START".to_string());
-        let next_str = next.unwrap_or_else(|| "END".to_string());
-        let key = (prev_str, current, next_str);
-        dict.set_item(key, count)?;
-    }
-
-    Ok(dict.into())
+    let counts = char::categories::category_ngrams(text).trigram_counts();
+    Ok(char::result::trigram_dict(py, counts, false)?.into())
 }
 
 /// Calculate Unicode category trigram ratios with "START" and "END" markers
 #[pyfunction]
 fn get_unicode_category_trigram_ratios(py: Python, text: &str) -> PyResult<PyObject> {
-    let trigram_map = char::categories::category_trigram_ratios(text);
-    let dict = PyDict::new(py);
-
-    // Convert special None values to "START" and "END" strings for Python interface
-    for ((prev, current, next), ratio) in trigram_map {
-        let prev_str = prev.unwrap_or_else(|| "START".to_string());
-        let next_str = next.unwrap_or_else(|| "END".to_string());
-        let key = (prev_str, current, next_str);
-        dict.set_item(key, ratio)?;
-    }
-
-    Ok(dict.into())
+    let counts = char::categories::category_ngrams(text).trigram_counts();
+    Ok(char::result::trigram_dict(py, counts, true)?.into())
 }
 
 /// Calculate Unicode category group trigrams with "START" and "END" markers
 #[pyfunction]
 fn get_unicode_category_group_trigrams(py: Python, text: &str) -> PyResult<PyObject> {
-    let trigram_map = char::categories::count_category_group_trigrams(text);
-    let dict = PyDict::new(py);
-
-    // Convert special None values to "START" and "END" strings for Python interface
-    for ((prev, current, next), count) in trigram_map {
-        let prev_str = prev.unwrap_or_else(|| "START".to_string());
-        let next_str = next.unwrap_or_else(|| "END".to_string());
-        let key = (prev_str, current, next_str);
-        dict.set_item(key, count)?;
-    }
-
-    Ok(dict.into())
+    let counts = char::categories::category_group_ngrams(text).trigram_counts();
+    Ok(char::result::trigram_dict(py, counts, false)?.into())
 }
 
 /// Calculate Unicode category group trigram ratios with "START" and "END" markers
 #[pyfunction]
 fn get_unicode_category_group_trigram_ratios(py: Python, text: &str) -> PyResult<PyObject> {
-    let trigram_map = char::categories::category_group_trigram_ratios(text);
-    let dict = PyDict::new(py);
+    let counts = char::categories::category_group_ngrams(text).trigram_counts();
+    Ok(char::result::trigram_dict(py, counts, true)?.into())
+}
 
-    // Convert special None values to "START" and "END" strings for Python interface
-    for ((prev, current, next), ratio) in trigram_map {
-        let prev_str = prev.unwrap_or_else(|| "START".to_string());
-        let next_str = next.unwrap_or_else(|| "END".to_string());
-        let key = (prev_str, current, next_str);
-        dict.set_item(key, ratio)?;
-    }
+/// Category n-gram counts for a batch of texts as a 2-D NumPy array
+///
+/// One row per text and one column per n-gram, in the order given by
+/// `get_unicode_category_ngram_columns`. With `ratios`, each row is divided by
+/// its total. Texts are processed in parallel without the GIL.
+#[pyfunction]
+#[pyo3(signature = (texts, n=2, groups=false, ratios=false, lossy=false))]
+fn get_unicode_category_ngram_matrix(
+    py: Python,
+    texts: &Bound<'_, PyAny>,
+    n: usize,
+    groups: bool,
+    ratios: bool,
+    lossy: bool,
+) -> PyResult<PyObject> {
+    let spec = columns::ngrams::NgramSpec::new(n, groups)?;
+    let batch = input::TextBatch::from_py(texts)?;
+    let texts = batch.texts(lossy)?;
+    columns::ngrams::matrix_to_numpy(py, &texts, spec, ratios)
+}
 
-    Ok(dict.into())
+/// Column names of `get_unicode_category_ngram_matrix`, as tuples of categories
+#[pyfunction]
+#[pyo3(signature = (n=2, groups=false))]
+fn get_unicode_category_ngram_columns(py: Python, n: usize, groups: bool) -> PyResult<PyObject> {
+    columns::ngrams::NgramSpec::new(n, groups)?.columns(py)
+}
+
+/// Byte-level metrics of raw, possibly invalid, UTF-8 input
+///
+/// Accepts `bytes`, `bytearray`, `memoryview` or `str` and reports byte entropy,
+/// invalid UTF-8 sequences, NUL/control byte ratios, U+FFFD replacement characters
+/// and overlong/mojibake sequences without decoding the input.
+#[pyfunction]
+fn byte_metrics(py: Python, data: &Bound<'_, PyAny>) -> PyResult<PyObject> {
+    let data = input::bytes_from_py(data)?;
+    let metrics = py.allow_threads(|| bytes::byte_metrics(&data));
+    Ok(bytes::byte_metrics_to_dict(py, &metrics)?.into())
+}
+
+/// Byte-level metrics for a batch of byte strings, computed in parallel
+#[pyfunction]
+fn batch_byte_metrics(py: Python, items: &Bound<'_, PyAny>) -> PyResult<PyObject> {
+    use rayon::prelude::*;
+
+    let batch = input::TextBatch::from_py(items)?;
+    let data = batch.bytes()?;
+    let metrics: Vec<bytes::ByteMetrics> =
+        py.allow_threads(|| data.par_iter().map(|d| bytes::byte_metrics(d)).collect());
+
+    let dicts = metrics
+        .iter()
+        .map(|m| bytes::byte_metrics_to_dict(py, m))
+        .collect::<PyResult<Vec<_>>>()?;
+    Ok(pyo3::types::PyList::new(py, dicts)?.into())
 }
 
 /// Gets character frequency counts for a string
@@ -702,6 +585,49 @@ fn tokenize_unigrams_with_punctuation(text: &str) -> PyResult<Vec<String>> {
     Ok(unigram::tokenize_with_punctuation(text))
 }
 
+/// Start and end offsets of the unigram tokens of a text as NumPy int64 arrays
+///
+/// Returns `(starts, ends)`, or `(starts, ends, classes)` with `classes`, where
+/// classes are uint8 codes indexing `TOKEN_CLASSES`. Offsets are byte offsets into
+/// the UTF-8 encoding, or character offsets with `unit="char"`.
+#[pyfunction]
+#[pyo3(signature = (text, include_punctuation=false, unit="byte", classes=false))]
+fn tokenize_unigrams_spans(
+    py: Python,
+    text: &str,
+    include_punctuation: bool,
+    unit: &str,
+    classes: bool,
+) -> PyResult<PyObject> {
+    let unit = columns::spans::OffsetUnit::parse(unit)?;
+    let spans = columns::spans::SpanArrays::from_text(text, include_punctuation, unit);
+    spans.into_numpy(py, false, classes)
+}
+
+/// Unigram token offsets for a batch of texts in CSR layout
+///
+/// Returns `(starts, ends, offsets)`, plus `classes` with `classes`; the spans of
+/// text `i` are `starts[offsets[i]:offsets[i + 1]]`. Texts are tokenized in
+/// parallel without the GIL.
+#[pyfunction]
+#[pyo3(signature = (texts, include_punctuation=false, unit="byte", classes=false, lossy=false))]
+fn batch_tokenize_unigrams_spans(
+    py: Python,
+    texts: &Bound<'_, PyAny>,
+    include_punctuation: bool,
+    unit: &str,
+    classes: bool,
+    lossy: bool,
+) -> PyResult<PyObject> {
+    let unit = columns::spans::OffsetUnit::parse(unit)?;
+    let batch = input::TextBatch::from_py(texts)?;
+    let texts = batch.texts(lossy)?;
+    let spans = py.allow_threads(|| {
+        columns::spans::SpanArrays::from_texts(&texts, include_punctuation, unit)
+    });
+    spans.into_numpy(py, true, classes)
+}
+
 /// Counts the total number of unigram tokens in a text.
 #[pyfunction]
 fn count_unigram_tokens(text: &str, include_punctuation: bool) -> PyResult<usize> {
@@ -799,7 +725,14 @@ fn get_all_unigram_metrics(
 ) -> PyResult<PyObject> {
     // Get all metrics in a single pass
     let metrics = unigram::calculate_all_unigram_metrics(text, include_punctuation, case_sensitive);
+    Ok(unigram_metrics_to_dict(py, &metrics)?.into())
+}
 
+/// Builds the dictionary returned by `get_all_unigram_metrics`.
+fn unigram_metrics_to_dict<'py>(
+    py: Python<'py>,
+    metrics: &unigram::UnigramMetrics,
+) -> PyResult<Bound<'py, PyDict>> {
     // Create a Python dictionary
     let dict = PyDict::new(py);
 
@@ -824,8 +757,7 @@ fn get_all_unigram_metrics(
     // to keep the output more concise
     // Users can call get_unigram_frequency separately if needed
 
-    // Return the Python dictionary
-    Ok(dict.into())
+    Ok(dict)
 }
 
 // ML-based tokenization functions
@@ -1301,221 +1233,76 @@ fn get_all_pattern_metrics(
     use_paragraph_processing: bool,
     max_segment_size: usize,
 ) -> PyResult<PyObject> {
-    // Initialize the pattern metrics dictionary
-    let pattern_section = PyDict::new(py);
-
-    // For large texts, process by paragraph when requested
-    if use_paragraph_processing {
-        // Split the text into paragraphs
+    let line_count = text.lines().count();
+    let metrics = if use_paragraph_processing {
+        // For large texts, process by paragraph when requested
         let paragraphs = text::segmentation::split_paragraphs(text);
-
-        // Record that we used paragraph processing
-        pattern_section.set_item("_used_paragraph_processing", true)?;
-        pattern_section.set_item("_paragraph_count", paragraphs.len())?;
-
-        // Process the paragraphs, potentially breaking them down further
-        let mut processed_segments = 0;
-        let mut large_paragraphs = 0;
-
-        // For each metric we need to count, initialize a counter
-        let mut question_count = 0;
-        let mut interrogative_count = 0;
-        let mut complex_interrogative_count = 0;
-        let mut factual_statement_count = 0;
-        let mut logical_reasoning_count = 0;
-        let mut section_heading_count = 0;
-        let mut copyright_count = 0;
-        let mut rights_reserved_count = 0;
-        let mut bullet_count = 0;
-        let mut ellipsis_count = 0;
-
-        // Process each paragraph, optionally breaking down large ones
-        for paragraph in &paragraphs {
-            processed_segments += 1;
-
-            if paragraph.len() > max_segment_size {
-                // This paragraph is too large - break it down into lines
-                large_paragraphs += 1;
-                let lines: Vec<String> = paragraph.lines().map(|s| s.to_string()).collect();
-
-                // Track extremely long lines that need further chunking
-                let mut extremely_long_lines = 0;
-
-                // Process each line separately
-                for line in &lines {
-                    if line.len() > max_segment_size {
-                        // Even this line is too long - break it into fixed-size chunks
-                        extremely_long_lines += 1;
-
-                        // Process in chunks of max_segment_size
-                        let mut start = 0;
-
-                        while start < line.len() {
-                            // Calculate end position, ensuring we stay on char boundaries
-                            let candidate_end = std::cmp::min(start + max_segment_size, line.len());
-
-                            // Find the closest valid char boundary (UTF-8 safe)
-                            let mut end = candidate_end;
-                            while end > start && !line.is_char_boundary(end) {
-                                end -= 1;
-                            }
-
-                            // Process this chunk if we have enough characters
-                            // Skip chunks smaller than 10 chars as they're unlikely to match patterns
-                            if end - start >= 10 {
-                                let chunk = &line[start..end];
-
-                                // Count patterns in this chunk
-                                question_count += patterns::QUESTION_REGEX.find_iter(chunk).count();
-                                interrogative_count +=
-                                    patterns::INTERROGATIVE_REGEX.find_iter(chunk).count();
-                                complex_interrogative_count +=
-                                    patterns::COMPLEX_INTERROGATIVE_REGEX
-                                        .find_iter(chunk)
-                                        .count();
-                                factual_statement_count +=
-                                    patterns::FACTUAL_STATEMENT_REGEX.find_iter(chunk).count();
-                                logical_reasoning_count +=
-                                    patterns::LOGICAL_REASONING_REGEX.find_iter(chunk).count();
-                                section_heading_count +=
-                                    patterns::SECTION_HEADING_REGEX.find_iter(chunk).count();
-                                copyright_count +=
-                                    patterns::COPYRIGHT_REGEX.find_iter(chunk).count();
-                                rights_reserved_count +=
-                                    patterns::RIGHTS_RESERVED_REGEX.find_iter(chunk).count();
-                                bullet_count += patterns::BULLET_REGEX.find_iter(chunk).count();
-                                ellipsis_count += patterns::ELLIPSIS_REGEX.find_iter(chunk).count();
-                            }
-
-                            // Move to next chunk
-                            start = end;
-                        }
-                    } else {
-                        // Line is reasonably sized - process normally
-                        question_count += patterns::QUESTION_REGEX.find_iter(line).count();
-                        interrogative_count +=
-                            patterns::INTERROGATIVE_REGEX.find_iter(line).count();
-                        complex_interrogative_count += patterns::COMPLEX_INTERROGATIVE_REGEX
-                            .find_iter(line)
-                            .count();
-                        factual_statement_count +=
-                            patterns::FACTUAL_STATEMENT_REGEX.find_iter(line).count();
-                        logical_reasoning_count +=
-                            patterns::LOGICAL_REASONING_REGEX.find_iter(line).count();
-                        section_heading_count +=
-                            patterns::SECTION_HEADING_REGEX.find_iter(line).count();
-                        copyright_count += patterns::COPYRIGHT_REGEX.find_iter(line).count();
-                        rights_reserved_count +=
-                            patterns::RIGHTS_RESERVED_REGEX.find_iter(line).count();
-                        bullet_count += patterns::BULLET_REGEX.find_iter(line).count();
-                        ellipsis_count += patterns::ELLIPSIS_REGEX.find_iter(line).count();
-                    }
-                }
-
-                // Add metadata about extremely long lines
-                pattern_section.set_item("_extremely_long_lines_chunked", extremely_long_lines)?;
-            } else {
-                // Normal-sized paragraph - process it as a single unit
-                question_count += patterns::QUESTION_REGEX.find_iter(paragraph).count();
-                interrogative_count += patterns::INTERROGATIVE_REGEX.find_iter(paragraph).count();
-                complex_interrogative_count += patterns::COMPLEX_INTERROGATIVE_REGEX
-                    .find_iter(paragraph)
-                    .count();
-                factual_statement_count += patterns::FACTUAL_STATEMENT_REGEX
-                    .find_iter(paragraph)
-                    .count();
-                logical_reasoning_count += patterns::LOGICAL_REASONING_REGEX
-                    .find_iter(paragraph)
-                    .count();
-                section_heading_count +=
-                    patterns::SECTION_HEADING_REGEX.find_iter(paragraph).count();
-                copyright_count += patterns::COPYRIGHT_REGEX.find_iter(paragraph).count();
-                rights_reserved_count +=
-                    patterns::RIGHTS_RESERVED_REGEX.find_iter(paragraph).count();
-                bullet_count += patterns::BULLET_REGEX.find_iter(paragraph).count();
-                ellipsis_count += patterns::ELLIPSIS_REGEX.find_iter(paragraph).count();
-            }
-        }
-
-        // Add processing metadata
-        pattern_section.set_item("_segments_processed", processed_segments)?;
-        pattern_section.set_item("_large_paragraphs_broken_down", large_paragraphs)?;
-        pattern_section.set_item("_max_segment_size", max_segment_size)?;
-
-        // Add all the metric counts
-        pattern_section.set_item("question_count", question_count)?;
-        pattern_section.set_item("interrogative_question_count", interrogative_count)?;
-        pattern_section.set_item("complex_interrogative_count", complex_interrogative_count)?;
-        pattern_section.set_item("factual_statement_count", factual_statement_count)?;
-        pattern_section.set_item("logical_reasoning_count", logical_reasoning_count)?;
-        pattern_section.set_item("section_heading_count", section_heading_count)?;
-        pattern_section.set_item("copyright_mention_count", copyright_count)?;
-        pattern_section.set_item("rights_reserved_count", rights_reserved_count)?;
-        pattern_section.set_item("bullet_count", bullet_count)?;
-        pattern_section.set_item("ellipsis_count", ellipsis_count)?;
-
-        // Some patterns need to be checked in the full text for accuracy
-        let contains_code = patterns::CODE_REGEX.is_match(text);
-        pattern_section.set_item("contains_code", contains_code)?;
-
-        // Calculate bullet/ellipsis ratio
-        let total_lines = text.lines().count();
-        let bullet_ellipsis_ratio = if total_lines > 0 {
-            (bullet_count + ellipsis_count) as f64 / total_lines as f64
-        } else {
-            0.0
-        };
-        pattern_section.set_item("bullet_ellipsis_ratio", bullet_ellipsis_ratio)?;
+        patterns::PatternMetrics::by_paragraph(text, &paragraphs, line_count, max_segment_size)
     } else {
         // Process the full text at once (original method)
-        pattern_section.set_item("_used_paragraph_processing", false)?;
-
-        let question_count = patterns::QUESTION_REGEX.find_iter(text).count();
-        pattern_section.set_item("question_count", question_count)?;
-
-        let interrogative_count = patterns::INTERROGATIVE_REGEX.find_iter(text).count();
-        pattern_section.set_item("interrogative_question_count", interrogative_count)?;
-
-        let complex_interrogative_count = patterns::COMPLEX_INTERROGATIVE_REGEX
-            .find_iter(text)
-            .count();
-        pattern_section.set_item("complex_interrogative_count", complex_interrogative_count)?;
-
-        let factual_statement_count = patterns::FACTUAL_STATEMENT_REGEX.find_iter(text).count();
-        pattern_section.set_item("factual_statement_count", factual_statement_count)?;
+        patterns::PatternMetrics::whole_text(text, line_count)
+    };
 
-        let logical_reasoning_count = patterns::LOGICAL_REASONING_REGEX.find_iter(text).count();
-        pattern_section.set_item("logical_reasoning_count", logical_reasoning_count)?;
-
-        let section_heading_count = patterns::SECTION_HEADING_REGEX.find_iter(text).count();
-        pattern_section.set_item("section_heading_count", section_heading_count)?;
-
-        let copyright_count = patterns::COPYRIGHT_REGEX.find_iter(text).count();
-        pattern_section.set_item("copyright_mention_count", copyright_count)?;
-
-        let rights_reserved_count = patterns::RIGHTS_RESERVED_REGEX.find_iter(text).count();
-        pattern_section.set_item("rights_reserved_count", rights_reserved_count)?;
-
-        let contains_code = patterns::CODE_REGEX.is_match(text);
-        pattern_section.set_item("contains_code", contains_code)?;
-
-        let bullet_count = patterns::BULLET_REGEX.find_iter(text).count();
-        pattern_section.set_item("bullet_count", bullet_count)?;
+    Ok(pattern_metrics_to_dict(py, &metrics)?.into())
+}
 
-        let ellipsis_count = patterns::ELLIPSIS_REGEX.find_iter(text).count();
-        pattern_section.set_item("ellipsis_count", ellipsis_count)?;
+/// Builds the dictionary returned by `get_all_pattern_metrics`, including the
+/// paragraph processing metadata when it was used.
+fn pattern_metrics_to_dict<'py>(
+    py: Python<'py>,
+    metrics: &patterns::PatternMetrics,
+) -> PyResult<Bound<'py, PyDict>> {
+    let pattern_section = PyDict::new(py);
+    let counts = &metrics.counts;
+
+    match &metrics.paragraphs {
+        Some(processing) => {
+            // Record that we used paragraph processing
+            pattern_section.set_item("_used_paragraph_processing", true)?;
+            pattern_section.set_item("_paragraph_count", processing.paragraph_count)?;
+            if let Some(extremely_long_lines) = processing.extremely_long_lines {
+                pattern_section.set_item("_extremely_long_lines_chunked", extremely_long_lines)?;
+            }
 
-        // Calculate bullet/ellipsis ratio manually to avoid another line counting pass
-        let total_lines = text.lines().count();
-        let bullet_ellipsis_ratio = if total_lines > 0 {
-            (bullet_count + ellipsis_count) as f64 / total_lines as f64
-        } else {
-            0.0
-        };
-        pattern_section.set_item("bullet_ellipsis_ratio", bullet_ellipsis_ratio)?;
+            // Add processing metadata
+            pattern_section.set_item("_segments_processed", processing.segments_processed)?;
+            pattern_section
+                .set_item("_large_paragraphs_broken_down", processing.large_paragraphs)?;
+            pattern_section.set_item("_max_segment_size", processing.max_segment_size)?;
+
+            // Add all the metric counts
+            pattern_section.set_item("question_count", counts.questions)?;
+            pattern_section.set_item("interrogative_question_count", counts.interrogatives)?;
+            pattern_section
+                .set_item("complex_interrogative_count", counts.complex_interrogatives)?;
+            pattern_section.set_item("factual_statement_count", counts.factual_statements)?;
+            pattern_section.set_item("logical_reasoning_count", counts.logical_reasoning)?;
+            pattern_section.set_item("section_heading_count", counts.section_headings)?;
+            pattern_section.set_item("copyright_mention_count", counts.copyright_mentions)?;
+            pattern_section.set_item("rights_reserved_count", counts.rights_reserved)?;
+            pattern_section.set_item("bullet_count", counts.bullets)?;
+            pattern_section.set_item("ellipsis_count", counts.ellipses)?;
+            pattern_section.set_item("contains_code", metrics.contains_code)?;
+        }
+        None => {
+            pattern_section.set_item("_used_paragraph_processing", false)?;
+            pattern_section.set_item("question_count", counts.questions)?;
+            pattern_section.set_item("interrogative_question_count", counts.interrogatives)?;
+            pattern_section
+                .set_item("complex_interrogative_count", counts.complex_interrogatives)?;
+            pattern_section.set_item("factual_statement_count", counts.factual_statements)?;
+            pattern_section.set_item("logical_reasoning_count", counts.logical_reasoning)?;
+            pattern_section.set_item("section_heading_count", counts.section_headings)?;
+            pattern_section.set_item("copyright_mention_count", counts.copyright_mentions)?;
+            pattern_section.set_item("rights_reserved_count", counts.rights_reserved)?;
+            pattern_section.set_item("contains_code", metrics.contains_code)?;
+            pattern_section.set_item("bullet_count", counts.bullets)?;
+            pattern_section.set_item("ellipsis_count", counts.ellipses)?;
+        }
     }
+    pattern_section.set_item("bullet_ellipsis_ratio", metrics.bullet_ellipsis_ratio)?;
 
-    Ok(pattern_section.into())
+    Ok(pattern_section)
 }
 
 /// Calculates all metrics including pattern-based metrics with optimized regex matching
@@ -1523,53 +1310,50 @@ fn get_all_pattern_metrics(
 ///
 /// By default, pattern-based metrics use paragraph processing for efficiency, with large paragraphs
 /// (>4096 bytes) further broken down into line segments for better performance.
+///
+/// `text` may be a `str` or UTF-8 `bytes`, `bytearray` or `memoryview`. Invalid UTF-8
+/// raises `UnicodeDecodeError` unless `lossy` is set, in which case it is replaced with U+FFFD.
 #[pyfunction]
-#[pyo3(signature = (text, include_punctuation=true, case_sensitive=false, use_paragraph_processing=true, max_segment_size=4096))]
+#[pyo3(signature = (text, include_punctuation=true, case_sensitive=false, use_paragraph_processing=true, max_segment_size=4096, lossy=false))]
 fn get_all_metrics(
     py: Python,
-    text: &str,
+    text: &Bound<'_, PyAny>,
     include_punctuation: bool,
     case_sensitive: bool,
     use_paragraph_processing: bool,
     max_segment_size: usize,
+    lossy: bool,
 ) -> PyResult<PyObject> {
-    // Create a new dictionary for results
-    let result_dict = PyDict::new(py);
+    // Accept str or raw UTF-8 bytes without building an intermediate Python string
+    let text = input::text_from_py(text, lossy)?;
 
-    // A simpler approach: use directly returned dictionaries
-    // Get character metrics
-    let char_metrics = get_all_char_metrics(py, text)?;
-    result_dict.set_item("character", char_metrics)?;
+    // Compute every section from one shared per-document analysis, without the GIL
+    let options = document::AnalysisOptions {
+        include_punctuation,
+        case_sensitive,
+        use_paragraph_processing,
+        max_segment_size,
+    };
+    let analysis = py.allow_threads(|| document::DocumentAnalysis::new(&text, options));
 
-    // Get unigram metrics
-    let unigram_metrics = get_all_unigram_metrics(py, text, include_punctuation, case_sensitive)?;
-    result_dict.set_item("unigram", unigram_metrics)?;
+    // Create a new dictionary for results
+    let result_dict = PyDict::new(py);
+    result_dict.set_item("character", char_profile_to_dict(py, &analysis.chars)?)?;
+    result_dict.set_item("unigram", unigram_metrics_to_dict(py, &analysis.unigrams)?)?;
 
     // Add segmentation metrics
     let segmentation_section = PyDict::new(py);
-    segmentation_section.set_item("line_count", text::segmentation::count_lines(text))?;
-    segmentation_section.set_item(
-        "average_line_length",
-        text::segmentation::average_line_length(text),
-    )?;
-    segmentation_section.set_item(
-        "paragraph_count",
-        text::segmentation::count_paragraphs(text),
-    )?;
+    segmentation_section.set_item("line_count", analysis.lines.line_count)?;
+    segmentation_section.set_item("average_line_length", analysis.lines.average_line_length())?;
+    segmentation_section.set_item("paragraph_count", analysis.lines.paragraph_count)?;
     segmentation_section.set_item(
         "average_paragraph_length",
-        text::segmentation::average_paragraph_length(text),
-    )?;
-    segmentation_section.set_item(
-        "average_sentence_length",
-        text::segmentation::average_sentence_length(text),
+        analysis.lines.average_paragraph_length(),
     )?;
+    segmentation_section.set_item("average_sentence_length", analysis.average_sentence_length)?;
     result_dict.set_item("segmentation", segmentation_section)?;
 
-    // Get all pattern metrics
-    let pattern_metrics =
-        get_all_pattern_metrics(py, text, use_paragraph_processing, max_segment_size)?;
-    result_dict.set_item("patterns", pattern_metrics)?;
+    result_dict.set_item("patterns", pattern_metrics_to_dict(py, &analysis.patterns)?)?;
 
     // Return the complete dictionary
     Ok(result_dict.into())
@@ -1584,6 +1368,23 @@ fn cheesecloth(m: &Bound<'_, PyModule>) -> PyResult<()> {
     // Hyper-optimized processor for calculating multiple metrics at once
     m.add_class::<hyper::HyperAnalyzer>()?;
 
+    // Streaming iterator returned by the analyzers' imap methods
+    m.add_class::<stream::MetricsStream>()?;
+
+    // Character metrics over texts too large to pass at once
+    m.add_class::<char::accumulator::CharMetricsAccumulator>()?;
+
+    // Character metrics converted to Python values on access
+    m.add_class::<char::result::CharMetricsResult>()?;
+
+    // Corpus-level unigram vocabulary
+    m.add_class::<unigram::vocabulary::VocabularyAccumulator>()?;
+
+    // Bounded-memory corpus token sketches
+    m.add_class::<unigram::sketch::HeavyHittersSketch>()?;
+    m.add_class::<unigram::sketch::CountMinSketch>()?;
+    m.add_class::<unigram::sketch::HyperLogLogSketch>()?;
+
     // Character metrics
     m.add_function(wrap_pyfunction!(count_chars, m)?)?;
     m.add_function(wrap_pyfunction!(count_words, m)?)?;
@@ -1627,6 +1428,13 @@ fn cheesecloth(m: &Bound<'_, PyModule>) -> PyResult<()> {
     m.add_function(wrap_pyfunction!(get_unicode_category_ratios, m)?)?;
     m.add_function(wrap_pyfunction!(get_unicode_category_group_ratios, m)?)?;
 
+    // Unicode scripts
+    m.add_function(wrap_pyfunction!(get_script_ratios, m)?)?;
+
+    // Byte-level metrics of raw input
+    m.add_function(wrap_pyfunction!(byte_metrics, m)?)?;
+    m.add_function(wrap_pyfunction!(batch_byte_metrics, m)?)?;
+
     // Unicode category bigrams
     m.add_function(wrap_pyfunction!(get_unicode_category_bigrams, m)?)?;
     m.add_function(wrap_pyfunction!(get_unicode_category_bigram_ratios, m)?)?;
@@ -1645,6 +1453,21 @@ fn cheesecloth(m: &Bound<'_, PyModule>) -> PyResult<()> {
         m
     )?)?;
 
+    // Unicode category n-gram feature matrices
+    m.add_function(wrap_pyfunction!(get_unicode_category_ngram_matrix, m)?)?;
+    m.add_function(wrap_pyfunction!(get_unicode_category_ngram_columns, m)?)?;
+    for (name, n, groups) in [
+        ("UNICODE_CATEGORY_BIGRAM_COLUMNS", 2, false),
+        ("UNICODE_CATEGORY_GROUP_BIGRAM_COLUMNS", 2, true),
+        ("UNICODE_CATEGORY_TRIGRAM_COLUMNS", 3, false),
+        ("UNICODE_CATEGORY_GROUP_TRIGRAM_COLUMNS", 3, true),
+    ] {
+        m.add(
+            name,
+            columns::ngrams::NgramSpec { n, groups }.columns(m.py())?,
+        )?;
+    }
+
     // Frequency counting functions (optimized)
     m.add_function(wrap_pyfunction!(get_char_frequency, m)?)?;
     m.add_function(wrap_pyfunction!(get_char_type_frequency, m)?)?;
@@ -1654,6 +1477,7 @@ fn cheesecloth(m: &Bound<'_, PyModule>) -> PyResult<()> {
     // Combined metrics
     m.add_function(wrap_pyfunction!(combined_char_metrics, m)?)?;
     m.add_function(wrap_pyfunction!(get_all_char_metrics, m)?)?;
+    m.add_function(wrap_pyfunction!(get_char_metrics, m)?)?;
     m.add_function(wrap_pyfunction!(get_all_pattern_metrics, m)?)?;
     m.add_function(wrap_pyfunction!(get_all_metrics, m)?)?;
 
@@ -1675,6 +1499,12 @@ fn cheesecloth(m: &Bound<'_, PyModule>) -> PyResult<()> {
     // Unigram tokenization functions
     m.add_function(wrap_pyfunction!(tokenize_unigrams, m)?)?;
     m.add_function(wrap_pyfunction!(tokenize_unigrams_with_punctuation, m)?)?;
+    m.add_function(wrap_pyfunction!(tokenize_unigrams_spans, m)?)?;
+    m.add_function(wrap_pyfunction!(batch_tokenize_unigrams_spans, m)?)?;
+    m.add(
+        "TOKEN_CLASSES",
+        PyTuple::new(m.py(), columns::spans::class_names())?,
+    )?;
     m.add_function(wrap_pyfunction!(count_unigram_tokens, m)?)?;
     m.add_function(wrap_pyfunction!(count_unique_unigrams, m)?)?;
     m.add_function(wrap_pyfunction!(unigram_type_token_ratio, m)?)?;
@@ -464,6 +464,169 @@ pub fn contains_blacklist_substring(text: &str, blacklist: &[&str]) -> bool {
     false
 }
 
+/// Match counts for the patterns reported together by `get_all_pattern_metrics`
+#[derive(Debug, Clone, Copy, Default, PartialEq, Eq)]
+pub struct PatternCounts {
+    pub questions: usize,
+    pub interrogatives: usize,
+    pub complex_interrogatives: usize,
+    pub factual_statements: usize,
+    pub logical_reasoning: usize,
+    pub section_headings: usize,
+    pub copyright_mentions: usize,
+    pub rights_reserved: usize,
+    pub bullets: usize,
+    pub ellipses: usize,
+}
+
+impl PatternCounts {
+    /// Count every pattern in a text
+    pub fn of(text: &str) -> Self {
+        let mut counts = PatternCounts::default();
+        counts.add(text);
+        counts
+    }
+
+    /// Add the matches found in one segment of a text
+    pub fn add(&mut self, segment: &str) {
+        self.questions += QUESTION_REGEX.find_iter(segment).count();
+        self.interrogatives += INTERROGATIVE_REGEX.find_iter(segment).count();
+        self.complex_interrogatives += COMPLEX_INTERROGATIVE_REGEX.find_iter(segment).count();
+        self.factual_statements += FACTUAL_STATEMENT_REGEX.find_iter(segment).count();
+        self.logical_reasoning += LOGICAL_REASONING_REGEX.find_iter(segment).count();
+        self.section_headings += SECTION_HEADING_REGEX.find_iter(segment).count();
+        self.copyright_mentions += COPYRIGHT_REGEX.find_iter(segment).count();
+        self.rights_reserved += RIGHTS_RESERVED_REGEX.find_iter(segment).count();
+        self.bullets += BULLET_REGEX.find_iter(segment).count();
+        self.ellipses += ELLIPSIS_REGEX.find_iter(segment).count();
+    }
+}
+
+/// How a text was processed paragraph by paragraph for pattern matching
+#[derive(Debug, Clone, Copy, Default, PartialEq, Eq)]
+pub struct ParagraphProcessing {
+    /// Number of paragraphs in the text
+    pub paragraph_count: usize,
+    /// Number of paragraphs processed
+    pub segments_processed: usize,
+    /// Paragraphs longer than `max_segment_size`, processed line by line
+    pub large_paragraphs: usize,
+    /// Lines cut into chunks within the last large paragraph, if there was one
+    pub extremely_long_lines: Option<usize>,
+    /// Segment size limit in bytes
+    pub max_segment_size: usize,
+}
+
+/// Count patterns over pre-split paragraphs
+///
+/// Paragraphs longer than `max_segment_size` bytes are processed line by line, and
+/// lines still longer than that are cut into chunks on char boundaries. Chunks
+/// shorter than 10 bytes are skipped as they're unlikely to match patterns.
+pub fn count_patterns_by_paragraph(
+    paragraphs: &[String],
+    max_segment_size: usize,
+) -> (PatternCounts, ParagraphProcessing) {
+    let mut counts = PatternCounts::default();
+    let mut processing = ParagraphProcessing {
+        paragraph_count: paragraphs.len(),
+        max_segment_size,
+        ..ParagraphProcessing::default()
+    };
+
+    for paragraph in paragraphs {
+        processing.segments_processed += 1;
+
+        if paragraph.len() <= max_segment_size {
+            counts.add(paragraph);
+            continue;
+        }
+
+        // This paragraph is too large - break it down into lines
+        processing.large_paragraphs += 1;
+        let mut extremely_long_lines = 0;
+
+        for line in paragraph.lines() {
+            if line.len() <= max_segment_size {
+                counts.add(line);
+                continue;
+            }
+
+            // Even this line is too long - break it into fixed-size chunks
+            extremely_long_lines += 1;
+            let mut start = 0;
+            while start < line.len() {
+                // Find the closest valid char boundary (UTF-8 safe)
+                let mut end = std::cmp::min(start + max_segment_size, line.len());
+                while end > start && !line.is_char_boundary(end) {
+                    end -= 1;
+                }
+
+                if end - start >= 10 {
+                    counts.add(&line[start..end]);
+                }
+                start = end;
+            }
+        }
+
+        processing.extremely_long_lines = Some(extremely_long_lines);
+    }
+
+    (counts, processing)
+}
+
+/// Pattern metrics for a document, as reported by `get_all_pattern_metrics`
+#[derive(Debug, Clone, Copy, PartialEq)]
+pub struct PatternMetrics {
+    pub counts: PatternCounts,
+    pub contains_code: bool,
+    /// Bullet and ellipsis matches per line
+    pub bullet_ellipsis_ratio: f64,
+    /// Set when patterns were matched paragraph by paragraph
+    pub paragraphs: Option<ParagraphProcessing>,
+}
+
+impl PatternMetrics {
+    /// Match every pattern against the whole text
+    ///
+    /// `line_count` is the number of lines in `text`, as counted by `str::lines`.
+    pub fn whole_text(text: &str, line_count: usize) -> Self {
+        Self::new(text, PatternCounts::of(text), line_count, None)
+    }
+
+    /// Match patterns paragraph by paragraph, using paragraphs already split from
+    /// `text` by `split_paragraphs`
+    pub fn by_paragraph(
+        text: &str,
+        paragraphs: &[String],
+        line_count: usize,
+        max_segment_size: usize,
+    ) -> Self {
+        let (counts, processing) = count_patterns_by_paragraph(paragraphs, max_segment_size);
+        Self::new(text, counts, line_count, Some(processing))
+    }
+
+    fn new(
+        text: &str,
+        counts: PatternCounts,
+        line_count: usize,
+        paragraphs: Option<ParagraphProcessing>,
+    ) -> Self {
+        let bullet_ellipsis_ratio = if line_count > 0 {
+            (counts.bullets + counts.ellipses) as f64 / line_count as f64
+        } else {
+            0.0
+        };
+
+        PatternMetrics {
+            counts,
+            // Code detection always needs the full text for accuracy
+            contains_code: CODE_REGEX.is_match(text),
+            bullet_ellipsis_ratio,
+            paragraphs,
+        }
+    }
+}
+
 #[cfg(test)]
 mod tests {
     use super::*;
@@ -677,4 +840,30 @@ mod tests {
         let safe_text = "This is a completely safe text.";
         assert!(!contains_blacklist_substring(safe_text, blacklist));
     }
+
+    #[test]
+    fn test_pattern_counts_by_paragraph() {
+        let paragraphs = vec![
+            "What is this? Why is it here?".to_string(),
+            "Copyright 2024. All rights reserved...".to_string(),
+        ];
+        let text = paragraphs.join("\n\n");
+
+        let whole = PatternMetrics::whole_text(&text, 3);
+        assert_eq!(whole.paragraphs, None);
+
+        let segmented = PatternMetrics::by_paragraph(&text, &paragraphs, 3, 4096);
+        assert_eq!(segmented.counts, whole.counts);
+        assert_eq!(segmented.contains_code, whole.contains_code);
+        let processing = segmented.paragraphs.unwrap();
+        assert_eq!(processing.paragraph_count, 2);
+        assert_eq!(processing.segments_processed, 2);
+        assert_eq!(processing.large_paragraphs, 0);
+        assert_eq!(processing.extremely_long_lines, None);
+
+        // A tiny segment size forces every paragraph to be chunked
+        let (_, chunked) = count_patterns_by_paragraph(&paragraphs, 12);
+        assert_eq!(chunked.large_paragraphs, 2);
+        assert_eq!(chunked.extremely_long_lines, Some(1));
+    }
 }
@@ -0,0 +1,283 @@
+//! # Streaming Metric Iterators
+//!
+//! This module provides `imap`-style iterators that overlap reading input in Python
+//! with metric computation in Rust. Texts are pulled from a Python iterable in
+//! chunks, each chunk is handed to a rayon worker, and results are yielded in input
+//! order while later chunks are still being read and analyzed.
+//!
+//! ## Key Features
+//!
+//! * Background computation on rayon workers with the GIL released
+//! * A bounded number of chunks in flight, so memory stays flat on long streams
+//! * Results yielded in input order, one per text
+//! * Shared by `HyperAnalyzer.imap` and `BatchProcessor.imap` via `StreamEngine`
+//!
+//! Reading (for example decompressing and parsing a JSONL shard) happens on the
+//! consuming Python thread while the GIL is held; the analysis of every chunk
+//! already submitted proceeds in parallel without it.
+
+use pyo3::prelude::*;
+use pyo3::types::PyIterator;
+use std::collections::VecDeque;
+use std::panic::{self, AssertUnwindSafe};
+use std::sync::{Arc, Condvar, Mutex};
+
+use crate::input::text_from_py;
+
+/// Analysis of one chunk of texts, run on a worker thread without the GIL
+pub trait ChunkWorker: Send + Sync + 'static {
+    /// Result of analyzing one chunk
+    type Output: Send + 'static;
+
+    /// Analyze a chunk of texts
+    fn compute_chunk(&self, texts: &[String]) -> Self::Output;
+}
+
+/// The Python-facing side of a streaming analyzer
+pub trait StreamEngine: Send + Sync + 'static {
+    type Worker: ChunkWorker;
+
+    /// Shared state handed to worker threads
+    fn worker(&self) -> Arc<Self::Worker>;
+
+    /// Convert a chunk result into one Python object per text, in input order
+    fn convert(
+        &self,
+        py: Python<'_>,
+        output: <Self::Worker as ChunkWorker>::Output,
+    ) -> PyResult<Vec<PyObject>>;
+
+    /// Thread pool that runs the chunks; `None` uses rayon's global pool
+    fn pool(&self) -> Option<&rayon::ThreadPool> {
+        None
+    }
+}
+
+/// Result slot of a chunk in flight, filled by its worker
+struct Pending<T> {
+    result: Mutex<Option<std::thread::Result<T>>>,
+    ready: Condvar,
+}
+
+impl<T> Pending<T> {
+    fn new() -> Self {
+        Pending {
+            result: Mutex::new(None),
+            ready: Condvar::new(),
+        }
+    }
+
+    fn complete(&self, result: std::thread::Result<T>) {
+        let mut slot = self.result.lock().unwrap_or_else(|e| e.into_inner());
+        *slot = Some(result);
+        self.ready.notify_one();
+    }
+
+    /// Block until the worker has produced a result
+    fn wait(&self) -> std::thread::Result<T> {
+        let mut slot = self.result.lock().unwrap_or_else(|e| e.into_inner());
+        loop {
+            if let Some(result) = slot.take() {
+                return result;
+            }
+            slot = self.ready.wait(slot).unwrap_or_else(|e| e.into_inner());
+        }
+    }
+}
+
+/// Type-erased queue of submitted chunks, oldest first
+trait ChunkQueue: Send + Sync {
+    fn in_flight(&self) -> usize;
+    fn submit(&mut self, texts: Vec<String>);
+    fn next_chunk(&mut self, py: Python<'_>) -> PyResult<Option<Vec<PyObject>>>;
+}
+
+struct Pipeline<E: StreamEngine> {
+    engine: E,
+    worker: Arc<E::Worker>,
+    pending: VecDeque<Arc<Pending<<E::Worker as ChunkWorker>::Output>>>,
+}
+
+impl<E: StreamEngine> ChunkQueue for Pipeline<E> {
+    fn in_flight(&self) -> usize {
+        self.pending.len()
+    }
+
+    fn submit(&mut self, texts: Vec<String>) {
+        let slot = Arc::new(Pending::new());
+        let task_slot = Arc::clone(&slot);
+        let worker = Arc::clone(&self.worker);
+        let task = move || {
+            let chunk = || worker.compute_chunk(&texts);
+            let result = panic::catch_unwind(AssertUnwindSafe(chunk));
+            task_slot.complete(result);
+        };
+
+        match self.engine.pool() {
+            Some(pool) => pool.spawn(task),
+            None => rayon::spawn(task),
+        }
+        self.pending.push_back(slot);
+    }
+
+    fn next_chunk(&mut self, py: Python<'_>) -> PyResult<Option<Vec<PyObject>>> {
+        let Some(slot) = self.pending.pop_front() else {
+            return Ok(None);
+        };
+        match py.allow_threads(|| slot.wait()) {
+            Ok(output) => self.engine.convert(py, output).map(Some),
+            Err(_) => Err(PyErr::new::<pyo3::exceptions::PyRuntimeError, _>(
+                "metric computation panicked on a worker thread",
+            )),
+        }
+    }
+}
+
+/// Iterator over metric results for a stream of texts
+///
+/// Created by `HyperAnalyzer.imap` and `BatchProcessor.imap`. Each call to
+/// `__next__` first reads and submits chunks until `max_in_flight` chunks are
+/// pending, then returns the next result in input order. An item that cannot be
+/// read raises its error in its place, after the results of the items before it.
+#[pyclass]
+pub struct MetricsStream {
+    source: Py<PyIterator>,
+    queue: Box<dyn ChunkQueue>,
+    ready: VecDeque<PyObject>,
+    exhausted: bool,
+    /// Error reading the source, raised once the texts read before it are returned
+    deferred_error: Option<PyErr>,
+    /// Replace invalid UTF-8 in bytes items instead of raising
+    lossy: bool,
+    #[pyo3(get)]
+    chunk_size: usize,
+    #[pyo3(get)]
+    max_in_flight: usize,
+}
+
+impl MetricsStream {
+    /// Create a stream over `iterable` analyzed by `engine`.
+    ///
+    /// `max_in_flight` defaults to the number of threads in the engine's pool.
+    /// Items may be `str` or UTF-8 bytes; see `crate::input::text_from_py`.
+    pub fn new<E: StreamEngine>(
+        iterable: &Bound<'_, PyAny>,
+        engine: E,
+        chunk_size: usize,
+        max_in_flight: Option<usize>,
+        lossy: bool,
+    ) -> PyResult<Self> {
+        if chunk_size == 0 {
+            return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                "chunk_size must be at least 1",
+            ));
+        }
+        let max_in_flight = match max_in_flight {
+            Some(0) => {
+                return Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(
+                    "max_in_flight must be at least 1",
+                ))
+            }
+            Some(n) => n,
+            None => engine
+                .pool()
+                .map_or_else(rayon::current_num_threads, |pool| {
+                    pool.current_num_threads()
+                }),
+        };
+
+        let worker = engine.worker();
+        Ok(MetricsStream {
+            source: iterable.try_iter()?.unbind(),
+            queue: Box::new(Pipeline {
+                engine,
+                worker,
+                pending: VecDeque::new(),
+            }),
+            ready: VecDeque::new(),
+            exhausted: false,
+            deferred_error: None,
+            lossy,
+            chunk_size,
+            max_in_flight,
+        })
+    }
+
+    /// Read up to `chunk_size` texts from the source iterator
+    ///
+    /// Stops early at an item that cannot be read, keeping its error in
+    /// `deferred_error` so the texts read before it are still analyzed.
+    fn read_chunk(&mut self, py: Python<'_>) -> Vec<String> {
+        let mut source = self.source.bind(py).clone();
+        let mut texts = Vec::with_capacity(self.chunk_size);
+        while texts.len() < self.chunk_size {
+            match source.next() {
+                Some(item) => match item.and_then(|item| text_from_py(&item, self.lossy)) {
+                    Ok(text) => texts.push(text.into_owned()),
+                    Err(e) => {
+                        self.deferred_error = Some(e);
+                        break;
+                    }
+                },
+                None => {
+                    self.exhausted = true;
+                    break;
+                }
+            }
+        }
+        texts
+    }
+}
+
+#[pymethods]
+impl MetricsStream {
+    fn __iter__(slf: PyRef<'_, Self>) -> PyRef<'_, Self> {
+        slf
+    }
+
+    fn __next__(&mut self, py: Python<'_>) -> PyResult<Option<PyObject>> {
+        // Keep the workers busy before waiting on the oldest chunk; after a read
+        // error, nothing more is read until it has been raised
+        while !self.exhausted
+            && self.deferred_error.is_none()
+            && self.queue.in_flight() < self.max_in_flight
+        {
+            let texts = self.read_chunk(py);
+            if !texts.is_empty() {
+                self.queue.submit(texts);
+            }
+        }
+
+        while self.ready.is_empty() {
+            match self.queue.next_chunk(py)? {
+                Some(results) => self.ready.extend(results),
+                None => return self.deferred_error.take().map_or(Ok(None), Err),
+            }
+        }
+
+        Ok(self.ready.pop_front())
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use std::thread;
+
+    #[test]
+    fn test_pending_wait() {
+        let slot = Arc::new(Pending::new());
+        let worker_slot = Arc::clone(&slot);
+        let handle = thread::spawn(move || worker_slot.complete(Ok(vec![1, 2, 3])));
+
+        assert_eq!(slot.wait().ok(), Some(vec![1, 2, 3]));
+        handle.join().unwrap();
+    }
+
+    #[test]
+    fn test_pending_panic() {
+        let slot: Pending<usize> = Pending::new();
+        slot.complete(panic::catch_unwind(|| panic!("worker failed")));
+        assert!(slot.wait().is_err());
+    }
+}
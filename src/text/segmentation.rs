@@ -95,6 +95,70 @@ pub fn average_paragraph_length(text: &str) -> f64 {
     total_chars as f64 / paragraphs.len() as f64
 }
 
+/// Line and paragraph statistics gathered in a single traversal of the text
+#[derive(Debug, Clone, Copy, Default, PartialEq, Eq)]
+pub struct LineStats {
+    /// Number of lines, as counted by `count_lines`
+    pub line_count: usize,
+    /// Total characters across all lines, excluding line terminators
+    pub line_chars: usize,
+    /// Number of paragraphs, as counted by `count_paragraphs`
+    pub paragraph_count: usize,
+    /// Total characters across all paragraphs as produced by `split_paragraphs`
+    pub paragraph_chars: usize,
+}
+
+impl LineStats {
+    /// Average line length in characters, matching `average_line_length`
+    pub fn average_line_length(&self) -> f64 {
+        if self.line_count == 0 {
+            return 0.0;
+        }
+        self.line_chars as f64 / self.line_count as f64
+    }
+
+    /// Average paragraph length in characters, matching `average_paragraph_length`
+    pub fn average_paragraph_length(&self) -> f64 {
+        if self.paragraph_count == 0 {
+            return 0.0;
+        }
+        self.paragraph_chars as f64 / self.paragraph_count as f64
+    }
+}
+
+/// Computes line and paragraph statistics in one pass without building paragraph strings
+///
+/// Paragraphs follow `split_paragraphs`: trimmed non-empty lines joined by a single
+/// space, so each paragraph's length is the sum of its trimmed lines plus the joins.
+pub fn line_statistics(text: &str) -> LineStats {
+    let mut stats = LineStats::default();
+    let mut paragraph_lines = 0;
+
+    for line in text.lines() {
+        stats.line_count += 1;
+        stats.line_chars += line.chars().count();
+
+        let trimmed = line.trim();
+        if trimmed.is_empty() {
+            if paragraph_lines > 0 {
+                stats.paragraph_count += 1;
+                stats.paragraph_chars += paragraph_lines - 1;
+                paragraph_lines = 0;
+            }
+        } else {
+            stats.paragraph_chars += trimmed.chars().count();
+            paragraph_lines += 1;
+        }
+    }
+
+    if paragraph_lines > 0 {
+        stats.paragraph_count += 1;
+        stats.paragraph_chars += paragraph_lines - 1;
+    }
+
+    stats
+}
+
 /// Calculates the average word length in characters
 pub fn average_word_length(text: &str) -> f64 {
     let words = split_words(text);
@@ -248,6 +312,29 @@ mod tests {
         assert_eq!(average_paragraph_length(empty), 0.0);
     }
 
+    #[test]
+    fn test_line_statistics() {
+        let texts = [
+            "",
+            "Single line",
+            "Line 1\nLine 2\r\nLine 3",
+            "  Para one\n  still one  \n\n\nPara two\n \t\nPara three  ",
+            "\n\n",
+            "Ünïcödé line\n\nanother",
+        ];
+
+        for text in texts {
+            let stats = line_statistics(text);
+            assert_eq!(stats.line_count, count_lines(text));
+            assert_eq!(stats.paragraph_count, count_paragraphs(text));
+            assert_eq!(stats.average_line_length(), average_line_length(text));
+            assert_eq!(
+                stats.average_paragraph_length(),
+                average_paragraph_length(text)
+            );
+        }
+    }
+
     #[test]
     fn test_average_word_length() {
         let text = "The quick brown fox";
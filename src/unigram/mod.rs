@@ -15,8 +15,127 @@
 //! follows linguistic word boundaries, making it useful for stylometric analysis,
 //! readability assessment, and author identification.
 
-use std::collections::{HashMap, HashSet};
-use unicode_segmentation::UnicodeSegmentation;
+pub mod sketch;
+pub mod vocabulary;
+
+use std::collections::HashMap;
+use std::fmt;
+use std::hash::{Hash, Hasher};
+use unicode_segmentation::{UnicodeSegmentation, UnicodeWordIndices};
+
+/// Byte range `(start, end)` of a token within its text
+pub type Span = (usize, usize);
+
+/// Class of a token produced by `tokenize_with_punctuation`
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+pub enum TokenClass {
+    Word,
+    Punctuation,
+    Whitespace,
+}
+
+impl TokenClass {
+    /// All classes, in the order of their codes
+    pub const ALL: [TokenClass; 3] = [
+        TokenClass::Word,
+        TokenClass::Punctuation,
+        TokenClass::Whitespace,
+    ];
+
+    /// Small integer code of the class, its index in `ALL`
+    #[inline]
+    pub fn code(self) -> u8 {
+        self as u8
+    }
+
+    /// Lowercase name of the class
+    pub fn name(self) -> &'static str {
+        match self {
+            TokenClass::Word => "word",
+            TokenClass::Punctuation => "punctuation",
+            TokenClass::Whitespace => "whitespace",
+        }
+    }
+
+    /// Class of a single character
+    #[inline]
+    pub fn of(ch: char) -> Self {
+        if ch.is_ascii_punctuation() {
+            TokenClass::Punctuation
+        } else if ch.is_whitespace() {
+            TokenClass::Whitespace
+        } else {
+            TokenClass::Word
+        }
+    }
+}
+
+/// Iterator over the tokens of `tokenize_with_punctuation` as spans and classes
+///
+/// Each token is a maximal run of characters of the same `TokenClass`, so words,
+/// runs of ASCII punctuation and runs of whitespace alternate.
+pub struct ClassSpans<'a> {
+    text: &'a str,
+    pos: usize,
+}
+
+impl<'a> Iterator for ClassSpans<'a> {
+    type Item = (Span, TokenClass);
+
+    fn next(&mut self) -> Option<Self::Item> {
+        let rest = &self.text[self.pos..];
+        let mut chars = rest.char_indices();
+        let (_, first) = chars.next()?;
+        let class = TokenClass::of(first);
+        let len = chars
+            .find(|&(_, ch)| TokenClass::of(ch) != class)
+            .map_or(rest.len(), |(offset, _)| offset);
+
+        let start = self.pos;
+        self.pos += len;
+        Some(((start, self.pos), class))
+    }
+}
+
+/// Tokens of `text` with their classes, including punctuation and whitespace
+pub fn class_spans(text: &str) -> ClassSpans<'_> {
+    ClassSpans { text, pos: 0 }
+}
+
+/// Iterator over the byte spans of unigram tokens
+pub enum TokenSpans<'a> {
+    Words(UnicodeWordIndices<'a>),
+    WithPunctuation(ClassSpans<'a>),
+}
+
+impl<'a> Iterator for TokenSpans<'a> {
+    type Item = Span;
+
+    #[inline]
+    fn next(&mut self) -> Option<Span> {
+        match self {
+            TokenSpans::Words(words) => words
+                .next()
+                .map(|(start, word)| (start, start + word.len())),
+            TokenSpans::WithPunctuation(spans) => spans.next().map(|(span, _)| span),
+        }
+    }
+}
+
+/// Byte spans of the tokens of `tokenize` or, with `include_punctuation`, of
+/// `tokenize_with_punctuation`, without allocating the tokens
+pub fn token_spans(text: &str, include_punctuation: bool) -> TokenSpans<'_> {
+    if include_punctuation {
+        TokenSpans::WithPunctuation(class_spans(text))
+    } else {
+        TokenSpans::Words(text.unicode_word_indices())
+    }
+}
+
+/// Tokens as slices borrowed from `text`
+pub fn token_slices(text: &str, include_punctuation: bool) -> impl Iterator<Item = &str> + '_ {
+    token_spans(text, include_punctuation).map(move |(start, end)| &text[start..end])
+}
 
 /// Tokenizes a text into unigram tokens (words and punctuation).
 ///
@@ -31,12 +150,7 @@ use unicode_segmentation::UnicodeSegmentation;
 ///
 /// A vector of string tokens
 pub fn tokenize(text: &str) -> Vec<String> {
-    // Use unicode_segmentation to split text into words
-    let tokens: Vec<String> = UnicodeSegmentation::unicode_words(text)
-        .map(|s| s.to_string())
-        .collect();
-
-    tokens
+    token_slices(text, false).map(str::to_string).collect()
 }
 
 /// Tokenizes a text into unigram tokens, including words, punctuation, and whitespace.
@@ -52,89 +166,183 @@ pub fn tokenize(text: &str) -> Vec<String> {
 ///
 /// A vector of string tokens
 pub fn tokenize_with_punctuation(text: &str) -> Vec<String> {
-    use std::ops::Not;
+    token_slices(text, true).map(str::to_string).collect()
+}
 
-    // Handle empty text
-    if text.is_empty() {
-        return Vec::new();
+/// Case-insensitive form of a character, used to compare and hash tokens
+///
+/// ASCII is lowercased with a table-free fast path. Other characters map to their
+/// lowercase form when it is a single character, and final sigma maps to sigma,
+/// so "ΟΔΟΣ" and "οδος" compare equal. This is single-character lowercasing, not
+/// full Unicode case folding: "µ" and "μ" or "ſ" and "s" stay distinct.
+#[inline]
+pub fn fold_char(ch: char) -> char {
+    if ch.is_ascii() {
+        return ch.to_ascii_lowercase();
+    }
+    if ch == 'ς' {
+        return 'σ';
+    }
+    let mut lower = ch.to_lowercase();
+    match (lower.next(), lower.next()) {
+        (Some(folded), None) => folded,
+        _ => ch,
     }
+}
 
-    // A more customized tokenization that separates punctuation from words
-    let mut tokens = Vec::new();
-    let mut current_token = String::new();
-    let mut current_is_punct = None;
+/// Size of the buffer through which folded tokens are hashed
+const FOLD_BUFFER: usize = 64;
 
-    for ch in text.chars() {
-        let is_punct = ch.is_ascii_punctuation() || ch.is_whitespace();
+/// A token used as a frequency-map key, borrowed from the text
+///
+/// Case-insensitive keys are hashed and compared through `fold_char` without
+/// materializing the folded form. The key returned to callers is the lowercase
+/// token, built only when a key is turned into a `String` with `to_string`.
+#[derive(Debug, Clone, Copy)]
+pub struct TokenKey<'a> {
+    token: &'a str,
+    folded: bool,
+}
 
-        match current_is_punct {
-            None => {
-                current_token.push(ch);
-                current_is_punct = Some(is_punct);
-            }
-            Some(prev_is_punct) if prev_is_punct == is_punct => {
-                // Continue current token if same type
-                current_token.push(ch);
-            }
-            Some(_) => {
-                // Switch token type
-                if !current_token.is_empty() {
-                    tokens.push(current_token);
-                    current_token = String::new();
-                }
-                current_token.push(ch);
-                current_is_punct = Some(is_punct);
-            }
+impl<'a> TokenKey<'a> {
+    /// Key comparing the token exactly, or by its case-folded form
+    #[inline]
+    pub fn new(token: &'a str, case_sensitive: bool) -> Self {
+        TokenKey {
+            token,
+            folded: !case_sensitive,
         }
     }
 
-    // Add the last token if not empty
-    if !current_token.is_empty() {
-        tokens.push(current_token);
-    }
-
-    // If text has period in the middle, further split
-    let mut final_tokens = Vec::new();
-    for token in tokens {
-        if token.len() > 1
-            && token.chars().any(|c| c.is_ascii_punctuation())
-            && token.chars().any(|c| c.is_ascii_punctuation().not())
-        {
-            // This is a token that contains both punctuation and non-punctuation
-            let mut current = String::new();
-            let mut is_punct = None;
-
-            for ch in token.chars() {
-                let ch_is_punct = ch.is_ascii_punctuation();
-
-                match is_punct {
-                    None => {
-                        current.push(ch);
-                        is_punct = Some(ch_is_punct);
-                    }
-                    Some(prev_is_punct) if prev_is_punct == ch_is_punct => {
-                        current.push(ch);
-                    }
-                    Some(_) => {
-                        if !current.is_empty() {
-                            final_tokens.push(current);
-                            current = String::new();
-                        }
-                        current.push(ch);
-                        is_punct = Some(ch_is_punct);
-                    }
-                }
+    /// The token as it appears in the text
+    pub fn as_str(&self) -> &'a str {
+        self.token
+    }
+
+    /// The key as a string slice: the token itself if it is case-sensitive or
+    /// already lowercase, otherwise its lowercase form written into `buffer`
+    pub fn as_key_str<'b>(&self, buffer: &'b mut String) -> &'b str
+    where
+        'a: 'b,
+    {
+        if !self.folded {
+            return self.token;
+        }
+        if self.token.is_ascii() {
+            if !self.token.bytes().any(|byte| byte.is_ascii_uppercase()) {
+                return self.token;
             }
+            buffer.clear();
+            buffer.push_str(self.token);
+            buffer.make_ascii_lowercase();
+            return buffer;
+        }
 
-            if !current.is_empty() {
-                final_tokens.push(current);
+        let lowercase = |ch: char| {
+            let mut lower = ch.to_lowercase();
+            lower.next() == Some(ch) && lower.next().is_none()
+        };
+        if self.token.chars().all(lowercase) {
+            return self.token;
+        }
+        *buffer = self.token.to_lowercase();
+        buffer
+    }
+
+    /// Characters of the key, folded if the key is case-insensitive
+    fn chars(&self) -> impl Iterator<Item = char> + 'a {
+        let folded = self.folded;
+        self.token
+            .chars()
+            .map(move |ch| if folded { fold_char(ch) } else { ch })
+    }
+}
+
+impl PartialEq for TokenKey<'_> {
+    fn eq(&self, other: &Self) -> bool {
+        if self.folded != other.folded {
+            return false;
+        }
+        if !self.folded {
+            return self.token == other.token;
+        }
+        if self.token.is_ascii() && other.token.is_ascii() {
+            return self.token.eq_ignore_ascii_case(other.token);
+        }
+        self.chars().eq(other.chars())
+    }
+}
+
+impl Eq for TokenKey<'_> {}
+
+impl Hash for TokenKey<'_> {
+    fn hash<H: Hasher>(&self, state: &mut H) {
+        if !self.folded {
+            self.token.hash(state);
+            return;
+        }
+
+        // The folded UTF-8 bytes are written in blocks of at most FOLD_BUFFER bytes,
+        // split only before a character that would not fit, so equal folded forms
+        // are always written identically
+        let mut buffer = [0u8; FOLD_BUFFER];
+        if self.token.is_ascii() {
+            for block in self.token.as_bytes().chunks(FOLD_BUFFER) {
+                for (folded, byte) in buffer.iter_mut().zip(block) {
+                    *folded = byte.to_ascii_lowercase();
+                }
+                state.write(&buffer[..block.len()]);
             }
         } else {
-            final_tokens.push(token);
+            let mut len = 0;
+            for ch in self.chars() {
+                if len + ch.len_utf8() > FOLD_BUFFER {
+                    state.write(&buffer[..len]);
+                    len = 0;
+                }
+                len += ch.encode_utf8(&mut buffer[len..]).len();
+            }
+            if len > 0 {
+                state.write(&buffer[..len]);
+            }
         }
+        state.write_u8(0xff);
+    }
+}
+
+impl fmt::Display for TokenKey<'_> {
+    fn fmt(&self, f: &mut fmt::Formatter<'_>) -> fmt::Result {
+        let mut buffer = String::new();
+        f.write_str(self.as_key_str(&mut buffer))
+    }
+}
+
+/// Counts the occurrences of each token, keyed by slices of `text`.
+///
+/// With `case_sensitive=false` tokens are compared by their case-folded form without
+/// allocating; `TokenKey::to_string` gives the lowercase key.
+pub fn count_token_slices(
+    text: &str,
+    include_punctuation: bool,
+    case_sensitive: bool,
+) -> HashMap<TokenKey<'_>, usize> {
+    let mut frequency_map = HashMap::new();
+
+    for token in token_slices(text, include_punctuation) {
+        *frequency_map
+            .entry(TokenKey::new(token, case_sensitive))
+            .or_insert(0) += 1;
     }
 
-    final_tokens
+    frequency_map
+}
+
+/// Converts a map of token keys to owned strings, lowercased if case-insensitive
+pub fn key_counts_to_strings(counts: HashMap<TokenKey<'_>, usize>) -> HashMap<String, usize> {
+    counts
+        .into_iter()
+        .map(|(token, count)| (token.to_string(), count))
+        .collect()
 }
 
 /// Counts the total number of unigram tokens in a text.
@@ -148,11 +356,7 @@ pub fn tokenize_with_punctuation(text: &str) -> Vec<String> {
 ///
 /// The count of tokens in the text
 pub fn count_tokens(text: &str, include_punctuation: bool) -> usize {
-    if include_punctuation {
-        tokenize_with_punctuation(text).len()
-    } else {
-        tokenize(text).len()
-    }
+    token_spans(text, include_punctuation).count()
 }
 
 /// Counts the number of unique unigram tokens in a text.
@@ -167,23 +371,7 @@ pub fn count_tokens(text: &str, include_punctuation: bool) -> usize {
 ///
 /// The count of unique tokens in the text
 pub fn count_unique_tokens(text: &str, include_punctuation: bool, case_sensitive: bool) -> usize {
-    let tokens = if include_punctuation {
-        tokenize_with_punctuation(text)
-    } else {
-        tokenize(text)
-    };
-
-    let mut unique_tokens = HashSet::new();
-
-    for token in tokens {
-        if case_sensitive {
-            unique_tokens.insert(token);
-        } else {
-            unique_tokens.insert(token.to_lowercase());
-        }
-    }
-
-    unique_tokens.len()
+    count_token_slices(text, include_punctuation, case_sensitive).len()
 }
 
 /// Calculates the type-token ratio (unique tokens / total tokens) for a text.
@@ -200,18 +388,14 @@ pub fn count_unique_tokens(text: &str, include_punctuation: bool, case_sensitive
 ///
 /// The type-token ratio (between 0.0 and 1.0)
 pub fn type_token_ratio(text: &str, include_punctuation: bool, case_sensitive: bool) -> f64 {
-    let tokens = if include_punctuation {
-        tokenize_with_punctuation(text)
-    } else {
-        tokenize(text)
-    };
+    let frequency = count_token_slices(text, include_punctuation, case_sensitive);
 
-    if tokens.is_empty() {
+    if frequency.is_empty() {
         return 0.0;
     }
 
-    let total_tokens = tokens.len();
-    let unique_count = count_unique_tokens(text, include_punctuation, case_sensitive);
+    let total_tokens: usize = frequency.values().sum();
+    let unique_count = frequency.len();
 
     unique_count as f64 / total_tokens as f64
 }
@@ -230,18 +414,15 @@ pub fn type_token_ratio(text: &str, include_punctuation: bool, case_sensitive: b
 ///
 /// The repetition rate (between 0.0 and 1.0)
 pub fn repetition_rate(text: &str, include_punctuation: bool, case_sensitive: bool) -> f64 {
-    let tokens = if include_punctuation {
-        tokenize_with_punctuation(text)
-    } else {
-        tokenize(text)
-    };
+    let frequency = count_token_slices(text, include_punctuation, case_sensitive);
 
     // Return 0.0 for empty text (no repetition)
-    if tokens.is_empty() {
+    if frequency.is_empty() {
         return 0.0;
     }
 
-    1.0 - type_token_ratio(text, include_punctuation, case_sensitive)
+    let total_tokens: usize = frequency.values().sum();
+    1.0 - frequency.len() as f64 / total_tokens as f64
 }
 
 /// Counts the frequency of each token in the text.
@@ -260,25 +441,11 @@ pub fn token_frequency(
     include_punctuation: bool,
     case_sensitive: bool,
 ) -> HashMap<String, usize> {
-    let tokens = if include_punctuation {
-        tokenize_with_punctuation(text)
-    } else {
-        tokenize(text)
-    };
-
-    let mut frequency_map = HashMap::new();
-
-    for token in tokens {
-        let key = if case_sensitive {
-            token
-        } else {
-            token.to_lowercase()
-        };
-
-        *frequency_map.entry(key).or_insert(0) += 1;
-    }
-
-    frequency_map
+    key_counts_to_strings(count_token_slices(
+        text,
+        include_punctuation,
+        case_sensitive,
+    ))
 }
 
 /// Calculates the Shannon entropy of the unigram token distribution.
@@ -296,7 +463,7 @@ pub fn token_frequency(
 ///
 /// The Shannon entropy value
 pub fn token_entropy(text: &str, include_punctuation: bool, case_sensitive: bool) -> f64 {
-    let frequency = token_frequency(text, include_punctuation, case_sensitive);
+    let frequency = count_token_slices(text, include_punctuation, case_sensitive);
 
     if frequency.is_empty() {
         return 0.0;
@@ -333,7 +500,7 @@ pub fn max_token_frequency_ratio(
     include_punctuation: bool,
     case_sensitive: bool,
 ) -> f64 {
-    let frequency = token_frequency(text, include_punctuation, case_sensitive);
+    let frequency = count_token_slices(text, include_punctuation, case_sensitive);
 
     if frequency.is_empty() {
         return 0.0;
@@ -360,7 +527,7 @@ pub fn max_token_frequency_ratio(
 ///
 /// The hapax legomena ratio (between 0.0 and 1.0)
 pub fn hapax_legomena_ratio(text: &str, include_punctuation: bool, case_sensitive: bool) -> f64 {
-    let frequency = token_frequency(text, include_punctuation, case_sensitive);
+    let frequency = count_token_slices(text, include_punctuation, case_sensitive);
 
     if frequency.is_empty() {
         return 0.0;
@@ -386,7 +553,7 @@ pub fn hapax_legomena_ratio(text: &str, include_punctuation: bool, case_sensitiv
 ///
 /// The top-5 token coverage (between 0.0 and 1.0)
 pub fn top_5_token_coverage(text: &str, include_punctuation: bool, case_sensitive: bool) -> f64 {
-    let frequency = token_frequency(text, include_punctuation, case_sensitive);
+    let frequency = count_token_slices(text, include_punctuation, case_sensitive);
 
     if frequency.is_empty() {
         return 0.0;
@@ -431,22 +598,21 @@ pub fn short_token_ratio(
     threshold: Option<usize>, // New parameter
 ) -> f64 {
     let threshold = threshold.unwrap_or(3);
-    
-    let tokens = if include_punctuation {
-        tokenize_with_punctuation(text)
-    } else {
-        tokenize(text)
-    };
 
-    if tokens.is_empty() {
-        return 0.0;
+    let mut token_count = 0;
+    let mut short_count = 0;
+    for (start, end) in token_spans(text, include_punctuation) {
+        token_count += 1;
+        if end - start <= threshold {
+            short_count += 1;
+        }
     }
 
-    // Clone the tokens for iterating to avoid ownership issues
-    let tokens_vec = tokens.clone();
-    let short_count = tokens_vec.iter().filter(|token| token.len() <= threshold).count();
+    if token_count == 0 {
+        return 0.0;
+    }
 
-    short_count as f64 / tokens.len() as f64
+    short_count as f64 / token_count as f64
 }
 
 /// Calculates the ratio of short tokens (3 characters or fewer) in a text.
@@ -496,22 +662,21 @@ pub fn long_token_ratio(
     threshold: Option<usize>, // New parameter
 ) -> f64 {
     let threshold = threshold.unwrap_or(7);
-    
-    let tokens = if include_punctuation {
-        tokenize_with_punctuation(text)
-    } else {
-        tokenize(text)
-    };
 
-    if tokens.is_empty() {
-        return 0.0;
+    let mut token_count = 0;
+    let mut long_count = 0;
+    for (start, end) in token_spans(text, include_punctuation) {
+        token_count += 1;
+        if end - start >= threshold {
+            long_count += 1;
+        }
     }
 
-    // Clone the tokens for iterating to avoid ownership issues
-    let tokens_vec = tokens.clone();
-    let long_count = tokens_vec.iter().filter(|token| token.len() >= threshold).count();
+    if token_count == 0 {
+        return 0.0;
+    }
 
-    long_count as f64 / tokens.len() as f64
+    long_count as f64 / token_count as f64
 }
 
 /// Calculates the ratio of long tokens (7 characters or more) in a text.
@@ -570,15 +735,32 @@ pub fn calculate_all_unigram_metrics(
     include_punctuation: bool,
     case_sensitive: bool,
 ) -> UnigramMetrics {
-    // Get tokens (with or without punctuation)
-    let tokens = if include_punctuation {
-        tokenize_with_punctuation(text)
-    } else {
-        tokenize(text)
-    };
+    // Count tokens, their lengths and their frequencies in a single pass over
+    // slices of the text
+    let mut frequency_map = HashMap::new();
+    let mut token_count = 0;
+    let mut total_token_length = 0;
+    let mut short_count = 0;
+    let mut long_count = 0;
+
+    for token in token_slices(text, include_punctuation) {
+        token_count += 1;
+        total_token_length += token.len();
+        // Use default thresholds (3 for short, 7 for long)
+        if token.len() <= 3 {
+            short_count += 1;
+        }
+        if token.len() >= 7 {
+            long_count += 1;
+        }
+
+        *frequency_map
+            .entry(TokenKey::new(token, case_sensitive))
+            .or_insert(0) += 1;
+    }
 
     // Handle empty text case
-    if tokens.is_empty() {
+    if token_count == 0 {
         return UnigramMetrics {
             token_count: 0,
             unique_token_count: 0,
@@ -594,25 +776,6 @@ pub fn calculate_all_unigram_metrics(
         };
     }
 
-    // Calculate token frequency in a single pass
-    let mut frequency_map = HashMap::new();
-    let token_count = tokens.len();
-    let mut total_token_length = 0;
-
-    // Store a clone of tokens for later use
-    let tokens_clone = tokens.clone();
-
-    for token in &tokens {
-        total_token_length += token.len();
-        let key = if case_sensitive {
-            token.clone()
-        } else {
-            token.to_lowercase()
-        };
-
-        *frequency_map.entry(key).or_insert(0) += 1;
-    }
-
     let unique_token_count = frequency_map.len();
     let total_tokens_f64 = token_count as f64;
 
@@ -656,9 +819,6 @@ pub fn calculate_all_unigram_metrics(
     let top_5_token_coverage = top_5_sum as f64 / token_count as f64;
 
     // Calculate short token ratio and long token ratio
-    // Use default thresholds (3 for short, 7 for long)
-    let short_count = tokens_clone.iter().filter(|token| token.len() <= 3).count();
-    let long_count = tokens_clone.iter().filter(|token| token.len() >= 7).count();
     let short_token_ratio = short_count as f64 / token_count as f64;
     let long_token_ratio = long_count as f64 / token_count as f64;
 
@@ -680,6 +840,7 @@ pub fn calculate_all_unigram_metrics(
 #[cfg(test)]
 mod tests {
     use super::*;
+    use std::collections::HashSet;
 
     #[test]
     fn test_tokenize() {
@@ -695,6 +856,74 @@ mod tests {
         assert_eq!(tokens, vec!["Hello", ",", " ", "world", "!"]);
     }
 
+    #[test]
+    fn test_token_spans() {
+        let text = "Hi, naïve  world... 42!\n";
+        let spans: Vec<(Span, TokenClass)> = class_spans(text).collect();
+        let tokens: Vec<&str> = spans
+            .iter()
+            .map(|&((start, end), _)| &text[start..end])
+            .collect();
+        assert_eq!(
+            tokens,
+            vec!["Hi", ",", " ", "naïve", "  ", "world", "...", " ", "42", "!", "\n"]
+        );
+        assert_eq!(tokens.concat(), text);
+        assert_eq!(spans[1].1, TokenClass::Punctuation);
+        assert_eq!(spans[4].1, TokenClass::Whitespace);
+        assert_eq!(spans[8].1, TokenClass::Word);
+
+        assert_eq!(token_slices(text, true).collect::<Vec<_>>(), tokens);
+        assert_eq!(tokenize_with_punctuation(text), tokens);
+        assert_eq!(
+            token_slices(text, false).collect::<Vec<_>>(),
+            vec!["Hi", "naïve", "world", "42"]
+        );
+        assert_eq!(token_spans(text, false).next(), Some((0, 2)));
+        assert_eq!(token_spans("", true).count(), 0);
+    }
+
+    #[test]
+    fn test_case_folded_keys() {
+        use std::collections::hash_map::DefaultHasher;
+
+        fn hash(key: TokenKey) -> u64 {
+            let mut hasher = DefaultHasher::new();
+            key.hash(&mut hasher);
+            hasher.finish()
+        }
+
+        let long = "Internationalization".repeat(5);
+        let pairs = [
+            ("Hello", "hELLO"),
+            ("ΟΔΟΣ", "οδος"),
+            ("Straße", "STRAßE"),
+            ("\u{212A}elvin", "kelvin"),
+            (long.as_str(), &long.to_uppercase()),
+        ];
+        for (a, b) in pairs {
+            let (a, b) = (TokenKey::new(a, false), TokenKey::new(b, false));
+            assert_eq!(a, b);
+            assert_eq!(hash(a), hash(b));
+            assert_eq!(a.to_string(), b.to_string());
+        }
+        assert_eq!(TokenKey::new("ΟΔΟΣ", false).to_string(), "οδος");
+        assert_eq!(TokenKey::new("οδος", false).to_string(), "οδος");
+        assert_eq!(
+            TokenKey::new("İstanbul", false).to_string(),
+            "i\u{307}stanbul"
+        );
+        assert_eq!(TokenKey::new("Hello", true).to_string(), "Hello");
+        assert_ne!(TokenKey::new("Hello", true), TokenKey::new("hello", true));
+        assert_ne!(TokenKey::new("hello", false), TokenKey::new("hell", false));
+
+        let counts = count_token_slices("The THE the Café CAFÉ", false, false);
+        assert_eq!(counts.len(), 2);
+        let strings = key_counts_to_strings(counts);
+        assert_eq!(strings["the"], 3);
+        assert_eq!(strings["café"], 2);
+    }
+
     #[test]
     fn test_count_tokens() {
         let text = "Hello, world! This is a test.";
@@ -0,0 +1,987 @@
+//! # Corpus Token Sketches
+//!
+//! This module provides fixed-size summaries of the unigram tokens of a corpus,
+//! for corpora whose exact vocabulary does not fit in memory. Every sketch uses
+//! the tokenizer and case folding of the other unigram functions, can be merged
+//! with sketches built in other processes, and serializes to a compact binary
+//! format.
+//!
+//! ## Key Features
+//!
+//! * `HeavyHitters`: mergeable Misra-Gries summary of the most frequent tokens
+//! * `CountMin`: Count-Min sketch answering frequency queries for any token
+//! * `HyperLogLog`: distinct token count estimate in `2^precision` bytes
+//!
+//! Tokens are hashed with a fixed, platform-independent hash, so sketches built
+//! on different machines can be merged.
+
+use pyo3::prelude::*;
+use pyo3::types::PyBytes;
+use rayon::prelude::*;
+use std::collections::HashMap;
+use std::io;
+
+use super::vocabulary::{
+    append_compressed, decompress, invalid_data, read_varint, sum_counts, to_py_err, write_varint,
+    Vocabulary,
+};
+use super::{token_slices, TokenKey};
+
+/// Magic bytes at the start of a serialized sketch
+const MAGIC: &[u8; 7] = b"CCSKTCH";
+
+/// Version of the binary format
+const FORMAT_VERSION: u8 = 1;
+
+/// Smallest and largest supported HyperLogLog precision
+const MIN_PRECISION: u8 = 4;
+const MAX_PRECISION: u8 = 18;
+
+/// Stable 64-bit hash of a token key
+///
+/// FNV-1a followed by the MurmurHash3 finalizer, which spreads the bits evenly
+/// enough for HyperLogLog and Count-Min indexing.
+pub fn token_hash(key: &str) -> u64 {
+    let mut hash: u64 = 0xcbf2_9ce4_8422_2325;
+    for &byte in key.as_bytes() {
+        hash ^= u64::from(byte);
+        hash = hash.wrapping_mul(0x0000_0100_0000_01b3);
+    }
+    hash ^= hash >> 33;
+    hash = hash.wrapping_mul(0xff51_afd7_ed55_8ccd);
+    hash ^= hash >> 33;
+    hash = hash.wrapping_mul(0xc4ce_b9fe_1a85_ec53);
+    hash ^ (hash >> 33)
+}
+
+/// Tokenizer options shared by all sketches
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+pub struct TokenOptions {
+    pub include_punctuation: bool,
+    pub case_sensitive: bool,
+}
+
+impl TokenOptions {
+    /// Hashes of the tokens of every text, computed in parallel
+    fn hashes<S: AsRef<str> + Sync>(&self, texts: &[S]) -> Vec<Vec<u64>> {
+        texts
+            .par_iter()
+            .map(|text| {
+                let mut buffer = String::new();
+                token_slices(text.as_ref(), self.include_punctuation)
+                    .map(|token| {
+                        token_hash(
+                            TokenKey::new(token, self.case_sensitive).as_key_str(&mut buffer),
+                        )
+                    })
+                    .collect()
+            })
+            .collect()
+    }
+
+    fn flags(&self) -> u8 {
+        self.include_punctuation as u8 | (self.case_sensitive as u8) << 1
+    }
+
+    fn from_flags(flags: u8) -> Self {
+        TokenOptions {
+            include_punctuation: flags & 1 != 0,
+            case_sensitive: flags & 2 != 0,
+        }
+    }
+}
+
+/// Kinds of serialized sketches
+#[derive(Debug, Clone, Copy, PartialEq, Eq)]
+enum SketchKind {
+    HeavyHitters = 1,
+    CountMin = 2,
+    HyperLogLog = 3,
+}
+
+/// Serialize a sketch body with its header
+fn encode(kind: SketchKind, options: TokenOptions, body: &[u8]) -> Vec<u8> {
+    let mut header = MAGIC.to_vec();
+    header.extend_from_slice(&[FORMAT_VERSION, kind as u8, options.flags()]);
+    append_compressed(header, body)
+}
+
+/// Check the header of a serialized sketch and return its options and body
+fn decode(bytes: &[u8], kind: SketchKind) -> io::Result<(TokenOptions, Vec<u8>)> {
+    let header_len = MAGIC.len() + 3;
+    if bytes.len() < header_len || &bytes[..MAGIC.len()] != MAGIC {
+        return Err(invalid_data("not a cheesecloth sketch"));
+    }
+    let header = &bytes[MAGIC.len()..header_len];
+    if header[0] != FORMAT_VERSION {
+        return Err(invalid_data(&format!(
+            "unsupported sketch format version {}",
+            header[0]
+        )));
+    }
+    if header[1] != kind as u8 {
+        return Err(invalid_data(&format!(
+            "expected a {:?} sketch, got kind {}",
+            kind, header[1]
+        )));
+    }
+    Ok((
+        TokenOptions::from_flags(header[2]),
+        decompress(&bytes[header_len..])?,
+    ))
+}
+
+/// Misra-Gries summary of the most frequent tokens
+///
+/// Keeps at most `capacity` counters. Each kept count underestimates the true
+/// count by at most `error`, which never exceeds `total / (capacity + 1)`, so
+/// every token more frequent than that is guaranteed to be kept. Summaries are
+/// merged by adding counters and cutting back to `capacity`.
+#[derive(Debug, Clone, PartialEq)]
+pub struct HeavyHitters {
+    pub options: TokenOptions,
+    pub capacity: usize,
+    pub counters: HashMap<Box<str>, u64>,
+    /// Total number of tokens seen
+    pub total: u64,
+    /// Largest possible underestimate of any count
+    pub error: u64,
+}
+
+impl HeavyHitters {
+    pub fn new(options: TokenOptions, capacity: usize) -> Self {
+        HeavyHitters {
+            options,
+            capacity,
+            counters: HashMap::new(),
+            total: 0,
+            error: 0,
+        }
+    }
+
+    /// Count a batch of texts
+    ///
+    /// The batch is counted exactly in parallel first, so memory grows with the
+    /// vocabulary of one batch, not of the corpus.
+    pub fn add_texts<S: AsRef<str> + Sync>(&mut self, texts: &[S]) {
+        let mut batch = Vocabulary::new(
+            self.options.include_punctuation,
+            self.options.case_sensitive,
+        );
+        batch.add_texts(texts);
+        self.add_counts(batch.counts, batch.total, 0);
+    }
+
+    /// Add counters, then subtract the (capacity + 1)-th largest count from all of
+    /// them and drop those that reach zero
+    fn add_counts(&mut self, counts: HashMap<Box<str>, u64>, total: u64, error: u64) {
+        for (token, count) in counts {
+            *self.counters.entry(token).or_insert(0) += count;
+        }
+        self.total += total;
+        self.error += error;
+
+        if self.counters.len() > self.capacity {
+            let mut values: Vec<u64> = self.counters.values().copied().collect();
+            let (_, &mut cut, _) = values.select_nth_unstable_by(self.capacity, |a, b| b.cmp(a));
+            self.counters.retain(|_, count| {
+                *count -= cut.min(*count);
+                *count > 0
+            });
+            self.error += cut;
+        }
+    }
+
+    /// Merge a summary built with the same options
+    pub fn merge(&mut self, other: HeavyHitters) {
+        self.add_counts(other.counters, other.total, other.error);
+    }
+
+    /// Lower bound of the count of a token key
+    pub fn estimate(&self, key: &str) -> u64 {
+        self.counters.get(key).copied().unwrap_or(0)
+    }
+
+    /// The `n` largest counters, most frequent first, ties in token order
+    pub fn top(&self, n: usize) -> Vec<(&str, u64)> {
+        let mut entries: Vec<(&str, u64)> = self
+            .counters
+            .iter()
+            .map(|(token, &count)| (&**token, count))
+            .collect();
+        entries.sort_unstable_by(|a, b| b.1.cmp(&a.1).then_with(|| a.0.cmp(b.0)));
+        entries.truncate(n);
+        entries
+    }
+
+    /// Share of all tokens covered by the `n` most frequent ones (a lower bound)
+    pub fn top_coverage(&self, n: usize) -> f64 {
+        if self.total == 0 {
+            return 0.0;
+        }
+        let covered: u64 = self.top(n).iter().map(|&(_, count)| count).sum();
+        covered as f64 / self.total as f64
+    }
+
+    pub fn to_bytes(&self) -> Vec<u8> {
+        let mut entries: Vec<(&str, u64)> = self
+            .counters
+            .iter()
+            .map(|(token, &count)| (&**token, count))
+            .collect();
+        entries.sort_unstable();
+
+        let mut body = Vec::new();
+        write_varint(&mut body, self.capacity as u64);
+        write_varint(&mut body, self.total);
+        write_varint(&mut body, self.error);
+        write_varint(&mut body, entries.len() as u64);
+        for (token, count) in entries {
+            write_varint(&mut body, token.len() as u64);
+            body.extend_from_slice(token.as_bytes());
+            write_varint(&mut body, count);
+        }
+        encode(SketchKind::HeavyHitters, self.options, &body)
+    }
+
+    pub fn from_bytes(bytes: &[u8]) -> io::Result<Self> {
+        let (options, body) = decode(bytes, SketchKind::HeavyHitters)?;
+        let mut reader = &body[..];
+
+        let capacity = read_varint(&mut reader)? as usize;
+        if capacity == 0 {
+            return Err(invalid_data("invalid heavy hitters capacity"));
+        }
+        let mut sketch = HeavyHitters::new(options, capacity);
+        sketch.total = read_varint(&mut reader)?;
+        sketch.error = read_varint(&mut reader)?;
+        let entries = read_varint(&mut reader)? as usize;
+        for _ in 0..entries {
+            let len = read_varint(&mut reader)? as usize;
+            if len > reader.len() {
+                return Err(invalid_data("truncated sketch"));
+            }
+            let (token, rest) = reader.split_at(len);
+            let token = std::str::from_utf8(token)
+                .map_err(|_| invalid_data("sketch token is not valid UTF-8"))?;
+            reader = rest;
+            let count = read_varint(&mut reader)?;
+            if sketch.counters.insert(token.into(), count).is_some() {
+                return Err(invalid_data("duplicate sketch token"));
+            }
+        }
+        // Counters are pruned, so they may sum to less than the total but not more
+        if sketch.counters.len() > capacity
+            || sum_counts(sketch.counters.values()).map_or(true, |sum| sum > sketch.total)
+        {
+            return Err(invalid_data("sketch counters do not match its total"));
+        }
+        Ok(sketch)
+    }
+}
+
+/// Count-Min sketch of token frequencies
+///
+/// `depth` rows of `width` counters. An estimate never undercounts and, with
+/// probability `1 - exp(-depth)`, overcounts by at most `e * total / width`.
+#[derive(Debug, Clone, PartialEq)]
+pub struct CountMin {
+    pub options: TokenOptions,
+    pub width: usize,
+    pub depth: usize,
+    /// Counters, row after row
+    pub table: Vec<u64>,
+    pub total: u64,
+}
+
+impl CountMin {
+    pub fn new(options: TokenOptions, width: usize, depth: usize) -> Self {
+        CountMin {
+            options,
+            width,
+            depth,
+            table: vec![0; width * depth],
+            total: 0,
+        }
+    }
+
+    /// Counter index of a hash in a row, by double hashing
+    fn cell(&self, hash: u64, row: usize) -> usize {
+        let (h1, h2) = (hash & 0xffff_ffff, (hash >> 32) | 1);
+        let column = h1.wrapping_add((row as u64).wrapping_mul(h2)) % self.width as u64;
+        row * self.width + column as usize
+    }
+
+    pub fn add_hash(&mut self, hash: u64, count: u64) {
+        for row in 0..self.depth {
+            let cell = self.cell(hash, row);
+            self.table[cell] += count;
+        }
+        self.total += count;
+    }
+
+    /// Count a batch of texts; tokens are hashed in parallel
+    pub fn add_texts<S: AsRef<str> + Sync>(&mut self, texts: &[S]) {
+        for hashes in self.options.hashes(texts) {
+            for hash in hashes {
+                self.add_hash(hash, 1);
+            }
+        }
+    }
+
+    /// Merge a sketch of the same shape and options
+    pub fn merge(&mut self, other: &CountMin) {
+        for (cell, &count) in self.table.iter_mut().zip(&other.table) {
+            *cell += count;
+        }
+        self.total += other.total;
+    }
+
+    /// Upper bound of the count of a token key
+    pub fn estimate(&self, key: &str) -> u64 {
+        let hash = token_hash(key);
+        (0..self.depth)
+            .map(|row| self.table[self.cell(hash, row)])
+            .min()
+            .unwrap_or(0)
+    }
+
+    pub fn to_bytes(&self) -> Vec<u8> {
+        let mut body = Vec::new();
+        write_varint(&mut body, self.width as u64);
+        write_varint(&mut body, self.depth as u64);
+        write_varint(&mut body, self.total);
+        for &count in &self.table {
+            write_varint(&mut body, count);
+        }
+        encode(SketchKind::CountMin, self.options, &body)
+    }
+
+    pub fn from_bytes(bytes: &[u8]) -> io::Result<Self> {
+        let (options, body) = decode(bytes, SketchKind::CountMin)?;
+        let mut reader = &body[..];
+
+        let width = read_varint(&mut reader)? as usize;
+        let depth = read_varint(&mut reader)? as usize;
+        if width == 0 || depth == 0 {
+            return Err(invalid_data("invalid Count-Min sketch shape"));
+        }
+        // Every counter takes at least one byte
+        if width
+            .checked_mul(depth)
+            .map_or(true, |cells| cells > reader.len())
+        {
+            return Err(invalid_data("truncated sketch"));
+        }
+        let mut sketch = CountMin::new(options, width, depth);
+        sketch.total = read_varint(&mut reader)?;
+        for cell in sketch.table.iter_mut() {
+            *cell = read_varint(&mut reader)?;
+        }
+        // Every token is counted once in every row
+        if sketch
+            .table
+            .chunks(width)
+            .any(|row| sum_counts(row) != Some(sketch.total))
+        {
+            return Err(invalid_data("sketch rows do not match its total"));
+        }
+        Ok(sketch)
+    }
+}
+
+/// HyperLogLog estimate of the number of distinct tokens
+///
+/// Uses `2^precision` one-byte registers; the relative standard error of the
+/// estimate is about `1.04 / sqrt(2^precision)`.
+#[derive(Debug, Clone, PartialEq)]
+pub struct HyperLogLog {
+    pub options: TokenOptions,
+    pub precision: u8,
+    pub registers: Vec<u8>,
+    pub total: u64,
+}
+
+impl HyperLogLog {
+    pub fn new(options: TokenOptions, precision: u8) -> Self {
+        HyperLogLog {
+            options,
+            precision,
+            registers: vec![0; 1 << precision],
+            total: 0,
+        }
+    }
+
+    pub fn add_hash(&mut self, hash: u64) {
+        let p = u32::from(self.precision);
+        let index = (hash >> (64 - p)) as usize;
+        let rank = ((hash << p).leading_zeros().min(64 - p) + 1) as u8;
+        let register = &mut self.registers[index];
+        *register = (*register).max(rank);
+        self.total += 1;
+    }
+
+    /// Count a batch of texts; tokens are hashed in parallel
+    pub fn add_texts<S: AsRef<str> + Sync>(&mut self, texts: &[S]) {
+        for hashes in self.options.hashes(texts) {
+            for hash in hashes {
+                self.add_hash(hash);
+            }
+        }
+    }
+
+    /// Merge a sketch of the same precision and options
+    pub fn merge(&mut self, other: &HyperLogLog) {
+        for (register, &rank) in self.registers.iter_mut().zip(&other.registers) {
+            *register = (*register).max(rank);
+        }
+        self.total += other.total;
+    }
+
+    /// Estimated number of distinct tokens
+    pub fn estimate(&self) -> f64 {
+        let m = self.registers.len() as f64;
+        let alpha = match self.registers.len() {
+            16 => 0.673,
+            32 => 0.697,
+            64 => 0.709,
+            _ => 0.7213 / (1.0 + 1.079 / m),
+        };
+        let sum: f64 = self
+            .registers
+            .iter()
+            .map(|&rank| 2f64.powi(-i32::from(rank)))
+            .sum();
+        let raw = alpha * m * m / sum;
+
+        // Linear counting is more accurate while many registers are still empty
+        let zeros = self.registers.iter().filter(|&&rank| rank == 0).count();
+        if raw <= 2.5 * m && zeros > 0 {
+            m * (m / zeros as f64).ln()
+        } else {
+            raw
+        }
+    }
+
+    /// Estimated distinct tokens per token
+    pub fn type_token_ratio(&self) -> f64 {
+        if self.total == 0 {
+            return 0.0;
+        }
+        (self.estimate() / self.total as f64).min(1.0)
+    }
+
+    pub fn to_bytes(&self) -> Vec<u8> {
+        let mut body = vec![self.precision];
+        write_varint(&mut body, self.total);
+        body.extend_from_slice(&self.registers);
+        encode(SketchKind::HyperLogLog, self.options, &body)
+    }
+
+    pub fn from_bytes(bytes: &[u8]) -> io::Result<Self> {
+        let (options, body) = decode(bytes, SketchKind::HyperLogLog)?;
+        let (&precision, mut reader) = body
+            .split_first()
+            .ok_or_else(|| invalid_data("truncated sketch"))?;
+        if !(MIN_PRECISION..=MAX_PRECISION).contains(&precision) {
+            return Err(invalid_data("invalid HyperLogLog precision"));
+        }
+        let mut sketch = HyperLogLog::new(options, precision);
+        sketch.total = read_varint(&mut reader)?;
+        if reader.len() != sketch.registers.len() {
+            return Err(invalid_data("truncated sketch"));
+        }
+        sketch.registers.copy_from_slice(reader);
+        let max_rank = 65 - precision;
+        if sketch.registers.iter().any(|&rank| rank > max_rank) {
+            return Err(invalid_data("invalid HyperLogLog register"));
+        }
+        Ok(sketch)
+    }
+}
+
+fn value_error(message: String) -> PyErr {
+    PyErr::new::<pyo3::exceptions::PyValueError, _>(message)
+}
+
+/// Raise unless two sketches use the same tokenizer options
+fn check_options(a: TokenOptions, b: TokenOptions) -> PyResult<()> {
+    if a == b {
+        Ok(())
+    } else {
+        Err(value_error(format!(
+            "cannot merge sketches with different options \
+             (include_punctuation={}, case_sensitive={} vs {}, {})",
+            a.include_punctuation, a.case_sensitive, b.include_punctuation, b.case_sensitive
+        )))
+    }
+}
+
+/// Lowercase a query token the way the sketch lowercased its tokens
+fn query_key<'a>(token: &'a str, options: TokenOptions, buffer: &'a mut String) -> &'a str {
+    TokenKey::new(token, options.case_sensitive).as_key_str(buffer)
+}
+
+/// Most frequent unigram tokens of a corpus in bounded memory
+///
+/// A Misra-Gries summary keeping at most `capacity` tokens; every token with a
+/// count above `total_tokens / (capacity + 1)` is kept, and kept counts are low
+/// by at most `error_bound`.
+#[pyclass]
+pub struct HeavyHittersSketch {
+    sketch: HeavyHitters,
+}
+
+#[pymethods]
+impl HeavyHittersSketch {
+    #[new]
+    #[pyo3(signature = (capacity=1000, include_punctuation=false, case_sensitive=true))]
+    fn new(capacity: usize, include_punctuation: bool, case_sensitive: bool) -> PyResult<Self> {
+        if capacity == 0 {
+            return Err(value_error("capacity must be at least 1".to_string()));
+        }
+        let options = TokenOptions {
+            include_punctuation,
+            case_sensitive,
+        };
+        Ok(HeavyHittersSketch {
+            sketch: HeavyHitters::new(options, capacity),
+        })
+    }
+
+    /// Count the tokens of a batch of texts (`str` or UTF-8 bytes).
+    #[pyo3(signature = (texts, lossy=false))]
+    fn update(&mut self, py: Python<'_>, texts: &Bound<'_, PyAny>, lossy: bool) -> PyResult<()> {
+        let batch = crate::input::TextBatch::from_py(texts)?;
+        let texts = batch.texts(lossy)?;
+        let sketch = &mut self.sketch;
+        py.allow_threads(|| sketch.add_texts(&texts));
+        Ok(())
+    }
+
+    /// Add the counts of another sketch built with the same options.
+    ///
+    /// The merged sketch keeps the capacity of this one.
+    fn merge(slf: &Bound<'_, Self>, other: &Bound<'_, HeavyHittersSketch>) -> PyResult<()> {
+        // Copy `other` before borrowing `slf` mutably, as they may be the same object
+        let other = other.borrow().sketch.clone();
+        let mut this = slf.borrow_mut();
+        check_options(this.sketch.options, other.options)?;
+        this.sketch.merge(other);
+        Ok(())
+    }
+
+    /// The `n` most frequent tokens with their (lower-bound) counts
+    #[pyo3(signature = (n=10))]
+    fn top(&self, n: usize) -> Vec<(&str, u64)> {
+        self.sketch.top(n)
+    }
+
+    /// Share of all tokens covered by the `n` most frequent ones (a lower bound)
+    #[pyo3(signature = (n=5))]
+    fn top_coverage(&self, n: usize) -> f64 {
+        self.sketch.top_coverage(n)
+    }
+
+    /// Lower bound of the count of a token
+    fn estimate(&self, token: &str) -> u64 {
+        let mut buffer = String::new();
+        self.sketch
+            .estimate(query_key(token, self.sketch.options, &mut buffer))
+    }
+
+    /// Encode the sketch in a compact binary format
+    fn to_bytes(&self, py: Python<'_>) -> PyObject {
+        let bytes = py.allow_threads(|| self.sketch.to_bytes());
+        PyBytes::new(py, &bytes).into_any().unbind()
+    }
+
+    /// Decode a sketch encoded with `to_bytes`
+    #[staticmethod]
+    fn from_bytes(py: Python<'_>, data: &[u8]) -> PyResult<Self> {
+        let sketch = py
+            .allow_threads(|| HeavyHitters::from_bytes(data))
+            .map_err(to_py_err)?;
+        Ok(HeavyHittersSketch { sketch })
+    }
+
+    #[getter]
+    fn capacity(&self) -> usize {
+        self.sketch.capacity
+    }
+
+    #[getter]
+    fn include_punctuation(&self) -> bool {
+        self.sketch.options.include_punctuation
+    }
+
+    #[getter]
+    fn case_sensitive(&self) -> bool {
+        self.sketch.options.case_sensitive
+    }
+
+    /// Total number of tokens counted
+    #[getter]
+    fn total_tokens(&self) -> u64 {
+        self.sketch.total
+    }
+
+    /// Largest possible underestimate of any count
+    #[getter]
+    fn error_bound(&self) -> u64 {
+        self.sketch.error
+    }
+
+    fn __len__(&self) -> usize {
+        self.sketch.counters.len()
+    }
+
+    fn __repr__(&self) -> String {
+        format!(
+            "<HeavyHittersSketch with {} tokens, {} of {} counters used>",
+            self.sketch.total,
+            self.sketch.counters.len(),
+            self.sketch.capacity
+        )
+    }
+}
+
+/// Approximate token frequencies of a corpus in a fixed-size Count-Min sketch
+///
+/// Estimates never undercount; with probability `1 - exp(-depth)` they overcount
+/// by at most `e * total_tokens / width`.
+#[pyclass]
+pub struct CountMinSketch {
+    sketch: CountMin,
+}
+
+#[pymethods]
+impl CountMinSketch {
+    #[new]
+    #[pyo3(signature = (width=1 << 16, depth=4, include_punctuation=false, case_sensitive=true))]
+    fn new(
+        width: usize,
+        depth: usize,
+        include_punctuation: bool,
+        case_sensitive: bool,
+    ) -> PyResult<Self> {
+        if width == 0 || !(1..=32).contains(&depth) {
+            return Err(value_error(format!(
+                "width must be at least 1 and depth between 1 and 32, got {} and {}",
+                width, depth
+            )));
+        }
+        let options = TokenOptions {
+            include_punctuation,
+            case_sensitive,
+        };
+        Ok(CountMinSketch {
+            sketch: CountMin::new(options, width, depth),
+        })
+    }
+
+    /// Count the tokens of a batch of texts (`str` or UTF-8 bytes).
+    #[pyo3(signature = (texts, lossy=false))]
+    fn update(&mut self, py: Python<'_>, texts: &Bound<'_, PyAny>, lossy: bool) -> PyResult<()> {
+        let batch = crate::input::TextBatch::from_py(texts)?;
+        let texts = batch.texts(lossy)?;
+        let sketch = &mut self.sketch;
+        py.allow_threads(|| sketch.add_texts(&texts));
+        Ok(())
+    }
+
+    /// Add the counts of another sketch of the same width, depth and options.
+    ///
+    /// Merging a sketch into itself doubles its counts.
+    fn merge(slf: &Bound<'_, Self>, other: &Bound<'_, CountMinSketch>) -> PyResult<()> {
+        if slf.is(other) {
+            let copy = slf.borrow().sketch.clone();
+            slf.borrow_mut().sketch.merge(&copy);
+            return Ok(());
+        }
+        let (mut this, other) = (slf.borrow_mut(), other.borrow());
+        check_options(this.sketch.options, other.sketch.options)?;
+        if (this.sketch.width, this.sketch.depth) != (other.sketch.width, other.sketch.depth) {
+            return Err(value_error(format!(
+                "cannot merge sketches of shape {}x{} and {}x{}",
+                this.sketch.depth, this.sketch.width, other.sketch.depth, other.sketch.width
+            )));
+        }
+        this.sketch.merge(&other.sketch);
+        Ok(())
+    }
+
+    /// Upper bound of the count of a token
+    fn estimate(&self, token: &str) -> u64 {
+        let mut buffer = String::new();
+        self.sketch
+            .estimate(query_key(token, self.sketch.options, &mut buffer))
+    }
+
+    /// Encode the sketch in a compact binary format
+    fn to_bytes(&self, py: Python<'_>) -> PyObject {
+        let bytes = py.allow_threads(|| self.sketch.to_bytes());
+        PyBytes::new(py, &bytes).into_any().unbind()
+    }
+
+    /// Decode a sketch encoded with `to_bytes`
+    #[staticmethod]
+    fn from_bytes(py: Python<'_>, data: &[u8]) -> PyResult<Self> {
+        let sketch = py
+            .allow_threads(|| CountMin::from_bytes(data))
+            .map_err(to_py_err)?;
+        Ok(CountMinSketch { sketch })
+    }
+
+    #[getter]
+    fn width(&self) -> usize {
+        self.sketch.width
+    }
+
+    #[getter]
+    fn depth(&self) -> usize {
+        self.sketch.depth
+    }
+
+    #[getter]
+    fn include_punctuation(&self) -> bool {
+        self.sketch.options.include_punctuation
+    }
+
+    #[getter]
+    fn case_sensitive(&self) -> bool {
+        self.sketch.options.case_sensitive
+    }
+
+    /// Total number of tokens counted
+    #[getter]
+    fn total_tokens(&self) -> u64 {
+        self.sketch.total
+    }
+
+    fn __repr__(&self) -> String {
+        format!(
+            "<CountMinSketch {}x{} with {} tokens>",
+            self.sketch.depth, self.sketch.width, self.sketch.total
+        )
+    }
+}
+
+/// Distinct token count of a corpus estimated with HyperLogLog
+///
+/// Uses `2**precision` bytes; the relative standard error is about
+/// `1.04 / sqrt(2**precision)` (0.8% at the default precision of 14).
+#[pyclass]
+pub struct HyperLogLogSketch {
+    sketch: HyperLogLog,
+}
+
+#[pymethods]
+impl HyperLogLogSketch {
+    #[new]
+    #[pyo3(signature = (precision=14, include_punctuation=false, case_sensitive=true))]
+    fn new(precision: u8, include_punctuation: bool, case_sensitive: bool) -> PyResult<Self> {
+        if !(MIN_PRECISION..=MAX_PRECISION).contains(&precision) {
+            return Err(value_error(format!(
+                "precision must be between {} and {}, got {}",
+                MIN_PRECISION, MAX_PRECISION, precision
+            )));
+        }
+        let options = TokenOptions {
+            include_punctuation,
+            case_sensitive,
+        };
+        Ok(HyperLogLogSketch {
+            sketch: HyperLogLog::new(options, precision),
+        })
+    }
+
+    /// Count the tokens of a batch of texts (`str` or UTF-8 bytes).
+    #[pyo3(signature = (texts, lossy=false))]
+    fn update(&mut self, py: Python<'_>, texts: &Bound<'_, PyAny>, lossy: bool) -> PyResult<()> {
+        let batch = crate::input::TextBatch::from_py(texts)?;
+        let texts = batch.texts(lossy)?;
+        let sketch = &mut self.sketch;
+        py.allow_threads(|| sketch.add_texts(&texts));
+        Ok(())
+    }
+
+    /// Add the tokens of another sketch of the same precision and options.
+    ///
+    /// Merging a sketch into itself keeps its distinct count and doubles its
+    /// token total.
+    fn merge(slf: &Bound<'_, Self>, other: &Bound<'_, HyperLogLogSketch>) -> PyResult<()> {
+        if slf.is(other) {
+            let mut this = slf.borrow_mut();
+            this.sketch.total *= 2;
+            return Ok(());
+        }
+        let (mut this, other) = (slf.borrow_mut(), other.borrow());
+        check_options(this.sketch.options, other.sketch.options)?;
+        if this.sketch.precision != other.sketch.precision {
+            return Err(value_error(format!(
+                "cannot merge sketches of precision {} and {}",
+                this.sketch.precision, other.sketch.precision
+            )));
+        }
+        this.sketch.merge(&other.sketch);
+        Ok(())
+    }
+
+    /// Estimated number of distinct tokens
+    fn estimate(&self) -> u64 {
+        self.sketch.estimate().round() as u64
+    }
+
+    /// Estimated distinct tokens per token
+    fn type_token_ratio(&self) -> f64 {
+        self.sketch.type_token_ratio()
+    }
+
+    /// Encode the sketch in a compact binary format
+    fn to_bytes(&self, py: Python<'_>) -> PyObject {
+        let bytes = py.allow_threads(|| self.sketch.to_bytes());
+        PyBytes::new(py, &bytes).into_any().unbind()
+    }
+
+    /// Decode a sketch encoded with `to_bytes`
+    #[staticmethod]
+    fn from_bytes(py: Python<'_>, data: &[u8]) -> PyResult<Self> {
+        let sketch = py
+            .allow_threads(|| HyperLogLog::from_bytes(data))
+            .map_err(to_py_err)?;
+        Ok(HyperLogLogSketch { sketch })
+    }
+
+    #[getter]
+    fn precision(&self) -> u8 {
+        self.sketch.precision
+    }
+
+    #[getter]
+    fn include_punctuation(&self) -> bool {
+        self.sketch.options.include_punctuation
+    }
+
+    #[getter]
+    fn case_sensitive(&self) -> bool {
+        self.sketch.options.case_sensitive
+    }
+
+    /// Total number of tokens counted
+    #[getter]
+    fn total_tokens(&self) -> u64 {
+        self.sketch.total
+    }
+
+    fn __repr__(&self) -> String {
+        format!(
+            "<HyperLogLogSketch with {} tokens, about {} distinct>",
+            self.sketch.total,
+            self.sketch.estimate().round()
+        )
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+
+    const OPTIONS: TokenOptions = TokenOptions {
+        include_punctuation: false,
+        case_sensitive: false,
+    };
+
+    /// Texts with a skewed vocabulary: word `i` appears about `1000 / (i + 1)` times
+    fn zipf_texts() -> Vec<String> {
+        (0..1000)
+            .map(|doc| {
+                (0..40)
+                    .filter(|rank| doc % (rank + 1) == 0)
+                    .map(|rank| format!("Word{} ", rank))
+                    .collect()
+            })
+            .collect()
+    }
+
+    #[test]
+    fn test_heavy_hitters() {
+        let texts = zipf_texts();
+        let mut exact = Vocabulary::new(false, false);
+        exact.add_texts(&texts);
+
+        let (first, second) = texts.split_at(400);
+        let mut sketch = HeavyHitters::new(OPTIONS, 10);
+        sketch.add_texts(first);
+        let mut other = HeavyHitters::new(OPTIONS, 10);
+        other.add_texts(second);
+        sketch.merge(other);
+
+        assert!(sketch.counters.len() <= 10);
+        assert_eq!(sketch.total, exact.total);
+        assert!(sketch.error <= sketch.total / 11);
+        assert_eq!(sketch.top(1)[0].0, "word0");
+        for (token, &count) in &exact.counts {
+            let estimate = sketch.estimate(token);
+            assert!(estimate <= count && count <= estimate + sketch.error);
+        }
+
+        let restored = HeavyHitters::from_bytes(&sketch.to_bytes()).unwrap();
+        assert_eq!(restored, sketch);
+
+        // Counters summing to more than the total are rejected
+        sketch.total = 0;
+        assert!(HeavyHitters::from_bytes(&sketch.to_bytes()).is_err());
+    }
+
+    #[test]
+    fn test_count_min() {
+        let texts = zipf_texts();
+        let mut exact = Vocabulary::new(false, false);
+        exact.add_texts(&texts);
+
+        let mut sketch = CountMin::new(OPTIONS, 64, 4);
+        sketch.add_texts(&texts[..500]);
+        let mut other = CountMin::new(OPTIONS, 64, 4);
+        other.add_texts(&texts[500..]);
+        sketch.merge(&other);
+
+        assert_eq!(sketch.total, exact.total);
+        for (token, &count) in &exact.counts {
+            assert!(sketch.estimate(token) >= count);
+        }
+        assert_eq!(sketch.estimate("word0"), 1000);
+
+        let restored = CountMin::from_bytes(&sketch.to_bytes()).unwrap();
+        assert_eq!(restored, sketch);
+        assert!(HyperLogLog::from_bytes(&sketch.to_bytes()).is_err());
+
+        sketch.total += 1;
+        assert!(CountMin::from_bytes(&sketch.to_bytes()).is_err());
+    }
+
+    #[test]
+    fn test_hyperloglog() {
+        let mut sketch = HyperLogLog::new(OPTIONS, 12);
+        let mut other = HyperLogLog::new(OPTIONS, 12);
+        for i in 0..20_000 {
+            sketch.add_hash(token_hash(&format!("token{}", i)));
+            other.add_hash(token_hash(&format!("token{}", i + 10_000)));
+        }
+        sketch.merge(&other);
+
+        let relative_error = (sketch.estimate() - 30_000.0).abs() / 30_000.0;
+        assert!(relative_error < 0.05, "estimate {}", sketch.estimate());
+        assert_eq!(sketch.total, 40_000);
+
+        let mut small = HyperLogLog::new(OPTIONS, 12);
+        small.add_texts(&["the cat THE cat the end"]);
+        assert_eq!(small.estimate().round(), 3.0);
+
+        let restored = HyperLogLog::from_bytes(&sketch.to_bytes()).unwrap();
+        assert_eq!(restored, sketch);
+
+        sketch.registers[0] = 64;
+        assert!(HyperLogLog::from_bytes(&sketch.to_bytes()).is_err());
+    }
+}
@@ -0,0 +1,506 @@
+//! # Corpus Vocabulary
+//!
+//! This module counts unigram tokens over a whole corpus. Texts are tokenized in
+//! parallel into per-thread shards that store each distinct token once, and shards
+//! are merged by moving their entries, so a vocabulary can be built from batches,
+//! from per-document frequency maps, or from vocabularies built elsewhere.
+//!
+//! ## Binary Format
+//!
+//! A vocabulary is saved as the magic bytes `CCVOCAB`, a format version byte, a
+//! flags byte (bit 0: `include_punctuation`, bit 1: `case_sensitive`) and a
+//! deflate-compressed body of LEB128 varints: document count, token total, entry
+//! count, then for each entry, in token order, the token length, its UTF-8 bytes
+//! and its count.
+
+use flate2::read::DeflateDecoder;
+use flate2::write::DeflateEncoder;
+use flate2::Compression;
+use pyo3::prelude::*;
+use pyo3::types::PyDict;
+use rayon::prelude::*;
+use std::collections::HashMap;
+use std::io::{self, Read, Write};
+
+use super::{token_slices, TokenKey};
+
+/// Magic bytes at the start of a saved vocabulary
+const MAGIC: &[u8; 7] = b"CCVOCAB";
+
+/// Version of the binary format
+const FORMAT_VERSION: u8 = 1;
+
+/// Token counts of a corpus
+#[derive(Debug, Clone, Default, PartialEq)]
+pub struct Vocabulary {
+    pub include_punctuation: bool,
+    pub case_sensitive: bool,
+    /// Count of each distinct token, lowercased unless case-sensitive
+    pub counts: HashMap<Box<str>, u64>,
+    /// Total number of tokens counted
+    pub total: u64,
+    /// Number of texts or frequency maps added
+    pub documents: u64,
+}
+
+impl Vocabulary {
+    /// Create an empty vocabulary
+    pub fn new(include_punctuation: bool, case_sensitive: bool) -> Self {
+        Vocabulary {
+            include_punctuation,
+            case_sensitive,
+            ..Default::default()
+        }
+    }
+
+    /// Add `count` occurrences of a token key, storing the key only if it is new
+    fn add_key(&mut self, key: &str, count: u64) {
+        match self.counts.get_mut(key) {
+            Some(existing) => *existing += count,
+            None => {
+                self.counts.insert(key.into(), count);
+            }
+        }
+        self.total += count;
+    }
+
+    /// Count the tokens of a text
+    pub fn add_text(&mut self, text: &str) {
+        let mut buffer = String::new();
+        for token in token_slices(text, self.include_punctuation) {
+            let key = TokenKey::new(token, self.case_sensitive);
+            self.add_key(key.as_key_str(&mut buffer), 1);
+        }
+        self.documents += 1;
+    }
+
+    /// Add an existing frequency map as one document
+    ///
+    /// Keys are lowercased when the vocabulary is case-insensitive.
+    pub fn add_counts<'a, I: IntoIterator<Item = (&'a str, u64)>>(&mut self, counts: I) {
+        let mut buffer = String::new();
+        for (token, count) in counts {
+            let key = TokenKey::new(token, self.case_sensitive);
+            self.add_key(key.as_key_str(&mut buffer), count);
+        }
+        self.documents += 1;
+    }
+
+    /// Count a batch of texts in parallel, one shard per worker
+    pub fn add_texts<S: AsRef<str> + Sync>(&mut self, texts: &[S]) {
+        let (include_punctuation, case_sensitive) = (self.include_punctuation, self.case_sensitive);
+        let shard = texts
+            .par_iter()
+            .fold(
+                || Vocabulary::new(include_punctuation, case_sensitive),
+                |mut shard, text| {
+                    shard.add_text(text.as_ref());
+                    shard
+                },
+            )
+            .reduce(
+                || Vocabulary::new(include_punctuation, case_sensitive),
+                Vocabulary::merged,
+            );
+        self.merge(shard);
+    }
+
+    /// Add the counts of another vocabulary built with the same options
+    pub fn merge(&mut self, other: Vocabulary) {
+        // Move the entries of the smaller table into the larger one
+        let mut other = other;
+        if other.counts.len() > self.counts.len() {
+            std::mem::swap(&mut self.counts, &mut other.counts);
+        }
+        for (token, count) in other.counts {
+            *self.counts.entry(token).or_insert(0) += count;
+        }
+        self.total += other.total;
+        self.documents += other.documents;
+    }
+
+    /// `merge` by value, for reductions
+    fn merged(mut self, other: Vocabulary) -> Vocabulary {
+        self.merge(other);
+        self
+    }
+
+    /// Whether another vocabulary was built with the same options
+    pub fn is_compatible(&self, other: &Vocabulary) -> bool {
+        self.include_punctuation == other.include_punctuation
+            && self.case_sensitive == other.case_sensitive
+    }
+
+    /// Entries sorted by descending count, ties in token order
+    pub fn most_common(&self, limit: Option<usize>) -> Vec<(&str, u64)> {
+        let mut entries: Vec<(&str, u64)> = self
+            .counts
+            .iter()
+            .map(|(token, &count)| (&**token, count))
+            .collect();
+        entries.sort_unstable_by(|a, b| b.1.cmp(&a.1).then_with(|| a.0.cmp(b.0)));
+        if let Some(limit) = limit {
+            entries.truncate(limit);
+        }
+        entries
+    }
+
+    /// Encode in the binary format
+    pub fn to_bytes(&self) -> Vec<u8> {
+        let mut entries: Vec<(&str, u64)> = self
+            .counts
+            .iter()
+            .map(|(token, &count)| (&**token, count))
+            .collect();
+        entries.sort_unstable();
+
+        let mut body = Vec::new();
+        write_varint(&mut body, self.documents);
+        write_varint(&mut body, self.total);
+        write_varint(&mut body, entries.len() as u64);
+        for (token, count) in entries {
+            write_varint(&mut body, token.len() as u64);
+            body.extend_from_slice(token.as_bytes());
+            write_varint(&mut body, count);
+        }
+
+        let mut header = MAGIC.to_vec();
+        header.push(FORMAT_VERSION);
+        header.push(self.include_punctuation as u8 | (self.case_sensitive as u8) << 1);
+        append_compressed(header, &body)
+    }
+
+    /// Decode the binary format
+    pub fn from_bytes(bytes: &[u8]) -> io::Result<Self> {
+        let header_len = MAGIC.len() + 2;
+        if bytes.len() < header_len || &bytes[..MAGIC.len()] != MAGIC {
+            return Err(invalid_data("not a cheesecloth vocabulary"));
+        }
+        let version = bytes[MAGIC.len()];
+        if version != FORMAT_VERSION {
+            return Err(invalid_data(&format!(
+                "unsupported vocabulary format version {}",
+                version
+            )));
+        }
+        let flags = bytes[MAGIC.len() + 1];
+
+        let body = decompress(&bytes[header_len..])?;
+        let mut reader = &body[..];
+
+        let mut vocabulary = Vocabulary::new(flags & 1 != 0, flags & 2 != 0);
+        vocabulary.documents = read_varint(&mut reader)?;
+        vocabulary.total = read_varint(&mut reader)?;
+        let entries = read_varint(&mut reader)? as usize;
+        vocabulary.counts.reserve(entries.min(body.len()));
+        for _ in 0..entries {
+            let len = read_varint(&mut reader)? as usize;
+            if len > reader.len() {
+                return Err(invalid_data("truncated vocabulary"));
+            }
+            let (token, rest) = reader.split_at(len);
+            let token = std::str::from_utf8(token)
+                .map_err(|_| invalid_data("vocabulary token is not valid UTF-8"))?;
+            reader = rest;
+            let count = read_varint(&mut reader)?;
+            if vocabulary.counts.insert(token.into(), count).is_some() {
+                return Err(invalid_data("duplicate vocabulary token"));
+            }
+        }
+        if sum_counts(vocabulary.counts.values()) != Some(vocabulary.total) {
+            return Err(invalid_data("vocabulary total does not match its counts"));
+        }
+        Ok(vocabulary)
+    }
+}
+
+/// Append a deflate-compressed body to a header
+pub(crate) fn append_compressed(header: Vec<u8>, body: &[u8]) -> Vec<u8> {
+    let mut encoder = DeflateEncoder::new(header, Compression::default());
+    // Writing to a Vec cannot fail
+    encoder.write_all(body).expect("in-memory write");
+    encoder.finish().expect("in-memory write")
+}
+
+/// Decompress a body written by `append_compressed`
+pub(crate) fn decompress(bytes: &[u8]) -> io::Result<Vec<u8>> {
+    let mut body = Vec::new();
+    DeflateDecoder::new(bytes).read_to_end(&mut body)?;
+    Ok(body)
+}
+
+/// Sum of decoded counts, or `None` if it overflows
+pub(crate) fn sum_counts<'a>(counts: impl IntoIterator<Item = &'a u64>) -> Option<u64> {
+    counts
+        .into_iter()
+        .try_fold(0u64, |sum, &count| sum.checked_add(count))
+}
+
+/// Error for malformed serialized data
+pub(crate) fn invalid_data(message: &str) -> io::Error {
+    io::Error::new(io::ErrorKind::InvalidData, message.to_string())
+}
+
+/// Append an unsigned LEB128 varint
+pub(crate) fn write_varint(out: &mut Vec<u8>, mut value: u64) {
+    while value >= 0x80 {
+        out.push(value as u8 | 0x80);
+        value >>= 7;
+    }
+    out.push(value as u8);
+}
+
+/// Read an unsigned LEB128 varint, advancing the slice
+pub(crate) fn read_varint(input: &mut &[u8]) -> io::Result<u64> {
+    let mut value = 0u64;
+    for shift in (0..64).step_by(7) {
+        let (&byte, rest) = input
+            .split_first()
+            .ok_or_else(|| invalid_data("truncated vocabulary"))?;
+        *input = rest;
+        value |= u64::from(byte & 0x7F) << shift;
+        if byte & 0x80 == 0 {
+            return Ok(value);
+        }
+    }
+    Err(invalid_data("varint too long"))
+}
+
+/// Convert a decoding error to a Python exception
+pub(crate) fn to_py_err(error: io::Error) -> PyErr {
+    if matches!(
+        error.kind(),
+        io::ErrorKind::InvalidData | io::ErrorKind::UnexpectedEof
+    ) {
+        PyErr::new::<pyo3::exceptions::PyValueError, _>(error.to_string())
+    } else {
+        error.into()
+    }
+}
+
+/// Corpus-level unigram vocabulary built from batches of texts
+///
+/// Tokens are counted with the `include_punctuation` and `case_sensitive`
+/// semantics of `get_unigram_frequency`. Accumulators from different processes
+/// can be saved with `to_bytes`/`save` and combined with `merge`.
+#[pyclass]
+pub struct VocabularyAccumulator {
+    vocabulary: Vocabulary,
+}
+
+impl VocabularyAccumulator {
+    /// Raise unless another accumulator was built with the same options
+    fn check_compatible(&self, other: &Vocabulary) -> PyResult<()> {
+        if self.vocabulary.is_compatible(other) {
+            Ok(())
+        } else {
+            Err(PyErr::new::<pyo3::exceptions::PyValueError, _>(format!(
+                "cannot merge vocabularies with different options \
+                 (include_punctuation={}, case_sensitive={} vs {}, {})",
+                self.vocabulary.include_punctuation,
+                self.vocabulary.case_sensitive,
+                other.include_punctuation,
+                other.case_sensitive
+            )))
+        }
+    }
+}
+
+#[pymethods]
+impl VocabularyAccumulator {
+    #[new]
+    #[pyo3(signature = (include_punctuation=false, case_sensitive=true))]
+    fn new(include_punctuation: bool, case_sensitive: bool) -> Self {
+        VocabularyAccumulator {
+            vocabulary: Vocabulary::new(include_punctuation, case_sensitive),
+        }
+    }
+
+    /// Count the tokens of a batch of texts (`str` or UTF-8 bytes) in parallel.
+    #[pyo3(signature = (texts, lossy=false))]
+    fn update(&mut self, py: Python<'_>, texts: &Bound<'_, PyAny>, lossy: bool) -> PyResult<()> {
+        let batch = crate::input::TextBatch::from_py(texts)?;
+        let texts = batch.texts(lossy)?;
+        let vocabulary = &mut self.vocabulary;
+        py.allow_threads(|| vocabulary.add_texts(&texts));
+        Ok(())
+    }
+
+    /// Add a per-document frequency map, such as one from `get_unigram_frequency`.
+    fn update_counts(&mut self, counts: HashMap<String, u64>) {
+        self.vocabulary
+            .add_counts(counts.iter().map(|(token, &count)| (token.as_str(), count)));
+    }
+
+    /// Add the counts of another accumulator built with the same options.
+    ///
+    /// Merging an accumulator into itself doubles its counts.
+    fn merge(slf: &Bound<'_, Self>, other: &Bound<'_, VocabularyAccumulator>) -> PyResult<()> {
+        // Copy `other` before borrowing `slf` mutably, as they may be the same object
+        let other = other.borrow().vocabulary.clone();
+        let mut this = slf.borrow_mut();
+        this.check_compatible(&other)?;
+        this.vocabulary.merge(other);
+        Ok(())
+    }
+
+    /// Token counts as a dictionary
+    fn counts<'py>(&self, py: Python<'py>) -> PyResult<Bound<'py, PyDict>> {
+        let dict = PyDict::new(py);
+        for (token, count) in &self.vocabulary.counts {
+            dict.set_item(&**token, count)?;
+        }
+        Ok(dict)
+    }
+
+    /// The `n` most frequent tokens with their counts, or all tokens if `n` is None
+    #[pyo3(signature = (n=None))]
+    fn most_common(&self, n: Option<usize>) -> Vec<(&str, u64)> {
+        self.vocabulary.most_common(n)
+    }
+
+    /// Count of a token (lowercased first if the vocabulary is case-insensitive)
+    fn get(&self, token: &str) -> u64 {
+        let mut buffer = String::new();
+        let key = TokenKey::new(token, self.vocabulary.case_sensitive).as_key_str(&mut buffer);
+        self.vocabulary.counts.get(key).copied().unwrap_or(0)
+    }
+
+    /// Encode the accumulator in a compact binary format
+    fn to_bytes(&self, py: Python<'_>) -> PyObject {
+        let bytes = py.allow_threads(|| self.vocabulary.to_bytes());
+        pyo3::types::PyBytes::new(py, &bytes).into_any().unbind()
+    }
+
+    /// Decode an accumulator encoded with `to_bytes`
+    #[staticmethod]
+    fn from_bytes(py: Python<'_>, data: &[u8]) -> PyResult<Self> {
+        let vocabulary = py
+            .allow_threads(|| Vocabulary::from_bytes(data))
+            .map_err(to_py_err)?;
+        Ok(VocabularyAccumulator { vocabulary })
+    }
+
+    /// Write the accumulator to a file
+    fn save(&self, py: Python<'_>, path: std::path::PathBuf) -> PyResult<()> {
+        py.allow_threads(|| std::fs::write(path, self.vocabulary.to_bytes()))?;
+        Ok(())
+    }
+
+    /// Read an accumulator written with `save`
+    #[staticmethod]
+    fn load(py: Python<'_>, path: std::path::PathBuf) -> PyResult<Self> {
+        let vocabulary = py
+            .allow_threads(|| std::fs::read(path).and_then(|bytes| Vocabulary::from_bytes(&bytes)))
+            .map_err(to_py_err)?;
+        Ok(VocabularyAccumulator { vocabulary })
+    }
+
+    #[getter]
+    fn include_punctuation(&self) -> bool {
+        self.vocabulary.include_punctuation
+    }
+
+    #[getter]
+    fn case_sensitive(&self) -> bool {
+        self.vocabulary.case_sensitive
+    }
+
+    /// Total number of tokens counted
+    #[getter]
+    fn total_tokens(&self) -> u64 {
+        self.vocabulary.total
+    }
+
+    /// Number of texts and frequency maps added
+    #[getter]
+    fn document_count(&self) -> u64 {
+        self.vocabulary.documents
+    }
+
+    /// Number of distinct tokens
+    fn __len__(&self) -> usize {
+        self.vocabulary.counts.len()
+    }
+
+    fn __contains__(&self, token: &str) -> bool {
+        self.get(token) > 0
+    }
+
+    fn __repr__(&self) -> String {
+        format!(
+            "<VocabularyAccumulator with {} tokens, {} distinct>",
+            self.vocabulary.total,
+            self.vocabulary.counts.len()
+        )
+    }
+}
+
+#[cfg(test)]
+mod tests {
+    use super::*;
+    use crate::unigram::{fold_char, token_frequency};
+
+    #[test]
+    fn test_parallel_counts_match_token_frequency() {
+        let texts: Vec<String> = (0..200)
+            .map(|i| format!("The cat {} and THE dog, the end {}.", i % 7, i % 3))
+            .collect();
+        for &(include_punctuation, case_sensitive) in
+            &[(false, true), (false, false), (true, false)]
+        {
+            let mut vocabulary = Vocabulary::new(include_punctuation, case_sensitive);
+            vocabulary.add_texts(&texts);
+
+            let mut expected: HashMap<String, u64> = HashMap::new();
+            for text in &texts {
+                let counts = token_frequency(text, include_punctuation, case_sensitive);
+                for (token, count) in counts {
+                    *expected.entry(token).or_insert(0) += count as u64;
+                }
+            }
+            let counts: HashMap<String, u64> = vocabulary
+                .counts
+                .iter()
+                .map(|(token, &count)| (token.to_string(), count))
+                .collect();
+            assert_eq!(counts, expected);
+            assert_eq!(vocabulary.total, expected.values().sum::<u64>());
+            assert_eq!(vocabulary.documents, 200);
+        }
+    }
+
+    #[test]
+    fn test_add_counts_and_merge() {
+        let mut a = Vocabulary::new(false, false);
+        a.add_text("Hello world");
+        let mut b = Vocabulary::new(false, false);
+        b.add_counts([("HELLO", 2), ("there", 1)]);
+        a.merge(b);
+        assert_eq!(a.counts["hello"], 3);
+        assert_eq!(a.counts["world"], 1);
+        assert_eq!(a.total, 5);
+        assert_eq!(a.documents, 2);
+        assert_eq!(a.most_common(Some(1)), vec![("hello", 3)]);
+        assert_eq!(fold_char('Σ'), 'σ');
+    }
+
+    #[test]
+    fn test_binary_round_trip() {
+        let mut vocabulary = Vocabulary::new(true, false);
+        vocabulary.add_texts(&["Ünïcode text, text!", "more TEXT"]);
+        let bytes = vocabulary.to_bytes();
+        assert_eq!(Vocabulary::from_bytes(&bytes).unwrap(), vocabulary);
+
+        assert!(Vocabulary::from_bytes(b"not a vocabulary").is_err());
+        assert!(Vocabulary::from_bytes(&bytes[..bytes.len() - 2]).is_err());
+
+        let mut inconsistent = vocabulary.clone();
+        inconsistent.total += 1;
+        assert!(Vocabulary::from_bytes(&inconsistent.to_bytes()).is_err());
+
+        let mut value = Vec::new();
+        write_varint(&mut value, u64::MAX);
+        assert_eq!(read_varint(&mut &value[..]).unwrap(), u64::MAX);
+    }
+}